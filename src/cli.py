@@ -0,0 +1,344 @@
+"""
+Línea de comandos para operaciones masivas sin la interfaz de Streamlit.
+
+Pensada para tareas programadas (cron): cada comando imprime un reporte JSON
+en stdout, los logs van a stderr y el código de salida es 1 si falla.
+
+Uso:
+    liz-pos import-recount inventario.xlsx --batch-size 5000
+    liz-pos delete salida.csv
+    liz-pos export catalogo.xlsx --all
+    liz-pos reprice --mode markup --value 1.35 --category Filtros --dry-run
+    liz-pos vacuum
+    liz-pos maintain --archive-after-days 180
+    liz-pos backup --dir backups --keep 14
+    liz-pos replenish pedido.xlsx --location CENTRO
+    liz-pos checkpoint
+    liz-pos stock-as-of 2026-03-31 stock_marzo.xlsx
+    liz-pos duplicates --full
+    liz-pos restore backups/pos_system-20260101-020000.db
+
+Sin instalar el paquete: python -m src.cli <comando> ...
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.database.backup import BackupManager
+from src.database.database import Database
+from src.entities.product import ProductCategory
+from src.entities.repricing_rule import RepricingMode, RepricingRule
+from src.repositories.duplicate_repository import DuplicateRepository
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.repositories.stock_ledger_repository import StockLedgerRepository
+from src.services.duplicate_service import DuplicateService
+from src.services.inventory_history_service import InventoryHistoryService, end_of_day
+from src.services.maintenance_service import MaintenanceService, archive_database_from_env
+from src.services.pricing_service import PricingService
+from src.services.replenishment_service import ReplenishmentService
+from src.services.product_service import CATALOG_COLUMNS, ProductService
+from src.utils.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+EXPORT_COLUMNS = CATALOG_COLUMNS
+
+_REPRICE_MODES = {"markup": RepricingMode.MARKUP_OVER_COST, "percent": RepricingMode.PERCENT_CHANGE}
+
+
+def read_records(path: str, sheet: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Filas de un XLSX o CSV como diccionarios, leídas en streaming; omite celdas vacías"""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            for row in csv.DictReader(file):
+                record = {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+                if "code" in record:
+                    yield record
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        rows = worksheet.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, [])]
+        for values in rows:
+            record = {
+                name: value for name, value in zip(header, values)
+                if name and value is not None and value != ""
+            }
+            if "code" in record:
+                yield record
+    finally:
+        workbook.close()
+
+
+def write_records(path: str, records: Iterator[Dict[str, Any]]) -> int:
+    """Escribe en streaming a XLSX (modo write_only) o CSV; retorna las filas escritas"""
+    count = 0
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=EXPORT_COLUMNS)
+            writer.writeheader()
+            for record in records:
+                writer.writerow(record)
+                count += 1
+        return count
+
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Productos")
+    worksheet.append(EXPORT_COLUMNS)
+    for record in records:
+        worksheet.append([record[column] for column in EXPORT_COLUMNS])
+        count += 1
+    workbook.save(path)
+    return count
+
+
+class CatalogCommands:
+    """Comandos sobre ProductService / PricingService; cada uno retorna su reporte"""
+
+    def __init__(self, database: Database):
+        self.database = database
+        repository = ProductRepository(database.get_session(), database.get_read_session(), actor="cli")
+        self.repository = repository
+        self.product_service = ProductService(repository)
+        self.pricing_service = PricingService(repository)
+
+    def import_recount(self, args: argparse.Namespace) -> Dict[str, Any]:
+        records = read_records(args.file, args.sheet)
+        return self.product_service.recount_inventory(records, batch_size=args.batch_size)
+
+    def delete(self, args: argparse.Namespace) -> Dict[str, Any]:
+        codes = list(args.codes or [])
+        if args.file:
+            codes.extend(record["code"] for record in read_records(args.file, args.sheet))
+        deleted_count, not_found = self.product_service.delete_products_by_code(codes)
+        return {"requested": len(codes), "deleted": deleted_count, "not_found": not_found}
+
+    def export(self, args: argparse.Namespace) -> Dict[str, Any]:
+        records = (
+            {**record, "category": getattr(record["category"], "value", record["category"])}
+            for record in self.product_service.iter_catalog(not args.all, args.batch_size)
+        )
+        exported = write_records(args.file, records)
+        return {"file": os.path.abspath(args.file), "exported": exported}
+
+    def reprice(self, args: argparse.Namespace) -> Dict[str, Any]:
+        rule = RepricingRule(
+            _REPRICE_MODES[args.mode],
+            args.value,
+            category=ProductCategory(args.category) if args.category else None,
+            supplier=args.supplier,
+            round_to=args.round_to,
+        )
+        if args.dry_run:
+            changes = self.pricing_service.preview([rule])
+            return {"dry_run": True, "changed": len(changes), "sample": changes[:args.sample]}
+        return {"dry_run": False, "changed": self.pricing_service.apply([rule])}
+
+    def vacuum(self, args: argparse.Namespace) -> Dict[str, Any]:
+        return self.database.vacuum()
+
+    def maintain(self, args: argparse.Namespace) -> Dict[str, Any]:
+        archive_database = (
+            Database.connect(args.archive_database_url) if args.archive_database_url else archive_database_from_env()
+        )
+        service = MaintenanceService(self.repository, self.database, archive_database,
+                                     args.archive_after_days, args.vacuum_pages)
+        deadline = time.time() + args.max_minutes * 60 if args.max_minutes else None
+        return service.run(deadline)
+
+    def backup(self, args: argparse.Namespace) -> Dict[str, Any]:
+        return BackupManager(self.database, args.dir, args.keep).create()
+
+    def verify_backup(self, args: argparse.Namespace) -> Dict[str, Any]:
+        report = BackupManager(self.database).verify(args.file)
+        if not report["ok"]:
+            raise ValueError(f"El respaldo no es válido: {report}")
+        return report
+
+    def restore(self, args: argparse.Namespace) -> Dict[str, Any]:
+        return BackupManager(self.database, args.dir).restore(args.file)
+
+    def replenish(self, args: argparse.Namespace) -> Dict[str, Any]:
+        session, read_session = self.database.get_session(), self.database.get_read_session()
+        locations = LocationRepository(session, read_session, actor="cli")
+        location_id = None
+        if args.location:
+            location = locations.get_by_code(args.location.strip().upper())
+            if location is None:
+                raise ValueError(f"No existe la sucursal: {args.location}")
+            location_id = location.id
+        service = ReplenishmentService(
+            self.repository, SaleRepository(session, read_session, actor="cli"), locations,
+            args.lookback_days, args.lead_days, args.safety_days, args.cover_days,
+        )
+        to_order = service.get_plan().for_location(location_id, only_to_order=True)
+        with open(args.file, "wb") as file:
+            file.write(service.export_purchase_order(location_id))
+        return {
+            "file": os.path.abspath(args.file),
+            "location": args.location,
+            "products": len(to_order),
+            "units": int(to_order["suggested_qty"].sum()),
+            "order_cost": round(float(to_order["order_cost"].sum()), 2),
+            **service.parameters,
+        }
+
+    def checkpoint(self, args: argparse.Namespace) -> Dict[str, Any]:
+        service = self._inventory_history()
+        checkpoint = service.take_checkpoint()
+        return {**checkpoint.to_dict(), "pruned": service.prune_checkpoints()}
+
+    def stock_as_of(self, args: argparse.Namespace) -> Dict[str, Any]:
+        try:
+            at = datetime.fromisoformat(args.at)
+        except ValueError:
+            raise ValueError(f"Fecha inválida (use AAAA-MM-DD o AAAA-MM-DD HH:MM): {args.at}")
+        if len(args.at) == 10:
+            at = end_of_day(at.date())
+        service = self._inventory_history()
+        report = service.stock_as_of(at, args.codes)
+        if args.file:
+            with open(args.file, "wb") as file:
+                file.write(service.export_xlsx(report))
+            return {"file": os.path.abspath(args.file), **report.totals}
+        return {**report.totals, "sample": report.products.head(args.sample).to_dict("records")}
+
+    def duplicates(self, args: argparse.Namespace) -> Dict[str, Any]:
+        duplicates = DuplicateRepository(self.database.get_session(), self.database.get_read_session(), actor="cli")
+        service = DuplicateService(duplicates, self.repository, args.threshold)
+        report = service.scan(full=args.full)
+        pending = service.get_pending(args.sample)
+        return {
+            **report,
+            "sample": [
+                {"id": candidate.id, "score": candidate.score,
+                 "product": f"{candidate.product.code} - {candidate.product.name}",
+                 "duplicate": f"{candidate.duplicate.code} - {candidate.duplicate.name}"}
+                for candidate in pending
+            ],
+        }
+
+    def _inventory_history(self) -> InventoryHistoryService:
+        ledger = StockLedgerRepository(self.database.get_session(), self.database.get_read_session(), actor="cli")
+        return InventoryHistoryService(ledger, self.repository)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="liz-pos", description="Operaciones masivas del catálogo")
+    parser.add_argument("--database-url", help="URL de la base (por defecto DATABASE_URL o SQLite local)")
+    parser.add_argument("--report", help="Además de stdout, guarda el reporte JSON en este archivo")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    recount = commands.add_parser("import-recount", help="Reconteo desde XLSX/CSV: agrega, actualiza y desactiva")
+    recount.add_argument("file", help="Archivo .xlsx o .csv con columnas code, name y opcionales")
+    recount.add_argument("--sheet", help="Hoja del XLSX (por defecto la activa)")
+    recount.add_argument("--batch-size", type=int, default=5000, help="Productos por escritura")
+
+    delete = commands.add_parser("delete", help="Desactiva los productos con los códigos dados")
+    delete.add_argument("file", nargs="?", help="Archivo .xlsx o .csv con la columna code")
+    delete.add_argument("--codes", nargs="+", help="Códigos sueltos")
+    delete.add_argument("--sheet", help="Hoja del XLSX (por defecto la activa)")
+
+    export = commands.add_parser("export", help="Exporta el catálogo a XLSX o CSV")
+    export.add_argument("file", help="Archivo de salida .xlsx o .csv")
+    export.add_argument("--all", action="store_true", help="Incluye productos inactivos")
+    export.add_argument("--batch-size", type=int, default=5000, help="Filas leídas por lote")
+
+    reprice = commands.add_parser("reprice", help="Actualización masiva de precios por regla")
+    reprice.add_argument("--mode", choices=sorted(_REPRICE_MODES), required=True,
+                         help="markup: costo × valor; percent: precio × (1 + valor/100)")
+    reprice.add_argument("--value", type=float, required=True)
+    reprice.add_argument("--category", choices=[category.value for category in ProductCategory])
+    reprice.add_argument("--supplier")
+    reprice.add_argument("--round-to", type=float, default=0.0)
+    reprice.add_argument("--dry-run", action="store_true", help="Solo calcula los cambios")
+    reprice.add_argument("--sample", type=int, default=20, help="Cambios de ejemplo en el reporte")
+
+    commands.add_parser("vacuum", help="Compacta la base y actualiza estadísticas")
+
+    maintain = commands.add_parser("maintain", help="Archiva inactivos antiguos y libera espacio por pasos")
+    maintain.add_argument("--archive-after-days", type=int,
+                          help="Días sin cambios de un inactivo para archivarlo (por defecto POS_ARCHIVE_AFTER_DAYS o 180)")
+    maintain.add_argument("--archive-database-url",
+                          help="Base donde archivar (por defecto POS_ARCHIVE_DATABASE_URL o la tabla archived_products)")
+    maintain.add_argument("--vacuum-pages", type=int, help="Páginas liberadas por paso (por defecto 1000)")
+    maintain.add_argument("--max-minutes", type=float, help="Tiempo máximo para liberar espacio")
+
+    backup = commands.add_parser("backup", help="Respaldo en línea de la base SQLite con suma SHA-256")
+    backup.add_argument("--dir", help="Carpeta de respaldos (por defecto POS_BACKUP_DIR o backups)")
+    backup.add_argument("--keep", type=int, help="Respaldos conservados (por defecto POS_BACKUP_KEEP o 14)")
+
+    verify = commands.add_parser("verify-backup", help="Verifica la suma y la integridad de un respaldo")
+    verify.add_argument("file", help="Archivo .db del respaldo")
+
+    restore = commands.add_parser("restore", help="Restaura un respaldo verificado (detenga la app antes)")
+    restore.add_argument("file", help="Archivo .db del respaldo")
+    restore.add_argument("--dir", help="Carpeta donde guardar el respaldo del estado actual")
+
+    replenish = commands.add_parser("replenish", help="Orden de compra XLSX según la velocidad de venta")
+    replenish.add_argument("file", help="Archivo .xlsx de salida (columnas de importación; stock = a pedir)")
+    replenish.add_argument("--location", help="Código de la sucursal (por defecto el total de la empresa)")
+    replenish.add_argument("--lookback-days", type=int, help="Días de historia (por defecto 28)")
+    replenish.add_argument("--lead-days", type=int, help="Plazo de entrega en días (por defecto 7)")
+    replenish.add_argument("--safety-days", type=int, help="Stock de seguridad en días (por defecto 3)")
+    replenish.add_argument("--cover-days", type=int, help="Días de venta que cubre el pedido (por defecto 14)")
+
+    commands.add_parser("checkpoint", help="Toma una foto del stock para las consultas a una fecha")
+
+    stock_as_of = commands.add_parser("stock-as-of", help="Stock de cada producto a una fecha")
+    stock_as_of.add_argument("at", help="Fecha (AAAA-MM-DD, al cierre del día) o fecha y hora")
+    stock_as_of.add_argument("file", nargs="?", help="Archivo .xlsx de salida")
+    stock_as_of.add_argument("--codes", nargs="+", help="Solo estos códigos")
+    stock_as_of.add_argument("--sample", type=int, default=20, help="Productos de ejemplo en el reporte")
+
+    duplicates = commands.add_parser("duplicates", help="Busca productos duplicados por nombre parecido")
+    duplicates.add_argument("--full", action="store_true",
+                            help="Recalcula todo el catálogo (por defecto solo los cambios desde la búsqueda anterior)")
+    duplicates.add_argument("--threshold", type=float,
+                            help="Similitud mínima entre 0 y 1 (por defecto POS_DUPLICATE_THRESHOLD o 0.6)")
+    duplicates.add_argument("--sample", type=int, default=20, help="Pares pendientes de ejemplo en el reporte")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "delete" and not (args.file or args.codes):
+        build_parser().error("delete requiere un archivo o --codes")
+    Logger.set_console_stream(sys.stderr)
+
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"command": args.command}
+    try:
+        database = Database.connect(args.database_url) if args.database_url else Database()
+        database.create_tables()
+        database.run_migrations()
+        commands = CatalogCommands(database)
+        handler = getattr(commands, args.command.replace("-", "_"))
+        report.update(handler(args))
+        report["ok"] = True
+    except Exception as e:
+        logger.error(f"Command {args.command} failed: {str(e)}")
+        report.update({"ok": False, "error": str(e)})
+    report["duration_seconds"] = round(time.perf_counter() - started, 3)
+
+    output = json.dumps(report, ensure_ascii=False, default=str)
+    print(output)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
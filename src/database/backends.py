@@ -0,0 +1,331 @@
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, TypeVar
+
+from dotenv import load_dotenv
+from sqlalchemy import Table, event, insert, inspect
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+
+T = TypeVar('T')
+
+DEFAULT_DATABASE_URL = 'sqlite:///pos_system.db'
+
+
+def database_url() -> str:
+    """URL de la base de datos desde DATABASE_URL (.env) o SQLite local por defecto"""
+    load_dotenv()
+    return os.getenv('DATABASE_URL', DEFAULT_DATABASE_URL)
+
+
+class StorageBackend:
+    """Configuración por dialecto: pool, motor de lectura y operaciones masivas - OCP"""
+
+    dialect_name = ""
+    # Límite de parámetros por sentencia que acepta el motor
+    max_bind_params = 999
+    # EXPLAIN del motor y patrón de una línea del plan que recorre la tabla completa
+    explain_prefix = "EXPLAIN "
+    full_scan_pattern = re.compile(r"Seq Scan on (\w+)")
+
+    def __init__(self, url: str):
+        self.url: URL = make_url(url)
+
+    def engine_options(self) -> Dict[str, Any]:
+        return {"pool_pre_ping": True}
+
+    def read_url(self) -> URL:
+        return self.url
+
+    def read_engine_options(self) -> Dict[str, Any]:
+        return self.engine_options()
+
+    def configure_engine(self, engine: Engine) -> None:
+        pass
+
+    def configure_read_engine(self, engine: Engine) -> None:
+        pass
+
+    def configure_savepoint_engine(self, engine: Engine) -> None:
+        """Motor cuyas transacciones admiten SAVEPOINT anidados que se revierten con la externa"""
+        pass
+
+    def configure_group_commit_engine(self, engine: Engine) -> None:
+        """Motor del escritor único: una transacción por grupo con un SAVEPOINT por operación"""
+        self.configure_engine(engine)
+        self.configure_savepoint_engine(engine)
+
+    def index_names(self, connection: Connection, table_name: str) -> Set[str]:
+        """Nombres de los índices existentes de una tabla"""
+        return {index["name"] for index in inspect(connection).get_indexes(table_name)}
+
+    def insert(self, table: Table):
+        """Sentencia INSERT del dialecto; soporta on_conflict_* donde existe"""
+        return insert(table)
+
+    def supports_upsert(self) -> bool:
+        return False
+
+    def maintenance_statements(self) -> List[str]:
+        """Compactación y estadísticas del planificador; se ejecutan fuera de transacción"""
+        return []
+
+    def database_size(self, connection: Connection) -> Optional[int]:
+        """Tamaño de la base en bytes, si el motor lo informa"""
+        return None
+
+    def free_pages(self, connection: Connection) -> Optional[int]:
+        """Páginas vacías que el archivo aún ocupa, si el motor lo informa"""
+        return None
+
+    def reclaim_step(self, connection: Connection, pages: int) -> bool:
+        """Devuelve hasta pages páginas vacías al sistema; True si quedan más por liberar"""
+        return False
+
+    def analyze_statements(self, tables: List[str]) -> List[str]:
+        """Estadísticas del planificador de las tablas dadas; se ejecutan fuera de transacción"""
+        return [f"ANALYZE {table}" for table in tables]
+
+    def database_path(self) -> Path:
+        """Archivo de la base, para motores que guardan la base en un solo archivo"""
+        raise ValueError(f"La base {self.dialect_name} no es un archivo local")
+
+    def open_backup_source(self) -> sqlite3.Connection:
+        """Conexión de solo lectura sobre la base en uso, origen de los respaldos en línea"""
+        raise ValueError(
+            f"El respaldo en línea no está disponible para {self.dialect_name}; use las herramientas del motor"
+        )
+
+    def online_backup(self, source: sqlite3.Connection, target_path: str, step_pages: int,
+                      step_sleep: float, max_restarts: int = 3) -> None:
+        """Copia la base a target_path sin bloquear a los escritores"""
+        raise ValueError(
+            f"El respaldo en línea no está disponible para {self.dialect_name}; use las herramientas del motor"
+        )
+
+    def restore_backup(self, source_path: str) -> None:
+        """Reemplaza el contenido de la base en uso por el de un respaldo"""
+        raise ValueError(
+            f"La restauración no está disponible para {self.dialect_name}; use las herramientas del motor"
+        )
+
+    def batch_size(self, params_per_row: int, max_rows: int = 1000) -> int:
+        """Filas por sentencia sin exceder el límite de parámetros"""
+        return max(1, min(max_rows, self.max_bind_params // max(1, params_per_row)))
+
+    def batched(self, rows: Sequence[T], params_per_row: int) -> Iterator[List[T]]:
+        """Divide filas en lotes para executemany / multi-VALUES"""
+        size = self.batch_size(params_per_row)
+        for start in range(0, len(rows), size):
+            yield list(rows[start:start + size])
+
+
+class SQLiteBackend(StorageBackend):
+    dialect_name = "sqlite"
+    max_bind_params = 32766
+    explain_prefix = "EXPLAIN QUERY PLAN "
+    # "SCAN products" sin "USING INDEX"; versiones antiguas escriben "SCAN TABLE products"
+    full_scan_pattern = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+
+    def engine_options(self) -> Dict[str, Any]:
+        # Archivo local: no hay conexiones de red que verificar
+        return {}
+
+    def read_url(self) -> URL:
+        if not self.url.database or self.url.database == ":memory:":
+            return self.url
+        return self.url.set(
+            database=f"file:{self.url.database}",
+            query={"mode": "ro", "uri": "true"},
+        )
+
+    def configure_engine(self, engine: Engine) -> None:
+        event.listen(engine, "connect", self._configure_writer_connection)
+
+    def configure_read_engine(self, engine: Engine) -> None:
+        event.listen(engine, "connect", self._configure_reader_connection)
+        event.listen(engine, "begin", self._begin_snapshot)
+
+    def index_names(self, connection: Connection, table_name: str) -> Set[str]:
+        # El inspector de SQLite omite los índices sobre expresiones (lower(supplier))
+        rows = connection.exec_driver_sql(f"PRAGMA index_list('{table_name}')").all()
+        return {row[1] for row in rows}
+
+    def configure_savepoint_engine(self, engine: Engine) -> None:
+        # pysqlite no emite BEGIN antes de un SAVEPOINT: el RELEASE confirmaría los cambios
+        event.listen(engine, "connect", self._configure_reader_connection)
+        event.listen(engine, "begin", self._begin_snapshot)
+
+    def configure_group_commit_engine(self, engine: Engine) -> None:
+        event.listen(engine, "connect", self._configure_writer_connection)
+        event.listen(engine, "connect", self._configure_reader_connection)
+        # El grupo toma el lock de escritura al empezar: un BEGIN diferido que lee
+        # antes de escribir falla con SQLITE_BUSY si otro proceso escribió entremedio
+        event.listen(engine, "begin", self._begin_immediate)
+
+    def insert(self, table: Table):
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(table)
+
+    def supports_upsert(self) -> bool:
+        return True
+
+    def maintenance_statements(self) -> List[str]:
+        # El VACUUM completo también deja las bases antiguas en auto_vacuum incremental
+        return ["PRAGMA wal_checkpoint(TRUNCATE)", "PRAGMA auto_vacuum=INCREMENTAL", "VACUUM", "ANALYZE"]
+
+    def database_size(self, connection: Connection) -> Optional[int]:
+        page_count = connection.exec_driver_sql("PRAGMA page_count").scalar()
+        page_size = connection.exec_driver_sql("PRAGMA page_size").scalar()
+        return page_count * page_size
+
+    def free_pages(self, connection: Connection) -> Optional[int]:
+        return connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+
+    def reclaim_step(self, connection: Connection, pages: int) -> bool:
+        # Solo con auto_vacuum=INCREMENTAL (2); en otro modo hace falta un VACUUM completo
+        if connection.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+            return False
+        # sqlite3 da un solo paso a un pragma sin columnas (libera una página);
+        # executescript lo ejecuta hasta el final
+        connection.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+        return self.free_pages(connection) > 0
+
+    def database_path(self) -> Path:
+        if not self.url.database or self.url.database == ":memory:":
+            raise ValueError("La base en memoria no admite respaldos")
+        return Path(self.url.database).absolute()
+
+    def open_backup_source(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"{self.database_path().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+
+    def online_backup(self, source: sqlite3.Connection, target_path: str, step_pages: int,
+                      step_sleep: float, max_restarts: int = 3) -> None:
+        # Copia step_pages páginas por paso y pausa step_sleep entre pasos (sqlite3 solo
+        # pausa ante SQLITE_BUSY) para no quitarle CPU ni disco a las cajas.
+        # En WAL la copia se hace sobre un snapshot fijo: los escritores no esperan y
+        # la copia no se reinicia. Sin WAL, cada escritura reinicia la copia; tras
+        # max_restarts se termina en un solo paso.
+        wal = source.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        restarts = [0]
+        previous = [None]
+
+        def progress(status, remaining, total):
+            if previous[0] is not None and remaining > previous[0]:
+                restarts[0] += 1
+                if restarts[0] > max_restarts:
+                    raise _BackupRestarted()
+            previous[0] = remaining
+            time.sleep(step_sleep)
+
+        target = sqlite3.connect(target_path)
+        source.isolation_level = None
+        try:
+            if wal:
+                source.execute("BEGIN")
+                source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+            try:
+                source.backup(target, pages=step_pages, progress=progress)
+            except _BackupRestarted:
+                source.backup(target, pages=-1)
+            # El respaldo queda como un solo archivo, sin -wal ni -shm al abrirlo
+            target.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            if source.in_transaction:
+                source.execute("ROLLBACK")
+            target.close()
+
+    def restore_backup(self, source_path: str) -> None:
+        # La API de respaldo escribe a través de la conexión: respeta el WAL y los locks
+        source = sqlite3.connect(f"{Path(source_path).absolute().as_uri()}?mode=ro", uri=True)
+        target = sqlite3.connect(str(self.database_path()), timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+    @staticmethod
+    def _configure_writer_connection(dbapi_connection, connection_record):
+        """WAL permite que los lectores trabajen sobre un snapshot mientras se escribe"""
+        cursor = dbapi_connection.cursor()
+        # Solo tiene efecto en una base nueva, antes de crear las tablas
+        cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    @staticmethod
+    def _configure_reader_connection(dbapi_connection, connection_record):
+        # Desactiva el BEGIN implícito de pysqlite; lo emitimos en _begin_snapshot
+        dbapi_connection.isolation_level = None
+
+    @staticmethod
+    def _begin_snapshot(connection):
+        """Cada sesión de lectura ve un snapshot consistente hasta que se cierra"""
+        connection.exec_driver_sql("BEGIN")
+
+    @staticmethod
+    def _begin_immediate(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+class _BackupRestarted(Exception):
+    """La copia por pasos se reinició demasiadas veces por escrituras concurrentes"""
+
+
+class PostgresBackend(StorageBackend):
+    dialect_name = "postgresql"
+    max_bind_params = 65535
+
+    def engine_options(self) -> Dict[str, Any]:
+        return {
+            "pool_size": int(os.getenv('DATABASE_POOL_SIZE', '10')),
+            "max_overflow": int(os.getenv('DATABASE_MAX_OVERFLOW', '20')),
+            "pool_pre_ping": True,
+            "pool_recycle": 1800,
+        }
+
+    def read_url(self) -> URL:
+        read_url = os.getenv('DATABASE_READ_URL')
+        return make_url(read_url) if read_url else self.url
+
+    def read_engine_options(self) -> Dict[str, Any]:
+        options = self.engine_options()
+        options["isolation_level"] = "REPEATABLE READ"
+        options["execution_options"] = {"postgresql_readonly": True}
+        return options
+
+    def insert(self, table: Table):
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+        return postgresql_insert(table)
+
+    def supports_upsert(self) -> bool:
+        return True
+
+    def maintenance_statements(self) -> List[str]:
+        return ["VACUUM (ANALYZE)"]
+
+    def analyze_statements(self, tables: List[str]) -> List[str]:
+        # VACUUM por tabla deja reutilizable el espacio de las filas archivadas
+        return [f"VACUUM (ANALYZE) {table}" for table in tables]
+
+    def database_size(self, connection: Connection) -> Optional[int]:
+        return connection.exec_driver_sql("SELECT pg_database_size(current_database())").scalar()
+
+
+_BACKENDS = {
+    SQLiteBackend.dialect_name: SQLiteBackend,
+    PostgresBackend.dialect_name: PostgresBackend,
+}
+
+
+def get_backend(url) -> StorageBackend:
+    """Selecciona el backend según el dialecto de la URL"""
+    url = make_url(url)
+    backend_class = _BACKENDS.get(url.get_backend_name())
+    if backend_class is None:
+        raise ValueError(f"Motor de base de datos no soportado: {url.get_backend_name()}")
+    return backend_class(url)
@@ -0,0 +1,284 @@
+"""
+Respaldos en línea de la base SQLite.
+
+La copia usa la API de respaldo de SQLite sobre un snapshot de lectura: en
+modo WAL los lectores no bloquean a los escritores, por lo que las cajas siguen
+vendiendo mientras se respalda. Se copia por pasos de pocas páginas con una
+pausa entre pasos para no competir por CPU ni disco con las ventas.
+Cada respaldo se escribe a un archivo temporal, se renombra al terminar y queda
+con su suma SHA-256 al lado (formato de sha256sum). La integridad (quick_check)
+se revisa al verificar o restaurar, no en cada respaldo.
+
+Un respaldo idéntico al último (misma suma) se descarta. El programador en
+segundo plano ni siquiera copia si la base no cambió desde el último respaldo
+(PRAGMA data_version). Se conservan los últimos POS_BACKUP_KEEP.
+
+Variables de entorno:
+    POS_BACKUP_DIR=backups               carpeta de los respaldos
+    POS_BACKUP_KEEP=14                   respaldos conservados
+    POS_BACKUP_INTERVAL_MINUTES=60       activa el respaldo periódico en la app
+    POS_BACKUP_STEP_PAGES=256            páginas copiadas por paso
+    POS_BACKUP_STEP_SLEEP_MS=20          pausa entre pasos
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.logger import Logger
+from src.utils.metrics import counter, gauge, histogram
+
+logger = Logger(__name__).get_logger()
+
+_BACKUP_SECONDS = histogram("pos_backup_seconds", "Duración de cada respaldo",
+                            buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0))
+_BACKUPS = counter("pos_backups_total", "Respaldos por resultado", ["result"])
+_BACKUPS_OK = _BACKUPS.labels("ok")
+_BACKUPS_FAILED = _BACKUPS.labels("error")
+_BACKUPS_SKIPPED = _BACKUPS.labels("unchanged")
+_LAST_BACKUP = gauge("pos_backup_last_success_timestamp", "Hora (epoch) del último respaldo correcto")
+_LAST_BACKUP_BYTES = gauge("pos_backup_last_size_bytes", "Tamaño del último respaldo")
+
+CHECKSUM_SUFFIX = ".sha256"
+_PARTIAL_SUFFIX = ".partial"
+_CHUNK = 1024 * 1024
+
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 del archivo leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BackupManager:
+    """Crea, verifica, poda y restaura respaldos de la base - SRP"""
+
+    def __init__(self, database, directory: Optional[str] = None, keep: Optional[int] = None,
+                 step_pages: Optional[int] = None, step_sleep: Optional[float] = None):
+        self.database = database
+        self.backend = database.backend
+        self.directory = Path(directory or os.getenv("POS_BACKUP_DIR", "backups"))
+        self.keep = keep if keep is not None else int(os.getenv("POS_BACKUP_KEEP", "14"))
+        self.step_pages = step_pages or int(os.getenv("POS_BACKUP_STEP_PAGES", "256"))
+        if step_sleep is None:
+            step_sleep = float(os.getenv("POS_BACKUP_STEP_SLEEP_MS", "20")) / 1000
+        self.step_sleep = step_sleep
+        self._lock = threading.Lock()
+
+    def create(self, label: str = "", prune: bool = True) -> Dict[str, Any]:
+        """
+        Respalda la base en uso; retorna archivo, tamaño, suma y respaldos podados.
+        Con prune=False no se eliminan respaldos antiguos (p. ej. el que se va a restaurar).
+        """
+        with self._lock:
+            started = time.perf_counter()
+            partial = None
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                target = self._new_backup_path(label)
+                partial = target.with_name(target.name + _PARTIAL_SUFFIX)
+                source = self.backend.open_backup_source()
+                try:
+                    self.backend.online_backup(source, str(partial), self.step_pages, self.step_sleep)
+                finally:
+                    source.close()
+
+                checksum = file_checksum(partial)
+                previous = self._latest_checksum()
+                if previous is not None and previous[1] == checksum:
+                    # Sin cambios desde el último respaldo: no ocupa espacio de nuevo
+                    partial.unlink()
+                    _BACKUPS_SKIPPED.inc()
+                    logger.info(f"Database unchanged since {previous[0].name}; backup skipped")
+                    return {"file": str(previous[0].absolute()), "sha256": checksum, "unchanged": True}
+                os.replace(partial, target)
+                self._checksum_path(target).write_text(f"{checksum}  {target.name}\n", encoding="utf-8")
+                pruned = self.prune() if prune else []
+            except Exception as e:
+                if partial is not None:
+                    partial.unlink(missing_ok=True)
+                _BACKUPS_FAILED.inc()
+                logger.error(f"Error creating backup: {str(e)}")
+                raise
+
+            seconds = time.perf_counter() - started
+            size = target.stat().st_size
+            _BACKUP_SECONDS.observe(seconds)
+            _BACKUPS_OK.inc()
+            _LAST_BACKUP.set(time.time())
+            _LAST_BACKUP_BYTES.set(size)
+            logger.info(f"Backup created: {target} ({size} bytes, {seconds:.1f}s)")
+            return {
+                "file": str(target.absolute()),
+                "bytes": size,
+                "sha256": checksum,
+                "seconds": round(seconds, 3),
+                "pruned": pruned,
+                "unchanged": False,
+            }
+
+    def verify(self, path: str) -> Dict[str, Any]:
+        """Compara la suma guardada y revisa la integridad del respaldo"""
+        backup = Path(path)
+        if not backup.is_file():
+            raise ValueError(f"No existe el respaldo: {path}")
+        checksum_path = self._checksum_path(backup)
+        if not checksum_path.is_file():
+            raise ValueError(f"El respaldo no tiene archivo de suma: {checksum_path.name}")
+        expected = checksum_path.read_text(encoding="utf-8").split()[0]
+        checksum = file_checksum(backup)
+        integrity = self._quick_check(backup)
+        return {
+            "file": str(backup.absolute()),
+            "sha256": checksum,
+            "checksum_ok": checksum == expected,
+            "integrity": integrity,
+            "ok": checksum == expected and integrity == "ok",
+        }
+
+    def restore(self, path: str) -> Dict[str, Any]:
+        """
+        Reemplaza la base en uso por el respaldo, previa verificación.
+        Antes se respalda el estado actual, por si hay que deshacer la restauración.
+        """
+        verification = self.verify(path)
+        if not verification["ok"]:
+            raise ValueError(
+                f"El respaldo no es válido (suma: {verification['checksum_ok']}, "
+                f"integridad: {verification['integrity']}); no se restauró"
+            )
+        # Sin podar: con la retención llena, la poda borraría el respaldo a restaurar si es el más antiguo
+        safety = self.create(label="pre-restore", prune=False)
+        self.database.engine.dispose()
+        self.database.read_engine.dispose()
+        self.backend.restore_backup(path)
+        logger.info(f"Database restored from {path} (previous state saved in {safety['file']})")
+        return {"restored": verification["file"], "sha256": verification["sha256"], "previous": safety["file"]}
+
+    def list_backups(self) -> List[Path]:
+        """Respaldos completos, del más antiguo al más reciente"""
+        if not self.directory.is_dir():
+            return []
+        prefix = self._prefix()
+        backups = [path for path in self.directory.glob(f"{prefix}-*.db") if path.is_file()]
+        return sorted(backups, key=lambda path: (path.stat().st_mtime_ns, path.name))
+
+    def prune(self) -> List[str]:
+        """Elimina los respaldos más antiguos que exceden keep"""
+        if self.keep <= 0:
+            return []
+        backups = self.list_backups()
+        pruned = []
+        for path in backups[:-self.keep]:
+            path.unlink()
+            self._checksum_path(path).unlink(missing_ok=True)
+            pruned.append(path.name)
+        return pruned
+
+    def _latest_checksum(self) -> Optional[Tuple[Path, str]]:
+        backups = self.list_backups()
+        if not backups:
+            return None
+        checksum_path = self._checksum_path(backups[-1])
+        if not checksum_path.is_file():
+            return None
+        return backups[-1], checksum_path.read_text(encoding="utf-8").split()[0]
+
+    def _prefix(self) -> str:
+        return self.backend.database_path().stem
+
+    def _new_backup_path(self, label: str) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        name = f"{self._prefix()}-{stamp}" + (f"-{label}" if label else "")
+        path = self.directory / f"{name}.db"
+        counter_suffix = 1
+        while path.exists():
+            counter_suffix += 1
+            path = self.directory / f"{name}-{counter_suffix}.db"
+        return path
+
+    @staticmethod
+    def _checksum_path(path: Path) -> Path:
+        return path.with_name(path.name + CHECKSUM_SUFFIX)
+
+    @staticmethod
+    def _quick_check(path: Path) -> str:
+        connection = sqlite3.connect(f"{path.absolute().as_uri()}?mode=ro", uri=True)
+        try:
+            return connection.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            connection.close()
+
+
+class BackupScheduler:
+    """Respaldo periódico en un hilo aparte; omite los intervalos sin cambios"""
+
+    def __init__(self, manager: BackupManager, interval_seconds: float):
+        self.manager = manager
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Conexión abierta todo el tiempo: data_version cambia si otra conexión escribió
+        self._watch = manager.backend.open_backup_source()
+        self._backed_up_version: Optional[int] = None
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self._run, name="backup-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Backups every {self.interval_seconds / 60:g} min in {self.manager.directory}")
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._watch.close()
+
+    def run_once(self) -> Optional[Dict[str, Any]]:
+        """Respalda si hubo escrituras desde el último respaldo; None si no hubo"""
+        version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._backed_up_version:
+            _BACKUPS_SKIPPED.inc()
+            return None
+        result = self.manager.create()
+        self._backed_up_version = version
+        return result
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                # Un respaldo fallido no detiene a la caja; se reintenta en el próximo intervalo
+                logger.error(f"Scheduled backup failed: {str(e)}")
+
+
+_scheduler: Optional[BackupScheduler] = None
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def start_backup_scheduler(database) -> Optional[BackupScheduler]:
+    """Inicia el respaldo periódico una sola vez por proceso si POS_BACKUP_INTERVAL_MINUTES está definido"""
+    global _scheduler, _scheduler_started
+    with _scheduler_lock:
+        if _scheduler_started:
+            return _scheduler
+        _scheduler_started = True
+        interval = os.getenv("POS_BACKUP_INTERVAL_MINUTES")
+        if not interval:
+            return None
+        try:
+            scheduler = BackupScheduler(BackupManager(database), float(interval) * 60)
+            scheduler.start()
+            _scheduler = scheduler
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.error(f"Error starting backup scheduler: {str(e)}")
+        return _scheduler
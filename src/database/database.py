@@ -1,28 +1,116 @@
-from sqlalchemy import create_engine, text
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from src.database.backends import database_url, get_backend
 from src.utils.logger import Logger
+from src.utils.metrics import counter, gauge, histogram
 
 logger = Logger(__name__).get_logger()
 
+_STATEMENTS = counter("pos_db_statements_total", "Sentencias SQL ejecutadas", ["engine", "verb"])
+_STATEMENT_SECONDS = histogram("pos_db_statement_seconds", "Duración de las sentencias SQL", ["engine"])
+_STATEMENT_ERRORS = counter("pos_db_statement_errors_total", "Sentencias SQL con error", ["engine"])
+_CONNECTIONS_IN_USE = gauge("pos_db_connections_in_use", "Conexiones del pool en uso", ["engine"])
+_VERB = re.compile(r"\s*(\w+)")
+
 Base = declarative_base()
 
 
 class Database:
     _instance = None
+
+    # (tabla, columna, definición) para bases creadas antes de que existiera la columna
+    _COLUMN_MIGRATIONS = [
+        ("products", "supplier", "VARCHAR(200)"),
+        ("products", "stock", "INTEGER NOT NULL DEFAULT 0"),
+        ("products", "version", "INTEGER NOT NULL DEFAULT 1"),
+        ("stock_movements", "location_id", "INTEGER REFERENCES locations(id)"),
+        ("invoices", "location_id", "INTEGER REFERENCES locations(id)"),
+    ]
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Database, cls).__new__(cls)
             cls._instance._initialize()
         return cls._instance
+
+    @classmethod
+    def connect(cls, url: str) -> "Database":
+        """Instancia independiente del singleton, p. ej. la base central desde una caja"""
+        instance = super(Database, cls).__new__(cls)
+        instance._initialize(url)
+        return instance
     
-    def _initialize(self):
-        self.engine = create_engine('sqlite:///pos_system.db', echo=False)
+    def _initialize(self, url: Optional[str] = None):
+        self.backend = get_backend(url or database_url())
+        self.engine = create_engine(self.backend.url, echo=False, **self.backend.engine_options())
+        self.backend.configure_engine(self.engine)
+        self._instrument(self.engine, "write")
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
-        logger.info("Database singleton initialized successfully")
+
+        # Motor de solo lectura: reportes y listados no compiten con las escrituras
+        self.read_engine = create_engine(
+            self.backend.read_url(), echo=False, **self.backend.read_engine_options()
+        )
+        self.backend.configure_read_engine(self.read_engine)
+        self._instrument(self.read_engine, "read")
+        self.ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.read_engine)
+        self._write_coordinator = None
+        self._coordinator_lock = threading.Lock()
+        logger.info(f"Database singleton initialized successfully ({self.backend.dialect_name})")
     
+    @staticmethod
+    def _instrument(engine: Engine, role: str) -> None:
+        """Cuenta y cronometra las sentencias y las conexiones en uso del motor"""
+        statements = {}
+        seconds = _STATEMENT_SECONDS.labels(role)
+        errors = _STATEMENT_ERRORS.labels(role)
+        in_use = _CONNECTIONS_IN_USE.labels(role)
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            seconds.observe(time.perf_counter() - conn.info["metrics_start"].pop())
+            match = _VERB.match(statement)
+            verb = match.group(1).upper() if match else "OTHER"
+            child = statements.get(verb)
+            if child is None:
+                child = statements.setdefault(verb, _STATEMENTS.labels(role, verb))
+            child.inc()
+
+        @event.listens_for(engine, "handle_error")
+        def handle_error(context):
+            errors.inc()
+            if context.connection is not None and context.connection.info.get("metrics_start"):
+                context.connection.info["metrics_start"].pop()
+
+        event.listen(engine, "checkout", lambda *args: in_use.inc())
+        event.listen(engine, "checkin", lambda *args: in_use.dec())
+
     def get_session(self):
         return self.SessionLocal()
+
+    def get_read_session(self):
+        """Sesión sobre el motor de solo lectura"""
+        return self.ReadSessionLocal()
+
+    def get_write_coordinator(self):
+        """Escritor único compartido por las sesiones del proceso; None si POS_GROUP_COMMIT no está activo"""
+        from src.database.write_coordinator import WriteCoordinator, group_commit_enabled
+        if not group_commit_enabled():
+            return None
+        with self._coordinator_lock:
+            if self._write_coordinator is None:
+                self._write_coordinator = WriteCoordinator(self)
+        return self._write_coordinator
     
     def create_tables(self):
         from src.database import models
@@ -33,20 +121,82 @@ class Database:
         """Ejecuta migraciones automáticamente - SOLUCIÓN AL PROBLEMA"""
         session = self.get_session()
         try:
-            result = session.execute(text("PRAGMA table_info(products)"))
-            columns = [row[1] for row in result]
-            
-            if 'supplier' not in columns:
-                logger.info("🔄 Ejecutando migración: agregando columna 'supplier'...")
-                session.execute(text("ALTER TABLE products ADD COLUMN supplier VARCHAR(200)"))
-                session.commit()
-                logger.info("✅ Migración completada: columna 'supplier' agregada")
-            else:
-                logger.info("✅ Columna 'supplier' ya existe en la base de datos")
+            for table, column, ddl in self._COLUMN_MIGRATIONS:
+                # Inspector nuevo en cada paso: el commit anterior libera la conexión
+                inspector = inspect(session.connection())
+                columns = [existing["name"] for existing in inspector.get_columns(table)]
+                
+                if column not in columns:
+                    logger.info(f"🔄 Ejecutando migración: agregando columna '{column}'...")
+                    session.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                    session.commit()
+                    logger.info(f"✅ Migración completada: columna '{column}' agregada")
+                else:
+                    logger.info(f"✅ Columna '{column}' ya existe en la base de datos")
+
+            self._create_missing_indexes(session)
                 
         except Exception as e:
             logger.error(f"❌ Error en migración: {e}")
             session.rollback()
             raise
         finally:
-            session.close()
\ No newline at end of file
+            session.close()
+
+    def vacuum(self) -> Dict[str, Any]:
+        """Compacta la base y actualiza estadísticas; retorna el tamaño antes y después"""
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            size_before = self.backend.database_size(connection)
+            for statement in self.backend.maintenance_statements():
+                logger.info(f"🔄 Mantenimiento: {statement}")
+                connection.exec_driver_sql(statement)
+            size_after = self.backend.database_size(connection)
+        logger.info(f"✅ Mantenimiento completado ({size_before} → {size_after} bytes)")
+        return {"size_before": size_before, "size_after": size_after}
+
+    def reclaim_space(self, tables: List[str], pages_per_step: int = 1000,
+                      deadline: Optional[float] = None, pause: float = 0.05) -> Dict[str, Any]:
+        """
+        Libera páginas vacías por pasos cortos (cada paso es una escritura breve) hasta
+        terminar o hasta deadline (time.time()) y actualiza las estadísticas de tables
+        """
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            size_before = self.backend.database_size(connection)
+            free_before = self.backend.free_pages(connection)
+            steps = 0
+            while self.backend.reclaim_step(connection, pages_per_step):
+                steps += 1
+                if deadline is not None and time.time() >= deadline:
+                    logger.info("Space reclaim stopped at the end of the maintenance window")
+                    break
+                time.sleep(pause)
+            for statement in self.backend.analyze_statements(tables):
+                logger.info(f"🔄 Mantenimiento: {statement}")
+                connection.exec_driver_sql(statement)
+            size_after = self.backend.database_size(connection)
+            free_after = self.backend.free_pages(connection)
+        logger.info(f"✅ Espacio liberado: {size_before} → {size_after} bytes en {steps} pasos")
+        return {
+            "size_before": size_before,
+            "size_after": size_after,
+            "free_pages_before": free_before,
+            "free_pages_after": free_after,
+        }
+
+    def _create_missing_indexes(self, session):
+        """create_all no agrega índices nuevos a tablas existentes; se crean aquí"""
+        from src.database import models
+        connection = session.connection()
+        inspector = inspect(connection)
+        missing = []
+        for table in Base.metadata.sorted_tables:
+            if inspector.has_table(table.name):
+                existing = self.backend.index_names(connection, table.name)
+                missing.extend(index for index in table.indexes if index.name not in existing)
+
+        for index in missing:
+            logger.info(f"🔄 Ejecutando migración: creando índice '{index.name}'...")
+            index.create(bind=session.connection())
+        if missing:
+            session.commit()
+            logger.info(f"✅ Migración completada: {len(missing)} índices creados")
@@ -1,4 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger, Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, Index, UniqueConstraint
+)
 from sqlalchemy.sql import func
 from .database import Base
 
@@ -13,6 +17,298 @@ class ProductModel(Base):
     price = Column(Float, nullable=False)
     cost = Column(Float, nullable=False, default=0.0)
     category = Column(String(50), nullable=False, default="Otros")
+    supplier = Column(String(200))
+    stock = Column(Integer, nullable=False, default=0)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Control de concurrencia optimista: sube con cada cambio del catálogo (no con el stock)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Índices según las consultas del repositorio (ver src/database/query_advisor.py)
+    __table_args__ = (
+        # Parciales: casi todas las lecturas filtran is_active; los inactivos no ocupan espacio
+        Index("ix_products_active_code", "code",
+              sqlite_where=is_active == True, postgresql_where=is_active == True),
+        Index("ix_products_active_category_name", "category", "name",
+              sqlite_where=is_active == True, postgresql_where=is_active == True),
+        # Filtro por proveedor sin distinguir mayúsculas (reprecio masivo)
+        Index("ix_products_supplier_lower", func.lower(supplier)),
+        # Rango de precios en los filtros de la lista
+        Index("ix_products_price", "price"),
+        # Candidatos a archivo: inactivos por antigüedad del último cambio
+        Index("ix_products_inactive_updated", "updated_at",
+              sqlite_where=is_active == False, postgresql_where=is_active == False),
+    )
+
+
+class ArchivedProductModel(Base):
+    """Productos inactivos retirados de products por el mantenimiento; conservan su id"""
+    __tablename__ = "archived_products"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    code = Column(String(50), nullable=False, index=True)
+    name = Column(String(200), nullable=False)
+    description = Column(Text)
+    price = Column(Float, nullable=False)
+    cost = Column(Float, nullable=False, default=0.0)
+    category = Column(String(50), nullable=False, default="Otros")
+    supplier = Column(String(200))
+    stock = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    version = Column(Integer, nullable=False, default=1)
+    archived_at = Column(DateTime, server_default=func.now())
+
+
+class PriceChangeModel(Base):
+    """Historial de cambios de precio para auditoría"""
+    __tablename__ = "price_changes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    old_price = Column(Float, nullable=False)
+    new_price = Column(Float, nullable=False)
+    reason = Column(String(300))
+    changed_at = Column(DateTime, server_default=func.now())
+
+
+class ProductChangeModel(Base):
+    """Registro append-only de cambios de productos; seq crece monótonamente"""
+    __tablename__ = "product_changes"
+    __table_args__ = (
+        # Último cambio de ciertas operaciones (versiones que ignoran los de stock)
+        Index("ix_product_changes_operation_seq", "operation", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    product_id = Column(Integer, nullable=False, index=True)
+    operation = Column(String(20), nullable=False)
+    changed_by = Column(String(100))
+    data = Column(Text)
+    changed_at = Column(DateTime, server_default=func.now())
+
+
+class LocationModel(Base):
+    """Sucursal o bodega"""
+    __tablename__ = "locations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(20), unique=True, nullable=False, index=True)
+    name = Column(String(200), nullable=False)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class LocationStockModel(Base):
+    """
+    Stock y precio de un producto en una sucursal; price NULL usa products.price.
+    La clave (location_id, product_id) agrupa las filas de cada sucursal: en SQLite
+    la tabla es WITHOUT ROWID, así que cada sucursal es un rango contiguo del árbol.
+    """
+    __tablename__ = "location_stock"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    location_id = Column(Integer, ForeignKey("locations.id"), primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True, index=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    price = Column(Float)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class PriceListModel(Base):
+    """
+    Lista de precios (promoción, mayorista...). location_id y customer_tier en NULL
+    aplican a todas las sucursales y clientes; priority decide entre listas vigentes.
+    """
+    __tablename__ = "price_lists"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(200), nullable=False)
+    customer_tier = Column(String(50))
+    location_id = Column(Integer, ForeignKey("locations.id"))
+    priority = Column(Integer, nullable=False, default=0)
+    is_active = Column(Boolean, nullable=False, default=True)
+    # Se incrementa con cada cambio de la lista o de sus ítems: invalida la caché de precios
+    revision = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
+class PriceListItemModel(Base):
+    """Precio de un producto en una lista durante [starts_at, ends_at); ends_at NULL = sin fin"""
+    __tablename__ = "price_list_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    price_list_id = Column(Integer, ForeignKey("price_lists.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    price = Column(Float, nullable=False)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime)
+
+    __table_args__ = (
+        # Búsqueda por producto e inicio de vigencia; las fronteras de ventanas por fecha
+        Index("ix_price_list_items_product_starts", "product_id", "starts_at"),
+        Index("ix_price_list_items_starts", "starts_at"),
+        Index("ix_price_list_items_ends", "ends_at"),
+    )
+
+
+class StockMovementModel(Base):
+    """Libro de movimientos de stock; quantity es el delta (negativo en ventas)"""
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    reason = Column(String(50), nullable=False)
+    invoice_id = Column(Integer, ForeignKey("invoices.id"))
+    location_id = Column(Integer, ForeignKey("locations.id"))
+    # Hora local como las ventas (invoice.created_at); el now() de SQLite es UTC y
+    # desordenaría los ajustes respecto de las ventas en las consultas a una fecha
+    created_at = Column(DateTime, default=datetime.now, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_stock_movements_product_created", "product_id", "created_at"),
+        # Demanda reciente de todo el catálogo (reposición): rango por fecha
+        Index("ix_stock_movements_created", "created_at"),
+    )
+
+
+class AppliedStockOperationModel(Base):
+    """Conteos y transferencias de las cajas ya aplicados; reenviarlos no los repite"""
+    __tablename__ = "applied_stock_operations"
+
+    operation_id = Column(String(32), primary_key=True)
+    applied_at = Column(DateTime, server_default=func.now())
+
+
+class StockCheckpointModel(Base):
+    """Foto periódica del stock; cubre los movimientos con id <= last_movement_id"""
+    __tablename__ = "stock_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    taken_at = Column(DateTime, nullable=False, index=True)
+    last_movement_id = Column(Integer, nullable=False)
+    products = Column(Integer, nullable=False, default=0)
+    units = Column(Integer, nullable=False, default=0)
+
+
+class StockCheckpointItemModel(Base):
+    """
+    Stock de cada producto en una foto; solo filas distintas de cero. La clave
+    (checkpoint_id, product_id) deja cada foto contigua (WITHOUT ROWID en SQLite).
+    Sin clave foránea a products: como sales_daily_summary, no impide archivar.
+    """
+    __tablename__ = "stock_checkpoint_items"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    checkpoint_id = Column(Integer, ForeignKey("stock_checkpoints.id"), primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False)
+
+
+class ProductLshBucketModel(Base):
+    """
+    Cubetas MinHash/LSH de los nombres de productos activos: dos productos que
+    comparten una (band, bucket) son candidatos a duplicado. La clave agrupa cada
+    cubeta (WITHOUT ROWID en SQLite). Sin índice por producto: con cientos de miles
+    de productos cuadruplica el tiempo de la búsqueda completa; las filas de un
+    producto se ubican por su firma (product_lsh_signatures).
+    """
+    __tablename__ = "product_lsh_buckets"
+    __table_args__ = {"sqlite_with_rowid": False}
+
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+
+
+class ProductLshSignatureModel(Base):
+    """Cubeta de cada banda de un producto (lista JSON); permite borrar sus filas cuando cambia"""
+    __tablename__ = "product_lsh_signatures"
+
+    product_id = Column(Integer, primary_key=True, autoincrement=False)
+    buckets = Column(Text, nullable=False)
+
+
+class DuplicateCandidateModel(Base):
+    """
+    Par de productos posiblemente duplicados; product_id < duplicate_id.
+    Sin clave foránea a products: un par pendiente no impide archivar.
+    """
+    __tablename__ = "duplicate_candidates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, nullable=False)
+    duplicate_id = Column(Integer, nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    status = Column(String(20), nullable=False, default="PENDING")
+    detected_at = Column(DateTime, server_default=func.now())
+    resolved_at = Column(DateTime)
+    resolved_by = Column(String(100))
+
+    __table_args__ = (
+        # Un par se detecta una sola vez: los descartados no vuelven a aparecer
+        UniqueConstraint("product_id", "duplicate_id", name="uq_duplicate_candidates_pair"),
+        # Revisión: pendientes de mayor a menor similitud
+        Index("ix_duplicate_candidates_status_score", "status", "score"),
+    )
+
+
+class DuplicateScanModel(Base):
+    """Búsquedas de duplicados; last_seq es el último cambio de catálogo revisado"""
+    __tablename__ = "duplicate_scans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scanned_at = Column(DateTime, nullable=False)
+    full = Column(Boolean, nullable=False, default=False)
+    last_seq = Column(Integer, nullable=False)
+    products = Column(Integer, nullable=False, default=0)
+    candidates = Column(Integer, nullable=False, default=0)
+    seconds = Column(Float, nullable=False, default=0.0)
+
+
+class InvoiceModel(Base):
+    __tablename__ = "invoices"
+
+    id = Column(Integer, primary_key=True, index=True)
+    invoice_number = Column(String(50), unique=True, index=True, nullable=False)
+    customer_document = Column(String(50))
+    customer_name = Column(String(200))
+    subtotal = Column(Float, nullable=False, default=0.0)
+    tax_amount = Column(Float, nullable=False, default=0.0)
+    total = Column(Float, nullable=False, default=0.0)
+    status = Column(String(20), nullable=False, default="COMPLETED")
+    created_at = Column(DateTime, nullable=False, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"))
+
+
+class InvoiceItemModel(Base):
+    __tablename__ = "invoice_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
+    product_name = Column(String(200), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    unit_cost = Column(Float, nullable=False, default=0.0)
+    tax_rate = Column(Float, nullable=False, default=0.0)
+    subtotal = Column(Float, nullable=False)
+    tax_amount = Column(Float, nullable=False)
+    total = Column(Float, nullable=False)
+
+
+class SalesDailySummaryModel(Base):
+    """Ventas pre-agregadas por día y producto; se actualiza con cada venta finalizada"""
+    __tablename__ = "sales_daily_summary"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True, index=True)
+    category = Column(String(50), nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    cost = Column(Float, nullable=False, default=0.0)
+    invoice_count = Column(Integer, nullable=False, default=0)
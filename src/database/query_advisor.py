@@ -0,0 +1,372 @@
+"""
+Diagnóstico de planes de consulta de los repositorios.
+
+Ejecuta las operaciones de los repositorios dentro de una
+transacción que se revierte al final, captura cada sentencia SQL emitida y
+obtiene su plan (EXPLAIN QUERY PLAN en SQLite, EXPLAIN en PostgreSQL).
+Las sentencias que recorren una tabla completa se informan; el proceso termina
+con código 1 si alguna no está marcada como recorrido esperado.
+
+Uso:
+    python -m src.database.query_advisor [--database-url URL] [--verbose]
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from src.database.database import Database
+from src.entities.invoice import Invoice, InvoiceItem
+from src.entities.duplicate_candidate import DuplicateStatus
+from src.entities.product import Product, ProductCategory
+from src.entities.product_change import ChangeOperation
+from src.entities.product_filter import ProductFilter
+from src.entities.repricing_rule import RepricingMode, RepricingRule
+from src.entities.location import Location
+from src.entities.price_list import PriceList, PriceListItem
+from src.entities.stock_checkpoint import StockCheckpoint
+from src.repositories.duplicate_repository import DuplicateRepository
+from src.repositories.location_repository import LocationRepository
+from src.repositories.price_list_repository import PriceListRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.repositories.stock_ledger_repository import StockLedgerRepository
+from src.utils.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+_PROBE_CODE = "__query_advisor__"
+_PROBE_LOCATION = "__QA__"
+
+
+class AdvisorStep:
+    """Operación de repositorio a analizar; allow_full_scan marca recorridos esperados"""
+
+    def __init__(self, label: str, run: Callable[["AdvisorRepositories"], Any],
+                 allow_full_scan: bool = False):
+        self.label = label
+        self.run = run
+        self.allow_full_scan = allow_full_scan
+
+
+class PlanFinding:
+    """Plan de una sentencia capturada y las tablas que recorre completas"""
+
+    def __init__(self, step: AdvisorStep, statement: str, plan: List[str], full_scans: List[str]):
+        self.step = step
+        self.statement = statement
+        self.plan = plan
+        self.full_scans = full_scans
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.full_scans) and not self.step.allow_full_scan
+
+
+class AdvisorRepositories:
+    """Repositorios sobre la sesión del análisis, disponibles para cada paso"""
+
+    def __init__(self, session: Session):
+        self.products = ProductRepository(session, actor="query_advisor")
+        self.sales = SaleRepository(session, actor="query_advisor")
+        self.locations = LocationRepository(session, actor="query_advisor")
+        self.ledger = StockLedgerRepository(session, actor="query_advisor")
+        self.price_lists = PriceListRepository(session, actor="query_advisor")
+        self.duplicates = DuplicateRepository(session, actor="query_advisor")
+        self.price_list_id: Optional[int] = None
+
+    def product_id(self, number: int = 1) -> Optional[int]:
+        return self.products.get_id_by_code(_PROBE_CODE if number == 1 else f"{_PROBE_CODE}{number}")
+
+    def location_id(self, number: int = 1) -> Optional[int]:
+        location = self.locations.get_by_code(_PROBE_LOCATION if number == 1 else f"{_PROBE_LOCATION}{number}")
+        return location.id if location else None
+
+
+def _probe_sale(repositories: AdvisorRepositories) -> Optional[Invoice]:
+    product = repositories.products.get_by_code(_PROBE_CODE)
+    invoice = Invoice(invoice_number=f"{_PROBE_CODE}-1", location_id=repositories.location_id())
+    invoice.add_item(InvoiceItem(product.id, product.name, 1, product.price, 0.19,
+                                 unit_cost=product.cost, product_code=product.code))
+    return repositories.sales.create(invoice)
+
+
+def _probe_price_list(repositories: AdvisorRepositories) -> PriceList:
+    price_list = repositories.price_lists.create(PriceList(name=_PROBE_CODE, location_id=repositories.location_id()))
+    repositories.price_list_id = price_list.id
+    return price_list
+
+
+def _probe_buckets(repositories: AdvisorRepositories, product_ids: Optional[List[int]]) -> None:
+    probes = [repositories.product_id(), repositories.product_id(2)]
+    repositories.duplicates.replace_buckets(
+        product_ids,
+        [(product_id, list(range(16))) for product_id in probes],
+        [(band, band, product_id) for product_id in probes for band in range(16)],
+    )
+
+
+def _probe_duplicate(repositories: AdvisorRepositories) -> Dict[str, Any]:
+    return repositories.duplicates.record_scan(
+        [(repositories.product_id(), repositories.product_id(2), 0.9)], False, 0, 2, 0.0
+    )
+
+
+def _probe_merge(repositories: AdvisorRepositories) -> int:
+    # Con stock en una sucursal, para que se analicen también los traspasos
+    repositories.locations.set_stock(repositories.location_id(), repositories.product_id(2), 3)
+    return repositories.products.merge_into(repositories.product_id(2), repositories.product_id())
+
+
+def default_steps() -> List[AdvisorStep]:
+    """Una entrada por consulta de repositorio; al agregar una consulta, agréguela aquí"""
+    today = date.today()
+    start = today - timedelta(days=30)
+    now = datetime.now()
+    rule = RepricingRule(RepricingMode.PERCENT_CHANGE, 5, category=ProductCategory.FILTROS)
+    supplier_rule = RepricingRule(RepricingMode.MARKUP_OVER_COST, 1.3, supplier="Proveedor")
+
+    return [
+        AdvisorStep("ProductRepository.create",
+                    lambda r: r.products.create(Product(code=_PROBE_CODE, name="Sonda", price=100, cost=60))),
+        AdvisorStep("ProductRepository.get_by_id", lambda r: r.products.get_by_id(1)),
+        AdvisorStep("ProductRepository.get_by_code", lambda r: r.products.get_by_code(_PROBE_CODE)),
+        AdvisorStep("ProductRepository.get_by_code_any_status",
+                    lambda r: r.products.get_by_code_any_status(_PROBE_CODE)),
+        AdvisorStep("ProductRepository.get_id_by_code", lambda r: r.products.get_id_by_code(_PROBE_CODE)),
+        AdvisorStep("ProductRepository.get_by_codes", lambda r: r.products.get_by_codes([_PROBE_CODE, "A"])),
+        AdvisorStep("ProductRepository.get_by_ids", lambda r: r.products.get_by_ids([1, 2])),
+        AdvisorStep("ProductRepository.get_all", lambda r: r.products.get_all()),
+        AdvisorStep("ProductRepository.get_all_any_status", lambda r: r.products.get_all_any_status(),
+                    allow_full_scan=True),
+        # LIKE con comodín inicial no puede usar un índice B-tree
+        AdvisorStep("ProductRepository.search", lambda r: r.products.search("sonda"), allow_full_scan=True),
+        AdvisorStep("ProductRepository.filter (activos)", lambda r: r.products.filter(ProductFilter())),
+        AdvisorStep("ProductRepository.filter (categorías)",
+                    lambda r: r.products.filter(ProductFilter(categories=[ProductCategory.FILTROS,
+                                                                          ProductCategory.HERRAMIENTAS]))),
+        AdvisorStep("ProductRepository.filter (proveedores)",
+                    lambda r: r.products.filter(ProductFilter(suppliers=["Acme", "Sonda SA"]))),
+        AdvisorStep("ProductRepository.filter (precio)",
+                    lambda r: r.products.filter(ProductFilter(is_active=None, min_price=10, max_price=20))),
+        AdvisorStep("ProductRepository.filter (inactivos)",
+                    lambda r: r.products.filter(ProductFilter(is_active=False))),
+        # Todos los estados, sin otro filtro: la lista completa es lo pedido
+        AdvisorStep("ProductRepository.filter (todos)",
+                    lambda r: r.products.filter(ProductFilter(is_active=None)), allow_full_scan=True),
+        AdvisorStep("ProductRepository.filter (texto)",
+                    lambda r: r.products.filter(ProductFilter(search="sonda"))),
+        # Se recalcula solo al cambiar la versión del catálogo
+        AdvisorStep("ProductRepository.facet_counts", lambda r: r.products.facet_counts(), allow_full_scan=True),
+        AdvisorStep("ProductRepository.get_facet_version", lambda r: r.products.get_facet_version()),
+        AdvisorStep("ProductRepository.update",
+                    lambda r: r.products.update(r.products.get_by_code(_PROBE_CODE))),
+        AdvisorStep("ProductRepository.upsert_many",
+                    lambda r: r.products.upsert_many([Product(code=_PROBE_CODE, name="Sonda", price=110)])),
+        AdvisorStep("ProductRepository.update_stock",
+                    lambda r: r.products.update_stock(r.product_id(), 10)),
+        AdvisorStep("ProductRepository.preview_reprice (categoría)",
+                    lambda r: r.products.preview_reprice([rule])),
+        AdvisorStep("ProductRepository.preview_reprice (proveedor)",
+                    lambda r: r.products.preview_reprice([supplier_rule])),
+        AdvisorStep("ProductRepository.apply_previewed_reprice",
+                    lambda r: r.products.apply_previewed_reprice([rule], {r.product_id(): 1})),
+        AdvisorStep("ProductRepository.get_price_history", lambda r: r.products.get_price_history(1)),
+        AdvisorStep("ProductRepository.changes_since", lambda r: r.products.changes_since(0, 100)),
+        AdvisorStep("ProductRepository.changes_since (operaciones)",
+                    lambda r: r.products.changes_since(0, 100, [ChangeOperation.CREATE, ChangeOperation.UPDATE])),
+        AdvisorStep("ProductRepository.get_latest_change_seq (operaciones)",
+                    lambda r: r.products.get_latest_change_seq([ChangeOperation.CREATE, ChangeOperation.STOCK])),
+        AdvisorStep("ProductRepository.get_inventory_version", lambda r: r.products.get_inventory_version()),
+        AdvisorStep("ProductRepository.get_catalog_snapshot", lambda r: r.products.get_catalog_snapshot(),
+                    allow_full_scan=True),
+        AdvisorStep("ProductRepository.iter_catalog", lambda r: list(r.products.iter_catalog()),
+                    allow_full_scan=True),
+        AdvisorStep("LocationRepository.create",
+                    lambda r: [r.locations.create(Location(code=code, name=code))
+                               for code in (_PROBE_LOCATION, f"{_PROBE_LOCATION}2")]),
+        AdvisorStep("LocationRepository.get_by_code", lambda r: r.locations.get_by_code(_PROBE_LOCATION)),
+        # Tabla de pocas filas: el recorrido es más barato que un índice
+        AdvisorStep("LocationRepository.get_all", lambda r: r.locations.get_all(), allow_full_scan=True),
+        AdvisorStep("LocationRepository.set_stock",
+                    lambda r: r.locations.set_stock(r.location_id(), r.product_id(), 5)),
+        # Dos veces el mismo id: la segunda es un reenvío de la caja y no aplica nada
+        AdvisorStep("LocationRepository.set_stock (caja)",
+                    lambda r: [r.locations.set_stock(r.location_id(), r.product_id(), 6, "advisor-count")
+                               for _ in range(2)]),
+        AdvisorStep("LocationRepository.set_price",
+                    lambda r: r.locations.set_price(r.location_id(), r.product_id(), 99.0)),
+        AdvisorStep("LocationRepository.get_products", lambda r: r.locations.get_products(r.location_id())),
+        AdvisorStep("LocationRepository.get_product_by_code",
+                    lambda r: r.locations.get_product_by_code(r.location_id(), _PROBE_CODE)),
+        AdvisorStep("LocationRepository.get_stock_by_location",
+                    lambda r: r.locations.get_stock_by_location(r.product_id())),
+        AdvisorStep("LocationRepository.transfer_stock",
+                    lambda r: r.locations.transfer_stock(r.location_id(), r.location_id(2), r.product_id(), 1)),
+        AdvisorStep("PriceListRepository.create", _probe_price_list),
+        AdvisorStep("PriceListRepository.get_all", lambda r: r.price_lists.get_all(), allow_full_scan=True),
+        AdvisorStep("PriceListRepository.add_items",
+                    lambda r: r.price_lists.add_items([PriceListItem(r.price_list_id, r.product_id(), 1.0, now)])),
+        AdvisorStep("PriceListRepository.get_items", lambda r: r.price_lists.get_items(r.price_list_id)),
+        AdvisorStep("PriceListRepository.get_product_candidates",
+                    lambda r: r.price_lists.get_product_candidates(r.product_id(), now)),
+        AdvisorStep("PriceListRepository.get_effective_candidates",
+                    lambda r: r.price_lists.get_effective_candidates(now)),
+        AdvisorStep("PriceListRepository.get_next_boundary", lambda r: r.price_lists.get_next_boundary(now)),
+        AdvisorStep("PriceListRepository.get_version", lambda r: r.price_lists.get_version(),
+                    allow_full_scan=True),
+        AdvisorStep("SaleRepository.create", _probe_sale),
+        AdvisorStep("SaleRepository.get_by_id", lambda r: r.sales.get_by_id(1)),
+        AdvisorStep("SaleRepository.get_all", lambda r: r.sales.get_all()),
+        AdvisorStep("SaleRepository.sales_by_day", lambda r: r.sales.sales_by_day(start, today)),
+        AdvisorStep("SaleRepository.sales_by_category", lambda r: r.sales.sales_by_category(start, today)),
+        AdvisorStep("SaleRepository.sales_by_product", lambda r: r.sales.sales_by_product(start, today, 20)),
+        AdvisorStep("SaleRepository.slow_movers", lambda r: r.sales.slow_movers(start, today)),
+        AdvisorStep("SaleRepository.demand_by_location",
+                    lambda r: r.sales.demand_by_location(now - timedelta(days=28))),
+        # Foto del stock de todas las sucursales (reposición): recorre location_stock completa
+        AdvisorStep("StockLedgerRepository.create", lambda r: r.ledger.create(StockCheckpoint()),
+                    allow_full_scan=True),
+        AdvisorStep("StockLedgerRepository.get_all", lambda r: r.ledger.get_all()),
+        AdvisorStep("StockLedgerRepository.stock_as_of", lambda r: r.ledger.stock_as_of(now)),
+        AdvisorStep("StockLedgerRepository.stock_as_of (productos)",
+                    lambda r: r.ledger.stock_as_of(now, [r.product_id()])),
+        AdvisorStep("StockLedgerRepository.delete", lambda r: r.ledger.delete(r.ledger.get_all()[0].id)),
+        AdvisorStep("LocationRepository.get_stock_snapshot", lambda r: r.locations.get_stock_snapshot(),
+                    allow_full_scan=True),
+        AdvisorStep("ProductRepository.create (duplicado)",
+                    lambda r: r.products.create(Product(code=f"{_PROBE_CODE}2", name="Sonda", price=100))),
+        # Búsqueda completa: vacía las cubetas antes de volver a cargarlas
+        AdvisorStep("DuplicateRepository.replace_buckets (todas)", lambda r: _probe_buckets(r, None),
+                    allow_full_scan=True),
+        AdvisorStep("DuplicateRepository.replace_buckets (productos)",
+                    lambda r: _probe_buckets(r, [r.product_id(), r.product_id(2)])),
+        AdvisorStep("DuplicateRepository.bucket_members",
+                    lambda r: r.duplicates.bucket_members([(band, band) for band in range(16)])),
+        AdvisorStep("DuplicateRepository.record_scan", _probe_duplicate),
+        # Recorre por id de atrás hacia adelante y se detiene en la primera fila
+        AdvisorStep("DuplicateRepository.get_last_scan", lambda r: r.duplicates.get_last_scan(),
+                    allow_full_scan=True),
+        AdvisorStep("DuplicateRepository.get_pending", lambda r: r.duplicates.get_pending()),
+        AdvisorStep("DuplicateRepository.get_by_id", lambda r: r.duplicates.get_by_id(1)),
+        AdvisorStep("DuplicateRepository.set_status",
+                    lambda r: r.duplicates.set_status(r.duplicates.get_pending()[0].id, DuplicateStatus.MERGED)),
+        AdvisorStep("ProductRepository.merge_into", _probe_merge),
+        AdvisorStep("SaleRepository.delete",
+                    lambda r: r.sales.delete(r.sales.get_all()[0].id) if r.sales.get_all() else None),
+        # Se conservan todos los códigos: solo interesa el plan de la lectura del reconteo
+        AdvisorStep("ProductRepository.deactivate_missing",
+                    lambda r: r.products.deactivate_missing(r.products.get_catalog_snapshot()["code"]),
+                    allow_full_scan=True),
+        AdvisorStep("ProductRepository.deactivate_by_codes",
+                    lambda r: r.products.deactivate_by_codes([_PROBE_CODE])),
+        # Con el corte en el futuro la sonda recién desactivada es candidata (queda por su historial)
+        AdvisorStep("ProductRepository.archive_inactive",
+                    lambda r: r.products.archive_inactive(now + timedelta(days=1))),
+        AdvisorStep("ProductRepository.time_catalog_scan", lambda r: r.products.time_catalog_scan(),
+                    allow_full_scan=True),
+    ]
+
+
+class QueryAdvisor:
+    """Captura las sentencias de cada operación y analiza su plan de ejecución"""
+
+    def __init__(self, database: Database):
+        self.backend = database.backend
+        self.engine = create_engine(self.backend.url, echo=False, **self.backend.engine_options())
+        self.backend.configure_engine(self.engine)
+        self.backend.configure_savepoint_engine(self.engine)
+
+    def analyze(self, steps: Optional[List[AdvisorStep]] = None) -> List[PlanFinding]:
+        steps = steps if steps is not None else default_steps()
+        findings: List[PlanFinding] = []
+        with self.engine.connect() as connection:
+            transaction = connection.begin()
+            # Los commit de los repositorios liberan savepoints; todo se revierte al final
+            session = Session(bind=connection, join_transaction_mode="create_savepoint")
+            repositories = AdvisorRepositories(session)
+            try:
+                for step in steps:
+                    statements = self._capture(connection, lambda: step.run(repositories))
+                    findings.extend(self._explain(connection, step, statements))
+            finally:
+                session.close()
+                transaction.rollback()
+        self.engine.dispose()
+        return findings
+
+    def _capture(self, connection: Connection, run: Callable[[], Any]) -> List[tuple]:
+        captured = {}
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(_EXPLAINABLE):
+                captured.setdefault(statement, parameters[0] if executemany else parameters)
+
+        event.listen(connection, "before_cursor_execute", before_cursor_execute)
+        try:
+            run()
+        except Exception as e:
+            logger.warning(f"Query advisor step failed: {str(e)}")
+        finally:
+            event.remove(connection, "before_cursor_execute", before_cursor_execute)
+        return list(captured.items())
+
+    def _explain(self, connection: Connection, step: AdvisorStep,
+                 statements: List[tuple]) -> List[PlanFinding]:
+        findings = []
+        for statement, parameters in statements:
+            rows = connection.exec_driver_sql(self.backend.explain_prefix + statement, parameters).all()
+            plan = [str(row[-1]) for row in rows]
+            full_scans = [
+                match.group(1)
+                for line in plan
+                for match in [self.backend.full_scan_pattern.search(line.strip())]
+                if match
+            ]
+            findings.append(PlanFinding(step, statement, plan, full_scans))
+        return findings
+
+
+def format_report(findings: List[PlanFinding], verbose: bool = False) -> str:
+    lines = []
+    for finding in findings:
+        if not (verbose or finding.flagged):
+            continue
+        if finding.flagged:
+            marker = "❌ RECORRIDO COMPLETO"
+        elif finding.full_scans:
+            marker = "ℹ️ recorrido esperado"
+        else:
+            marker = "✅"
+        lines.append(f"{marker} {finding.step.label}")
+        lines.append("    " + " ".join(finding.statement.split())[:300])
+        lines.extend(f"      {line}" for line in finding.plan)
+
+    flagged = sum(1 for finding in findings if finding.flagged)
+    lines.append(f"{len(findings)} sentencias analizadas, {flagged} con recorridos completos no esperados")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analiza los planes de consulta de los repositorios")
+    parser.add_argument("--database-url", help="URL de la base (por defecto DATABASE_URL)")
+    parser.add_argument("--verbose", action="store_true", help="Muestra el plan de todas las sentencias")
+    args = parser.parse_args(argv)
+
+    database = Database.connect(args.database_url) if args.database_url else Database()
+    database.create_tables()
+    database.run_migrations()
+
+    findings = QueryAdvisor(database).analyze()
+    print(format_report(findings, args.verbose))
+    return 1 if any(finding.flagged for finding in findings) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
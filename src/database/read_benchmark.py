@@ -0,0 +1,146 @@
+"""
+Microbenchmark de las lecturas calientes de productos: costo por llamada.
+
+Compara la forma anterior (una cadena session.query(...).filter(...) nueva en
+cada llamada) con la actual del ProductRepository (sentencias select() armadas
+una vez con bindparam, que SQLAlchemy reutiliza desde su caché de compilación).
+Ambas abren y cierran la sesión de lectura en cada llamada, como el repositorio.
+
+Uso:
+    python -m src.database.read_benchmark [--calls 5000] [--products 1000]
+    python -m src.database.read_benchmark --database-url sqlite:////tmp/bench.db --json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from src.database.database import Database
+from src.database.models import ProductModel
+from src.repositories.product_repository import ProductRepository
+from src.utils.logger import Logger
+
+_ROUNDS = 5
+
+
+def _seed(database: Database, products: int) -> None:
+    database.create_tables()
+    database.run_migrations()
+    with database.get_session() as session:
+        session.execute(insert(ProductModel), [
+            {"code": f"READ-{number:06d}", "name": f"Producto {number}", "description": "",
+             "price": 1000.0 + number, "cost": 600.0, "category": "Otros", "stock": 100}
+            for number in range(1, products + 1)
+        ])
+        session.commit()
+
+
+def _legacy_readers(repository: ProductRepository) -> Dict[str, Callable[[Any], Any]]:
+    """Las lecturas como estaban antes: la consulta se arma de nuevo en cada llamada"""
+
+    def by_id(product_id):
+        with repository._reading() as session:
+            row = session.query(ProductModel).filter(ProductModel.id == product_id).first()
+            return repository._to_entity(row) if row else None
+
+    def by_code(code):
+        with repository._reading() as session:
+            row = session.query(ProductModel).filter(
+                ProductModel.code == code, ProductModel.is_active == True
+            ).first()
+            return repository._to_entity(row) if row else None
+
+    def by_code_any_status(code):
+        with repository._reading() as session:
+            row = session.query(ProductModel).filter(ProductModel.code == code).first()
+            return repository._to_entity(row) if row else None
+
+    return {"get_by_id": by_id, "get_by_code": by_code, "get_by_code_any_status": by_code_any_status}
+
+
+def _current_readers(repository: ProductRepository) -> Dict[str, Callable[[Any], Any]]:
+    return {
+        "get_by_id": repository.get_by_id,
+        "get_by_code": repository.get_by_code,
+        "get_by_code_any_status": repository.get_by_code_any_status,
+    }
+
+
+def _time_per_call(read: Callable[[Any], Any], keys: List[Any]) -> float:
+    """Mediana de varias rondas, en microsegundos por llamada"""
+    for key in keys[:100]:
+        read(key)
+    rounds = []
+    for _ in range(_ROUNDS):
+        started = time.perf_counter()
+        for key in keys:
+            read(key)
+        rounds.append((time.perf_counter() - started) / len(keys))
+    return statistics.median(rounds) * 1_000_000
+
+
+def run(url: str, calls: int, products: int) -> List[Dict[str, Any]]:
+    """Mide cada lectura con ambas formas sobre la base de url"""
+    database = Database.connect(url)
+    _seed(database, products)
+    repository = ProductRepository(database.get_session(), database.get_read_session())
+
+    ids = [number % products + 1 for number in range(calls)]
+    codes = [f"READ-{number:06d}" for number in ids]
+    keys = {"get_by_id": ids, "get_by_code": codes, "get_by_code_any_status": codes}
+
+    legacy = _legacy_readers(repository)
+    current = _current_readers(repository)
+    results = []
+    for operation in keys:
+        before = _time_per_call(legacy[operation], keys[operation])
+        after = _time_per_call(current[operation], keys[operation])
+        results.append({
+            "operation": operation,
+            "calls": calls,
+            "before_us": round(before, 1),
+            "after_us": round(after, 1),
+            "speedup": round(before / after, 2) if after else None,
+        })
+
+    repository.session.close()
+    database.engine.dispose()
+    database.read_engine.dispose()
+    return results
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'lectura':<24} {'antes µs':>9} {'ahora µs':>9} {'mejora':>7}"]
+    for result in results:
+        lines.append(
+            f"{result['operation']:<24} {result['before_us']:>9,.1f} {result['after_us']:>9,.1f} "
+            f"{result['speedup'] or 0:>6,.2f}×"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmark de las lecturas calientes de productos")
+    parser.add_argument("--calls", type=int, default=5000, help="Llamadas por ronda y lectura")
+    parser.add_argument("--products", type=int, default=1000, help="Productos en la base")
+    parser.add_argument("--database-url", help="Base vacía a usar (por defecto SQLite temporal)")
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados como JSON")
+    args = parser.parse_args(argv)
+    Logger.set_console_stream(sys.stderr)
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'read.db')}"
+        results = run(url, args.calls, args.products)
+
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, create_engine, event, func, select, update
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from src.database.backends import SQLiteBackend
+from src.entities.invoice import Invoice, InvoiceItem
+from src.utils.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+JournalBase = declarative_base()
+
+DEFAULT_JOURNAL_PATH = 'till_journal.db'
+
+STOCK_COUNT = "COUNT"
+STOCK_TRANSFER = "TRANSFER"
+
+
+class QueuedSaleModel(JournalBase):
+    """Venta registrada en la caja pendiente de enviar a la base central"""
+    __tablename__ = "queued_sales"
+
+    id = Column(Integer, primary_key=True)
+    invoice_number = Column(String(50), unique=True, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    synced_at = Column(DateTime, index=True)
+
+
+class QueuedStockOperationModel(JournalBase):
+    """Conteo o transferencia de stock hecha en la caja pendiente de enviar a la base central"""
+    __tablename__ = "queued_stock_operations"
+
+    id = Column(Integer, primary_key=True)
+    operation = Column(String(20), nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    synced_at = Column(DateTime, index=True)
+
+
+class JournalStateModel(JournalBase):
+    """Estado de sincronización (p. ej. último cambio de catálogo central recibido)"""
+    __tablename__ = "journal_state"
+
+    key = Column(String(50), primary_key=True)
+    value = Column(String(200))
+
+
+class TillJournal:
+    """
+    Diario local SQLite de la caja para operar sin conexión a la base central.
+    Las ventas, los conteos y las transferencias de stock se encolan aquí y
+    TillSyncService los envía a la central.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('POS_TILL_JOURNAL', DEFAULT_JOURNAL_PATH)
+        self.engine = create_engine(f'sqlite:///{self.path}', echo=False)
+        event.listen(self.engine, "connect", SQLiteBackend._configure_writer_connection)
+        JournalBase.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        logger.info(f"Till journal ready at {self.path}")
+
+    def enqueue_sale(self, invoice: Invoice, location_code: Optional[str] = None) -> None:
+        """
+        Encola la venta con el código de su sucursal: el location_id es de la base de
+        la caja y en la central la sucursal se resuelve por código
+        """
+        with self.SessionLocal() as session:
+            session.add(QueuedSaleModel(
+                invoice_number=invoice.invoice_number,
+                payload=json.dumps(self._to_payload(invoice, location_code)),
+                created_at=invoice.created_at,
+            ))
+            session.commit()
+
+    def pending_sales(self, limit: int, after_id: int = 0,
+                      before: Optional[datetime] = None) -> List[tuple]:
+        """
+        Lote de ventas pendientes como (id en el diario, factura, código de la sucursal),
+        en orden de registro; la factura no trae location_id. Con before, solo las
+        ventas hechas antes de ese momento.
+        """
+        stmt = (
+            select(QueuedSaleModel.id, QueuedSaleModel.payload)
+            .where(QueuedSaleModel.synced_at.is_(None), QueuedSaleModel.id > after_id)
+            .order_by(QueuedSaleModel.id)
+            .limit(limit)
+        )
+        if before is not None:
+            stmt = stmt.where(QueuedSaleModel.created_at < before)
+        with self.SessionLocal() as session:
+            rows = session.execute(stmt).all()
+            payloads = [(row.id, json.loads(row.payload)) for row in rows]
+            return [(sale_id, self._from_payload(payload), payload.get("location_code"))
+                    for sale_id, payload in payloads]
+
+    def mark_synced(self, invoice_numbers: Iterable[str]) -> None:
+        invoice_numbers = list(invoice_numbers)
+        if not invoice_numbers:
+            return
+        with self.SessionLocal() as session:
+            session.execute(
+                update(QueuedSaleModel)
+                .where(QueuedSaleModel.invoice_number.in_(invoice_numbers))
+                .values(synced_at=datetime.now())
+            )
+            session.commit()
+
+    def pending_count(self) -> int:
+        with self.SessionLocal() as session:
+            return session.execute(
+                select(func.count()).select_from(QueuedSaleModel).where(QueuedSaleModel.synced_at.is_(None))
+            ).scalar()
+
+    def enqueue_stock_count(self, location_code: str, product_code: str, quantity: int) -> None:
+        """Conteo de la sucursal: en la central fija el stock a quantity"""
+        self._enqueue_stock_operation(STOCK_COUNT, {
+            "location_code": location_code, "product_code": product_code, "quantity": quantity,
+        })
+
+    def enqueue_stock_transfer(self, from_location_code: str, to_location_code: str,
+                               product_code: str, quantity: int) -> None:
+        self._enqueue_stock_operation(STOCK_TRANSFER, {
+            "from_location_code": from_location_code, "to_location_code": to_location_code,
+            "product_code": product_code, "quantity": quantity,
+        })
+
+    def pending_stock_operations(self) -> List[Dict[str, Any]]:
+        """Conteos y transferencias pendientes, en orden de registro"""
+        with self.SessionLocal() as session:
+            rows = session.execute(
+                select(QueuedStockOperationModel)
+                .where(QueuedStockOperationModel.synced_at.is_(None))
+                .order_by(QueuedStockOperationModel.id)
+            ).scalars().all()
+            return [
+                {"id": row.id, "operation": row.operation, "created_at": row.created_at, **json.loads(row.payload)}
+                for row in rows
+            ]
+
+    def mark_stock_operation_synced(self, operation_id: int) -> None:
+        with self.SessionLocal() as session:
+            session.execute(
+                update(QueuedStockOperationModel)
+                .where(QueuedStockOperationModel.id == operation_id)
+                .values(synced_at=datetime.now())
+            )
+            session.commit()
+
+    def pending_stock_count(self) -> int:
+        with self.SessionLocal() as session:
+            return session.execute(
+                select(func.count()).select_from(QueuedStockOperationModel)
+                .where(QueuedStockOperationModel.synced_at.is_(None))
+            ).scalar()
+
+    def get_state(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self.SessionLocal() as session:
+            state = session.get(JournalStateModel, key)
+            return state.value if state else default
+
+    def set_state(self, key: str, value: str) -> None:
+        with self.SessionLocal() as session:
+            session.merge(JournalStateModel(key=key, value=value))
+            session.commit()
+
+    def _enqueue_stock_operation(self, operation: str, payload: dict) -> None:
+        # Id único de la operación: la central lo registra al aplicarla y descarta los reenvíos
+        payload = {"operation_id": uuid.uuid4().hex, **payload}
+        with self.SessionLocal() as session:
+            session.add(QueuedStockOperationModel(
+                operation=operation, payload=json.dumps(payload), created_at=datetime.now(),
+            ))
+            session.commit()
+
+    def _to_payload(self, invoice: Invoice, location_code: Optional[str]) -> dict:
+        return {
+            "invoice_number": invoice.invoice_number,
+            "customer_document": invoice.customer_document,
+            "customer_name": invoice.customer_name,
+            "created_at": invoice.created_at.isoformat(),
+            "location_code": location_code,
+            "items": [
+                {
+                    "product_code": item.product_code,
+                    "product_name": item.product_name,
+                    "quantity": item.quantity,
+                    "unit_price": item.unit_price,
+                    "unit_cost": item.unit_cost,
+                    "tax_rate": item.tax_rate,
+                    "category": item.category,
+                }
+                for item in invoice.items
+            ],
+        }
+
+    def _from_payload(self, payload: dict) -> Invoice:
+        invoice = Invoice(
+            customer_document=payload["customer_document"],
+            customer_name=payload["customer_name"],
+            invoice_number=payload["invoice_number"],
+            created_at=datetime.fromisoformat(payload["created_at"]),
+        )
+        for item in payload["items"]:
+            invoice.add_item(InvoiceItem(
+                product_id=None,
+                product_name=item["product_name"],
+                quantity=item["quantity"],
+                unit_price=item["unit_price"],
+                tax_rate=item["tax_rate"],
+                unit_cost=item["unit_cost"],
+                category=item["category"],
+                product_code=item["product_code"],
+            ))
+        return invoice
@@ -0,0 +1,160 @@
+"""
+Benchmark de escrituras concurrentes: commit por sesión contra escritor único.
+
+Simula cajas que finalizan ventas a la vez sobre una base nueva. En el modo
+"session" cada caja confirma con su propia sesión (como hoy); en el modo
+"group" las ventas pasan por el WriteCoordinator y se confirman en grupo.
+
+Uso:
+    python -m src.database.write_benchmark [--writers 20] [--sales 50] [--items 3]
+    python -m src.database.write_benchmark --modes group --database-url sqlite:////tmp/bench.db --json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from src.database.database import Database
+from src.database.models import ProductModel
+from src.database.write_coordinator import WriteCoordinator
+from src.entities.invoice import Invoice, InvoiceItem
+from src.repositories.sale_repository import SaleRepository
+from src.services.sales_service import SalesService
+from src.utils.logger import Logger
+
+SESSION = "session"
+GROUP = "group"
+
+_PRODUCTS = 200
+
+
+def _seed(database: Database) -> None:
+    database.create_tables()
+    database.run_migrations()
+    with database.get_session() as session:
+        session.execute(insert(ProductModel), [
+            {"code": f"BENCH-{number:04d}", "name": f"Producto {number}", "description": "",
+             "price": 1000.0 + number, "cost": 600.0, "category": "Otros", "stock": 1_000_000}
+            for number in range(1, _PRODUCTS + 1)
+        ])
+        session.commit()
+
+
+def _new_invoice(writer: int, sale: int, items: int) -> Invoice:
+    invoice = Invoice(invoice_number=f"B-{writer:03d}-{sale:06d}")
+    for line in range(items):
+        product_id = (writer * 31 + sale * 7 + line) % _PRODUCTS + 1
+        invoice.add_item(InvoiceItem(product_id, f"Producto {product_id}", 1, 1000.0 + product_id,
+                                     0.19, unit_cost=600.0))
+    return invoice
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_mode(mode: str, url: str, writers: int, sales: int, items: int) -> Dict[str, Any]:
+    """Ejecuta writers cajas concurrentes sobre la base de url y mide latencias y errores"""
+    database = Database.connect(url)
+    _seed(database)
+    coordinator = WriteCoordinator(database) if mode == GROUP else None
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(writers + 1)
+
+    def cashier(writer: int) -> None:
+        session = database.get_session()
+        service = SalesService(SaleRepository(session, actor="benchmark"), write_coordinator=coordinator)
+        barrier.wait()
+        for sale in range(sales):
+            started = time.perf_counter()
+            try:
+                service.finalize_sale(_new_invoice(writer, sale, items))
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__ + ": " + str(e).splitlines()[0])
+        session.close()
+
+    threads = [threading.Thread(target=cashier, args=(writer,)) for writer in range(writers)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    if coordinator:
+        coordinator.close()
+    database.engine.dispose()
+    database.read_engine.dispose()
+
+    return {
+        "mode": mode,
+        "writers": writers,
+        "sales": len(latencies),
+        "errors": len(errors),
+        "error_sample": sorted(set(errors))[:3],
+        "seconds": round(elapsed, 3),
+        "sales_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+    }
+
+
+def format_report(results: List[Dict[str, Any]]) -> str:
+    lines = [f"{'modo':<8} {'ventas':>7} {'errores':>7} {'ventas/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+    for result in results:
+        lines.append(
+            f"{result['mode']:<8} {result['sales']:>7} {result['errors']:>7} {result['sales_per_second']:>9,.1f} "
+            f"{result['p50_ms'] or 0:>8,.1f} {result['p95_ms'] or 0:>8,.1f} {result['p99_ms'] or 0:>8,.1f}"
+        )
+        for sample in result["error_sample"]:
+            lines.append(f"         ❌ {sample}")
+    by_mode = {result["mode"]: result for result in results}
+    if by_mode.get(SESSION, {}).get("sales_per_second") and GROUP in by_mode:
+        ratio = by_mode[GROUP]["sales_per_second"] / by_mode[SESSION]["sales_per_second"]
+        lines.append("")
+        lines.append(f"Escritor único: {ratio:,.1f}× el rendimiento del commit por sesión")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de escrituras concurrentes de ventas")
+    parser.add_argument("--writers", type=int, default=20, help="Cajas escribiendo a la vez")
+    parser.add_argument("--sales", type=int, default=50, help="Ventas por caja")
+    parser.add_argument("--items", type=int, default=3, help="Líneas por venta")
+    parser.add_argument("--modes", nargs="+", choices=[SESSION, GROUP], default=[SESSION, GROUP])
+    parser.add_argument("--database-url", help="Base vacía a usar (por defecto SQLite temporal por modo)")
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados como JSON")
+    args = parser.parse_args(argv)
+    if args.database_url and len(args.modes) > 1:
+        parser.error("--database-url requiere un solo modo (--modes session o --modes group)")
+    Logger.set_console_stream(sys.stderr)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in args.modes:
+            url = args.database_url or f"sqlite:///{os.path.join(directory, f'{mode}.db')}"
+            results.append(run_mode(mode, url, args.writers, args.sales, args.items))
+
+    print(json.dumps(results, indent=2) if args.json else format_report(results))
+    return 0 if not any(result["errors"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Escritor único con commits agrupados (group commit).
+
+Las sesiones de Streamlit no confirman sus escrituras por su cuenta: envían la
+operación a una cola y un solo hilo escritor la ejecuta. El hilo junta las
+operaciones que llegan dentro de una ventana corta (o hasta un máximo) y las
+confirma en una sola transacción: un fsync por grupo en lugar de uno por venta
+y sin esperas por "database is locked" entre cajas del mismo proceso.
+
+Cada operación corre en su propio SAVEPOINT, por lo que si una falla solo se
+revierte esa; las demás del grupo se confirman. Los repositorios se usan sin
+cambios: su commit() libera el savepoint y su rollback() lo revierte.
+
+Las operaciones se ejecutan en orden de llegada. Las encoladas con
+submit_batched() que llegan seguidas con el mismo handler se escriben juntas en
+una sola llamada (p. ej. las ventas consecutivas en un create_many); si esa
+llamada falla, se reintentan una por una para aislar la que falló. Una operación
+de otro tipo corta el lote, así nunca se adelanta ni se atrasa respecto de otra.
+
+Variables de entorno:
+    POS_GROUP_COMMIT=1               activa el escritor único (ventas y anulaciones)
+    POS_GROUP_COMMIT_MAX=64          operaciones máximas por grupo
+    POS_GROUP_COMMIT_WINDOW_MS=2     espera para completar un grupo
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.utils.logger import Logger
+from src.utils.metrics import counter, histogram
+
+T = TypeVar('T')
+
+logger = Logger(__name__).get_logger()
+
+_GROUP_SIZE = histogram("pos_write_group_size", "Operaciones confirmadas por grupo",
+                        buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+_QUEUE_SECONDS = histogram("pos_write_queue_seconds", "Espera de una operación en la cola del escritor")
+_COMMIT_SECONDS = histogram("pos_write_commit_seconds", "Duración del commit de cada grupo")
+_WRITE_REQUESTS = counter("pos_write_requests_total", "Operaciones del escritor por resultado", ["result"])
+_WRITE_OK = _WRITE_REQUESTS.labels("ok")
+_WRITE_FAILED = _WRITE_REQUESTS.labels("error")
+
+# Cierra el hilo escritor después de vaciar la cola
+_STOP = object()
+
+
+def group_commit_enabled() -> bool:
+    return os.getenv("POS_GROUP_COMMIT", "").lower() in ("1", "true", "yes")
+
+
+class WriteRequest:
+    """Operación encolada: función que recibe la sesión del grupo (o handler + item) y su futuro"""
+
+    __slots__ = ("operation", "handler", "item", "future", "enqueued_at")
+
+    def __init__(self, operation: Optional[Callable[[Session], T]] = None,
+                 handler: Optional[Callable[[Session, List[Any]], List[Any]]] = None, item: Any = None):
+        self.operation = operation
+        self.handler = handler
+        self.item = item
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class WriteCoordinator:
+    """
+    Cola de escrituras con un solo hilo escritor y commits agrupados - SRP
+    Las operaciones reciben una Session unida a la transacción del grupo.
+    """
+
+    def __init__(self, database, max_group_size: Optional[int] = None,
+                 window_seconds: Optional[float] = None):
+        self.backend = database.backend
+        self.max_group_size = max_group_size or int(os.getenv("POS_GROUP_COMMIT_MAX", "64"))
+        if window_seconds is None:
+            window_seconds = float(os.getenv("POS_GROUP_COMMIT_WINDOW_MS", "2")) / 1000
+        self.window_seconds = window_seconds
+
+        # Motor propio de una conexión: el escritor nunca compite consigo mismo
+        self.engine = create_engine(self.backend.url, echo=False, **self.backend.engine_options())
+        self.backend.configure_group_commit_engine(self.engine)
+        database._instrument(self.engine, "group_commit")
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-coordinator", daemon=True)
+        self._thread.start()
+        logger.info(f"Write coordinator started (max {self.max_group_size} ops, "
+                     f"window {self.window_seconds * 1000:g} ms)")
+
+    def submit(self, operation: Callable[[Session], T]) -> Future:
+        """Encola la operación; el futuro se resuelve al confirmarse (o fallar) su grupo"""
+        return self._enqueue(WriteRequest(operation))
+
+    def submit_batched(self, handler: Callable[[Session, List[Any]], List[Any]], item: Any) -> Future:
+        """
+        Encola item para escribirlo junto a los demás del mismo handler en el grupo.
+        handler(session, items) retorna un resultado por item, en orden; un resultado
+        que es una excepción se entrega como error solo a ese item.
+        """
+        return self._enqueue(WriteRequest(handler=handler, item=item))
+
+    def execute(self, operation: Callable[[Session], T], timeout: Optional[float] = None) -> T:
+        """Encola la operación y espera su resultado (o su excepción)"""
+        return self.submit(operation).result(timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Confirma lo que quede en la cola y detiene el hilo escritor"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self.engine.dispose()
+
+    def _enqueue(self, request: WriteRequest) -> Future:
+        if self._closed:
+            raise RuntimeError("El escritor de la base de datos está cerrado")
+        self._queue.put(request)
+        return request.future
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            group, stopping = self._next_group()
+            if group:
+                self._commit_group(group)
+
+    def _next_group(self) -> tuple:
+        """Espera la primera operación y junta las que lleguen dentro de la ventana"""
+        first = self._queue.get()
+        if first is _STOP:
+            return [], True
+        group = [first]
+        deadline = time.perf_counter() + self.window_seconds
+        while len(group) < self.max_group_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is _STOP:
+                return group, True
+            group.append(request)
+        return group, False
+
+    def _commit_group(self, group: List[WriteRequest]) -> None:
+        # Las canceladas mientras esperaban en la cola no se ejecutan
+        group = [request for request in group if request.future.set_running_or_notify_cancel()]
+        if not group:
+            return
+        started = time.perf_counter()
+        for request in group:
+            _QUEUE_SECONDS.observe(started - request.enqueued_at)
+
+        outcomes: Dict[WriteRequest, Tuple[Any, Optional[Exception]]] = {}
+        try:
+            with self.engine.connect() as connection:
+                transaction = connection.begin()
+                for handler, requests in self._partition(group):
+                    if handler is None:
+                        for request in requests:
+                            outcomes[request] = self._run_operation(connection, request.operation)
+                    else:
+                        outcomes.update(self._run_batch(connection, handler, requests))
+                committing = time.perf_counter()
+                transaction.commit()
+                _COMMIT_SECONDS.observe(time.perf_counter() - committing)
+        except Exception as e:
+            # Sin commit no se confirmó ninguna: todas las del grupo fallan
+            logger.error(f"Error committing write group of {len(group)}: {str(e)}")
+            for request in group:
+                request.future.set_exception(e)
+            _WRITE_FAILED.inc(len(group))
+            return
+
+        _GROUP_SIZE.observe(len(group))
+        for request in group:
+            result, error = outcomes[request]
+            if error is not None:
+                request.future.set_exception(error)
+                _WRITE_FAILED.inc()
+            else:
+                request.future.set_result(result)
+                _WRITE_OK.inc()
+
+    @staticmethod
+    def _partition(group: List[WriteRequest]) -> List[Tuple[Any, List[WriteRequest]]]:
+        """Tramos consecutivos con el mismo handler (None: operaciones sueltas), en orden de llegada"""
+        partitions: List[Tuple[Any, List[WriteRequest]]] = []
+        for request in group:
+            if partitions and partitions[-1][0] == request.handler:
+                partitions[-1][1].append(request)
+            else:
+                partitions.append((request.handler, [request]))
+        return partitions
+
+    def _run_batch(self, connection, handler, requests: List[WriteRequest]) -> Dict[WriteRequest, tuple]:
+        items = [request.item for request in requests]
+        results, error = self._run_operation(connection, lambda session: handler(session, items))
+        if error is None:
+            return {
+                request: (None, result) if isinstance(result, Exception) else (result, None)
+                for request, result in zip(requests, results)
+            }
+        if len(requests) == 1:
+            return {requests[0]: (None, error)}
+
+        # Un item hizo fallar el lote (ya revertido): cada uno por separado aísla al culpable
+        logger.warning(f"Write batch of {len(requests)} failed, retrying one by one: {str(error)}")
+        outcomes = {}
+        for request in requests:
+            outcomes.update(self._run_batch(connection, handler, [request]))
+        return outcomes
+
+    @staticmethod
+    def _run_operation(connection, operation: Callable[[Session], T]) -> tuple:
+        """Ejecuta una operación en su savepoint; su error no afecta al resto del grupo"""
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            return operation(session), None
+        except Exception as e:
+            return None, e
+        finally:
+            # Revierte el savepoint si la operación no lo confirmó
+            session.close()
@@ -0,0 +1,34 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from .base_entity import BaseEntity
+from .product import Product
+
+
+class DuplicateStatus(Enum):
+    PENDING = "PENDING"
+    DISMISSED = "DISMISSED"
+    MERGED = "MERGED"
+
+
+class DuplicateCandidate(BaseEntity):
+    """
+    Par de productos con nombres parecidos pendiente de revisión.
+    product y duplicate se completan al listar para la pantalla de revisión.
+    """
+
+    def __init__(self, id: int = None, product_id: int = 0, duplicate_id: int = 0, score: float = 0.0,
+                 status: DuplicateStatus = DuplicateStatus.PENDING, detected_at: Optional[datetime] = None,
+                 resolved_at: Optional[datetime] = None, resolved_by: Optional[str] = None,
+                 product: Optional[Product] = None, duplicate: Optional[Product] = None):
+        self.id = id
+        self.product_id = product_id
+        self.duplicate_id = duplicate_id
+        self.score = score
+        self.status = status
+        self.detected_at = detected_at
+        self.resolved_at = resolved_at
+        self.resolved_by = resolved_by
+        self.product = product
+        self.duplicate = duplicate
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import List, Optional
+from enum import Enum
+
+from .base_entity import BaseEntity
+
+
+class InvoiceStatus(Enum):
+    PENDING = "PENDING"
+    COMPLETED = "COMPLETED"
+    CANCELLED = "CANCELLED"
+
+
+class InvoiceItem(BaseEntity):
+    def __init__(self, product_id: int, product_name: str, quantity: int,
+                 unit_price: float, tax_rate: float, unit_cost: float = 0.0,
+                 category: str = "Otros", product_code: str = ""):
+        self.product_id = product_id
+        self.product_code = product_code
+        self.product_name = product_name
+        self.quantity = quantity
+        self.unit_price = unit_price
+        self.unit_cost = unit_cost
+        self.tax_rate = tax_rate
+        self.category = category
+        self.subtotal = quantity * unit_price
+        self.tax_amount = self.subtotal * tax_rate
+        self.total = self.subtotal + self.tax_amount
+
+
+class Invoice(BaseEntity):
+    def __init__(self, id: int = None, customer_document: str = "",
+                 customer_name: str = "Consumidor Final", invoice_number: str = "",
+                 created_at: Optional[datetime] = None,
+                 status: InvoiceStatus = InvoiceStatus.PENDING,
+                 location_id: Optional[int] = None):
+        self.id = id
+        self.customer_document = customer_document
+        self.customer_name = customer_name
+        self.invoice_number = invoice_number
+        self.created_at = created_at or datetime.now()
+        self.items: List[InvoiceItem] = []
+        self.subtotal = 0.0
+        self.tax_amount = 0.0
+        self.total = 0.0
+        self.status = status
+        self.location_id = location_id
+
+    def add_item(self, item: InvoiceItem):
+        self.items.append(item)
+        self._calculate_totals()
+
+    def validate(self) -> tuple[bool, str]:
+        errors = []
+        if not self.items:
+            errors.append("La factura no tiene productos")
+        if any(item.quantity <= 0 for item in self.items):
+            errors.append("Las cantidades deben ser mayores a cero")
+
+        if errors:
+            return False, ", ".join(errors)
+
+        return True, "Factura válida"
+
+    def _calculate_totals(self):
+        self.subtotal = sum(item.subtotal for item in self.items)
+        self.tax_amount = sum(item.tax_amount for item in self.items)
+        self.total = self.subtotal + self.tax_amount
@@ -0,0 +1,26 @@
+from typing import Optional
+
+from .base_entity import BaseEntity
+
+
+class Location(BaseEntity):
+    """Sucursal o bodega con stock y precios propios"""
+
+    def __init__(self, id: int = None, code: str = "", name: str = "",
+                 is_active: bool = True, created_at: Optional[str] = None):
+        self.id = id
+        self.code = code
+        self.name = name
+        self.is_active = is_active
+        self.created_at = created_at
+
+    def validate(self) -> tuple[bool, str]:
+        errors = []
+        if not self.code or len(self.code.strip()) == 0:
+            errors.append("El código de la sucursal es requerido")
+        if not self.name or len(self.name.strip()) == 0:
+            errors.append("El nombre de la sucursal es requerido")
+
+        if errors:
+            return False, ", ".join(errors)
+        return True, "Sucursal válida"
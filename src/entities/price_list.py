@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Optional
+
+from .base_entity import BaseEntity
+
+
+class PriceList(BaseEntity):
+    """
+    Lista de precios con vigencia por ítem. Sin sucursal ni tipo de cliente
+    aplica a todos; entre listas vigentes gana la de mayor prioridad.
+    """
+
+    def __init__(self, id: int = None, name: str = "", customer_tier: Optional[str] = None,
+                 location_id: Optional[int] = None, priority: int = 0, is_active: bool = True,
+                 created_at: Optional[datetime] = None, updated_at: Optional[datetime] = None):
+        self.id = id
+        self.name = name
+        self.customer_tier = customer_tier
+        self.location_id = location_id
+        self.priority = priority
+        self.is_active = is_active
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def validate(self) -> tuple[bool, str]:
+        if not self.name or len(self.name.strip()) == 0:
+            return False, "El nombre de la lista es requerido"
+        return True, "Lista válida"
+
+
+class PriceListItem(BaseEntity):
+    """Precio de un producto dentro de una lista durante [starts_at, ends_at)"""
+
+    def __init__(self, price_list_id: int, product_id: int, price: float, starts_at: datetime,
+                 ends_at: Optional[datetime] = None, id: int = None, product_code: str = ""):
+        self.id = id
+        self.price_list_id = price_list_id
+        self.product_id = product_id
+        self.product_code = product_code
+        self.price = price
+        self.starts_at = starts_at
+        self.ends_at = ends_at
+
+    def is_effective(self, at: datetime) -> bool:
+        return self.starts_at <= at and (self.ends_at is None or at < self.ends_at)
+
+    def validate(self) -> tuple[bool, str]:
+        errors = []
+        if self.price < 0:
+            errors.append("El precio no puede ser negativo")
+        if self.ends_at is not None and self.ends_at <= self.starts_at:
+            errors.append("La vigencia debe terminar después de comenzar")
+
+        if errors:
+            return False, ", ".join(errors)
+        return True, "Precio válido"
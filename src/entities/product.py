@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
 
 from .base_entity import BaseEntity
@@ -13,8 +13,9 @@ class ProductCategory(Enum):
 class Product(BaseEntity):
     def __init__(self, id: int = None, code: str = "", name: str = "", description: str = "",
                  price: float = 0.0, cost: float = 0.0,
-                 category: ProductCategory = ProductCategory.OTROS,
-                 is_active: bool = True, created_at: Optional[str] = None, updated_at: Optional[str] = None):
+                 category: ProductCategory = ProductCategory.OTROS, supplier: Optional[str] = None,
+                 is_active: bool = True, stock: int = 0, created_at: Optional[str] = None, updated_at: Optional[str] = None,
+                 version: Optional[int] = None):
         
         self.id = id
         self.code = code
@@ -23,9 +24,13 @@ class Product(BaseEntity):
         self.price = price
         self.cost = cost
         self.category = category
+        self.supplier = supplier
         self.is_active = is_active
+        self.stock = stock
         self.created_at = created_at
         self.updated_at = updated_at
+        # Versión leída de la base; None si el producto no viene de la base
+        self.version = version
 
     def validate(self) -> tuple[bool, str]:
         errors = []
@@ -37,4 +42,37 @@ class Product(BaseEntity):
         if errors:
             return False, ", ".join(errors)
         
-        return True, "Producto válido"
\ No newline at end of file
+        return True, "Producto válido"
+
+
+class ProductConflictError(ValueError):
+    """
+    El producto cambió en la base desde que se leyó (su versión ya no coincide).
+    Lleva el producto que se intentó guardar y el vigente para mostrar las diferencias.
+    """
+
+    FIELDS = ("code", "name", "description", "price", "cost", "category", "supplier", "is_active")
+
+    def __init__(self, attempted: Product, current: Product):
+        self.attempted = attempted
+        self.current = current
+        super().__init__(
+            f"El producto {current.code or current.id} fue modificado por otro usuario "
+            f"(versión {attempted.version}, vigente {current.version})"
+        )
+
+    def field_diff(self, base: Optional[Product] = None) -> List[Dict[str, Any]]:
+        """Campos en conflicto: valor original (base), el propio y el vigente"""
+        rows = []
+        for field in self.FIELDS:
+            mine, theirs = getattr(self.attempted, field), getattr(self.current, field)
+            original = getattr(base, field) if base is not None else None
+            if _differs(mine, theirs) or (base is not None and _differs(theirs, original)):
+                rows.append({"field": field, "base": original, "mine": mine, "theirs": theirs})
+        return rows
+
+
+def _differs(left: Any, right: Any) -> bool:
+    # El formulario envía "" donde la base guarda NULL: no es una diferencia
+    return (None if left == "" else left) != (None if right == "" else right)
+
@@ -0,0 +1,29 @@
+from typing import Any, Dict, Optional
+from enum import Enum
+
+from .base_entity import BaseEntity
+
+
+class ChangeOperation(Enum):
+    CREATE = "CREATE"
+    UPDATE = "UPDATE"
+    DELETE = "DELETE"
+    REPRICE = "REPRICE"
+    # Solo cambia el stock (ventas, ajustes, fusiones); los datos de catálogo no
+    STOCK = "STOCK"
+    # Un producto ya inactivo sale de products al archivarse
+    ARCHIVE = "ARCHIVE"
+
+
+class ProductChange(BaseEntity):
+    """Entrada del registro de cambios de productos"""
+
+    def __init__(self, seq: int, product_id: int, operation: ChangeOperation,
+                 changed_by: Optional[str] = None, data: Optional[Dict[str, Any]] = None,
+                 changed_at: Optional[str] = None):
+        self.seq = seq
+        self.product_id = product_id
+        self.operation = operation
+        self.changed_by = changed_by
+        self.data = data or {}
+        self.changed_at = changed_at
@@ -0,0 +1,32 @@
+from typing import List, Optional
+
+from .base_entity import BaseEntity
+from .product import ProductCategory
+
+
+class ProductFilter(BaseEntity):
+    """
+    Filtros de la lista de productos; los vacíos no filtran.
+    is_active None muestra activos e inactivos.
+    """
+
+    def __init__(self, search: str = "", categories: Optional[List[ProductCategory]] = None,
+                 is_active: Optional[bool] = True, suppliers: Optional[List[str]] = None,
+                 min_price: Optional[float] = None, max_price: Optional[float] = None):
+        self.search = (search or "").strip()
+        self.categories = list(categories or [])
+        self.is_active = is_active
+        self.suppliers = [supplier.strip() for supplier in suppliers or [] if supplier and supplier.strip()]
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def validate(self) -> tuple[bool, str]:
+        errors = []
+        if self.min_price is not None and self.min_price < 0:
+            errors.append("El precio mínimo no puede ser negativo")
+        if self.min_price is not None and self.max_price is not None and self.min_price > self.max_price:
+            errors.append("El precio mínimo no puede superar al máximo")
+
+        if errors:
+            return False, ", ".join(errors)
+        return True, "Filtro válido"
@@ -0,0 +1,60 @@
+from typing import Optional
+from enum import Enum
+
+from .base_entity import BaseEntity
+from .product import ProductCategory
+
+
+class RepricingMode(Enum):
+    MARKUP_OVER_COST = "Costo × factor"
+    PERCENT_CHANGE = "Variación %"
+
+
+class RepricingRule(BaseEntity):
+    """
+    Regla de actualización masiva de precios.
+    Filtra por categoría y/o proveedor y calcula el nuevo precio a partir del costo
+    (precio = costo × valor) o del precio actual (precio × (1 + valor / 100)),
+    opcionalmente redondeado al múltiplo round_to.
+    """
+
+    def __init__(self, mode: RepricingMode, value: float,
+                 category: Optional[ProductCategory] = None, supplier: Optional[str] = None,
+                 round_to: float = 0.0):
+        self.mode = mode
+        self.value = value
+        self.category = category
+        self.supplier = supplier
+        self.round_to = round_to
+
+    def validate(self) -> tuple[bool, str]:
+        errors = []
+        if self.mode == RepricingMode.MARKUP_OVER_COST and self.value <= 0:
+            errors.append("El factor sobre el costo debe ser mayor a cero")
+        if self.mode == RepricingMode.PERCENT_CHANGE and self.value <= -100:
+            errors.append("La variación no puede ser de -100% o menos")
+        if self.round_to < 0:
+            errors.append("El redondeo no puede ser negativo")
+
+        if errors:
+            return False, ", ".join(errors)
+
+        return True, "Regla válida"
+
+    def describe(self) -> str:
+        """Descripción legible, se guarda en el historial de precios"""
+        scope = []
+        if self.category:
+            scope.append(f"categoría = {self.category.value}")
+        if self.supplier:
+            scope.append(f"proveedor = {self.supplier}")
+        target = ", ".join(scope) if scope else "todos los productos"
+
+        if self.mode == RepricingMode.MARKUP_OVER_COST:
+            formula = f"precio = costo × {self.value:g}"
+        else:
+            formula = f"precio {self.value:+g}%"
+        if self.round_to:
+            formula += f", redondeado a {self.round_to:g}"
+
+        return f"{target}: {formula}"
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+
+from .base_entity import BaseEntity
+
+
+class StockCheckpoint(BaseEntity):
+    """
+    Foto del stock de todo el catálogo. Incluye todos los movimientos hasta
+    last_movement_id; el stock a otra fecha se obtiene reproduciendo los siguientes.
+    """
+
+    def __init__(self, id: int = None, taken_at: Optional[datetime] = None, last_movement_id: int = 0,
+                 products: int = 0, units: int = 0):
+        self.id = id
+        self.taken_at = taken_at
+        self.last_movement_id = last_movement_id
+        self.products = products
+        self.units = units
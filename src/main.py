@@ -10,7 +10,14 @@ import streamlit as st
 from src.ui.app_state import StreamlitAppState
 from src.ui.pages import PageRegistry
 from src.ui.sidebar import render_sidebar
+from src.database.backup import start_backup_scheduler
 from src.database.database import Database
+from src.services.inventory_history_service import start_checkpoint_scheduler
+from src.services.maintenance_service import start_maintenance_scheduler
+from src.utils.metrics import histogram, start_exporters
+from src.utils.profiler import phase, profile_rerun, profiling_enabled
+
+_PAGE_SECONDS = histogram("pos_page_render_seconds", "Duración del renderizado de cada página", ["page"])
 
 
 def initialize_database():
@@ -42,21 +49,32 @@ def main():
     st.title("📦 Inventory Control")
     st.markdown("---")
 
-    with st.spinner("Inicializando base de datos..."):
-        if not initialize_database():
-            st.error("No se pudo inicializar la base de datos. La aplicación no puede continuar.")
-            return
+    profiling = profiling_enabled() or st.session_state.get("profiling_enabled", False)
+    with profile_rerun(profiling) as profile:
+        with phase("db_init"), st.spinner("Inicializando base de datos..."):
+            if not initialize_database():
+                st.error("No se pudo inicializar la base de datos. La aplicación no puede continuar.")
+                return
+        start_exporters()
+        start_backup_scheduler(Database())
+        start_maintenance_scheduler(Database())
+        start_checkpoint_scheduler(Database())
 
-    app_state = initialize_app()
-    page_registry = PageRegistry(app_state)
-    
-    selected_page_name = render_sidebar(app_state, page_registry)
+        with phase("state_init"):
+            app_state = initialize_app()
+            page_registry = PageRegistry(app_state)
+
+        with phase("sidebar"):
+            selected_page_name = render_sidebar(app_state, page_registry)
 
-    selected_page = page_registry.get_page(selected_page_name)
-    if selected_page:
-        selected_page.render()
-    else:
-        st.error("Página no encontrada")
+        selected_page = page_registry.get_page(selected_page_name)
+        if profile:
+            profile.page = selected_page_name
+        if selected_page:
+            with phase("page_render"), _PAGE_SECONDS.labels(selected_page.title).time():
+                selected_page.render()
+        else:
+            st.error("Página no encontrada")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
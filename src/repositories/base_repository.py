@@ -1,17 +1,79 @@
+import getpass
+import json
+import os
 from abc import ABC, abstractmethod
-from typing import List, Optional, TypeVar, Generic
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TypeVar, Generic
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from src.database.backends import StorageBackend, get_backend
+from src.database.models import ProductChangeModel
+from src.entities.product_change import ChangeOperation
 from src.utils.logger import Logger
 
 T = TypeVar('T')
 
 
+def default_actor() -> str:
+    """Usuario que firma los cambios: POS_USER o el usuario del sistema"""
+    try:
+        return os.getenv('POS_USER') or getpass.getuser()
+    except Exception:
+        return "sistema"
+
+
 class BaseRepository(ABC, Generic[T]):
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, read_session: Optional[Session] = None,
+                 actor: Optional[str] = None):
         self.session = session
+        self.read_session = read_session or session
+        self.actor = actor or default_actor()
         self.logger = Logger(self.__class__.__name__).get_logger()
+        self._backend: Optional[StorageBackend] = None
+
+    @property
+    def backend(self) -> StorageBackend:
+        """Backend del motor de escritura, para operaciones masivas por dialecto"""
+        if self._backend is None:
+            # get_bind() puede ser un Engine o una Connection (sesión unida a una transacción)
+            self._backend = get_backend(self.session.get_bind().engine.url)
+        return self._backend
+
+    def with_session(self, session: Session) -> "BaseRepository[T]":
+        """El mismo repositorio leyendo y escribiendo en otra sesión (p. ej. la del WriteCoordinator)"""
+        return type(self)(session, session, self.actor)
+
+    @contextmanager
+    def _reading(self) -> Iterator[Session]:
+        """Entrega la sesión de lectura y libera su snapshot al terminar"""
+        try:
+            yield self.read_session
+        finally:
+            if self.read_session is not self.session:
+                self.read_session.close()
+
+    def _record_product_changes(self, operation: ChangeOperation,
+                                changes: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """
+        Agrega entradas al registro de cambios de productos dentro de la transacción
+        en curso; todo repositorio que modifica products las escribe
+        """
+        if not changes:
+            return
+        self.session.execute(
+            insert(ProductChangeModel),
+            [
+                {
+                    "product_id": product_id,
+                    "operation": operation.value,
+                    "changed_by": self.actor,
+                    "data": json.dumps(data, default=str),
+                }
+                for product_id, data in changes
+            ]
+        )
     
     @abstractmethod
     def get_by_id(self, id: int) -> Optional[T]:
@@ -0,0 +1,242 @@
+import json
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.orm import Session, aliased
+
+from src.database.models import (
+    DuplicateCandidateModel, DuplicateScanModel, ProductLshBucketModel, ProductLshSignatureModel, ProductModel
+)
+from src.entities.duplicate_candidate import DuplicateCandidate, DuplicateStatus
+from .base_repository import BaseRepository
+
+
+class DuplicateRepository(BaseRepository[DuplicateCandidate]):
+    """
+    Cubetas LSH de los nombres, pares candidatos a duplicado y registro de búsquedas.
+    Cada búsqueda guarda el último cambio de catálogo revisado: la siguiente solo
+    recalcula los productos cambiados y busca sus pares en las cubetas guardadas.
+    """
+
+    def __init__(self, session: Session, read_session: Optional[Session] = None,
+                 actor: Optional[str] = None):
+        super().__init__(session, read_session, actor)
+
+    def get_by_id(self, candidate_id: int) -> Optional[DuplicateCandidate]:
+        try:
+            with self._reading() as session:
+                db_candidate = session.get(DuplicateCandidateModel, candidate_id)
+                return self._to_entity(db_candidate) if db_candidate else None
+        except Exception as e:
+            self.logger.error(f"Error getting duplicate candidate {candidate_id}: {str(e)}")
+            return None
+
+    def get_all(self) -> List[DuplicateCandidate]:
+        return self.get_pending(limit=None)
+
+    def get_pending(self, limit: Optional[int] = 200) -> List[DuplicateCandidate]:
+        """Pares pendientes entre productos activos, de mayor a menor similitud"""
+        product = aliased(ProductModel)
+        duplicate = aliased(ProductModel)
+        try:
+            with self._reading() as session:
+                stmt = (
+                    select(DuplicateCandidateModel)
+                    .join(product, product.id == DuplicateCandidateModel.product_id)
+                    .join(duplicate, duplicate.id == DuplicateCandidateModel.duplicate_id)
+                    .where(
+                        DuplicateCandidateModel.status == DuplicateStatus.PENDING.value,
+                        product.is_active == True,
+                        duplicate.is_active == True,
+                    )
+                    .order_by(DuplicateCandidateModel.score.desc())
+                )
+                if limit is not None:
+                    stmt = stmt.limit(limit)
+                return [self._to_entity(db_candidate) for db_candidate in session.execute(stmt).scalars().all()]
+        except Exception as e:
+            self.logger.error(f"Error getting pending duplicates: {str(e)}")
+            return []
+
+    def create(self, entity: DuplicateCandidate) -> DuplicateCandidate:
+        try:
+            db_candidate = DuplicateCandidateModel(
+                product_id=min(entity.product_id, entity.duplicate_id),
+                duplicate_id=max(entity.product_id, entity.duplicate_id),
+                score=entity.score,
+                status=entity.status.value,
+            )
+            self.session.add(db_candidate)
+            self.session.commit()
+            self.session.refresh(db_candidate)
+            return self._to_entity(db_candidate)
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error creating duplicate candidate: {str(e)}")
+            raise
+
+    def update(self, entity: DuplicateCandidate) -> DuplicateCandidate:
+        if not self.set_status(entity.id, entity.status):
+            raise ValueError("El par ya fue revisado o no existe")
+        return self.get_by_id(entity.id)
+
+    def delete(self, id: int) -> bool:
+        try:
+            result = self.session.execute(delete(DuplicateCandidateModel).where(DuplicateCandidateModel.id == id))
+            self.session.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error deleting duplicate candidate {id}: {str(e)}")
+            raise
+
+    def set_status(self, candidate_id: int, status: DuplicateStatus) -> bool:
+        """Resuelve un par pendiente; False si otro usuario ya lo resolvió"""
+        try:
+            result = self.session.execute(
+                update(DuplicateCandidateModel)
+                .where(
+                    DuplicateCandidateModel.id == candidate_id,
+                    DuplicateCandidateModel.status == DuplicateStatus.PENDING.value,
+                )
+                .values(status=status.value, resolved_at=datetime.now(), resolved_by=self.actor)
+            )
+            self.session.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error resolving duplicate candidate {candidate_id}: {str(e)}")
+            raise
+
+    def replace_buckets(self, product_ids: Optional[Sequence[int]], signatures: Iterable[Tuple[int, List[int]]],
+                        rows: Iterable[Tuple[int, int, int]]) -> None:
+        """
+        Reemplaza las cubetas de esos productos (product_ids None: todas, búsqueda
+        completa) por las nuevas: la firma de cada producto (su cubeta en cada banda)
+        y las filas (band, bucket, product_id). Las filas llegan ordenadas por
+        cubeta, así se agregan al final del árbol; se consumen por lotes.
+        """
+        buckets = ProductLshBucketModel.__table__
+        signature_table = ProductLshSignatureModel.__table__
+        try:
+            if product_ids is None:
+                self.session.execute(delete(buckets))
+                self.session.execute(delete(signature_table))
+            else:
+                stale_row = delete(buckets).where(
+                    buckets.c.band == bindparam("stale_band"),
+                    buckets.c.bucket == bindparam("stale_bucket"),
+                    buckets.c.product_id == bindparam("stale_product_id"),
+                )
+                for batch in self.backend.batched(product_ids, 1):
+                    stale = self.session.execute(
+                        select(signature_table.c.product_id, signature_table.c.buckets)
+                        .where(signature_table.c.product_id.in_(batch))
+                    ).all()
+                    stale_rows = [
+                        {"stale_band": band, "stale_bucket": bucket, "stale_product_id": product_id}
+                        for product_id, keys in stale for band, bucket in enumerate(json.loads(keys))
+                    ]
+                    if stale_rows:
+                        self.session.execute(stale_row, stale_rows)
+                    self.session.execute(delete(signature_table).where(signature_table.c.product_id.in_(batch)))
+
+            # executemany no tiene el límite de parámetros de un multi-VALUES
+            size = self.backend.batch_size(params_per_row=3, max_rows=10000)
+            signatures, rows = iter(signatures), iter(rows)
+            while batch := list(islice(signatures, size)):
+                self.session.execute(insert(signature_table), [
+                    {"product_id": product_id, "buckets": json.dumps(keys)} for product_id, keys in batch
+                ])
+            while batch := list(islice(rows, size)):
+                self.session.execute(insert(buckets), [
+                    {"band": band, "bucket": bucket, "product_id": product_id} for band, bucket, product_id in batch
+                ])
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error replacing LSH buckets: {str(e)}")
+            raise
+
+    def bucket_members(self, keys: Sequence[Tuple[int, int]]) -> List[Tuple[int, int, int]]:
+        """Productos de las cubetas (band, bucket) dadas; una búsqueda por clave primaria cada una"""
+        table = ProductLshBucketModel.__table__
+        by_band: Dict[int, List[int]] = {}
+        for band, bucket in keys:
+            by_band.setdefault(band, []).append(bucket)
+        try:
+            members = []
+            with self._reading() as session:
+                for band, buckets in by_band.items():
+                    for batch in self.backend.batched(sorted(set(buckets)), 1):
+                        members.extend(session.connection().execute(
+                            select(table.c.band, table.c.bucket, table.c.product_id)
+                            .where(table.c.band == band, table.c.bucket.in_(batch))
+                        ).all())
+            return [tuple(member) for member in members]
+        except Exception as e:
+            self.logger.error(f"Error getting LSH bucket members: {str(e)}")
+            return []
+
+    def record_scan(self, pairs: Sequence[Tuple[int, int, float]], full: bool, last_seq: int,
+                    products: int, seconds: float) -> Dict[str, Any]:
+        """
+        Guarda los pares nuevos y la búsqueda en una transacción: el cursor solo avanza
+        con sus pares. Los pares ya detectados (pendientes o resueltos) se conservan.
+        """
+        table = DuplicateCandidateModel.__table__
+        try:
+            inserted = 0
+            for batch in self.backend.batched(pairs, params_per_row=3):
+                stmt = self.backend.insert(table).values([
+                    {"product_id": min(first, second), "duplicate_id": max(first, second), "score": score,
+                     "status": DuplicateStatus.PENDING.value}
+                    for first, second, score in batch
+                ])
+                result = self.session.execute(
+                    stmt.on_conflict_do_nothing(index_elements=[table.c.product_id, table.c.duplicate_id])
+                    .returning(table.c.id)
+                )
+                inserted += len(result.all())
+            scan = {
+                "scanned_at": datetime.now(), "full": full, "last_seq": last_seq,
+                "products": products, "candidates": inserted, "seconds": round(seconds, 3),
+            }
+            self.session.execute(insert(DuplicateScanModel).values(**scan))
+            self.session.commit()
+            return scan
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error recording duplicate scan: {str(e)}")
+            raise
+
+    def get_last_scan(self) -> Optional[Dict[str, Any]]:
+        try:
+            with self._reading() as session:
+                db_scan = session.execute(
+                    select(DuplicateScanModel).order_by(DuplicateScanModel.id.desc()).limit(1)
+                ).scalar()
+                if db_scan is None:
+                    return None
+                return {
+                    "scanned_at": db_scan.scanned_at, "full": db_scan.full, "last_seq": db_scan.last_seq,
+                    "products": db_scan.products, "candidates": db_scan.candidates, "seconds": db_scan.seconds,
+                }
+        except Exception as e:
+            self.logger.error(f"Error getting last duplicate scan: {str(e)}")
+            return None
+
+    def _to_entity(self, db_candidate: DuplicateCandidateModel) -> DuplicateCandidate:
+        """Convierte modelo de base de datos a entidad"""
+        return DuplicateCandidate(
+            id=db_candidate.id,
+            product_id=db_candidate.product_id,
+            duplicate_id=db_candidate.duplicate_id,
+            score=db_candidate.score,
+            status=DuplicateStatus(db_candidate.status),
+            detected_at=db_candidate.detected_at,
+            resolved_at=db_candidate.resolved_at,
+            resolved_by=db_candidate.resolved_by,
+        )
@@ -0,0 +1,375 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.database.models import (
+    AppliedStockOperationModel, LocationModel, LocationStockModel, ProductModel, StockMovementModel
+)
+from src.entities.location import Location
+from src.entities.product_change import ChangeOperation
+from src.entities.product import Product, ProductCategory
+from .base_repository import BaseRepository
+
+
+# Lecturas por sucursal: parten de location_stock filtrando por location_id, de modo que
+# recorren solo el rango de la clave (location_id, product_id) de esa sucursal
+# Columnas (no entidades ORM): sin mapa de identidad por fila en sucursales grandes
+_LOCATION_PRODUCT_COLUMNS = (
+    ProductModel.id, ProductModel.code, ProductModel.name, ProductModel.description,
+    ProductModel.cost, ProductModel.category, ProductModel.supplier, ProductModel.is_active,
+    ProductModel.created_at, ProductModel.updated_at,
+    LocationStockModel.quantity,
+    func.coalesce(LocationStockModel.price, ProductModel.price).label("effective_price"),
+)
+_LOCATION_PRODUCTS_STMT = (
+    select(*_LOCATION_PRODUCT_COLUMNS)
+    .join(ProductModel, ProductModel.id == LocationStockModel.product_id)
+    .where(LocationStockModel.location_id == bindparam("location_id"), ProductModel.is_active == True)
+    .order_by(ProductModel.category, ProductModel.name)
+)
+_LOCATION_PRODUCT_BY_CODE_STMT = (
+    select(*_LOCATION_PRODUCT_COLUMNS)
+    .join(LocationStockModel, LocationStockModel.product_id == ProductModel.id)
+    .where(
+        LocationStockModel.location_id == bindparam("location_id"),
+        ProductModel.code == bindparam("code"),
+        ProductModel.is_active == True,
+    )
+)
+_STOCK_STMT = select(LocationStockModel.quantity).where(
+    LocationStockModel.location_id == bindparam("location_id"),
+    LocationStockModel.product_id == bindparam("product_id"),
+)
+
+
+class LocationRepository(BaseRepository[Location]):
+    """
+    Sucursales y su inventario. products.stock es el total de la empresa; cada
+    ajuste de una sucursal mueve ese total en el mismo delta, y las transferencias
+    entre sucursales no lo cambian.
+    """
+
+    def __init__(self, session: Session, read_session: Optional[Session] = None,
+                 actor: Optional[str] = None):
+        super().__init__(session, read_session, actor)
+
+    def get_by_id(self, location_id: int) -> Optional[Location]:
+        try:
+            with self._reading() as session:
+                db_location = session.get(LocationModel, location_id)
+                return self._to_entity(db_location) if db_location else None
+        except Exception as e:
+            self.logger.error(f"Error getting location by id {location_id}: {str(e)}")
+            return None
+
+    def get_by_code(self, code: str) -> Optional[Location]:
+        try:
+            with self._reading() as session:
+                db_location = session.execute(
+                    select(LocationModel).where(LocationModel.code == code)
+                ).scalar_one_or_none()
+                return self._to_entity(db_location) if db_location else None
+        except Exception as e:
+            self.logger.error(f"Error getting location by code {code}: {str(e)}")
+            return None
+
+    def get_all(self) -> List[Location]:
+        try:
+            with self._reading() as session:
+                db_locations = session.execute(
+                    select(LocationModel)
+                    .where(LocationModel.is_active == True)
+                    .order_by(LocationModel.name)
+                ).scalars().all()
+                return [self._to_entity(db_location) for db_location in db_locations]
+        except Exception as e:
+            self.logger.error(f"Error getting all locations: {str(e)}")
+            return []
+
+    def create(self, entity: Location) -> Location:
+        try:
+            db_row = self.session.execute(
+                insert(LocationModel)
+                .values(code=entity.code, name=entity.name, is_active=entity.is_active)
+                .returning(LocationModel.id, LocationModel.created_at)
+            ).one()
+            self.session.commit()
+
+            entity.id = db_row.id
+            entity.created_at = db_row.created_at
+            self.logger.info(f"Location created: {entity.name} (ID: {entity.id})")
+            return entity
+
+        except IntegrityError as e:
+            self.session.rollback()
+            self.logger.error(f"Error creating location: {str(e)}")
+            raise ValueError(f"Ya existe una sucursal con el código: {entity.code}")
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error creating location: {str(e)}")
+            raise
+
+    def update(self, entity: Location) -> Location:
+        try:
+            self.session.execute(
+                update(LocationModel)
+                .where(LocationModel.id == entity.id)
+                .values(name=entity.name, is_active=entity.is_active)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+            self.logger.info(f"Location updated: {entity.name} (ID: {entity.id})")
+            return entity
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error updating location: {str(e)}")
+            raise
+
+    def delete(self, id: int) -> bool:
+        """Desactiva la sucursal; su stock se conserva"""
+        try:
+            result = self.session.execute(
+                update(LocationModel)
+                .where(LocationModel.id == id)
+                .values(is_active=False)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error deactivating location {id}: {str(e)}")
+            return False
+
+    def get_products(self, location_id: int) -> List[Product]:
+        """Productos activos de la sucursal con su stock y precio efectivo"""
+        try:
+            with self._reading() as session:
+                rows = session.execute(_LOCATION_PRODUCTS_STMT, {"location_id": location_id}).all()
+            return [self._to_product(row) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting products for location {location_id}: {str(e)}")
+            return []
+
+    def get_product_by_code(self, location_id: int, code: str) -> Optional[Product]:
+        try:
+            with self._reading() as session:
+                row = session.execute(
+                    _LOCATION_PRODUCT_BY_CODE_STMT, {"location_id": location_id, "code": code}
+                ).first()
+                return self._to_product(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting product {code} for location {location_id}: {str(e)}")
+            return None
+
+    def get_stock(self, location_id: int, product_id: int) -> int:
+        try:
+            with self._reading() as session:
+                quantity = session.execute(
+                    _STOCK_STMT, {"location_id": location_id, "product_id": product_id}
+                ).scalar()
+                return quantity or 0
+        except Exception as e:
+            self.logger.error(f"Error getting stock of product {product_id} at {location_id}: {str(e)}")
+            return 0
+
+    def get_stock_by_location(self, product_id: int) -> List[Dict[str, Any]]:
+        """Stock y precio de un producto en cada sucursal activa"""
+        try:
+            with self._reading() as session:
+                rows = session.execute(
+                    select(
+                        LocationModel.id.label("location_id"),
+                        LocationModel.code,
+                        LocationModel.name,
+                        LocationStockModel.quantity,
+                        LocationStockModel.price,
+                    )
+                    .join(LocationModel, LocationModel.id == LocationStockModel.location_id)
+                    .where(LocationStockModel.product_id == product_id, LocationModel.is_active == True)
+                    .order_by(LocationModel.name)
+                ).all()
+                return [dict(row._mapping) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting stock by location for product {product_id}: {str(e)}")
+            return []
+
+    def get_stock_snapshot(self) -> Dict[str, List[Any]]:
+        """Stock de todas las sucursales activas en forma columnar, para cálculos vectorizados"""
+        names = ["location_id", "product_id", "quantity"]
+        try:
+            stmt = (
+                select(LocationStockModel.location_id, LocationStockModel.product_id, LocationStockModel.quantity)
+                .join(LocationModel, LocationModel.id == LocationStockModel.location_id)
+                .where(LocationModel.is_active == True)
+            )
+            with self._reading() as session:
+                rows = session.connection().execute(stmt).all()
+            if not rows:
+                return {name: [] for name in names}
+            return {name: list(values) for name, values in zip(names, zip(*rows))}
+        except Exception as e:
+            self.logger.error(f"Error getting location stock snapshot: {str(e)}")
+            return {name: [] for name in names}
+
+    def set_stock(self, location_id: int, product_id: int, quantity: int,
+                  operation_id: Optional[str] = None) -> Optional[int]:
+        """
+        Fija el stock de la sucursal (conteo); retorna el delta aplicado. Con
+        operation_id (conteo de una caja) no hace nada y retorna None si ya se aplicó.
+        """
+        try:
+            if not self._claim_operation(operation_id):
+                self.session.rollback()
+                return None
+            # La cantidad actual se lee con la fila ya bloqueada (o creada en 0) por la propia
+            # escritura: un conteo simultáneo espera y el delta sobre el total no se pierde
+            table = LocationStockModel.__table__
+            stmt = self.backend.insert(table).values(location_id=location_id, product_id=product_id, quantity=0)
+            current = self.session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[table.c.location_id, table.c.product_id],
+                    set_={"quantity": table.c.quantity},
+                ).returning(table.c.quantity)
+            ).scalar_one()
+            delta = quantity - current
+
+            self.session.execute(
+                update(table)
+                .where(table.c.location_id == location_id, table.c.product_id == product_id)
+                .values(quantity=quantity, updated_at=func.now())
+            )
+            if delta:
+                self._adjust_total_stock(product_id, delta)
+                self.session.execute(insert(StockMovementModel).values(
+                    product_id=product_id, quantity=delta, reason="ADJUSTMENT", location_id=location_id
+                ))
+            self.session.commit()
+            self.logger.info(f"Stock of product {product_id} at location {location_id} set to {quantity}")
+            return delta
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error setting stock of product {product_id} at {location_id}: {str(e)}")
+            raise
+
+    def set_price(self, location_id: int, product_id: int, price: Optional[float]) -> None:
+        """Precio propio de la sucursal; None vuelve al precio general"""
+        try:
+            table = LocationStockModel.__table__
+            stmt = self.backend.insert(table).values(
+                location_id=location_id, product_id=product_id, quantity=0, price=price
+            )
+            self.session.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.location_id, table.c.product_id],
+                set_={"price": stmt.excluded.price, "updated_at": func.now()},
+            ))
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error setting price of product {product_id} at {location_id}: {str(e)}")
+            raise
+
+    def transfer_stock(self, from_location_id: int, to_location_id: int,
+                       product_id: int, quantity: int, operation_id: Optional[str] = None) -> bool:
+        """
+        Mueve stock entre sucursales en una transacción. El descuento en origen es
+        condicional (quantity >= cantidad), así dos transferencias simultáneas no
+        pueden dejar el origen en negativo. Con operation_id (transferencia de una
+        caja) retorna False sin mover nada si ya se aplicó.
+        """
+        try:
+            if not self._claim_operation(operation_id):
+                self.session.rollback()
+                return False
+            table = LocationStockModel.__table__
+            result = self.session.execute(
+                update(table)
+                .where(
+                    table.c.location_id == from_location_id,
+                    table.c.product_id == product_id,
+                    table.c.quantity >= quantity,
+                )
+                .values(quantity=table.c.quantity - quantity, updated_at=func.now())
+            )
+            if result.rowcount == 0:
+                raise ValueError("Stock insuficiente en la sucursal de origen")
+
+            stmt = self.backend.insert(table).values(
+                location_id=to_location_id, product_id=product_id, quantity=quantity
+            )
+            self.session.execute(stmt.on_conflict_do_update(
+                index_elements=[table.c.location_id, table.c.product_id],
+                set_={"quantity": table.c.quantity + stmt.excluded.quantity, "updated_at": func.now()},
+            ))
+            self.session.execute(insert(StockMovementModel), [
+                {"product_id": product_id, "quantity": -quantity, "reason": "TRANSFER_OUT",
+                 "location_id": from_location_id},
+                {"product_id": product_id, "quantity": quantity, "reason": "TRANSFER_IN",
+                 "location_id": to_location_id},
+            ])
+            # El total no cambia, pero sí el stock por sucursal (reposición)
+            self._record_product_changes(ChangeOperation.STOCK, [(product_id, {
+                "stock_delta": 0, "transferred": quantity,
+                "from_location_id": from_location_id, "to_location_id": to_location_id,
+            })])
+            self.session.commit()
+            self.logger.info(
+                f"Transferred {quantity} of product {product_id} from {from_location_id} to {to_location_id}"
+            )
+            return True
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error transferring product {product_id}: {str(e)}")
+            raise
+
+    def _claim_operation(self, operation_id: Optional[str]) -> bool:
+        """
+        Registra operation_id como aplicado en la transacción en curso; False si ya
+        lo estaba (como create_many con el número de factura)
+        """
+        if operation_id is None:
+            return True
+        table = AppliedStockOperationModel.__table__
+        return self.session.execute(
+            self.backend.insert(table).values(operation_id=operation_id)
+            .on_conflict_do_nothing(index_elements=[table.c.operation_id])
+            .returning(table.c.operation_id)
+        ).first() is not None
+
+    def _adjust_total_stock(self, product_id: int, delta: int) -> None:
+        products = ProductModel.__table__
+        self.session.execute(
+            update(products)
+            .where(products.c.id == product_id)
+            .values(stock=products.c.stock + delta)
+        )
+        self._record_product_changes(ChangeOperation.STOCK, [(product_id, {"stock_delta": delta})])
+
+    def _to_entity(self, db_location: LocationModel) -> Location:
+        """Convierte modelo de base de datos a entidad"""
+        return Location(
+            id=db_location.id,
+            code=db_location.code,
+            name=db_location.name,
+            is_active=db_location.is_active,
+            created_at=db_location.created_at,
+        )
+
+    def _to_product(self, row) -> Product:
+        """Producto con el stock y el precio de la sucursal"""
+        return Product(
+            id=row.id,
+            code=row.code,
+            name=row.name,
+            description=row.description,
+            price=row.effective_price,
+            cost=row.cost,
+            category=ProductCategory(row.category),
+            supplier=row.supplier,
+            is_active=row.is_active,
+            stock=row.quantity or 0,
+            created_at=row.created_at,
+            updated_at=row.updated_at
+        )
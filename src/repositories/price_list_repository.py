@@ -0,0 +1,268 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.database.models import PriceListItemModel, PriceListModel, ProductModel
+from src.entities.price_list import PriceList, PriceListItem
+from .base_repository import BaseRepository
+
+
+# Columnas que necesita el resolvedor de precios para elegir entre listas vigentes
+_CANDIDATE_COLUMNS = (
+    PriceListItemModel.product_id,
+    PriceListItemModel.price,
+    PriceListModel.location_id,
+    PriceListModel.customer_tier,
+    PriceListModel.priority,
+)
+
+
+def _effective_at(at):
+    return (
+        PriceListModel.is_active == True,
+        PriceListItemModel.starts_at <= at,
+        or_(PriceListItemModel.ends_at.is_(None), PriceListItemModel.ends_at > at),
+    )
+
+
+_PRODUCT_CANDIDATES_STMT = (
+    select(*_CANDIDATE_COLUMNS)
+    .join(PriceListModel, PriceListModel.id == PriceListItemModel.price_list_id)
+    .where(PriceListItemModel.product_id == bindparam("product_id"), *_effective_at(bindparam("at")))
+)
+_EFFECTIVE_CANDIDATES_STMT = (
+    select(*_CANDIDATE_COLUMNS)
+    .join(PriceListModel, PriceListModel.id == PriceListItemModel.price_list_id)
+    .where(*_effective_at(bindparam("at")))
+)
+
+
+class PriceListRepository(BaseRepository[PriceList]):
+    """Listas de precios con vigencia; lecturas pensadas para PriceResolver"""
+
+    def __init__(self, session: Session, read_session: Optional[Session] = None,
+                 actor: Optional[str] = None):
+        super().__init__(session, read_session, actor)
+
+    def get_by_id(self, price_list_id: int) -> Optional[PriceList]:
+        try:
+            with self._reading() as session:
+                db_list = session.get(PriceListModel, price_list_id)
+                return self._to_entity(db_list) if db_list else None
+        except Exception as e:
+            self.logger.error(f"Error getting price list by id {price_list_id}: {str(e)}")
+            return None
+
+    def get_all(self) -> List[PriceList]:
+        try:
+            with self._reading() as session:
+                db_lists = session.execute(
+                    select(PriceListModel)
+                    .where(PriceListModel.is_active == True)
+                    .order_by(PriceListModel.priority.desc(), PriceListModel.name)
+                ).scalars().all()
+                return [self._to_entity(db_list) for db_list in db_lists]
+        except Exception as e:
+            self.logger.error(f"Error getting all price lists: {str(e)}")
+            return []
+
+    def create(self, entity: PriceList) -> PriceList:
+        try:
+            db_row = self.session.execute(
+                insert(PriceListModel)
+                .values(
+                    name=entity.name,
+                    customer_tier=entity.customer_tier,
+                    location_id=entity.location_id,
+                    priority=entity.priority,
+                    is_active=entity.is_active,
+                )
+                .returning(PriceListModel.id, PriceListModel.created_at, PriceListModel.updated_at)
+            ).one()
+            self.session.commit()
+
+            entity.id = db_row.id
+            entity.created_at = db_row.created_at
+            entity.updated_at = db_row.updated_at
+            self.logger.info(f"Price list created: {entity.name} (ID: {entity.id})")
+            return entity
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error creating price list: {str(e)}")
+            raise
+
+    def update(self, entity: PriceList) -> PriceList:
+        try:
+            self.session.execute(
+                update(PriceListModel)
+                .where(PriceListModel.id == entity.id)
+                .values(
+                    name=entity.name,
+                    customer_tier=entity.customer_tier,
+                    location_id=entity.location_id,
+                    priority=entity.priority,
+                    is_active=entity.is_active,
+                    revision=PriceListModel.revision + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+            return entity
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error updating price list: {str(e)}")
+            raise
+
+    def delete(self, id: int) -> bool:
+        """Desactiva la lista; sus precios dejan de aplicarse"""
+        try:
+            result = self.session.execute(
+                update(PriceListModel)
+                .where(PriceListModel.id == id)
+                .values(is_active=False, revision=PriceListModel.revision + 1)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error deactivating price list {id}: {str(e)}")
+            return False
+
+    def add_items(self, items: List[PriceListItem]) -> int:
+        """Agrega precios en lote y marca las listas afectadas como modificadas"""
+        if not items:
+            return 0
+        try:
+            self.session.execute(insert(PriceListItemModel), [
+                {
+                    "price_list_id": item.price_list_id,
+                    "product_id": item.product_id,
+                    "price": item.price,
+                    "starts_at": item.starts_at,
+                    "ends_at": item.ends_at,
+                }
+                for item in items
+            ])
+            self._touch({item.price_list_id for item in items})
+            self.session.commit()
+            self.logger.info(f"Price list items added: {len(items)}")
+            return len(items)
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error adding price list items: {str(e)}")
+            raise
+
+    def remove_item(self, item_id: int) -> bool:
+        try:
+            price_list_id = self.session.execute(
+                select(PriceListItemModel.price_list_id).where(PriceListItemModel.id == item_id)
+            ).scalar()
+            if price_list_id is None:
+                return False
+            self.session.execute(
+                PriceListItemModel.__table__.delete().where(PriceListItemModel.id == item_id)
+            )
+            self._touch({price_list_id})
+            self.session.commit()
+            return True
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error removing price list item {item_id}: {str(e)}")
+            return False
+
+    def get_items(self, price_list_id: int) -> List[PriceListItem]:
+        try:
+            with self._reading() as session:
+                rows = session.execute(
+                    select(PriceListItemModel, ProductModel.code)
+                    .join(ProductModel, ProductModel.id == PriceListItemModel.product_id)
+                    .where(PriceListItemModel.price_list_id == price_list_id)
+                    .order_by(PriceListItemModel.starts_at.desc())
+                ).all()
+                return [self._to_item_entity(db_item, code) for db_item, code in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting items of price list {price_list_id}: {str(e)}")
+            return []
+
+    def get_product_candidates(self, product_id: int, at: datetime) -> List[Any]:
+        """Precios vigentes de un producto en un instante (índice product_id, starts_at)"""
+        try:
+            with self._reading() as session:
+                return session.execute(_PRODUCT_CANDIDATES_STMT, {"product_id": product_id, "at": at}).all()
+        except Exception as e:
+            self.logger.error(f"Error getting price candidates for product {product_id}: {str(e)}")
+            return []
+
+    def get_effective_candidates(self, at: datetime) -> List[Any]:
+        """Todos los precios vigentes en un instante, para precargar la caché"""
+        try:
+            with self._reading() as session:
+                return session.connection().execute(_EFFECTIVE_CANDIDATES_STMT, {"at": at}).all()
+        except Exception as e:
+            self.logger.error(f"Error getting effective price candidates: {str(e)}")
+            return []
+
+    def get_next_boundary(self, at: datetime) -> Optional[datetime]:
+        """Próximo instante posterior a `at` en que una ventana de precio abre o cierra"""
+        try:
+            with self._reading() as session:
+                next_start, next_end = session.execute(
+                    select(
+                        select(func.min(PriceListItemModel.starts_at))
+                        .where(PriceListItemModel.starts_at > at).scalar_subquery(),
+                        select(func.min(PriceListItemModel.ends_at))
+                        .where(PriceListItemModel.ends_at > at).scalar_subquery(),
+                    )
+                ).one()
+            boundaries = [boundary for boundary in (next_start, next_end) if boundary is not None]
+            return min(boundaries) if boundaries else None
+        except Exception as e:
+            self.logger.error(f"Error getting next price boundary: {str(e)}")
+            return None
+
+    def get_version(self) -> Tuple[int, int]:
+        """Cambia cada vez que se crea o modifica una lista o sus ítems"""
+        try:
+            with self._reading() as session:
+                count, revisions = session.execute(
+                    select(func.count(PriceListModel.id), func.coalesce(func.sum(PriceListModel.revision), 0))
+                ).one()
+                return count, revisions
+        except Exception as e:
+            self.logger.error(f"Error getting price list version: {str(e)}")
+            return 0, 0
+
+    def _touch(self, price_list_ids) -> None:
+        self.session.execute(
+            update(PriceListModel)
+            .where(PriceListModel.id.in_(list(price_list_ids)))
+            .values(revision=PriceListModel.revision + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _to_entity(self, db_list: PriceListModel) -> PriceList:
+        """Convierte modelo de base de datos a entidad"""
+        return PriceList(
+            id=db_list.id,
+            name=db_list.name,
+            customer_tier=db_list.customer_tier,
+            location_id=db_list.location_id,
+            priority=db_list.priority,
+            is_active=db_list.is_active,
+            created_at=db_list.created_at,
+            updated_at=db_list.updated_at,
+        )
+
+    def _to_item_entity(self, db_item: PriceListItemModel, product_code: str = "") -> PriceListItem:
+        return PriceListItem(
+            id=db_item.id,
+            price_list_id=db_item.price_list_id,
+            product_id=db_item.product_id,
+            product_code=product_code,
+            price=db_item.price,
+            starts_at=db_item.starts_at,
+            ends_at=db_item.ends_at,
+        )
@@ -1,22 +1,99 @@
-from typing import List, Optional
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from sqlalchemy import String, and_, bindparam, cast, delete, exists, func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from src.database.models import ProductModel
-from src.entities.product import Product, ProductCategory
+from src.database.database import Base
+from src.database.models import (
+    ArchivedProductModel, LocationStockModel, PriceChangeModel, ProductChangeModel, ProductModel, StockMovementModel
+)
+from src.entities.product import Product, ProductCategory, ProductConflictError
+from src.entities.product_change import ChangeOperation, ProductChange
+from src.entities.product_filter import ProductFilter
+from src.entities.repricing_rule import RepricingMode, RepricingRule
+from src.utils.metrics import counter
 from .base_repository import BaseRepository
 
+_PRODUCTS_WRITTEN = counter("pos_products_written_total", "Productos escritos por operación", ["operation"])
+_CREATED = _PRODUCTS_WRITTEN.labels("create")
+_UPDATED = _PRODUCTS_WRITTEN.labels("update")
+_UPSERT_INSERTED = _PRODUCTS_WRITTEN.labels("upsert_insert")
+_UPSERT_UPDATED = _PRODUCTS_WRITTEN.labels("upsert_update")
+_DEACTIVATED = _PRODUCTS_WRITTEN.labels("deactivate")
+_MERGED = _PRODUCTS_WRITTEN.labels("merge")
+_ARCHIVED = _PRODUCTS_WRITTEN.labels("archive")
+_REPOSITORY_ERRORS = counter("pos_product_repository_errors_total", "Errores en ProductRepository", ["operation"])
+_CONFLICTS = counter("pos_product_conflicts_total", "Escrituras rechazadas por versión desactualizada",
+                     ["operation"])
+_UPDATE_CONFLICTS = _CONFLICTS.labels("update")
+_REPRICE_CONFLICTS = _CONFLICTS.labels("reprice")
+
+
+# Lecturas calientes: sentencias construidas una sola vez con parámetros enlazados,
+# así SQLAlchemy reutiliza la versión compilada de su caché en cada llamada
+_BY_ID_STMT = select(ProductModel).where(ProductModel.id == bindparam("product_id"))
+_ACTIVE_BY_CODE_STMT = select(ProductModel).where(
+    ProductModel.code == bindparam("code"), ProductModel.is_active == True
+)
+_BY_CODE_STMT = select(ProductModel).where(ProductModel.code == bindparam("code"))
+_ID_BY_CODE_STMT = select(ProductModel.id).where(ProductModel.code == bindparam("code"))
+# Columnas que referencian a products.id (ventas, movimientos, historial de precios...):
+# un producto referenciado no se archiva, así las claves foráneas siguen siendo válidas
+_PRODUCT_REFERENCES = [
+    foreign_key.parent
+    for table in Base.metadata.sorted_tables
+    for foreign_key in table.foreign_keys
+    if foreign_key.column is ProductModel.__table__.c.id
+]
+_ARCHIVE_COLUMNS = [column.key for column in ArchivedProductModel.__table__.columns if column.key != "archived_at"]
+
+_CHANGES_SINCE_STMT = (
+    select(ProductChangeModel)
+    .where(ProductChangeModel.seq > bindparam("seq"))
+    .order_by(ProductChangeModel.seq)
+    .limit(bindparam("limit"))
+)
+_CHANGES_SINCE_OPERATIONS_STMT = (
+    select(ProductChangeModel)
+    .where(ProductChangeModel.seq > bindparam("seq"),
+           ProductChangeModel.operation.in_(bindparam("operations", expanding=True)))
+    .order_by(ProductChangeModel.seq)
+    .limit(bindparam("limit"))
+)
+
+
+class UpsertResult:
+    """Resultado de un upsert masivo: ids insertados y actualizados"""
+
+    def __init__(self):
+        self.inserted_ids: List[int] = []
+        self.updated_ids: List[int] = []
+
+    @property
+    def inserted_count(self) -> int:
+        return len(self.inserted_ids)
+
+    @property
+    def updated_count(self) -> int:
+        return len(self.updated_ids)
+
 
 class ProductRepository(BaseRepository[Product]):
-    def __init__(self, session: Session):
-        super().__init__(session)
+    def __init__(self, session: Session, read_session: Optional[Session] = None,
+                 actor: Optional[str] = None):
+        super().__init__(session, read_session, actor)
     
     def get_by_id(self, product_id: int) -> Optional[Product]:
         try:
-            db_product = self.session.query(ProductModel).filter(ProductModel.id == product_id).first()
-            if db_product:
-                return self._to_entity(db_product)
-            return None
+            with self._reading() as session:
+                db_product = session.execute(_BY_ID_STMT, {"product_id": product_id}).scalars().first()
+                if db_product:
+                    return self._to_entity(db_product)
+                return None
         except Exception as e:
             self.logger.error(f"Error getting product by id {product_id}: {str(e)}")
             return None
@@ -24,13 +101,11 @@ class ProductRepository(BaseRepository[Product]):
     def get_by_code(self, code: str) -> Optional[Product]:
         """Obtiene producto por código"""
         try:
-            db_product = self.session.query(ProductModel).filter(
-                ProductModel.code == code,
-                ProductModel.is_active == True
-            ).first()
-            if db_product:
-                return self._to_entity(db_product)
-            return None
+            with self._reading() as session:
+                db_product = session.execute(_ACTIVE_BY_CODE_STMT, {"code": code}).scalars().first()
+                if db_product:
+                    return self._to_entity(db_product)
+                return None
         except Exception as e:
             self.logger.error(f"Error getting product by code {code}: {str(e)}")
             return None
@@ -38,104 +113,789 @@ class ProductRepository(BaseRepository[Product]):
     def get_by_code_any_status(self, code: str) -> Optional[Product]:
         """Obtiene producto por código sin importar su estado"""
         try:
-            db_product = self.session.query(ProductModel).filter(
-                ProductModel.code == code
-            ).first()
-            if db_product:
-                return self._to_entity(db_product)
-            return None
+            with self._reading() as session:
+                db_product = session.execute(_BY_CODE_STMT, {"code": code}).scalars().first()
+                if db_product:
+                    return self._to_entity(db_product)
+                return None
         except Exception as e:
             self.logger.error(f"Error getting product by code {code}: {str(e)}")
             return None
+
+    def get_id_by_code(self, code: str) -> Optional[int]:
+        """Solo el id del producto (cualquier estado), sin hidratar la entidad"""
+        try:
+            with self._reading() as session:
+                return session.execute(_ID_BY_CODE_STMT, {"code": code}).scalar()
+        except Exception as e:
+            self.logger.error(f"Error getting product id by code {code}: {str(e)}")
+            return None
+    
+    def get_by_codes(self, codes: Iterable[str]) -> List[Product]:
+        """Productos (cualquier estado) para muchos códigos, en lotes"""
+        return self._get_many(ProductModel.code, list(set(codes)))
+
+    def get_by_ids(self, product_ids: Iterable[int]) -> List[Product]:
+        return self._get_many(ProductModel.id, list(set(product_ids)))
+
+    def _get_many(self, column, values: List[Any]) -> List[Product]:
+        try:
+            products = []
+            with self._reading() as session:
+                for batch in self.backend.batched(values, 1):
+                    db_products = session.execute(
+                        select(ProductModel).where(column.in_(batch))
+                    ).scalars().all()
+                    products.extend(self._to_entity(product) for product in db_products)
+            return products
+        except Exception as e:
+            self.logger.error(f"Error getting products by {column.key}: {str(e)}")
+            return []
     
     def get_all(self) -> List[Product]:
         try:
-            db_products = self.session.query(ProductModel).filter(ProductModel.is_active == True).all()
-            return [self._to_entity(product) for product in db_products]
+            with self._reading() as session:
+                db_products = session.execute(
+                    select(ProductModel)
+                    .where(ProductModel.is_active == True)
+                    .order_by(ProductModel.category, ProductModel.name)
+                ).scalars().all()
+                return [self._to_entity(product) for product in db_products]
         except Exception as e:
             self.logger.error(f"Error getting all products: {str(e)}")
             return []
 
     def get_all_any_status(self) -> List[Product]:
         try:
-            db_products = self.session.query(ProductModel).all()
-            return [self._to_entity(product) for product in db_products]
+            with self._reading() as session:
+                db_products = session.execute(select(ProductModel)).scalars().all()
+                return [self._to_entity(product) for product in db_products]
         except Exception as e:
             self.logger.error(f"Error getting all products: {str(e)}")
             return []
+
+    def search(self, search_term: str) -> List[Product]:
+        """Busca por nombre o código (sin importar estado) directamente en SQL"""
+        try:
+            pattern = f"%{search_term}%"
+            with self._reading() as session:
+                db_products = session.execute(
+                    select(ProductModel).where(
+                        or_(
+                            ProductModel.name.ilike(pattern),
+                            ProductModel.code.ilike(pattern)
+                        )
+                    )
+                ).scalars().all()
+                return [self._to_entity(product) for product in db_products]
+        except Exception as e:
+            self.logger.error(f"Error searching products '{search_term}': {str(e)}")
+            return []
     
+    def filter(self, product_filter: ProductFilter, limit: int = 500) -> List[Product]:
+        """
+        Productos que cumplen todos los filtros, ordenados por categoría y nombre.
+        Cada filtro tiene su índice: categoría (parcial de activos, en el orden de la
+        lista), proveedor (lower), precio e inactivos (parcial); el texto libre se
+        aplica sobre lo que dejan los demás.
+        """
+        conditions = []
+        if product_filter.is_active is not None:
+            conditions.append(ProductModel.is_active == product_filter.is_active)
+        if product_filter.categories:
+            conditions.append(ProductModel.category.in_([category.value for category in product_filter.categories]))
+        if product_filter.suppliers:
+            conditions.append(
+                func.lower(ProductModel.supplier).in_([supplier.lower() for supplier in product_filter.suppliers])
+            )
+        if product_filter.min_price is not None:
+            conditions.append(ProductModel.price >= product_filter.min_price)
+        if product_filter.max_price is not None:
+            conditions.append(ProductModel.price <= product_filter.max_price)
+        if product_filter.search:
+            pattern = f"%{product_filter.search}%"
+            conditions.append(or_(ProductModel.name.ilike(pattern), ProductModel.code.ilike(pattern)))
+        try:
+            with self._reading() as session:
+                db_products = session.execute(
+                    select(ProductModel)
+                    .where(*conditions)
+                    .order_by(ProductModel.category, ProductModel.name)
+                    .limit(limit)
+                ).scalars().all()
+                return [self._to_entity(product) for product in db_products]
+        except Exception as e:
+            self.logger.error(f"Error filtering products: {str(e)}")
+            return []
+
+    def facet_counts(self) -> Dict[str, Dict[Any, int]]:
+        """
+        Productos por categoría y por proveedor (activos) y por estado, en una sola
+        pasada agrupada; el llamador la guarda por versión (get_facet_version)
+        """
+        facets: Dict[str, Dict[Any, int]] = {"category": {}, "supplier": {}, "is_active": {True: 0, False: 0}}
+        try:
+            with self._reading() as session:
+                rows = session.connection().execute(
+                    select(ProductModel.is_active, ProductModel.category, ProductModel.supplier, func.count())
+                    .group_by(ProductModel.is_active, ProductModel.category, ProductModel.supplier)
+                ).all()
+            for is_active, category, supplier, count in rows:
+                facets["is_active"][bool(is_active)] += count
+                if not is_active:
+                    continue
+                facets["category"][category] = facets["category"].get(category, 0) + count
+                if supplier:
+                    facets["supplier"][supplier] = facets["supplier"].get(supplier, 0) + count
+            return facets
+        except Exception as e:
+            self.logger.error(f"Error getting facet counts: {str(e)}")
+            return facets
+
+    def get_facet_version(self) -> int:
+        """Último cambio que no es solo de stock: los conteos no dependen del stock"""
+        return self.get_latest_change_seq([
+            operation for operation in ChangeOperation if operation != ChangeOperation.STOCK
+        ])
+
     def create(self, entity: Product) -> Product:
+        """Inserta en una sola sentencia; la unicidad del código la garantiza el índice"""
         try:
-            if entity.code:
-                existing = self.get_by_code_any_status(entity.code)
-                if existing:
-                    raise ValueError(f"Ya existe un producto con el código: {entity.code}")
-            
-            db_product = self._to_model(entity)
-            self.session.add(db_product)
+            stmt = (
+                insert(ProductModel)
+                .values(**self._to_row(entity))
+                .returning(ProductModel.id, ProductModel.created_at, ProductModel.updated_at, ProductModel.version)
+            )
+            db_row = self.session.execute(stmt).one()
+            self._record_product_changes(ChangeOperation.CREATE, [(db_row.id, self._to_row(entity))])
             self.session.commit()
-            self.session.refresh(db_product)
             
-            entity.id = db_product.id
-            entity.created_at = db_product.created_at
-            entity.updated_at = db_product.updated_at
+            entity.id = db_row.id
+            entity.created_at = db_row.created_at
+            entity.updated_at = db_row.updated_at
+            entity.version = db_row.version
+            _CREATED.inc()
             self.logger.info(f"Product created: {entity.name} (ID: {entity.id})")
             return entity
             
+        except IntegrityError as e:
+            self.session.rollback()
+            self.logger.error(f"Error creating product: {str(e)}")
+            raise self._duplicate_code_error(entity, e)
         except Exception as e:
             self.session.rollback()
+            _REPOSITORY_ERRORS.labels("create").inc()
             self.logger.error(f"Error creating product: {str(e)}")
             raise
     
     def update(self, entity: Product) -> Product:
+        """
+        Compare-and-swap: solo escribe si la versión en la base sigue siendo entity.version
+        (sin versión escribe incondicionalmente). Si otro usuario guardó antes, lanza
+        ProductConflictError con el producto vigente; no se bloquea la fila mientras se edita.
+        Si el producto no existe lanza ValueError.
+        """
         try:
-            db_product = self.session.query(ProductModel).filter(ProductModel.id == entity.id).first()
-            if db_product:
-                if entity.code and entity.code != db_product.code:
-                    existing = self.get_by_code_any_status(entity.code)
-                    if existing and existing.id != entity.id:
-                        raise ValueError(f"Ya existe un producto con el código: {entity.code}")
-                
-                db_product.code = entity.code
-                db_product.name = entity.name
-                db_product.description = entity.description
-                db_product.price = entity.price
-                db_product.cost = entity.cost
-                db_product.category = entity.category.value
-                db_product.is_active = entity.is_active
-                
-                self.session.commit()
-                self.session.refresh(db_product)
-                entity.updated_at = db_product.updated_at
-                self.logger.info(f"Product updated: {entity.name} (ID: {entity.id})")
-            
+            conditions = [ProductModel.id == entity.id]
+            if entity.version is not None:
+                conditions.append(ProductModel.version == entity.version)
+            stmt = (
+                update(ProductModel)
+                .where(*conditions)
+                .values(**self._to_row(entity), version=ProductModel.version + 1)
+                .returning(ProductModel.updated_at, ProductModel.version)
+                .execution_options(synchronize_session=False)
+            )
+            db_row = self.session.execute(stmt).first()
+            if db_row is None:
+                current = None
+                if entity.version is not None:
+                    current = self.session.execute(_BY_ID_STMT, {"product_id": entity.id}).scalars().first()
+                self.session.rollback()
+                if current is not None:
+                    _UPDATE_CONFLICTS.inc()
+                    raise ProductConflictError(entity, self._to_entity(current))
+                raise ValueError(f"No existe el producto con ID: {entity.id}")
+
+            self._record_product_changes(ChangeOperation.UPDATE, [(entity.id, self._to_row(entity))])
+            self.session.commit()
+            entity.updated_at = db_row.updated_at
+            entity.version = db_row.version
+            _UPDATED.inc()
+            self.logger.info(f"Product updated: {entity.name} (ID: {entity.id}, version {entity.version})")
             return entity
             
+        except ProductConflictError as e:
+            self.logger.warning(f"Product update conflict: {str(e)}")
+            raise
+        except IntegrityError as e:
+            self.session.rollback()
+            self.logger.error(f"Error updating product: {str(e)}")
+            raise self._duplicate_code_error(entity, e)
         except Exception as e:
             self.session.rollback()
+            _REPOSITORY_ERRORS.labels("update").inc()
             self.logger.error(f"Error updating product: {str(e)}")
             raise
+
+    def upsert_many(self, products: List[Product],
+                    update_fields: Optional[Iterable[str]] = None) -> UpsertResult:
+        """
+        Inserta o actualiza por código con INSERT ... ON CONFLICT(code) DO UPDATE ... RETURNING.
+        update_fields limita las columnas que se sobrescriben en productos existentes;
+        los productos nuevos siempre se insertan completos. Todo ocurre en una transacción.
+        """
+        result = UpsertResult()
+        rows = []
+        seen_codes = set()
+        for entity in products:
+            if entity.code in seen_codes:
+                continue
+            seen_codes.add(entity.code)
+            rows.append(self._to_row(entity))
+        if not rows:
+            return result
+
+        fields = list(update_fields) if update_fields is not None else list(rows[0].keys())
+        table = ProductModel.__table__
+        # Una sola sentencia con parámetros por fila (executemany / insertmanyvalues):
+        # se compila una vez, no un VALUES distinto por lote
+        stmt = self.backend.insert(table)
+        set_ = {field: stmt.excluded[field] for field in fields if field != "code"}
+        set_["updated_at"] = func.now()
+        set_["version"] = table.c.version + 1
+        # La versión devuelta distingue el caso: 1 es fila nueva; el DO UPDATE la incrementa
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.code], set_=set_
+        ).returning(table.c.id, table.c.code, table.c.version)
+        try:
+            for batch in self.backend.batched(rows, len(rows[0])):
+                rows_by_code = {row["code"]: row for row in batch}
+                changes = {ChangeOperation.CREATE: [], ChangeOperation.UPDATE: []}
+                for product_id, code, version in self.session.execute(stmt, batch):
+                    if version > 1:
+                        result.updated_ids.append(product_id)
+                        changed = {field: rows_by_code[code][field] for field in fields}
+                        changes[ChangeOperation.UPDATE].append((product_id, changed))
+                    else:
+                        result.inserted_ids.append(product_id)
+                        changes[ChangeOperation.CREATE].append((product_id, rows_by_code[code]))
+                for operation, operation_changes in changes.items():
+                    self._record_product_changes(operation, operation_changes)
+
+            self.session.commit()
+            _UPSERT_INSERTED.inc(result.inserted_count)
+            _UPSERT_UPDATED.inc(result.updated_count)
+            self.logger.info(
+                f"Products upserted: {result.inserted_count} inserted, {result.updated_count} updated"
+            )
+            return result
+        except Exception as e:
+            self.session.rollback()
+            _REPOSITORY_ERRORS.labels("upsert_many").inc()
+            self.logger.error(f"Error upserting products: {str(e)}")
+            raise
+
+    def deactivate_by_codes(self, codes: Iterable[str]) -> Tuple[int, List[str]]:
+        """Desactiva en lote los productos activos con esos códigos; retorna (desactivados, no encontrados)"""
+        codes = list(dict.fromkeys(codes))
+        found_codes = set()
+        try:
+            for batch in self.backend.batched(codes, 1):
+                stmt = (
+                    update(ProductModel)
+                    .where(ProductModel.code.in_(batch), ProductModel.is_active == True)
+                    .values(is_active=False, version=ProductModel.version + 1)
+                    .returning(ProductModel.id, ProductModel.code)
+                    .execution_options(synchronize_session=False)
+                )
+                deactivated = self.session.execute(stmt).all()
+                found_codes.update(code for _, code in deactivated)
+                self._record_product_changes(
+                    ChangeOperation.DELETE,
+                    [(product_id, {"is_active": False}) for product_id, _ in deactivated]
+                )
+            self.session.commit()
+            _DEACTIVATED.inc(len(found_codes))
+            self.logger.info(f"Products deactivated by code: {len(found_codes)}")
+            return len(found_codes), [code for code in codes if code not in found_codes]
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error deactivating products by code: {str(e)}")
+            raise
+
+    def deactivate_missing(self, keep_codes: Iterable[str]) -> int:
+        """Desactiva los productos activos cuyo código no está en keep_codes (reconteo)"""
+        keep_codes = set(keep_codes)
+        try:
+            active = self.session.execute(
+                select(ProductModel.id, ProductModel.code).where(ProductModel.is_active == True)
+            ).all()
+            ids = [product_id for product_id, code in active if code not in keep_codes]
+            for batch in self.backend.batched(ids, 1):
+                self.session.execute(
+                    update(ProductModel)
+                    .where(ProductModel.id.in_(batch))
+                    .values(is_active=False, version=ProductModel.version + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                self._record_product_changes(
+                    ChangeOperation.DELETE, [(product_id, {"is_active": False}) for product_id in batch]
+                )
+            self.session.commit()
+            _DEACTIVATED.inc(len(ids))
+            self.logger.info(f"Products missing from recount deactivated: {len(ids)}")
+            return len(ids)
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error deactivating missing products: {str(e)}")
+            raise
     
     def delete(self, id: int) -> bool:
         try:
-            db_product = self.session.query(ProductModel).filter(ProductModel.id == id).first()
-            if db_product:
-                db_product.is_active = False
+            deleted = self.session.execute(
+                update(ProductModel)
+                .where(ProductModel.id == id)
+                .values(is_active=False, version=ProductModel.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+            if deleted.rowcount:
+                self._record_product_changes(ChangeOperation.DELETE, [(id, {"is_active": False})])
                 self.session.commit()
+                _DEACTIVATED.inc()
                 self.logger.info(f"Product deleted: {id}")
                 return True
+            # El UPDATE sin filas igual abrió la transacción de escritura
+            self.session.rollback()
             return False
         except Exception as e:
             self.session.rollback()
             self.logger.error(f"Error deleting product: {str(e)}")
             return False
     
+    def merge_into(self, duplicate_id: int, keep_id: int) -> int:
+        """
+        Fusiona un duplicado en el producto que se conserva, en una transacción: su
+        stock (total y por sucursal) pasa al conservado con movimientos MERGE_OUT /
+        MERGE_IN y el duplicado queda inactivo. Sus ventas quedan en su historial.
+        Retorna las unidades movidas.
+        """
+        if duplicate_id == keep_id:
+            raise ValueError("Un producto no puede fusionarse consigo mismo")
+        locations = LocationStockModel.__table__
+        try:
+            rows = self.session.execute(
+                select(ProductModel.id, ProductModel.stock, ProductModel.is_active)
+                .where(ProductModel.id.in_([duplicate_id, keep_id]))
+            ).all()
+            products = {row.id: row for row in rows}
+            if len(products) < 2 or not all(row.is_active for row in rows):
+                raise ValueError("Ambos productos deben existir y estar activos para fusionarlos")
+            units = products[duplicate_id].stock or 0
+
+            movements = []
+            located = 0
+            location_rows = self.session.execute(
+                select(locations.c.location_id, locations.c.quantity)
+                .where(locations.c.product_id == duplicate_id, locations.c.quantity != 0)
+            ).all()
+            for location_id, quantity in location_rows:
+                stmt = self.backend.insert(locations).values(
+                    location_id=location_id, product_id=keep_id, quantity=quantity
+                )
+                self.session.execute(stmt.on_conflict_do_update(
+                    index_elements=[locations.c.location_id, locations.c.product_id],
+                    set_={"quantity": locations.c.quantity + stmt.excluded.quantity, "updated_at": func.now()},
+                ))
+                movements.append((location_id, quantity))
+                located += quantity
+            if location_rows:
+                self.session.execute(
+                    update(locations)
+                    .where(locations.c.product_id == duplicate_id)
+                    .values(quantity=0, updated_at=func.now())
+                )
+            # Stock sin sucursal asignada (o de antes de las sucursales)
+            if units - located:
+                movements.append((None, units - located))
+            for location_id, quantity in movements:
+                self.session.execute(insert(StockMovementModel), [
+                    {"product_id": duplicate_id, "quantity": -quantity, "reason": "MERGE_OUT",
+                     "location_id": location_id},
+                    {"product_id": keep_id, "quantity": quantity, "reason": "MERGE_IN",
+                     "location_id": location_id},
+                ])
+
+            self.session.execute(
+                update(ProductModel)
+                .where(ProductModel.id == keep_id)
+                .values(stock=ProductModel.stock + units)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.execute(
+                update(ProductModel)
+                .where(ProductModel.id == duplicate_id)
+                .values(stock=0, is_active=False, version=ProductModel.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+            if movements:
+                self._record_product_changes(ChangeOperation.STOCK, [(keep_id, {"stock_delta": units})])
+            self._record_product_changes(ChangeOperation.DELETE,
+                                         [(duplicate_id, {"is_active": False, "merged_into": keep_id})])
+            self.session.commit()
+            _MERGED.inc()
+            self.logger.info(f"Product {duplicate_id} merged into {keep_id}: {units} units moved")
+            return units
+        except Exception as e:
+            self.session.rollback()
+            _REPOSITORY_ERRORS.labels("merge_into").inc()
+            self.logger.error(f"Error merging product {duplicate_id} into {keep_id}: {str(e)}")
+            raise
+
+    def archive_inactive(self, older_than: datetime, archive_session: Optional[Session] = None,
+                         batch_size: int = 1000) -> Tuple[int, int]:
+        """
+        Mueve a archived_products los productos inactivos sin cambios desde older_than.
+        Los que tienen historial (ventas, movimientos, precios...) se quedan en products.
+        archive_session escribe el archivo en otra base (p. ej. otro archivo SQLite);
+        sin ella se usa la tabla de esta base. Confirma cada lote por separado para no
+        retener el lock de escritura. Retorna (archivados, retenidos por historial).
+        Cada producto archivado queda en el registro de cambios como ARCHIVE.
+        """
+        archive_session = archive_session or self.session
+        old_inactive = [ProductModel.is_active == False, ProductModel.updated_at < older_than]
+        referenced = or_(*(
+            exists().where(column == ProductModel.id) for column in _PRODUCT_REFERENCES
+        ))
+        try:
+            with self._reading() as session:
+                candidate_ids = session.execute(
+                    select(ProductModel.id).where(*old_inactive, ~referenced)
+                ).scalars().all()
+                kept_count = session.execute(
+                    select(func.count()).select_from(ProductModel).where(*old_inactive, referenced)
+                ).scalar()
+
+            archived_count = 0
+            size = self.backend.batch_size(1, batch_size)
+            for start in range(0, len(candidate_ids), size):
+                batch = candidate_ids[start:start + size]
+                # Se revalida al borrar: un producto reactivado entretanto no se archiva
+                rows = self.session.execute(
+                    delete(ProductModel)
+                    .where(ProductModel.id.in_(batch), *old_inactive, ~referenced)
+                    .returning(*(getattr(ProductModel, key) for key in _ARCHIVE_COLUMNS))
+                    .execution_options(synchronize_session=False)
+                ).mappings().all()
+                if rows:
+                    # Borrar antes de insertar hace idempotente el reintento si el commit
+                    # de products falló después de confirmar el archivo en otra base
+                    archive_session.execute(
+                        delete(ArchivedProductModel).where(ArchivedProductModel.id.in_([row["id"] for row in rows]))
+                    )
+                    archive_session.execute(insert(ArchivedProductModel), [dict(row) for row in rows])
+                    if archive_session is not self.session:
+                        archive_session.commit()
+                    self._record_product_changes(
+                        ChangeOperation.ARCHIVE, [(row["id"], {"archived": True}) for row in rows]
+                    )
+                self.session.commit()
+                archived_count += len(rows)
+
+            _ARCHIVED.inc(archived_count)
+            self.logger.info(f"Products archived: {archived_count} ({kept_count} kept with history)")
+            return archived_count, kept_count
+        except Exception as e:
+            self.session.rollback()
+            if archive_session is not self.session:
+                archive_session.rollback()
+            _REPOSITORY_ERRORS.labels("archive_inactive").inc()
+            self.logger.error(f"Error archiving inactive products: {str(e)}")
+            raise
+
+    def time_catalog_scan(self) -> Tuple[int, float]:
+        """Filas y segundos de leer el catálogo completo, como el listado de productos"""
+        try:
+            with self._reading() as session:
+                started = time.perf_counter()
+                rows = session.connection().execute(select(ProductModel.__table__)).all()
+                return len(rows), time.perf_counter() - started
+        except Exception as e:
+            self.logger.error(f"Error timing catalog scan: {str(e)}")
+            return 0, 0.0
+
+    def preview_reprice(self, rules: List[RepricingRule]) -> List[Dict[str, Any]]:
+        """Calcula los cambios de precio de las reglas y revierte; coincide con apply_reprice"""
+        changes, _, _ = self._execute_reprice(rules, dry_run=True)
+        return changes
+
+    def apply_previewed_reprice(self, rules: List[RepricingRule],
+                                expected_versions: Dict[int, int]) -> Tuple[int, List[int]]:
+        """
+        Aplica las reglas solo a los productos de la vista previa que siguen en la versión
+        previsualizada (compare-and-swap por lotes). Retorna (precios cambiados, ids en conflicto).
+        """
+        _, changed_count, conflicts = self._execute_reprice(rules, dry_run=False,
+                                                            expected_versions=expected_versions)
+        return changed_count, conflicts
+
+    def apply_reprice(self, rules: List[RepricingRule]) -> int:
+        """Aplica las reglas en una transacción; retorna la cantidad de precios cambiados"""
+        _, changed_count, _ = self._execute_reprice(rules, dry_run=False)
+        return changed_count
+
+    def get_price_history(self, product_id: int) -> List[Dict[str, Any]]:
+        try:
+            with self._reading() as session:
+                rows = session.execute(
+                    select(PriceChangeModel)
+                    .where(PriceChangeModel.product_id == product_id)
+                    .order_by(PriceChangeModel.changed_at.desc(), PriceChangeModel.id.desc())
+                ).scalars().all()
+                return [
+                    {
+                        "old_price": row.old_price,
+                        "new_price": row.new_price,
+                        "reason": row.reason,
+                        "changed_at": row.changed_at,
+                    }
+                    for row in rows
+                ]
+        except Exception as e:
+            self.logger.error(f"Error getting price history for product {product_id}: {str(e)}")
+            return []
+
+    def changes_since(self, seq: int, limit: int = 1000,
+                      operations: Optional[Iterable[ChangeOperation]] = None) -> List[ProductChange]:
+        """
+        Cambios con número de secuencia mayor a seq, en orden. Los consumidores
+        (caché, búsqueda, exportaciones) guardan el último seq procesado y solo
+        leen lo nuevo en lugar de recorrer todo el catálogo. Con operations, solo
+        esas (p. ej. sin STOCK para quien no usa el stock).
+        """
+        try:
+            with self._reading() as session:
+                if operations is None:
+                    rows = session.execute(_CHANGES_SINCE_STMT, {"seq": seq, "limit": limit})
+                else:
+                    rows = session.execute(_CHANGES_SINCE_OPERATIONS_STMT, {
+                        "seq": seq, "limit": limit,
+                        "operations": [operation.value for operation in operations],
+                    })
+                return [self._to_change_entity(row) for row in rows.scalars().all()]
+        except Exception as e:
+            self.logger.error(f"Error getting product changes since {seq}: {str(e)}")
+            return []
+
+    def get_latest_change_seq(self, operations: Optional[Iterable[ChangeOperation]] = None) -> int:
+        """
+        Último número de secuencia; sirve como versión del catálogo. Con operations,
+        el último de esas operaciones (un máximo por operación, cada uno por índice).
+        """
+        try:
+            with self._reading() as session:
+                if operations is None:
+                    return session.execute(select(func.max(ProductChangeModel.seq))).scalar() or 0
+                row = session.execute(select(*(
+                    select(func.max(ProductChangeModel.seq))
+                    .where(ProductChangeModel.operation == operation.value)
+                    .scalar_subquery()
+                    for operation in operations
+                ))).one()
+                return max((seq for seq in row if seq is not None), default=0)
+        except Exception as e:
+            self.logger.error(f"Error getting latest change seq: {str(e)}")
+            return 0
+
+    def get_inventory_version(self) -> int:
+        """
+        Último cambio de cualquier tipo: ventas, anulaciones, ajustes, transferencias
+        y fusiones registran el suyo (STOCK), así que versiona también el stock
+        """
+        return self.get_latest_change_seq()
+
+    def iter_catalog(self, active_only: bool = True, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Recorre el catálogo fila a fila en lotes, sin cargarlo completo (exportaciones)"""
+        columns = [
+            ProductModel.code, ProductModel.name, ProductModel.description, ProductModel.price,
+            ProductModel.cost, ProductModel.category, ProductModel.supplier, ProductModel.stock,
+            ProductModel.is_active,
+        ]
+        stmt = select(*columns).order_by(ProductModel.code)
+        if active_only:
+            stmt = stmt.where(ProductModel.is_active == True)
+        with self._reading() as session:
+            result = session.connection().execution_options(yield_per=batch_size).execute(stmt)
+            for row in result.mappings():
+                yield dict(row)
+
+    def get_catalog_snapshot(self, active_only: bool = True) -> Dict[str, List[Any]]:
+        """Catálogo en forma columnar (una lista por columna) para cálculos vectorizados"""
+        columns = [
+            ProductModel.id, ProductModel.code, ProductModel.name, ProductModel.category,
+            ProductModel.supplier, ProductModel.price, ProductModel.cost, ProductModel.stock,
+        ]
+        names = [column.key for column in columns]
+        try:
+            stmt = select(*columns)
+            if active_only:
+                stmt = stmt.where(ProductModel.is_active == True)
+            with self._reading() as session:
+                # Ejecución Core: sin la capa ORM por fila, relevante con cientos de miles de filas
+                rows = session.connection().execute(stmt).all()
+            if not rows:
+                return {name: [] for name in names}
+            return {name: list(values) for name, values in zip(names, zip(*rows))}
+        except Exception as e:
+            self.logger.error(f"Error getting catalog snapshot: {str(e)}")
+            return {name: [] for name in names}
+
+    def _execute_reprice(self, rules: List[RepricingRule], dry_run: bool,
+                         expected_versions: Optional[Dict[int, int]] = None
+                         ) -> Tuple[List[Dict[str, Any]], int, List[int]]:
+        """
+        Cada regla es un INSERT ... SELECT al historial y un UPDATE por conjuntos;
+        las reglas se encadenan dentro de la misma transacción. Con expected_versions
+        solo se tocan esos productos, y de ellos los que siguen en esa versión.
+        """
+        changes = []
+        changed_count = 0
+        conflicts: List[int] = []
+        try:
+            scopes = [None]
+            if expected_versions is not None:
+                allowed, conflicts = self._check_versions(expected_versions)
+                scopes = [ProductModel.id.in_(batch) for batch in self.backend.batched(allowed, 1)]
+
+            for rule in rules:
+                new_price = self._reprice_expression(rule)
+                rule_condition = self._reprice_condition(rule, new_price)
+                reason = rule.describe()
+
+                for scope in scopes:
+                    condition = rule_condition if scope is None else and_(rule_condition, scope)
+                    changed_count += self._reprice_scope(
+                        condition, new_price, reason, changes if dry_run else None
+                    )
+
+            if conflicts:
+                _REPRICE_CONFLICTS.inc(len(conflicts))
+                self.logger.warning(f"Repricing skipped {len(conflicts)} products changed since the preview")
+            if dry_run:
+                self.session.rollback()
+            else:
+                self.session.commit()
+                self.logger.info(f"Repricing applied: {changed_count} prices changed")
+            return changes, changed_count, conflicts
+
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error repricing products: {str(e)}")
+            raise
+
+    def _check_versions(self, expected_versions: Dict[int, int]) -> Tuple[List[int], List[int]]:
+        """
+        Separa los productos que siguen en la versión esperada de los que cambiaron.
+        FOR UPDATE (PostgreSQL) los bloquea solo hasta el commit de esta misma transacción.
+        """
+        ids = list(expected_versions)
+        current: Dict[int, int] = {}
+        for batch in self.backend.batched(ids, 1):
+            current.update(self.session.execute(
+                select(ProductModel.id, ProductModel.version)
+                .where(ProductModel.id.in_(batch))
+                .with_for_update()
+            ).all())
+        allowed = [product_id for product_id in ids if current.get(product_id) == expected_versions[product_id]]
+        conflicts = [product_id for product_id in ids if current.get(product_id) != expected_versions[product_id]]
+        return allowed, conflicts
+
+    def _reprice_scope(self, condition, new_price, reason: str,
+                       changes: Optional[List[Dict[str, Any]]]) -> int:
+        """Historial y UPDATE de una regla sobre los productos de condition; con changes, los anota"""
+        if changes is not None:
+            rows = self.session.execute(
+                select(
+                    ProductModel.id, ProductModel.code, ProductModel.name,
+                    ProductModel.price, ProductModel.version, new_price.label("new_price")
+                ).where(condition)
+            ).all()
+            changes.extend(
+                {
+                    "product_id": row.id,
+                    "code": row.code,
+                    "name": row.name,
+                    "old_price": row.price,
+                    "new_price": row.new_price,
+                    "rule": reason,
+                    "version": row.version,
+                }
+                for row in rows
+            )
+
+        self.session.execute(
+            insert(PriceChangeModel).from_select(
+                ["product_id", "old_price", "new_price", "reason"],
+                select(ProductModel.id, ProductModel.price, new_price, literal(reason)).where(condition),
+            )
+        )
+        self.session.execute(
+            insert(ProductChangeModel).from_select(
+                ["product_id", "operation", "changed_by", "data"],
+                select(
+                    ProductModel.id,
+                    literal(ChangeOperation.REPRICE.value),
+                    literal(self.actor),
+                    literal('{"price": ') + cast(new_price, String) + literal('}'),
+                ).where(condition),
+            )
+        )
+        result = self.session.execute(
+            update(ProductModel)
+            .where(condition)
+            .values(price=new_price, version=ProductModel.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+
+    def _reprice_expression(self, rule: RepricingRule):
+        if rule.mode == RepricingMode.MARKUP_OVER_COST:
+            new_price = ProductModel.cost * rule.value
+        else:
+            new_price = ProductModel.price * (1 + rule.value / 100.0)
+        if rule.round_to:
+            new_price = func.round(new_price / rule.round_to) * rule.round_to
+        return new_price
+
+    def _reprice_condition(self, rule: RepricingRule, new_price):
+        conditions = [ProductModel.is_active == True, ProductModel.price != new_price]
+        if rule.category:
+            conditions.append(ProductModel.category == rule.category.value)
+        if rule.supplier:
+            conditions.append(func.lower(ProductModel.supplier) == rule.supplier.strip().lower())
+        return and_(*conditions)
+
     def update_stock(self, product_id: int, new_stock: int) -> bool:
-        """Actualiza el stock de un producto"""
+        """Actualiza el stock de un producto registrando el ajuste en el libro de movimientos"""
         try:
-            db_product = self.session.query(ProductModel).filter(ProductModel.id == product_id).first()
-            if db_product:
-                db_product.stock = new_stock
+            current = self.session.execute(
+                select(ProductModel.stock).where(ProductModel.id == product_id)
+            ).first()
+            if current:
+                delta = new_stock - (current.stock or 0)
+                self.session.execute(
+                    update(ProductModel)
+                    .where(ProductModel.id == product_id)
+                    .values(stock=new_stock)
+                    .execution_options(synchronize_session=False)
+                )
+                if delta:
+                    self.session.execute(
+                        insert(StockMovementModel).values(
+                            product_id=product_id, quantity=delta, reason="ADJUSTMENT"
+                        )
+                    )
+                    self._record_product_changes(ChangeOperation.STOCK, [(product_id, {"stock_delta": delta})])
                 self.session.commit()
                 self.logger.info(f"Stock updated for product {product_id}: {new_stock}")
                 return True
@@ -155,19 +915,38 @@ class ProductRepository(BaseRepository[Product]):
             price=db_product.price,
             cost=db_product.cost,
             category=ProductCategory(db_product.category),
+            supplier=db_product.supplier,
             is_active=db_product.is_active,
+            stock=db_product.stock or 0,
             created_at=db_product.created_at,
-            updated_at=db_product.updated_at
+            updated_at=db_product.updated_at,
+            version=db_product.version
         )
     
-    def _to_model(self, entity: Product) -> ProductModel:
-        """Convierte entidad a modelo de base de datos"""
-        return ProductModel(
-            code=entity.code,
-            name=entity.name,
-            description=entity.description,
-            price=entity.price,
-            cost=entity.cost,
-            category=entity.category.value,
-            is_active=entity.is_active
-        )
\ No newline at end of file
+    def _to_row(self, entity: Product) -> Dict[str, Any]:
+        """Convierte entidad a columnas de base de datos"""
+        return {
+            "code": entity.code,
+            "name": entity.name,
+            "description": entity.description,
+            "price": entity.price,
+            "cost": entity.cost,
+            "category": entity.category.value,
+            "supplier": entity.supplier,
+            "is_active": entity.is_active,
+        }
+
+    def _to_change_entity(self, db_change: ProductChangeModel) -> ProductChange:
+        return ProductChange(
+            seq=db_change.seq,
+            product_id=db_change.product_id,
+            operation=ChangeOperation(db_change.operation),
+            changed_by=db_change.changed_by,
+            data=json.loads(db_change.data) if db_change.data else {},
+            changed_at=db_change.changed_at
+        )
+
+    def _duplicate_code_error(self, entity: Product, error: IntegrityError) -> Exception:
+        if entity.code and "code" in str(error.orig):
+            return ValueError(f"Ya existe un producto con el código: {entity.code}")
+        return error
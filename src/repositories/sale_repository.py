@@ -0,0 +1,401 @@
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from src.database.models import (
+    InvoiceItemModel, InvoiceModel, LocationStockModel, ProductModel, SalesDailySummaryModel,
+    StockMovementModel
+)
+from src.entities.invoice import Invoice, InvoiceItem, InvoiceStatus
+from src.entities.product_change import ChangeOperation
+from .base_repository import BaseRepository
+
+# Movimientos que cuentan como demanda: la anulación devuelve las unidades de la venta
+_SALE_REASONS = ("SALE", "SALE_CANCELLED")
+
+
+class SaleRepository(BaseRepository[Invoice]):
+    """
+    Persistencia de ventas. Cada venta finalizada escribe factura, líneas,
+    movimientos de stock y el resumen diario en una sola transacción, de modo
+    que los reportes leen sales_daily_summary en lugar de todas las líneas.
+    """
+
+    def __init__(self, session: Session, read_session: Optional[Session] = None,
+                 actor: Optional[str] = None):
+        super().__init__(session, read_session, actor)
+
+    def get_by_id(self, invoice_id: int) -> Optional[Invoice]:
+        try:
+            with self._reading() as session:
+                return self._load(session, invoice_id)
+        except Exception as e:
+            self.logger.error(f"Error getting invoice by id {invoice_id}: {str(e)}")
+            return None
+
+    def get_all(self) -> List[Invoice]:
+        """Facturas sin sus líneas (encabezados)"""
+        try:
+            with self._reading() as session:
+                db_invoices = session.execute(
+                    select(InvoiceModel).order_by(InvoiceModel.created_at.desc())
+                ).scalars().all()
+                return [self._to_entity(db_invoice, []) for db_invoice in db_invoices]
+        except Exception as e:
+            self.logger.error(f"Error getting all invoices: {str(e)}")
+            return []
+
+    def create(self, entity: Invoice) -> Invoice:
+        """Registra una venta finalizada"""
+        created = self.create_many([entity])
+        if not created:
+            raise ValueError(f"La factura {entity.invoice_number} ya fue registrada")
+        return created[0]
+
+    def create_many(self, invoices: List[Invoice]) -> List[Invoice]:
+        """
+        Registra ventas finalizadas en lote, en una transacción. Las facturas cuyo
+        número ya existe se omiten (ON CONFLICT DO NOTHING), lo que hace idempotente
+        reenviar un lote. Retorna solo las facturas efectivamente creadas.
+        """
+        if not invoices:
+            return []
+        try:
+            by_number = {invoice.invoice_number: invoice for invoice in invoices}
+            header_rows = [
+                {
+                    "invoice_number": invoice.invoice_number,
+                    "customer_document": invoice.customer_document,
+                    "customer_name": invoice.customer_name,
+                    "subtotal": invoice.subtotal,
+                    "tax_amount": invoice.tax_amount,
+                    "total": invoice.total,
+                    "status": InvoiceStatus.COMPLETED.value,
+                    "created_at": invoice.created_at,
+                    "location_id": invoice.location_id,
+                }
+                for invoice in by_number.values()
+            ]
+
+            created = []
+            table = InvoiceModel.__table__
+            # Filas como parámetros (executemany): la sentencia se compila una vez y queda en caché
+            stmt = (
+                self.backend.insert(table)
+                .on_conflict_do_nothing(index_elements=[table.c.invoice_number])
+                .returning(table.c.id, table.c.invoice_number)
+            )
+            for invoice_id, invoice_number in self.session.execute(stmt, header_rows):
+                invoice = by_number[invoice_number]
+                invoice.id = invoice_id
+                invoice.status = InvoiceStatus.COMPLETED
+                created.append(invoice)
+
+            if created:
+                self.session.execute(insert(InvoiceItemModel), [
+                    {
+                        "invoice_id": invoice.id,
+                        "product_id": item.product_id,
+                        "product_name": item.product_name,
+                        "quantity": item.quantity,
+                        "unit_price": item.unit_price,
+                        "unit_cost": item.unit_cost,
+                        "tax_rate": item.tax_rate,
+                        "subtotal": item.subtotal,
+                        "tax_amount": item.tax_amount,
+                        "total": item.total,
+                    }
+                    for invoice in created
+                    for item in invoice.items
+                ])
+                self._apply_stock_and_summary(created, sign=1)
+
+            self.session.commit()
+            self.logger.info(f"Sales finalized: {len(created)} of {len(invoices)}")
+            return created
+
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error finalizing sales: {str(e)}")
+            raise
+
+    def update(self, entity: Invoice) -> Invoice:
+        """Solo actualiza datos del cliente; las líneas de una venta finalizada no cambian"""
+        try:
+            self.session.execute(
+                update(InvoiceModel)
+                .where(InvoiceModel.id == entity.id)
+                .values(customer_document=entity.customer_document, customer_name=entity.customer_name)
+                .execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+            return entity
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error updating invoice: {str(e)}")
+            raise
+
+    def delete(self, id: int) -> bool:
+        """
+        Anula la venta: devuelve el stock y descuenta el resumen diario. El cambio de
+        estado es condicional (solo desde COMPLETED), así dos anulaciones simultáneas
+        no revierten dos veces; la que no cambia la fila retorna False.
+        """
+        try:
+            result = self.session.execute(
+                update(InvoiceModel)
+                .where(InvoiceModel.id == id, InvoiceModel.status == InvoiceStatus.COMPLETED.value)
+                .values(status=InvoiceStatus.CANCELLED.value)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                self.session.rollback()
+                return False
+
+            # Las líneas se leen en la misma transacción que ya anuló la factura
+            self._apply_stock_and_summary([self._load(self.session, id)], sign=-1)
+            self.session.commit()
+            self.logger.info(f"Sale cancelled: {id}")
+            return True
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error cancelling sale: {str(e)}")
+            return False
+
+    def sales_by_day(self, start: date, end: date) -> List[Dict[str, Any]]:
+        return self._summary_rows(
+            [SalesDailySummaryModel.day], start, end, order_by=[SalesDailySummaryModel.day]
+        )
+
+    def sales_by_category(self, start: date, end: date) -> List[Dict[str, Any]]:
+        return self._summary_rows(
+            [SalesDailySummaryModel.category], start, end,
+            order_by=[func.sum(SalesDailySummaryModel.revenue).desc()]
+        )
+
+    def sales_by_product(self, start: date, end: date, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Ventas por producto ordenadas por unidades (los primeros son los más vendidos)"""
+        return self._summary_rows(
+            [SalesDailySummaryModel.product_id, ProductModel.code, ProductModel.name],
+            start, end,
+            order_by=[func.sum(SalesDailySummaryModel.quantity).desc()],
+            join_products=True,
+            limit=limit
+        )
+
+    def slow_movers(self, start: date, end: date, limit: int = 20) -> List[Dict[str, Any]]:
+        """Productos activos con menos unidades vendidas en el período (incluye los que no vendieron)"""
+        try:
+            sold = (
+                select(
+                    SalesDailySummaryModel.product_id,
+                    func.sum(SalesDailySummaryModel.quantity).label("quantity"),
+                    func.sum(SalesDailySummaryModel.revenue).label("revenue"),
+                )
+                .where(SalesDailySummaryModel.day.between(start, end))
+                .group_by(SalesDailySummaryModel.product_id)
+                .subquery()
+            )
+            quantity = func.coalesce(sold.c.quantity, 0)
+            stmt = (
+                select(
+                    ProductModel.id.label("product_id"), ProductModel.code, ProductModel.name,
+                    ProductModel.category, ProductModel.stock,
+                    quantity.label("quantity"),
+                    func.coalesce(sold.c.revenue, 0.0).label("revenue"),
+                )
+                .outerjoin(sold, sold.c.product_id == ProductModel.id)
+                .where(ProductModel.is_active == True)
+                .order_by(quantity, ProductModel.stock.desc())
+                .limit(limit)
+            )
+            with self._reading() as session:
+                return [dict(row._mapping) for row in session.execute(stmt)]
+        except Exception as e:
+            self.logger.error(f"Error getting slow movers: {str(e)}")
+            return []
+
+    def demand_by_location(self, since: datetime) -> Dict[str, List[Any]]:
+        """
+        Unidades vendidas netas (ventas menos anulaciones) por sucursal y producto
+        desde since, en forma columnar; location_id None son ventas sin sucursal
+        """
+        names = ["location_id", "product_id", "quantity"]
+        try:
+            stmt = (
+                select(
+                    StockMovementModel.location_id,
+                    StockMovementModel.product_id,
+                    (-func.sum(StockMovementModel.quantity)).label("quantity"),
+                )
+                .where(
+                    StockMovementModel.created_at >= since,
+                    StockMovementModel.reason.in_(_SALE_REASONS),
+                )
+                .group_by(StockMovementModel.location_id, StockMovementModel.product_id)
+            )
+            with self._reading() as session:
+                rows = session.connection().execute(stmt).all()
+            if not rows:
+                return {name: [] for name in names}
+            return {name: list(values) for name, values in zip(names, zip(*rows))}
+        except Exception as e:
+            self.logger.error(f"Error getting demand by location: {str(e)}")
+            return {name: [] for name in names}
+
+    def _summary_rows(self, group_columns, start: date, end: date, order_by,
+                      join_products: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        try:
+            stmt = select(
+                *group_columns,
+                func.sum(SalesDailySummaryModel.quantity).label("quantity"),
+                func.sum(SalesDailySummaryModel.revenue).label("revenue"),
+                func.sum(SalesDailySummaryModel.cost).label("cost"),
+                func.sum(SalesDailySummaryModel.invoice_count).label("invoice_count"),
+            )
+            if join_products:
+                stmt = stmt.join(ProductModel, ProductModel.id == SalesDailySummaryModel.product_id)
+            stmt = (
+                stmt.where(SalesDailySummaryModel.day.between(start, end))
+                .group_by(*group_columns)
+                .order_by(*order_by)
+            )
+            if limit:
+                stmt = stmt.limit(limit)
+
+            with self._reading() as session:
+                return [dict(row._mapping) for row in session.execute(stmt)]
+        except Exception as e:
+            self.logger.error(f"Error getting sales summary: {str(e)}")
+            return []
+
+    def _apply_stock_and_summary(self, invoices: List[Invoice], sign: int) -> None:
+        """Movimientos de stock y acumulado diario de las ventas (sign=-1 revierte)"""
+        reason = "SALE" if sign > 0 else "SALE_CANCELLED"
+        # La anulación devuelve el stock ahora: con la fecha de la venta, el stock
+        # a una fecha anterior a la anulación ya la incluiría
+        cancelled_at = datetime.now() if sign < 0 else None
+        self.session.execute(insert(StockMovementModel), [
+            {
+                "product_id": item.product_id,
+                "quantity": -sign * item.quantity,
+                "reason": reason,
+                "invoice_id": invoice.id,
+                "location_id": invoice.location_id,
+                "created_at": cancelled_at or invoice.created_at,
+            }
+            for invoice in invoices
+            for item in invoice.items
+        ])
+
+        stock_deltas: Dict[int, int] = {}
+        location_deltas: Dict[tuple, int] = {}
+        per_day_product: Dict[tuple, Dict[str, Any]] = {}
+        for invoice in invoices:
+            day = invoice.created_at.date()
+            for item in invoice.items:
+                stock_deltas[item.product_id] = stock_deltas.get(item.product_id, 0) + sign * item.quantity
+                if invoice.location_id:
+                    key = (invoice.location_id, item.product_id)
+                    location_deltas[key] = location_deltas.get(key, 0) - sign * item.quantity
+                row = per_day_product.get((day, item.product_id))
+                if row is None:
+                    row = per_day_product[(day, item.product_id)] = {
+                        "day": day,
+                        "product_id": item.product_id,
+                        "category": item.category,
+                        "quantity": 0,
+                        "revenue": 0.0,
+                        "cost": 0.0,
+                        "invoice_count": 0,
+                        "_invoices": set(),
+                    }
+                row["quantity"] += sign * item.quantity
+                row["revenue"] += sign * item.subtotal
+                row["cost"] += sign * item.quantity * item.unit_cost
+                row["_invoices"].add(invoice.invoice_number)
+
+        products = ProductModel.__table__
+        self.session.execute(
+            update(products)
+            .where(products.c.id == bindparam("item_product_id"))
+            .values(stock=products.c.stock - bindparam("item_quantity")),
+            [
+                {"item_product_id": product_id, "item_quantity": quantity}
+                for product_id, quantity in stock_deltas.items()
+            ]
+        )
+        self._record_product_changes(ChangeOperation.STOCK, [
+            (product_id, {"stock_delta": -quantity}) for product_id, quantity in stock_deltas.items()
+        ])
+
+        if location_deltas:
+            self._apply_location_stock(location_deltas)
+
+        rows = []
+        for row in per_day_product.values():
+            row["invoice_count"] = sign * len(row.pop("_invoices"))
+            rows.append(row)
+
+        table = SalesDailySummaryModel.__table__
+        stmt = self.backend.insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.product_id],
+            set_={
+                "quantity": table.c.quantity + stmt.excluded.quantity,
+                "revenue": table.c.revenue + stmt.excluded.revenue,
+                "cost": table.c.cost + stmt.excluded.cost,
+                "invoice_count": table.c.invoice_count + stmt.excluded.invoice_count,
+            }
+        )
+        self.session.execute(stmt, rows)
+
+    def _apply_location_stock(self, deltas: Dict[tuple, int]) -> None:
+        """Stock de la sucursal de cada venta; crea la fila si el producto no tenía stock allí"""
+        table = LocationStockModel.__table__
+        rows = [
+            {"location_id": location_id, "product_id": product_id, "quantity": delta}
+            for (location_id, product_id), delta in deltas.items()
+        ]
+        stmt = self.backend.insert(table)
+        self.session.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.location_id, table.c.product_id],
+            set_={"quantity": table.c.quantity + stmt.excluded.quantity},
+        ), rows)
+
+    def _load(self, session: Session, invoice_id: int) -> Optional[Invoice]:
+        db_invoice = session.get(InvoiceModel, invoice_id)
+        if not db_invoice:
+            return None
+        db_items = session.execute(
+            select(InvoiceItemModel).where(InvoiceItemModel.invoice_id == invoice_id)
+        ).scalars().all()
+        return self._to_entity(db_invoice, db_items)
+
+    def _to_entity(self, db_invoice: InvoiceModel, db_items: List[InvoiceItemModel]) -> Invoice:
+        """Convierte modelo de base de datos a entidad"""
+        invoice = Invoice(
+            id=db_invoice.id,
+            customer_document=db_invoice.customer_document,
+            customer_name=db_invoice.customer_name,
+            invoice_number=db_invoice.invoice_number,
+            created_at=db_invoice.created_at,
+            status=InvoiceStatus(db_invoice.status),
+            location_id=db_invoice.location_id,
+        )
+        for db_item in db_items:
+            invoice.add_item(InvoiceItem(
+                product_id=db_item.product_id,
+                product_name=db_item.product_name,
+                quantity=db_item.quantity,
+                unit_price=db_item.unit_price,
+                tax_rate=db_item.tax_rate,
+                unit_cost=db_item.unit_cost,
+            ))
+        if not db_items:
+            invoice.subtotal = db_invoice.subtotal
+            invoice.tax_amount = db_invoice.tax_amount
+            invoice.total = db_invoice.total
+        return invoice
@@ -0,0 +1,172 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, literal_column, select
+from sqlalchemy.orm import Session
+
+from src.database.models import StockCheckpointItemModel, StockCheckpointModel, ProductModel, StockMovementModel
+from src.entities.stock_checkpoint import StockCheckpoint
+from .base_repository import BaseRepository
+
+
+class StockLedgerRepository(BaseRepository[StockCheckpoint]):
+    """
+    Fotos del stock y consultas a una fecha sobre el libro de movimientos.
+    Una foto guarda products.stock junto con el último movimiento que incluye;
+    el stock a una fecha parte de la foto anterior más cercana y suma solo los
+    movimientos posteriores a ella con fecha hasta la consultada. Se reproducen
+    por id y no por fecha: las ventas de una caja sin conexión llegan después
+    con su fecha original y así igual se cuentan.
+    """
+
+    def __init__(self, session: Session, read_session: Optional[Session] = None,
+                 actor: Optional[str] = None):
+        super().__init__(session, read_session, actor)
+
+    def get_by_id(self, checkpoint_id: int) -> Optional[StockCheckpoint]:
+        try:
+            with self._reading() as session:
+                db_checkpoint = session.get(StockCheckpointModel, checkpoint_id)
+                return self._to_entity(db_checkpoint) if db_checkpoint else None
+        except Exception as e:
+            self.logger.error(f"Error getting stock checkpoint {checkpoint_id}: {str(e)}")
+            return None
+
+    def get_all(self) -> List[StockCheckpoint]:
+        """Fotos de la más reciente a la más antigua"""
+        try:
+            with self._reading() as session:
+                db_checkpoints = session.execute(
+                    select(StockCheckpointModel).order_by(StockCheckpointModel.taken_at.desc())
+                ).scalars().all()
+                return [self._to_entity(db_checkpoint) for db_checkpoint in db_checkpoints]
+        except Exception as e:
+            self.logger.error(f"Error getting stock checkpoints: {str(e)}")
+            return []
+
+    def create(self, entity: StockCheckpoint) -> StockCheckpoint:
+        """
+        Toma la foto del stock actual. products.stock y el último movimiento se leen
+        en el mismo snapshot: cada venta actualiza ambos en una sola transacción.
+        """
+        try:
+            with self._reading() as session:
+                last_movement_id = session.execute(select(func.max(StockMovementModel.id))).scalar() or 0
+                rows = session.connection().execute(
+                    select(ProductModel.id, ProductModel.stock).where(ProductModel.stock != 0)
+                ).all()
+            # Después de leer: todo movimiento incluido tiene fecha anterior a la foto
+            taken_at = datetime.now()
+
+            checkpoint_id = self.session.execute(
+                insert(StockCheckpointModel)
+                .values(taken_at=taken_at, last_movement_id=last_movement_id,
+                        products=len(rows), units=sum(row.stock for row in rows))
+                .returning(StockCheckpointModel.id)
+            ).scalar_one()
+            for batch in self.backend.batched(rows, params_per_row=3):
+                self.session.execute(insert(StockCheckpointItemModel), [
+                    {"checkpoint_id": checkpoint_id, "product_id": row.id, "quantity": row.stock}
+                    for row in batch
+                ])
+            self.session.commit()
+
+            entity.id = checkpoint_id
+            entity.taken_at = taken_at
+            entity.last_movement_id = last_movement_id
+            entity.products = len(rows)
+            entity.units = sum(row.stock for row in rows)
+            self.logger.info(f"Stock checkpoint {checkpoint_id}: {len(rows)} products up to movement {last_movement_id}")
+            return entity
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error creating stock checkpoint: {str(e)}")
+            raise
+
+    def update(self, entity: StockCheckpoint) -> StockCheckpoint:
+        raise ValueError("Las fotos de stock no se modifican; tome una nueva")
+
+    def delete(self, id: int) -> bool:
+        return self.delete_many([id]) > 0
+
+    def delete_many(self, checkpoint_ids: Sequence[int]) -> int:
+        """Elimina fotos y sus filas; las consultas a esas fechas reproducen desde una anterior"""
+        if not checkpoint_ids:
+            return 0
+        try:
+            self.session.execute(
+                delete(StockCheckpointItemModel).where(StockCheckpointItemModel.checkpoint_id.in_(checkpoint_ids))
+            )
+            result = self.session.execute(
+                delete(StockCheckpointModel).where(StockCheckpointModel.id.in_(checkpoint_ids))
+            )
+            self.session.commit()
+            return result.rowcount
+        except Exception as e:
+            self.session.rollback()
+            self.logger.error(f"Error deleting stock checkpoints: {str(e)}")
+            raise
+
+    def get_last_movement_id(self) -> int:
+        try:
+            with self._reading() as session:
+                return session.execute(select(func.max(StockMovementModel.id))).scalar() or 0
+        except Exception as e:
+            self.logger.error(f"Error getting last stock movement: {str(e)}")
+            return 0
+
+    def stock_as_of(self, at: datetime, product_ids: Optional[Sequence[int]] = None
+                    ) -> Tuple[Dict[int, int], Optional[StockCheckpoint], int]:
+        """
+        Stock de cada producto (solo distintos de cero) al momento at, la foto usada
+        y los movimientos reproducidos. Sin foto anterior se reproduce el libro completo.
+        """
+        try:
+            with self._reading() as session:
+                db_checkpoint = session.execute(
+                    select(StockCheckpointModel)
+                    .where(StockCheckpointModel.taken_at <= at)
+                    .order_by(StockCheckpointModel.taken_at.desc())
+                    .limit(1)
+                ).scalar()
+                quantities: Dict[int, int] = {}
+                last_movement_id = 0
+                if db_checkpoint is not None:
+                    last_movement_id = db_checkpoint.last_movement_id
+                    items = select(StockCheckpointItemModel.product_id, StockCheckpointItemModel.quantity).where(
+                        StockCheckpointItemModel.checkpoint_id == db_checkpoint.id
+                    )
+                    if product_ids is not None:
+                        items = items.where(StockCheckpointItemModel.product_id.in_(product_ids))
+                    quantities.update(session.connection().execute(items).all())
+
+                # Agrupar por product_id + 0: con la columna sola SQLite prefiere recorrer todo
+                # el índice (product_id, created_at) para no ordenar, en vez del rango de id
+                product_key = StockMovementModel.product_id + literal_column("0")
+                replay = (
+                    select(product_key, func.sum(StockMovementModel.quantity), func.count())
+                    .where(StockMovementModel.id > last_movement_id, StockMovementModel.created_at <= at)
+                    .group_by(product_key)
+                )
+                if product_ids is not None:
+                    replay = replay.where(StockMovementModel.product_id.in_(product_ids))
+                replayed = 0
+                for product_id, delta, count in session.connection().execute(replay):
+                    quantities[product_id] = quantities.get(product_id, 0) + delta
+                    replayed += count
+                checkpoint = self._to_entity(db_checkpoint) if db_checkpoint is not None else None
+
+            return {product_id: quantity for product_id, quantity in quantities.items() if quantity}, checkpoint, replayed
+        except Exception as e:
+            self.logger.error(f"Error getting stock as of {at}: {str(e)}")
+            return {}, None, 0
+
+    def _to_entity(self, db_checkpoint: StockCheckpointModel) -> StockCheckpoint:
+        """Convierte modelo de base de datos a entidad"""
+        return StockCheckpoint(
+            id=db_checkpoint.id,
+            taken_at=db_checkpoint.taken_at,
+            last_movement_id=db_checkpoint.last_movement_id,
+            products=db_checkpoint.products,
+            units=db_checkpoint.units,
+        )
@@ -0,0 +1,51 @@
+from datetime import date
+from typing import Any, Dict, List
+
+from src.repositories.sale_repository import SaleRepository
+from src.utils.logger import Logger
+
+
+class AnalyticsService:
+    """
+    Reportes de ventas sobre el resumen diario pre-agregado - SRP
+    Agrega márgenes (ingreso - costo) a cada fila de los reportes.
+    """
+
+    def __init__(self, repository: SaleRepository):
+        self.repository = repository
+        self.logger = Logger(__name__).get_logger()
+
+    def sales_by_day(self, start: date, end: date) -> List[Dict[str, Any]]:
+        return self._with_margins(self.repository.sales_by_day(start, end))
+
+    def sales_by_category(self, start: date, end: date) -> List[Dict[str, Any]]:
+        return self._with_margins(self.repository.sales_by_category(start, end))
+
+    def sales_by_product(self, start: date, end: date) -> List[Dict[str, Any]]:
+        return self._with_margins(self.repository.sales_by_product(start, end))
+
+    def top_sellers(self, start: date, end: date, limit: int = 10) -> List[Dict[str, Any]]:
+        return self._with_margins(self.repository.sales_by_product(start, end, limit=limit))
+
+    def slow_movers(self, start: date, end: date, limit: int = 10) -> List[Dict[str, Any]]:
+        return self.repository.slow_movers(start, end, limit=limit)
+
+    def totals(self, start: date, end: date) -> Dict[str, float]:
+        """Totales del período a partir de las filas diarias"""
+        days = self.repository.sales_by_day(start, end)
+        revenue = sum(row["revenue"] for row in days)
+        cost = sum(row["cost"] for row in days)
+        return {
+            "quantity": sum(row["quantity"] for row in days),
+            "revenue": revenue,
+            "cost": cost,
+            "margin": revenue - cost,
+            "margin_pct": (revenue - cost) / revenue * 100 if revenue else 0.0,
+        }
+
+    def _with_margins(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for row in rows:
+            revenue = row.get("revenue") or 0.0
+            row["margin"] = revenue - (row.get("cost") or 0.0)
+            row["margin_pct"] = row["margin"] / revenue * 100 if revenue else 0.0
+        return rows
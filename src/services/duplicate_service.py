@@ -0,0 +1,417 @@
+"""
+Productos duplicados con nombres parecidos ("Filtro aceite X-200" y
+"FILTRO DE ACEITE X200" de proveedores distintos).
+
+Comparar todos los pares es imposible con cientos de miles de productos. Los
+nombres se normalizan (minúsculas, sin tildes ni conectores, palabras ordenadas)
+y se parten en trigramas de caracteres; una firma MinHash por producto se divide
+en bandas y cada banda cae en una cubeta (LSH). Solo los productos que comparten
+alguna cubeta se comparan, con la similitud de Jaccard de sus trigramas. Dos
+nombres con números de modelo distintos (X-200 y X-300) no son duplicados.
+Las cubetas enormes (familias como "Filtro aceite Bosch ...") no se comparan
+todos contra todos: en la búsqueda completa cada producto se compara con sus
+vecinos en el orden del nombre normalizado, que empieza por el número de modelo.
+
+Las cubetas quedan guardadas: la búsqueda incremental toma los cambios de
+catálogo desde la anterior (changes_since), recalcula solo esos productos y busca
+sus pares en las cubetas, sin recorrer el catálogo. Los cambios de precio o de
+stock no cambian nombres y no cuentan.
+
+Variables de entorno:
+    POS_DUPLICATE_THRESHOLD=0.6    similitud mínima para proponer un par
+    POS_DUPLICATE_MAX_BUCKET=50    en cubetas más grandes se compara solo con los más parecidos
+"""
+import os
+import re
+import time
+import unicodedata
+import zlib
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from src.entities.duplicate_candidate import DuplicateCandidate, DuplicateStatus
+from src.entities.product_change import ChangeOperation
+from src.repositories.duplicate_repository import DuplicateRepository
+from src.repositories.product_repository import ProductRepository
+from src.utils.logger import Logger
+from src.utils.metrics import counter, histogram
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_SCAN_SECONDS = histogram("pos_duplicate_scan_seconds", "Duración de las búsquedas de duplicados", ["mode"],
+                          buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 180.0, 600.0))
+_SCAN_FULL = _SCAN_SECONDS.labels("full")
+_SCAN_INCREMENTAL = _SCAN_SECONDS.labels("incremental")
+_CANDIDATES = counter("pos_duplicate_candidates_total", "Pares de duplicados por resultado", ["result"])
+_FOUND = _CANDIDATES.labels("found")
+_DISMISSED = _CANDIDATES.labels("dismissed")
+_MERGED = _CANDIDATES.labels("merged")
+
+# Conectores que no distinguen productos
+_STOPWORDS = frozenset({
+    "a", "al", "con", "de", "del", "el", "en", "la", "las", "los", "para", "por", "sin", "y",
+})
+# 16 bandas de 4 valores: pares con Jaccard 0,6 comparten alguna cubeta el 89% de las veces, con 0,8 el 99,9%
+_BANDS = 16
+_ROWS = 4
+# Semilla fija: las cubetas guardadas y las de la búsqueda incremental deben coincidir
+_SEED = 20240601
+# Productos por pasada vectorizada; acota la memoria en catálogos grandes
+_CHUNK = 50000
+# Vecinos por nombre con los que se compara cada producto de una cubeta enorme
+_WINDOW = 8
+# Pares por pasada al filtrar con las firmas
+_PAIR_CHUNK = 250000
+# Con 64 valores el Jaccard estimado tiene un desvío de ~0,06: se descarta lo que está 0,15 bajo el umbral
+_ESTIMATE_MARGIN = 0.15
+# Con más cambios que esta fracción del catálogo conviene la búsqueda completa
+_FULL_SCAN_RATIO = 0.2
+# Cambios que pueden cambiar nombres o sacar productos de las cubetas
+_NAME_OPERATIONS = (ChangeOperation.CREATE, ChangeOperation.UPDATE, ChangeOperation.DELETE)
+
+
+def normalize_name(name: str) -> str:
+    """Minúsculas sin tildes ni conectores, letras y números separados, palabras ordenadas sin repetir"""
+    text = unicodedata.normalize("NFKD", (name or "").lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    tokens = {token for token in re.findall(r"[a-z]+|[0-9]+", text) if token not in _STOPWORDS}
+    return " ".join(sorted(tokens))
+
+
+def _trigrams(normalized: str) -> Set[str]:
+    return {normalized[i:i + 3] for i in range(len(normalized) - 2)}
+
+
+def _numbers(normalized: str) -> Set[str]:
+    return {token for token in normalized.split() if token.isdigit()}
+
+
+class DuplicateService:
+    """Búsqueda de duplicados por MinHash/LSH, revisión y fusión - SRP"""
+
+    def __init__(self, duplicate_repository: DuplicateRepository, product_repository: ProductRepository,
+                 threshold: Optional[float] = None, max_bucket: Optional[int] = None):
+        self.duplicate_repository = duplicate_repository
+        self.product_repository = product_repository
+        self.threshold = threshold if threshold is not None else float(os.getenv("POS_DUPLICATE_THRESHOLD", "0.6"))
+        self.max_bucket = max_bucket or int(os.getenv("POS_DUPLICATE_MAX_BUCKET", "50"))
+        if not 0 < self.threshold <= 1:
+            raise ValueError("La similitud mínima debe estar entre 0 y 1")
+        if self.max_bucket < 2:
+            raise ValueError("El tamaño máximo de cubeta debe ser al menos 2")
+        self.logger = Logger(__name__).get_logger()
+
+    def get_last_scan(self) -> Optional[Dict[str, Any]]:
+        return self.duplicate_repository.get_last_scan()
+
+    def has_unscanned_changes(self) -> bool:
+        """Si hubo cambios de catálogo desde la última búsqueda (o nunca se buscó)"""
+        last_scan = self.get_last_scan()
+        return last_scan is None or (
+            self.product_repository.get_latest_change_seq(_NAME_OPERATIONS) > last_scan["last_seq"]
+        )
+
+    def scan(self, full: bool = False) -> Dict[str, Any]:
+        """Busca pares nuevos; incremental desde la búsqueda anterior salvo full o si nunca se buscó"""
+        last_scan = self.get_last_scan()
+        if full or last_scan is None:
+            return self._full_scan()
+        return self._incremental_scan(last_scan["last_seq"])
+
+    def get_pending(self, limit: int = 200) -> List[DuplicateCandidate]:
+        """Pares pendientes con sus productos, de mayor a menor similitud"""
+        candidates = self.duplicate_repository.get_pending(limit)
+        ids = {candidate.product_id for candidate in candidates} | {candidate.duplicate_id for candidate in candidates}
+        products = {product.id: product for product in self.product_repository.get_by_ids(ids)}
+        for candidate in candidates:
+            candidate.product = products.get(candidate.product_id)
+            candidate.duplicate = products.get(candidate.duplicate_id)
+        return [candidate for candidate in candidates if candidate.product and candidate.duplicate]
+
+    def dismiss(self, candidate_id: int) -> None:
+        """Marca el par como distinto; no se vuelve a proponer"""
+        if not self.duplicate_repository.set_status(candidate_id, DuplicateStatus.DISMISSED):
+            raise ValueError("El par ya fue revisado o no existe")
+        _DISMISSED.inc()
+
+    def merge(self, candidate_id: int, keep_id: int) -> Dict[str, Any]:
+        """Fusiona el otro producto del par en keep_id (stock incluido) y lo desactiva"""
+        candidate = self.duplicate_repository.get_by_id(candidate_id)
+        if candidate is None or candidate.status != DuplicateStatus.PENDING:
+            raise ValueError("El par ya fue revisado o no existe")
+        if keep_id not in (candidate.product_id, candidate.duplicate_id):
+            raise ValueError("El producto a conservar no pertenece al par")
+        duplicate_id = candidate.duplicate_id if keep_id == candidate.product_id else candidate.product_id
+
+        units = self.product_repository.merge_into(duplicate_id, keep_id)
+        self.duplicate_repository.set_status(candidate_id, DuplicateStatus.MERGED)
+        _MERGED.inc()
+        return {"kept": keep_id, "merged": duplicate_id, "units_moved": units}
+
+    def _full_scan(self) -> Dict[str, Any]:
+        import numpy as np
+        started = time.perf_counter()
+        # Antes de leer el catálogo: un cambio concurrente se vuelve a revisar en la siguiente
+        last_seq = self.product_repository.get_latest_change_seq()
+        normalized = self._normalized_catalog()
+
+        product_ids, signature = self._signatures(normalized)
+        keys = self._band_keys(signature)
+        names = [normalized[product_id] for product_id in product_ids.tolist()]
+        name_rank = np.empty(len(names), dtype=np.int64)
+        name_rank[sorted(range(len(names)), key=names.__getitem__)] = np.arange(len(names))
+        # Una fila por producto y banda, ordenadas por cubeta y dentro de ella por nombre
+        bands = np.tile(np.arange(_BANDS, dtype=np.int64), len(product_ids))
+        flat_keys = keys.ravel()
+        rows = np.repeat(np.arange(len(product_ids)), _BANDS)
+        order = np.lexsort((name_rank[rows], flat_keys, bands))
+        bands, flat_keys, rows = bands[order], flat_keys[order], rows[order]
+        self.duplicate_repository.replace_buckets(
+            None,
+            self._iter_chunks(product_ids, keys),
+            self._iter_chunks(bands, flat_keys, product_ids[rows]),
+        )
+
+        first, second = self._bucket_pairs(bands, flat_keys, rows)
+        number_masks = self._number_masks(names)
+        first, second = self._prefilter(first, second, signature, number_masks)
+        pairs = zip(product_ids[first].tolist(), product_ids[second].tolist())
+        return self._finish(True, last_seq, len(normalized), self._score(pairs, normalized), started)
+
+    def _incremental_scan(self, since_seq: int) -> Dict[str, Any]:
+        started = time.perf_counter()
+        changed: Set[int] = set()
+        # Los cambios de stock posteriores se saltean igual; con el último seq leído
+        # antes, la próxima búsqueda no vuelve a recorrerlos
+        latest_seq = self.product_repository.get_latest_change_seq()
+        last_seq = since_seq
+        while True:
+            changes = self.product_repository.changes_since(last_seq, 5000, _NAME_OPERATIONS)
+            if not changes:
+                break
+            last_seq = changes[-1].seq
+            changed.update(change.product_id for change in changes)
+        last_seq = max(last_seq, latest_seq)
+        if not changed:
+            return {"full": False, "products": 0, "candidates": 0, "last_seq": last_seq,
+                    "seconds": round(time.perf_counter() - started, 3)}
+
+        last_scan = self.get_last_scan()
+        if len(changed) > _FULL_SCAN_RATIO * max(last_scan["products"], 1):
+            self.logger.info(f"{len(changed)} changed products since the last duplicate scan: full scan")
+            return self._full_scan()
+
+        normalized = {product.id: normalize_name(product.name)
+                      for product in self.product_repository.get_by_ids(changed) if product.is_active}
+        product_ids, signature = self._signatures(normalized)
+        keys = self._band_keys(signature)
+        rows = sorted(
+            (band, bucket, product_id)
+            for product_id, product_keys in zip(product_ids.tolist(), keys.tolist())
+            for band, bucket in enumerate(product_keys)
+        )
+        # Desactivados y borrados solo pierden sus cubetas
+        self.duplicate_repository.replace_buckets(sorted(changed), zip(product_ids.tolist(), keys.tolist()), rows)
+
+        members: Dict[Tuple[int, int], List[int]] = {}
+        for band, bucket, product_id in self.duplicate_repository.bucket_members(
+                [(band, bucket) for band, bucket, _ in rows]):
+            members.setdefault((band, bucket), []).append(product_id)
+        pairs = set()
+        # En cubetas enormes: los que comparten más bandas con el producto cambiado
+        shared_bands: Dict[int, Counter] = {}
+        for bucket_members in members.values():
+            for product_id in bucket_members:
+                if product_id not in normalized:
+                    continue
+                others = (other for other in bucket_members if other != product_id)
+                if len(bucket_members) > self.max_bucket:
+                    shared_bands.setdefault(product_id, Counter()).update(others)
+                else:
+                    pairs.update((min(product_id, other), max(product_id, other)) for other in others)
+        for product_id, counts in shared_bands.items():
+            pairs.update((min(product_id, other), max(product_id, other))
+                         for other, _ in counts.most_common(self.max_bucket))
+
+        others = {product_id for pair in pairs for product_id in pair} - set(normalized)
+        active = {product.id: product for product in self.product_repository.get_by_ids(others)
+                  if product.is_active}
+        # Cubetas de productos que ya no están activos (p. ej. cubetas guardadas antes de que
+        # el archivo registrara sus cambios): se limpian al encontrarlas
+        stale = others - set(active)
+        if stale:
+            self.duplicate_repository.replace_buckets(sorted(stale), [], [])
+        normalized.update({product_id: normalize_name(product.name) for product_id, product in active.items()})
+
+        return self._finish(False, last_seq, len(changed), self._score(pairs, normalized), started)
+
+    def _finish(self, full: bool, last_seq: int, products: int, scored: List[Tuple[int, int, float]],
+                started: float) -> Dict[str, Any]:
+        seconds = time.perf_counter() - started
+        scan = self.duplicate_repository.record_scan(scored, full, last_seq, products, seconds)
+        (_SCAN_FULL if full else _SCAN_INCREMENTAL).observe(seconds)
+        _FOUND.inc(scan["candidates"])
+        self.logger.info(
+            f"Duplicate scan ({'full' if full else 'incremental'}): {products} products, "
+            f"{len(scored)} similar pairs, {scan['candidates']} new, {seconds:.1f}s"
+        )
+        return {**scan, "similar_pairs": len(scored)}
+
+    def _score(self, pairs: Iterable[Tuple[int, int]], normalized: Dict[int, str]) -> List[Tuple[int, int, float]]:
+        """Jaccard exacto de trigramas de cada par; los números de modelo deben coincidir o uno contener al otro"""
+        trigrams: Dict[int, Set[str]] = {}
+        scored = []
+        for first, second in pairs:
+            if first not in normalized or second not in normalized:
+                continue
+            first_numbers, second_numbers = _numbers(normalized[first]), _numbers(normalized[second])
+            if first_numbers and second_numbers and not (first_numbers <= second_numbers
+                                                         or second_numbers <= first_numbers):
+                continue
+            for product_id in (first, second):
+                if product_id not in trigrams:
+                    trigrams[product_id] = _trigrams(normalized[product_id])
+            union = len(trigrams[first] | trigrams[second])
+            score = len(trigrams[first] & trigrams[second]) / union if union else 0.0
+            if score >= self.threshold:
+                scored.append((min(first, second), max(first, second), round(score, 4)))
+        return scored
+
+    def _bucket_pairs(self, bands: "np.ndarray", keys: "np.ndarray",
+                      rows: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Pares de filas que comparten cubeta, sin repetir. En las cubetas enormes cada
+        fila se empareja con las _WINDOW siguientes (ordenadas por nombre): todos
+        contra todos serían millones de pares de una misma familia de productos.
+        """
+        import numpy as np
+        boundaries = np.flatnonzero((np.diff(bands) != 0) | (np.diff(keys) != 0)) + 1
+        starts = np.concatenate(([0], boundaries))
+        sizes = np.diff(np.concatenate((starts, [len(bands)])))
+
+        # Cada par como un entero (fila menor · n + fila mayor) para quitar repetidos entre bandas
+        def encode(first: "np.ndarray", second: "np.ndarray") -> "np.ndarray":
+            return np.minimum(first, second).astype(np.int64) * len(rows) + np.maximum(first, second)
+
+        pieces = []
+        small = (sizes >= 2) & (sizes <= self.max_bucket)
+        for size in np.flatnonzero(np.bincount(sizes[small])).tolist():
+            group_starts = starts[small & (sizes == size)]
+            upper_i, upper_j = np.triu_indices(size, 1)
+            pieces.append(encode(rows[(group_starts[:, None] + upper_i).ravel()],
+                                 rows[(group_starts[:, None] + upper_j).ravel()]))
+        large = sizes > self.max_bucket
+        if large.any():
+            group = np.repeat(np.arange(len(sizes)), sizes)
+            positions = np.flatnonzero(np.repeat(large, sizes))
+            for offset in range(1, _WINDOW + 1):
+                ahead = positions + offset
+                same_group = ahead < len(rows)
+                same_group[same_group] = group[positions[same_group]] == group[ahead[same_group]]
+                pieces.append(encode(rows[positions[same_group]], rows[ahead[same_group]]))
+        if not pieces:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        codes = np.concatenate(pieces)
+        # Ordenar y comparar vecinos: np.unique es un orden de magnitud más lento con decenas de millones
+        codes.sort()
+        codes = codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+        return codes // len(rows), codes % len(rows)
+
+    def _prefilter(self, first: "np.ndarray", second: "np.ndarray", signature: "np.ndarray",
+                   number_masks: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Descarta sin salir de numpy los pares con números de modelo incompatibles o
+        con Jaccard estimado por la firma claramente bajo el umbral; los que quedan
+        se puntúan exactamente
+        """
+        import numpy as np
+        keep = np.zeros(len(first), dtype=bool)
+        minimum = int(np.floor((self.threshold - _ESTIMATE_MARGIN) * signature.shape[1]))
+        for start in range(0, len(first), _PAIR_CHUNK):
+            a, b = first[start:start + _PAIR_CHUNK], second[start:start + _PAIR_CHUNK]
+            masks_a, masks_b = number_masks[a], number_masks[b]
+            common = masks_a & masks_b
+            numbers_match = (masks_a == 0) | (masks_b == 0) | (common == masks_a) | (common == masks_b)
+            similar = (signature[a] == signature[b]).sum(axis=1) >= minimum
+            keep[start:start + _PAIR_CHUNK] = numbers_match & similar
+        return first[keep], second[keep]
+
+    @staticmethod
+    def _number_masks(normalized: List[str]) -> "np.ndarray":
+        """Números de cada nombre como bits de una máscara de 64: la inclusión de máscaras aproxima la de conjuntos"""
+        import numpy as np
+        masks = np.zeros(len(normalized), dtype=np.uint64)
+        for row, name in enumerate(normalized):
+            mask = 0
+            for number in _numbers(name):
+                mask |= 1 << (zlib.crc32(number.encode()) & 63)
+            masks[row] = mask
+        return masks
+
+    def _normalized_catalog(self) -> Dict[int, str]:
+        """Nombre normalizado de cada producto activo; el resto de la foto del catálogo se libera al salir"""
+        catalog = self.product_repository.get_catalog_snapshot()
+        return dict(zip(catalog["id"], map(normalize_name, catalog["name"])))
+
+    @staticmethod
+    def _iter_chunks(*columns: "np.ndarray") -> Iterator[Tuple[Any, ...]]:
+        """Filas de las columnas por tramos, sin convertir millones de valores a objetos de Python a la vez"""
+        for start in range(0, len(columns[0]), _PAIR_CHUNK):
+            yield from zip(*(column[start:start + _PAIR_CHUNK].tolist() for column in columns))
+
+    @staticmethod
+    def _signatures(normalized: Dict[int, str]) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Firma MinHash de cada producto con al menos un trigrama, por tramos de _CHUNK.
+        Todos los nombres van en un arreglo de bytes separados por \\0; un trigrama es
+        válido si no incluye un separador.
+        """
+        import numpy as np
+        rng = np.random.default_rng(_SEED)
+        multipliers = rng.integers(1, 2 ** 63, size=_BANDS * _ROWS, dtype=np.uint64) | np.uint64(1)
+        offsets = rng.integers(0, 2 ** 63, size=_BANDS * _ROWS, dtype=np.uint64)
+
+        ids = list(normalized)
+        names = list(normalized.values())
+        id_chunks, signature_chunks = [], []
+        for chunk_start in range(0, len(ids), _CHUNK):
+            chunk_ids = np.asarray(ids[chunk_start:chunk_start + _CHUNK], dtype=np.int64)
+            chunk_names = names[chunk_start:chunk_start + _CHUNK]
+            codes = np.frombuffer("\0".join(chunk_names).encode("ascii"), dtype=np.uint8).astype(np.uint64)
+            if len(codes) < 3:
+                continue
+            owner = np.repeat(np.arange(len(chunk_names)),
+                              np.fromiter((len(name) + 1 for name in chunk_names), dtype=np.int64,
+                                          count=len(chunk_names)))[:len(codes) - 2]
+            valid = (codes[:-2] != 0) & (codes[1:-1] != 0) & (codes[2:] != 0)
+            grams = ((codes[:-2] << np.uint64(16)) | (codes[1:-1] << np.uint64(8)) | codes[2:])[valid]
+            owner = owner[valid]
+            if not len(grams):
+                continue
+            segments = np.flatnonzero(np.concatenate(([True], owner[1:] != owner[:-1])))
+
+            # Hashing multiplicativo: 32 bits altos de (a·x + b) mod 2^64
+            signature = np.empty((len(segments), _BANDS * _ROWS), dtype=np.uint32)
+            with np.errstate(over="ignore"):
+                for column in range(_BANDS * _ROWS):
+                    hashed = (grams * multipliers[column] + offsets[column]) >> np.uint64(32)
+                    signature[:, column] = np.minimum.reduceat(hashed, segments)
+            id_chunks.append(chunk_ids[owner[segments]])
+            signature_chunks.append(signature)
+        if not id_chunks:
+            return np.empty(0, dtype=np.int64), np.empty((0, _BANDS * _ROWS), dtype=np.uint32)
+        return np.concatenate(id_chunks), np.concatenate(signature_chunks)
+
+    @staticmethod
+    def _band_keys(signature: "np.ndarray") -> "np.ndarray":
+        """Cubeta de cada banda: los _ROWS valores de la banda combinados en 63 bits (BIGINT con signo)"""
+        import numpy as np
+        keys = np.zeros((len(signature), _BANDS), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for band in range(_BANDS):
+                for value in signature[:, band * _ROWS:(band + 1) * _ROWS].T:
+                    keys[:, band] = (keys[:, band] ^ value.astype(np.uint64)) * np.uint64(0x9E3779B97F4A7C15)
+        return (keys >> np.uint64(1)).astype(np.int64)
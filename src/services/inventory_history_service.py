@@ -0,0 +1,216 @@
+"""
+Inventario a una fecha ("¿qué había el 31 de marzo?").
+
+Se toman fotos periódicas del stock; el stock a una fecha parte de la foto
+anterior más cercana y reproduce solo los movimientos posteriores, así una
+consulta de todo el catálogo no recorre años de libro. Las fotos de más de
+POS_STOCK_CHECKPOINT_KEEP_DAYS días se reducen a la primera de cada mes.
+El valor al costo usa el costo actual: el catálogo no guarda historial de costos.
+
+Variables de entorno:
+    POS_STOCK_CHECKPOINT_HOURS=24       activa las fotos periódicas en la app
+    POS_STOCK_CHECKPOINT_KEEP_DAYS=90   días con todas las fotos; antes, una por mes
+"""
+import io
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from src.entities.stock_checkpoint import StockCheckpoint
+from src.repositories.product_repository import ProductRepository
+from src.repositories.stock_ledger_repository import StockLedgerRepository
+from src.utils.logger import Logger
+from src.utils.metrics import counter, histogram
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = Logger(__name__).get_logger()
+
+_AS_OF_SECONDS = histogram("pos_stock_as_of_seconds", "Duración de las consultas de stock a una fecha",
+                           buckets=(0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+_CHECKPOINTS = counter("pos_stock_checkpoints_total", "Fotos de stock por resultado", ["result"])
+_CHECKPOINTS_TAKEN = _CHECKPOINTS.labels("taken")
+_CHECKPOINTS_SKIPPED = _CHECKPOINTS.labels("unchanged")
+
+
+def end_of_day(day: date) -> datetime:
+    """Último instante del día: el stock "al 31 de marzo" incluye las ventas de ese día"""
+    return datetime.combine(day, datetime.max.time())
+
+
+class InventoryAsOf:
+    """Stock por producto a una fecha, con la foto de partida y lo reproducido"""
+
+    def __init__(self, at: datetime, products: "pd.DataFrame", totals: Dict[str, Any]):
+        self.at = at
+        self.products = products
+        self.totals = totals
+
+
+class InventoryHistoryService:
+    """Fotos de stock y consultas a una fecha - SRP"""
+
+    def __init__(self, ledger_repository: StockLedgerRepository, product_repository: ProductRepository,
+                 keep_days: Optional[int] = None):
+        self.ledger_repository = ledger_repository
+        self.product_repository = product_repository
+        self.keep_days = keep_days if keep_days is not None else int(
+            os.getenv("POS_STOCK_CHECKPOINT_KEEP_DAYS", "90"))
+        self.logger = Logger(__name__).get_logger()
+
+    def take_checkpoint(self, only_if_changed: bool = False) -> Optional[StockCheckpoint]:
+        """Foto del stock actual; con only_if_changed no se toma si no hubo movimientos desde la última"""
+        if only_if_changed:
+            latest = self.ledger_repository.get_all()[:1]
+            if latest and latest[0].last_movement_id == self.ledger_repository.get_last_movement_id():
+                _CHECKPOINTS_SKIPPED.inc()
+                return None
+        checkpoint = self.ledger_repository.create(StockCheckpoint())
+        _CHECKPOINTS_TAKEN.inc()
+        return checkpoint
+
+    def get_checkpoints(self) -> List[StockCheckpoint]:
+        return self.ledger_repository.get_all()
+
+    def prune_checkpoints(self, now: Optional[datetime] = None) -> int:
+        """Conserva todas las fotos recientes y la primera de cada mes de las anteriores"""
+        if self.keep_days <= 0:
+            return 0
+        cutoff = (now or datetime.now()) - timedelta(days=self.keep_days)
+        kept_months = set()
+        to_delete = []
+        for checkpoint in reversed(self.ledger_repository.get_all()):
+            if checkpoint.taken_at >= cutoff:
+                break
+            month = (checkpoint.taken_at.year, checkpoint.taken_at.month)
+            if month in kept_months:
+                to_delete.append(checkpoint.id)
+            else:
+                kept_months.add(month)
+        deleted = self.ledger_repository.delete_many(to_delete)
+        if deleted:
+            self.logger.info(f"Pruned {deleted} stock checkpoints older than {cutoff:%Y-%m-%d}")
+        return deleted
+
+    def stock_as_of(self, at: datetime, codes: Optional[List[str]] = None) -> InventoryAsOf:
+        """Stock de todo el catálogo (o de los códigos dados) al momento at"""
+        import numpy as np
+        import pandas as pd
+        started = time.perf_counter()
+
+        product_ids = None
+        if codes:
+            product_ids = [product.id for product in self.product_repository.get_by_codes(codes)]
+            if not product_ids:
+                raise ValueError("Ninguno de los códigos corresponde a un producto")
+        quantities, checkpoint, replayed = self.ledger_repository.stock_as_of(at, product_ids)
+
+        catalog = self.product_repository.get_catalog_snapshot(active_only=False)
+        rows = pd.Index(catalog["id"]).get_indexer(list(quantities))
+        quantity = np.fromiter(quantities.values(), dtype=np.int64, count=len(quantities))
+        # Productos archivados ya no están en el catálogo (no tenían stock al archivarse)
+        known = rows >= 0
+        rows, quantity = rows[known], quantity[known]
+        cost = np.asarray(catalog["cost"], dtype=np.float64)[rows]
+
+        products = pd.DataFrame({
+            "code": np.asarray(catalog["code"], dtype=object)[rows],
+            "name": np.asarray(catalog["name"], dtype=object)[rows],
+            "category": np.asarray(catalog["category"], dtype=object)[rows],
+            "supplier": np.asarray(catalog["supplier"], dtype=object)[rows],
+            "cost": cost,
+            "quantity": quantity,
+            "value_at_cost": quantity * cost,
+        }).sort_values("code", ignore_index=True)
+
+        seconds = time.perf_counter() - started
+        _AS_OF_SECONDS.observe(seconds)
+        totals = {
+            "at": at.isoformat(sep=" ", timespec="seconds"),
+            "products": len(products),
+            "units": int(quantity.sum()),
+            "value_at_cost": float(products["value_at_cost"].sum()),
+            "checkpoint": checkpoint.taken_at.isoformat(sep=" ", timespec="seconds") if checkpoint else None,
+            "replayed_movements": replayed,
+            "seconds": round(seconds, 3),
+        }
+        self.logger.info(
+            f"Stock as of {totals['at']}: {totals['products']} products, "
+            f"{replayed} movements replayed from checkpoint {totals['checkpoint']}"
+        )
+        return InventoryAsOf(at, products, totals)
+
+    def export_xlsx(self, report: InventoryAsOf) -> bytes:
+        """XLSX del reporte: stock por producto y una hoja de resumen"""
+        import pandas as pd
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            report.products.to_excel(writer, sheet_name="Stock", index=False)
+            pd.DataFrame([report.totals]).to_excel(writer, sheet_name="Resumen", index=False)
+        return buffer.getvalue()
+
+
+class CheckpointScheduler:
+    """Toma una foto cada cierto tiempo si hubo movimientos y poda las antiguas"""
+
+    def __init__(self, service: InventoryHistoryService, interval_seconds: float):
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self._run, name="stock-checkpoints", daemon=True)
+        self._thread.start()
+        logger.info(f"Stock checkpoints every {self.interval_seconds / 3600:g} h")
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_once(self) -> Optional[StockCheckpoint]:
+        checkpoint = self.service.take_checkpoint(only_if_changed=True)
+        self.service.prune_checkpoints()
+        return checkpoint
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                # Sin foto las consultas reproducen desde la anterior; se reintenta luego
+                logger.error(f"Scheduled stock checkpoint failed: {str(e)}")
+
+
+_scheduler: Optional[CheckpointScheduler] = None
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def start_checkpoint_scheduler(database) -> Optional[CheckpointScheduler]:
+    """Inicia las fotos periódicas una sola vez por proceso si POS_STOCK_CHECKPOINT_HOURS está definido"""
+    global _scheduler, _scheduler_started
+    with _scheduler_lock:
+        if _scheduler_started:
+            return _scheduler
+        _scheduler_started = True
+        interval = os.getenv("POS_STOCK_CHECKPOINT_HOURS")
+        if not interval:
+            return None
+        try:
+            session, read_session = database.get_session(), database.get_read_session()
+            service = InventoryHistoryService(
+                StockLedgerRepository(session, read_session, actor="fotos-de-stock"),
+                ProductRepository(session, read_session, actor="fotos-de-stock"),
+            )
+            scheduler = CheckpointScheduler(service, float(interval) * 3600)
+            scheduler.start()
+            _scheduler = scheduler
+        except ValueError as e:
+            logger.error(f"Error starting stock checkpoint scheduler: {str(e)}")
+        return _scheduler
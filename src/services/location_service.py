@@ -0,0 +1,100 @@
+from typing import Any, Dict, List, Optional
+
+from src.database.till_journal import TillJournal
+from src.entities.location import Location
+from src.entities.product import Product
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.utils.logger import Logger
+
+
+class LocationService:
+    """
+    Sucursales: stock, precios propios y transferencias - SRP
+    En modo caja (con journal) los conteos y transferencias se encolan localmente
+    y TillSyncService los aplica en la base central.
+    """
+
+    def __init__(self, repository: LocationRepository, product_repository: ProductRepository,
+                 journal: Optional[TillJournal] = None):
+        self.repository = repository
+        self.product_repository = product_repository
+        self.journal = journal
+        self.logger = Logger(__name__).get_logger()
+
+    def create_location(self, location_data: Dict[str, Any]) -> Location:
+        location = Location(
+            code=str(location_data.get("code", "")).strip().upper(),
+            name=str(location_data.get("name", "")).strip(),
+        )
+        is_valid, message = location.validate()
+        if not is_valid:
+            raise ValueError(f"Sucursal inválida: {message}")
+        return self.repository.create(location)
+
+    def get_all_locations(self) -> List[Location]:
+        return self.repository.get_all()
+
+    def get_location(self, location_id: int) -> Optional[Location]:
+        return self.repository.get_by_id(location_id)
+
+    def get_location_by_code(self, code: str) -> Optional[Location]:
+        return self.repository.get_by_code(code)
+
+    def deactivate_location(self, location_id: int) -> bool:
+        return self.repository.delete(location_id)
+
+    def get_location_products(self, location_id: int) -> List[Product]:
+        return self.repository.get_products(location_id)
+
+    def get_location_product(self, location_id: int, code: str) -> Optional[Product]:
+        return self.repository.get_product_by_code(location_id, code)
+
+    def get_stock_by_location(self, product_code: str) -> List[Dict[str, Any]]:
+        product_id = self.product_repository.get_id_by_code(product_code)
+        return self.repository.get_stock_by_location(product_id) if product_id else []
+
+    def is_till_mode(self) -> bool:
+        return self.journal is not None
+
+    def set_stock(self, location_id: int, product_code: str, quantity: int) -> Optional[int]:
+        """Fija el stock contado; retorna el delta, o None en modo caja (se conoce al sincronizar)"""
+        if quantity < 0:
+            raise ValueError("El stock no puede ser negativo")
+        product_id = self._product_id(product_code)
+        if self.journal:
+            self.journal.enqueue_stock_count(self._location_code(location_id), str(product_code).strip(), quantity)
+            return None
+        return self.repository.set_stock(location_id, product_id, quantity)
+
+    def set_price(self, location_id: int, product_code: str, price: Optional[float]) -> None:
+        if price is not None and price < 0:
+            raise ValueError("El precio no puede ser negativo")
+        self.repository.set_price(location_id, self._product_id(product_code), price)
+
+    def transfer_stock(self, from_location_id: int, to_location_id: int,
+                       product_code: str, quantity: int) -> None:
+        if quantity <= 0:
+            raise ValueError("La cantidad a transferir debe ser mayor a cero")
+        if from_location_id == to_location_id:
+            raise ValueError("La sucursal de origen y destino deben ser distintas")
+        product_id = self._product_id(product_code)
+        if self.journal:
+            self.journal.enqueue_stock_transfer(
+                self._location_code(from_location_id), self._location_code(to_location_id),
+                str(product_code).strip(), quantity,
+            )
+            return
+        self.repository.transfer_stock(from_location_id, to_location_id, product_id, quantity)
+
+    def _location_code(self, location_id: int) -> str:
+        location = self.repository.get_by_id(location_id)
+        if location is None:
+            raise ValueError(f"No existe la sucursal: {location_id}")
+        return location.code
+
+    def _product_id(self, product_code: str) -> int:
+        product_id = self.product_repository.get_id_by_code(str(product_code).strip())
+        if product_id is None:
+            raise ValueError(f"No existe un producto con el código: {product_code}")
+        return product_id
@@ -0,0 +1,202 @@
+"""
+Mantenimiento del catálogo: archivo de productos inactivos y recuperación de espacio.
+
+Los reconteos desactivan productos que nunca se borran; con el tiempo el listado
+y la búsqueda recorren sobre todo filas inactivas. El mantenimiento mueve a
+archived_products los inactivos sin cambios desde hace POS_ARCHIVE_AFTER_DAYS
+días (en la misma base o en POS_ARCHIVE_DATABASE_URL), libera las páginas vacías por pasos cortos (VACUUM incremental) y
+actualiza las estadísticas (ANALYZE). Informa el espacio y el tiempo de
+recorrido del catálogo antes y después.
+
+Variables de entorno:
+    POS_ARCHIVE_AFTER_DAYS=180          antigüedad mínima de un inactivo para archivarlo
+    POS_ARCHIVE_DATABASE_URL=sqlite:///pos_archive.db   base del archivo; así la principal se achica
+    POS_MAINTENANCE_WINDOW=02:00-05:00  activa el mantenimiento diario en la app, en ese horario
+    POS_VACUUM_PAGES=1000               páginas liberadas por paso
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import time as day_time
+from typing import Any, Dict, Optional, Tuple
+
+from src.repositories.product_repository import ProductRepository
+from src.utils.logger import Logger
+from src.utils.metrics import counter, histogram
+
+logger = Logger(__name__).get_logger()
+
+_MAINTENANCE_SECONDS = histogram("pos_maintenance_seconds", "Duración de cada mantenimiento",
+                                 buckets=(1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0))
+_RECLAIMED_BYTES = counter("pos_maintenance_reclaimed_bytes_total", "Bytes devueltos al sistema por el mantenimiento")
+
+# Tablas cuyas estadísticas cambian al archivar
+_ARCHIVE_TABLES = ["products", "archived_products"]
+
+
+class MaintenanceService:
+    """Archiva inactivos, recupera espacio y reporta lo ganado - SRP"""
+
+    def __init__(self, repository: ProductRepository, database, archive_database=None,
+                 archive_after_days: Optional[int] = None, vacuum_pages: Optional[int] = None):
+        self.repository = repository
+        self.database = database
+        self.archive_database = archive_database
+        self.archive_after_days = archive_after_days if archive_after_days is not None else int(
+            os.getenv("POS_ARCHIVE_AFTER_DAYS", "180"))
+        self.vacuum_pages = vacuum_pages or int(os.getenv("POS_VACUUM_PAGES", "1000"))
+        self.logger = Logger(__name__).get_logger()
+
+    def run(self, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Ejecuta el mantenimiento completo; deadline (time.time()) corta la liberación de espacio"""
+        if self.archive_after_days < 1:
+            raise ValueError("La antigüedad para archivar debe ser de al menos un día")
+        started = time.perf_counter()
+        try:
+            rows_before, scan_before = self.repository.time_catalog_scan()
+            cutoff = datetime.now() - timedelta(days=self.archive_after_days)
+            archived_count, kept_count = self._archive(cutoff)
+            space = self.database.reclaim_space(_ARCHIVE_TABLES, self.vacuum_pages, deadline)
+            rows_after, scan_after = self.repository.time_catalog_scan()
+        except Exception as e:
+            self.logger.error(f"Error running maintenance: {str(e)}")
+            raise
+
+        reclaimed = None
+        if space["size_before"] is not None and space["size_after"] is not None:
+            reclaimed = space["size_before"] - space["size_after"]
+            _RECLAIMED_BYTES.inc(max(0, reclaimed))
+        seconds = time.perf_counter() - started
+        _MAINTENANCE_SECONDS.observe(seconds)
+        report = {
+            "archived": archived_count,
+            "kept_with_history": kept_count,
+            "archive_cutoff": cutoff.isoformat(timespec="seconds"),
+            "catalog_rows_before": rows_before,
+            "catalog_rows_after": rows_after,
+            "scan_ms_before": round(scan_before * 1000, 1),
+            "scan_ms_after": round(scan_after * 1000, 1),
+            **space,
+            "reclaimed_bytes": reclaimed,
+            "seconds": round(seconds, 3),
+        }
+        self.logger.info(
+            f"Maintenance: {archived_count} products archived, {reclaimed} bytes reclaimed, "
+            f"catalog scan {report['scan_ms_before']} → {report['scan_ms_after']} ms"
+        )
+        return report
+
+    def _archive(self, cutoff: datetime) -> Tuple[int, int]:
+        if self.archive_database is None:
+            return self.repository.archive_inactive(cutoff)
+        from src.database.models import ArchivedProductModel
+        # Solo la tabla del archivo: el resto del esquema no hace falta en esa base
+        ArchivedProductModel.__table__.create(bind=self.archive_database.engine, checkfirst=True)
+        archive_session = self.archive_database.get_session()
+        try:
+            return self.repository.archive_inactive(cutoff, archive_session)
+        finally:
+            archive_session.close()
+
+
+def archive_database_from_env():
+    """Base del archivo según POS_ARCHIVE_DATABASE_URL; None para usar la tabla de la base principal"""
+    url = os.getenv("POS_ARCHIVE_DATABASE_URL")
+    if not url:
+        return None
+    from src.database.database import Database
+    return Database.connect(url)
+
+
+def parse_window(value: str) -> Tuple[day_time, day_time]:
+    """'02:00-05:00' → (inicio, fin); la ventana puede cruzar la medianoche"""
+    try:
+        start, end = (day_time.fromisoformat(part.strip()) for part in value.split("-"))
+    except ValueError:
+        raise ValueError(f"Horario de mantenimiento inválido (use HH:MM-HH:MM): {value}")
+    if start == end:
+        raise ValueError(f"El horario de mantenimiento no puede empezar y terminar igual: {value}")
+    return start, end
+
+
+class MaintenanceScheduler:
+    """Ejecuta el mantenimiento una vez por día dentro del horario de poca actividad"""
+
+    def __init__(self, service: MaintenanceService, window: Tuple[day_time, day_time],
+                 poll_seconds: float = 60.0):
+        self.service = service
+        self.start_time, self.end_time = window
+        self.poll_seconds = poll_seconds
+        self._last_run_day = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self._run, name="maintenance-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Maintenance scheduled daily between {self.start_time:%H:%M} and {self.end_time:%H:%M}")
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def window_end(self, now: datetime) -> Optional[datetime]:
+        """Fin de la ventana en curso, o None si now está fuera de ella"""
+        start = datetime.combine(now.date(), self.start_time)
+        end = datetime.combine(now.date(), self.end_time)
+        if self.start_time < self.end_time:
+            return end if start <= now < end else None
+        # Cruza la medianoche: 23:00-04:00
+        if now >= start:
+            return end + timedelta(days=1)
+        return end if now < end else None
+
+    def run_once(self, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Mantenimiento si now cae en la ventana y aún no se hizo en esta; None si no"""
+        now = now or datetime.now()
+        end = self.window_end(now)
+        if end is None:
+            return None
+        window_day = end.date()
+        if self._last_run_day == window_day:
+            return None
+        self._last_run_day = window_day
+        return self.service.run(deadline=end.timestamp())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                # Se reintenta en la ventana del día siguiente
+                logger.error(f"Scheduled maintenance failed: {str(e)}")
+
+
+_scheduler: Optional[MaintenanceScheduler] = None
+_scheduler_started = False
+_scheduler_lock = threading.Lock()
+
+
+def start_maintenance_scheduler(database) -> Optional[MaintenanceScheduler]:
+    """Inicia el mantenimiento diario una sola vez por proceso si POS_MAINTENANCE_WINDOW está definido"""
+    global _scheduler, _scheduler_started
+    with _scheduler_lock:
+        if _scheduler_started:
+            return _scheduler
+        _scheduler_started = True
+        window = os.getenv("POS_MAINTENANCE_WINDOW")
+        if not window:
+            return None
+        try:
+            repository = ProductRepository(database.get_session(), database.get_read_session(),
+                                           actor="mantenimiento")
+            service = MaintenanceService(repository, database, archive_database_from_env())
+            scheduler = MaintenanceScheduler(service, parse_window(window))
+            scheduler.start()
+            _scheduler = scheduler
+        except ValueError as e:
+            logger.error(f"Error starting maintenance scheduler: {str(e)}")
+        return _scheduler
@@ -0,0 +1,86 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.entities.price_list import PriceList, PriceListItem
+from src.repositories.location_repository import LocationRepository
+from src.repositories.price_list_repository import PriceListRepository
+from src.repositories.product_repository import ProductRepository
+from src.services.price_resolver import PriceResolver
+from src.utils.logger import Logger
+
+
+class PriceListService:
+    """Listas de precios con vigencia (promociones, mayoristas) - SRP"""
+
+    def __init__(self, repository: PriceListRepository, product_repository: ProductRepository,
+                 resolver: PriceResolver, location_repository: Optional[LocationRepository] = None):
+        self.repository = repository
+        self.product_repository = product_repository
+        self.resolver = resolver
+        self.location_repository = location_repository
+        self.logger = Logger(__name__).get_logger()
+
+    def create_price_list(self, price_list_data: Dict[str, Any]) -> PriceList:
+        price_list = PriceList(
+            name=str(price_list_data.get("name", "")).strip(),
+            customer_tier=self.normalize_tier(price_list_data.get("customer_tier")),
+            location_id=price_list_data.get("location_id"),
+            priority=int(price_list_data.get("priority") or 0),
+        )
+        is_valid, message = price_list.validate()
+        if not is_valid:
+            raise ValueError(f"Lista inválida: {message}")
+        created = self.repository.create(price_list)
+        self.resolver.invalidate()
+        return created
+
+    def get_price_lists(self) -> List[PriceList]:
+        return self.repository.get_all()
+
+    def deactivate_price_list(self, price_list_id: int) -> bool:
+        deactivated = self.repository.delete(price_list_id)
+        self.resolver.invalidate()
+        return deactivated
+
+    def add_price(self, price_list_id: int, product_code: str, price: float,
+                  starts_at: datetime, ends_at: Optional[datetime] = None) -> PriceListItem:
+        product_id = self.product_repository.get_id_by_code(str(product_code).strip())
+        if product_id is None:
+            raise ValueError(f"No existe un producto con el código: {product_code}")
+
+        item = PriceListItem(price_list_id, product_id, float(price), starts_at, ends_at,
+                             product_code=product_code)
+        is_valid, message = item.validate()
+        if not is_valid:
+            raise ValueError(f"Precio inválido: {message}")
+
+        self.repository.add_items([item])
+        self.resolver.invalidate()
+        return item
+
+    def remove_price(self, item_id: int) -> bool:
+        removed = self.repository.remove_item(item_id)
+        self.resolver.invalidate()
+        return removed
+
+    def get_prices(self, price_list_id: int) -> List[PriceListItem]:
+        return self.repository.get_items(price_list_id)
+
+    def resolve_price(self, product_code: str, location_id: Optional[int] = None,
+                      customer_tier: Optional[str] = None, at: Optional[datetime] = None) -> Optional[float]:
+        """Precio aplicable; None si el producto no existe o está inactivo"""
+        code = str(product_code).strip()
+        product = None
+        if location_id and self.location_repository:
+            # Sin lista aplicable rige el precio propio de la sucursal
+            product = self.location_repository.get_product_by_code(location_id, code)
+        product = product or self.product_repository.get_by_code(code)
+        if product is None:
+            return None
+        return self.resolver.resolve(product, location_id, self.normalize_tier(customer_tier), at)
+
+    @staticmethod
+    def normalize_tier(customer_tier: Any) -> Optional[str]:
+        """Tipo de cliente en mayúsculas; vacío significa todos los clientes"""
+        tier = str(customer_tier or "").strip().upper()
+        return tier or None
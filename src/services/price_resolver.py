@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from src.entities.product import Product
+from src.repositories.price_list_repository import PriceListRepository
+from src.utils.logger import Logger
+from src.utils.metrics import counter
+
+_CACHE_REQUESTS = counter("pos_cache_requests_total", "Consultas a cachés en memoria", ["cache", "result"])
+_HITS = _CACHE_REQUESTS.labels("price", "hit")
+_RELOADS = _CACHE_REQUESTS.labels("price", "reload")
+_BYPASSES = _CACHE_REQUESTS.labels("price", "bypass")
+
+# (location_id, customer_tier, price) ordenados del más al menos preferido
+Candidates = List[Tuple[Optional[int], Optional[str], float]]
+
+
+class PriceResolver:
+    """
+    Precio aplicable a (producto, sucursal, tipo de cliente, instante) - SRP
+
+    Para el instante actual usa una caché con todos los precios vigentes, válida
+    hasta la próxima apertura o cierre de una ventana de precio o hasta que cambien
+    las listas: cada consulta en caja es una búsqueda en un diccionario. Otros
+    instantes se consultan en la base por el índice (product_id, starts_at).
+
+    Entre listas vigentes gana la de mayor prioridad; a igual prioridad la más
+    específica (sucursal y tipo de cliente) y luego el menor precio. Sin lista
+    aplicable se usa el precio del producto.
+    """
+
+    # Tolerancia para considerar "ahora" un instante pedido por la caja
+    _NOW_TOLERANCE = timedelta(minutes=1)
+
+    def __init__(self, repository: PriceListRepository):
+        self.repository = repository
+        self.logger = Logger(__name__).get_logger()
+        # Cada cuánto se comprueba si otro proceso modificó las listas
+        self.version_check_seconds = float(os.getenv('POS_PRICE_CACHE_CHECK_SECONDS', '30'))
+        self._lock = threading.Lock()
+        self._candidates: Dict[int, Candidates] = {}
+        self._loaded_at: Optional[datetime] = None
+        self._valid_until: Optional[datetime] = None
+        self._version: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+
+    def resolve(self, product: Product, location_id: Optional[int] = None,
+                customer_tier: Optional[str] = None, at: Optional[datetime] = None) -> float:
+        at = at or datetime.now()
+        candidates = self._cached_candidates(product.id, at)
+        if candidates is None:
+            candidates = self._rank(self.repository.get_product_candidates(product.id, at))
+
+        for candidate_location, candidate_tier, price in candidates:
+            if candidate_location not in (None, location_id):
+                continue
+            if candidate_tier not in (None, customer_tier):
+                continue
+            return price
+        return product.price
+
+    def invalidate(self) -> None:
+        """Descarta la caché; la siguiente consulta la reconstruye"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _cached_candidates(self, product_id: int, at: datetime) -> Optional[Candidates]:
+        """Candidatos desde la caché, o None si el instante no es el actual"""
+        with self._lock:
+            if not self._covers(at):
+                if abs(at - datetime.now()) > self._NOW_TOLERANCE:
+                    _BYPASSES.inc()
+                    return None
+                _RELOADS.inc()
+                self._reload(at)
+            else:
+                _HITS.inc()
+            return self._candidates.get(product_id, [])
+
+    def _covers(self, at: datetime) -> bool:
+        if self._loaded_at is None or at < self._loaded_at:
+            return False
+        if self._valid_until is not None and at >= self._valid_until:
+            return False
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.version_check_seconds:
+            self._checked_at = now
+            if self.repository.get_version() != self._version:
+                return False
+        return True
+
+    def _reload(self, at: datetime) -> None:
+        self._version = self.repository.get_version()
+        self._checked_at = time.monotonic()
+        rows = self.repository.get_effective_candidates(at)
+
+        by_product: Dict[int, list] = {}
+        for row in rows:
+            by_product.setdefault(row.product_id, []).append(row)
+        self._candidates = {product_id: self._rank(rows) for product_id, rows in by_product.items()}
+        self._valid_until = self.repository.get_next_boundary(at)
+        self._loaded_at = at
+        self.logger.info(
+            f"Price cache loaded: {len(rows)} effective prices, valid until {self._valid_until or 'changes'}"
+        )
+
+    @staticmethod
+    def _rank(rows) -> Candidates:
+        ranked = sorted(
+            rows,
+            key=lambda row: (
+                -row.priority,
+                -((row.location_id is not None) + (row.customer_tier is not None)),
+                row.price,
+            ),
+        )
+        return [(row.location_id, row.customer_tier, row.price) for row in ranked]
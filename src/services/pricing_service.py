@@ -0,0 +1,60 @@
+from typing import Any, Dict, List
+
+from src.entities.repricing_rule import RepricingRule
+from src.repositories.product_repository import ProductRepository
+from src.utils.logger import Logger
+
+
+class PricingService:
+    """Actualización masiva de precios por reglas - SRP"""
+
+    def __init__(self, repository: ProductRepository):
+        self.repository = repository
+        self.logger = Logger(__name__).get_logger()
+
+    def preview(self, rules: List[RepricingRule]) -> List[Dict[str, Any]]:
+        """Vista previa de los cambios sin persistirlos"""
+        self._validate_rules(rules)
+        return self.repository.preview_reprice(rules)
+
+    def apply(self, rules: List[RepricingRule]) -> int:
+        """Aplica las reglas en una sola transacción y registra el historial"""
+        try:
+            self._validate_rules(rules)
+            changed_count = self.repository.apply_reprice(rules)
+            self.logger.info(f"Repricing with {len(rules)} rules changed {changed_count} prices")
+            return changed_count
+        except Exception as e:
+            self.logger.error(f"Error applying repricing rules: {str(e)}")
+            raise
+
+    def apply_preview(self, rules: List[RepricingRule], preview: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Aplica las reglas solo a los productos de la vista previa; los que cambiaron
+        desde entonces no se tocan y se informan como conflictos
+        """
+        try:
+            self._validate_rules(rules)
+            # Con varias reglas un producto aparece varias veces: vale la versión previa a la primera
+            expected_versions: Dict[int, int] = {}
+            for change in preview:
+                expected_versions.setdefault(change["product_id"], change["version"])
+            changed_count, conflicts = self.repository.apply_previewed_reprice(rules, expected_versions)
+            self.logger.info(
+                f"Repricing preview applied: {changed_count} prices changed, {len(conflicts)} conflicts"
+            )
+            return {"changed": changed_count, "conflicts": len(conflicts)}
+        except Exception as e:
+            self.logger.error(f"Error applying repricing preview: {str(e)}")
+            raise
+
+    def get_price_history(self, product_id: int) -> List[Dict[str, Any]]:
+        return self.repository.get_price_history(product_id)
+
+    def _validate_rules(self, rules: List[RepricingRule]) -> None:
+        if not rules:
+            raise ValueError("Debe definir al menos una regla de precios")
+        for rule in rules:
+            is_valid, message = rule.validate()
+            if not is_valid:
+                raise ValueError(f"Regla inválida: {message}")
@@ -1,17 +1,52 @@
-from typing import List, Optional, Dict, Any
+import threading
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 
 from src.entities.product import Product, ProductCategory
+from src.entities.product_change import ProductChange
+from src.entities.product_filter import ProductFilter
 from src.repositories.product_repository import ProductRepository
 from src.utils.logger import Logger
+from src.utils.metrics import counter, histogram
+
+_OPERATION_SECONDS = histogram("pos_product_service_seconds", "Duración de las operaciones de productos",
+                               ["operation"])
+_OPERATION_ERRORS = counter("pos_product_service_errors_total", "Operaciones de productos con error",
+                            ["operation"])
+_RECOUNT_PRODUCTS = counter("pos_recount_products_total", "Productos procesados en reconteos", ["result"])
+_CACHE_REQUESTS = counter("pos_cache_requests_total", "Consultas a cachés en memoria", ["cache", "result"])
+_FACET_HITS = _CACHE_REQUESTS.labels("product_facets", "hit")
+_FACET_MISSES = _CACHE_REQUESTS.labels("product_facets", "miss")
+
+# Columnas de los archivos de catálogo (exportación y reconteo)
+CATALOG_COLUMNS = ["code", "name", "description", "price", "cost", "category", "supplier", "stock", "is_active"]
+# Columna propia de la orden de compra: un archivo que la trae no es un catálogo
+ORDER_QUANTITY_COLUMN = "order_quantity"
+
+
+def normalize_code(value: Any) -> str:
+    """Código leído de un archivo como texto; Excel guarda los códigos numéricos como float (1234.0 es "1234")"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
 
 
 class ProductService:  
     """Implementación concreta del servicio de productos - Cumple SOLID"""
+
+    _UPDATABLE_FIELDS = [
+        'code', 'name', 'description', 'price', 'cost',
+        'category', 'supplier', 'is_active'
+    ]
     
+    # Conteos de filtros por versión del catálogo, compartidos entre sesiones de Streamlit
+    _facet_cache: Optional[Tuple[int, Dict[str, Dict[Any, int]]]] = None
+    _facet_lock = threading.Lock()
+
     def __init__(self, repository: ProductRepository):
         self.repository = repository
         self.logger = Logger(__name__).get_logger()
     
+    @_OPERATION_SECONDS.timed("create_product")
     def create_product(self, product_data: Dict[str, Any]) -> Product:
         """Crea producto con datos flexibles - Cumple OCP"""
         try:
@@ -25,17 +60,26 @@ class ProductService:
             return self.repository.create(product)
             
         except Exception as e:
+            _OPERATION_ERRORS.labels("create_product").inc()
             self.logger.error(f"Error creating product: {str(e)}")
             raise
     
-    def update_product(self, product_id: int, product_data: Dict[str, Any]) -> Optional[Product]:
-        """Actualiza producto con datos flexibles - Cumple OCP"""
+    @_OPERATION_SECONDS.timed("update_product")
+    def update_product(self, product_id: int, product_data: Dict[str, Any],
+                       expected_version: Optional[int] = None) -> Optional[Product]:
+        """
+        Actualiza producto con datos flexibles - Cumple OCP
+        expected_version es la versión que vio el usuario al empezar a editar; si otro
+        guardó después, el repositorio lanza ProductConflictError.
+        """
         try:
             product = self.repository.get_by_id(product_id)
             if not product:
                 return None
             
             self._update_product_fields(product, product_data)
+            if expected_version is not None:
+                product.version = expected_version
             
             is_valid, message = product.validate()
             if not is_valid:
@@ -44,9 +88,87 @@ class ProductService:
             return self.repository.update(product)
             
         except Exception as e:
+            _OPERATION_ERRORS.labels("update_product").inc()
             self.logger.error(f"Error updating product {product_id}: {str(e)}")
             raise
     
+    @_OPERATION_SECONDS.timed("recount_inventory")
+    def recount_inventory(self, records: Iterable[Dict[str, Any]],
+                          batch_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Reconteo de inventario: inserta o actualiza cada registro con upsert masivo y
+        desactiva los productos que no aparecen. En productos existentes solo se
+        sobrescriben los campos presentes en el registro.
+        Con batch_size los registros se escriben cada batch_size productos, de modo
+        que un archivo grande se procesa en streaming sin retenerlo en memoria.
+        """
+        try:
+            groups: Dict[frozenset, List[Product]] = {}
+            processed_codes = set()
+            counts = {"added": 0, "updated": 0}
+
+            def flush(fields: frozenset, products: List[Product]) -> None:
+                result = self.repository.upsert_many(products, update_fields=fields)
+                counts["added"] += result.inserted_count
+                counts["updated"] += result.updated_count
+                products.clear()
+
+            for record in records:
+                if ORDER_QUANTITY_COLUMN in record:
+                    # Reconteo con la orden de compra desactivaría todo lo que no se pide
+                    raise ValueError(
+                        f"El archivo es una orden de compra (columna {ORDER_QUANTITY_COLUMN}), "
+                        f"no un reconteo de inventario"
+                    )
+                code = normalize_code(record["code"])
+                if code in processed_codes:
+                    continue
+                processed_codes.add(code)
+
+                fields = frozenset(
+                    field for field in record if field in self._UPDATABLE_FIELDS and field != "code"
+                ) | {"is_active"}
+                is_active = record.get("is_active", True)
+                if isinstance(is_active, str):
+                    is_active = is_active.lower() == 'true'
+                product = self._build_product_from_data({
+                    **record,
+                    "code": code,
+                    "name": str(record.get("name", "null")),
+                    "description": str(record.get("description", "null")),
+                    "category": str(record.get("category", ProductCategory.OTROS.value)),
+                    "is_active": is_active,
+                })
+                is_valid, message = product.validate()
+                if not is_valid:
+                    raise ValueError(f"Producto inválido ({code}): {message}")
+                group = groups.setdefault(fields, [])
+                group.append(product)
+                if batch_size and len(group) >= batch_size:
+                    flush(fields, group)
+
+            for fields, products in groups.items():
+                if products:
+                    flush(fields, products)
+
+            added_count = counts["added"]
+            updated_count = counts["updated"]
+            deleted_count = self.repository.deactivate_missing(processed_codes)
+            _RECOUNT_PRODUCTS.labels("added").inc(added_count)
+            _RECOUNT_PRODUCTS.labels("updated").inc(updated_count)
+            _RECOUNT_PRODUCTS.labels("deleted").inc(deleted_count)
+            return {"added": added_count, "updated": updated_count, "deleted": deleted_count}
+
+        except Exception as e:
+            _OPERATION_ERRORS.labels("recount_inventory").inc()
+            self.logger.error(f"Error in inventory recount: {str(e)}")
+            raise
+
+    @_OPERATION_SECONDS.timed("delete_products_by_code")
+    def delete_products_by_code(self, codes: Iterable[Any]) -> Tuple[int, List[str]]:
+        """Elimina (desactiva) en lote; retorna (eliminados, códigos no encontrados)"""
+        return self.repository.deactivate_by_codes(normalize_code(code) for code in codes)
+
     def _validate_required_fields(self, product_data: Dict[str, Any]) -> None:
         """Valida campos requeridos - Cumple SRP"""
         required_fields = [
@@ -83,6 +205,7 @@ class ProductService:
             'description': product_data.get('description', ''),
             'cost': float(product_data.get('cost', 0.0)),
             'category': category,
+            'supplier': str(product_data['supplier']) if product_data.get('supplier') else None,
             'is_active': product_data.get('is_active', True)
         }
         
@@ -90,13 +213,8 @@ class ProductService:
     
     def _update_product_fields(self, product: Product, product_data: Dict[str, Any]) -> None:
         """Actualiza campos del producto - Cumple SRP"""
-        allowed_fields = [
-            'code', 'name', 'description', 'price', 'cost',
-            'category', 'is_active'
-        ]
-        
         for field, value in product_data.items():
-            if field in allowed_fields and hasattr(product, field):
+            if field in self._UPDATABLE_FIELDS and hasattr(product, field):
                 if field in ['price', 'cost']:
                     value = float(value)
                 elif field == 'is_active' and isinstance(value, str):
@@ -115,6 +233,7 @@ class ProductService:
     def get_product_by_code_any_status(self, code: str) -> Optional[Product]:
         return self.repository.get_by_code_any_status(code)
     
+    @_OPERATION_SECONDS.timed("get_all_products")
     def get_all_products(self) -> List[Product]:
         return self.repository.get_all()
 
@@ -124,12 +243,41 @@ class ProductService:
     def delete_product(self, product_id: int) -> bool:
         return self.repository.delete(product_id)
 
+    def iter_catalog(self, active_only: bool = True, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        return self.repository.iter_catalog(active_only, batch_size)
+
+    def get_changes_since(self, seq: int, limit: int = 1000) -> List[ProductChange]:
+        """Cambios posteriores a seq para refrescos incrementales"""
+        return self.repository.changes_since(seq, limit)
+
+    def get_catalog_version(self) -> int:
+        return self.repository.get_latest_change_seq()
+
+    @_OPERATION_SECONDS.timed("search_products")
     def search_products(self, search_term: str) -> List[Product]:
-        all_products = self.repository.get_all_any_status()
-        search_term_lower = search_term.lower()
-        
-        return [
-            product for product in all_products
-            if (search_term_lower in product.name.lower() or 
-                search_term_lower in (product.code or "").lower())
-        ]
+        return self.repository.search(search_term)
+
+    @_OPERATION_SECONDS.timed("filter_products")
+    def filter_products(self, product_filter: ProductFilter, limit: int = 500) -> List[Product]:
+        """Hasta limit productos que cumplen el filtro, ordenados por categoría y nombre"""
+        is_valid, message = product_filter.validate()
+        if not is_valid:
+            raise ValueError(f"Filtro inválido: {message}")
+        return self.repository.filter(product_filter, limit)
+
+    def get_facet_counts(self) -> Dict[str, Dict[Any, int]]:
+        """
+        Productos por categoría, proveedor y estado. Se recalculan solo cuando cambia
+        el catálogo; entre cambios cada recarga de la lista cuesta una consulta indexada.
+        """
+        version = self.repository.get_facet_version()
+        with self._facet_lock:
+            cached = ProductService._facet_cache
+            if cached and cached[0] == version:
+                _FACET_HITS.inc()
+                return cached[1]
+        _FACET_MISSES.inc()
+        facets = self.repository.facet_counts()
+        with self._facet_lock:
+            ProductService._facet_cache = (version, facets)
+        return facets
@@ -0,0 +1,229 @@
+"""
+Sugerencias de reposición a partir de la velocidad de venta.
+
+Por producto (total de la empresa) y por sucursal: demanda diaria promedio en
+los últimos POS_REPLENISH_LOOKBACK_DAYS días, días de cobertura del stock,
+punto de pedido y cantidad sugerida. Se calcula para todo el catálogo en una
+pasada vectorizada sobre la demanda agregada (una consulta), no con una
+consulta por producto.
+
+    punto de pedido = demanda diaria × (plazo de entrega + días de seguridad)
+    stock objetivo  = demanda diaria × (plazo + seguridad + días de cobertura)
+    sugerido        = stock objetivo - stock, si el stock llegó al punto de pedido
+
+Variables de entorno:
+    POS_REPLENISH_LOOKBACK_DAYS=28   días de historia de ventas
+    POS_REPLENISH_LEAD_DAYS=7        plazo de entrega del proveedor
+    POS_REPLENISH_SAFETY_DAYS=3      stock de seguridad, en días de demanda
+    POS_REPLENISH_COVER_DAYS=14      días de venta que cubre cada pedido
+"""
+import io
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.services.product_service import ORDER_QUANTITY_COLUMN
+from src.utils.logger import Logger
+from src.utils.metrics import counter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_CACHE_REQUESTS = counter("pos_cache_requests_total", "Consultas a cachés en memoria", ["cache", "result"])
+_PLAN_HITS = _CACHE_REQUESTS.labels("replenishment", "hit")
+_PLAN_MISSES = _CACHE_REQUESTS.labels("replenishment", "miss")
+_ORDER_HITS = _CACHE_REQUESTS.labels("purchase_order_xlsx", "hit")
+_ORDER_MISSES = _CACHE_REQUESTS.labels("purchase_order_xlsx", "miss")
+
+# Distintas de las del catálogo: el reconteo rechaza un archivo con order_quantity
+PURCHASE_ORDER_COLUMNS = ["code", "name", "category", "supplier", "cost", ORDER_QUANTITY_COLUMN]
+
+
+class ReplenishmentPlan:
+    """Sugerencias por producto y sucursal; location_id NaN es el total de la empresa"""
+
+    def __init__(self, version: Tuple[Any, ...], suggestions: "pd.DataFrame",
+                 parameters: Dict[str, int]):
+        self.version = version
+        self.suggestions = suggestions
+        self.parameters = parameters
+
+    def for_location(self, location_id: Optional[int] = None,
+                     only_to_order: bool = False) -> "pd.DataFrame":
+        """Filas de una sucursal (None: total de la empresa); only_to_order deja las que hay que pedir"""
+        frame = self.suggestions
+        if location_id is None:
+            mask = frame["location_id"].isna()
+        else:
+            mask = frame["location_id"] == location_id
+        if only_to_order:
+            mask &= frame["suggested_qty"] > 0
+        return frame[mask]
+
+
+class ReplenishmentService:
+    """
+    Reposición por velocidad de venta - SRP
+    El resultado queda en caché hasta que lleguen ventas nuevas o cambie el
+    inventario (misma versión que la valorización) o cambie el día.
+    """
+
+    # Caché compartida entre sesiones de Streamlit del mismo proceso
+    _cache: Dict[str, Any] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, product_repository: ProductRepository, sale_repository: SaleRepository,
+                 location_repository: LocationRepository, lookback_days: Optional[int] = None,
+                 lead_days: Optional[int] = None, safety_days: Optional[int] = None,
+                 cover_days: Optional[int] = None):
+        self.product_repository = product_repository
+        self.sale_repository = sale_repository
+        self.location_repository = location_repository
+        self.parameters = {
+            "lookback_days": lookback_days or int(os.getenv("POS_REPLENISH_LOOKBACK_DAYS", "28")),
+            "lead_days": lead_days if lead_days is not None else int(os.getenv("POS_REPLENISH_LEAD_DAYS", "7")),
+            "safety_days": safety_days if safety_days is not None else int(
+                os.getenv("POS_REPLENISH_SAFETY_DAYS", "3")),
+            "cover_days": cover_days if cover_days is not None else int(os.getenv("POS_REPLENISH_COVER_DAYS", "14")),
+        }
+        if self.parameters["lookback_days"] < 1:
+            raise ValueError("La historia de ventas debe ser de al menos un día")
+        if min(self.parameters.values()) < 0:
+            raise ValueError("Los días de reposición no pueden ser negativos")
+        self.logger = Logger(__name__).get_logger()
+
+    def get_plan(self) -> ReplenishmentPlan:
+        # El día entra en la versión: la ventana de historia avanza aunque no haya ventas
+        version = (self.product_repository.get_inventory_version(), date.today(),
+                   *self.parameters.values())
+        with self._cache_lock:
+            cached: Optional[ReplenishmentPlan] = self._cache.get("plan")
+            if cached and cached.version == version:
+                _PLAN_HITS.inc()
+                return cached
+        _PLAN_MISSES.inc()
+
+        since = datetime.combine(date.today(), datetime.min.time()) - timedelta(
+            days=self.parameters["lookback_days"])
+        plan = self._compute(
+            version,
+            self.product_repository.get_catalog_snapshot(),
+            self.sale_repository.demand_by_location(since),
+            self.location_repository.get_stock_snapshot(),
+            {location.id: location.code for location in self.location_repository.get_all()},
+        )
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache["plan"] = plan
+        self.logger.info(f"Replenishment computed: {len(plan.suggestions)} product/location rows")
+        return plan
+
+    def export_purchase_order(self, location_id: Optional[int] = None) -> bytes:
+        """
+        Orden de compra en XLSX (PURCHASE_ORDER_COLUMNS, order_quantity es la cantidad
+        a pedir). La hoja Detalle agrega demanda, cobertura y punto de pedido.
+        """
+        import pandas as pd
+        plan = self.get_plan()
+        key = f"xlsx:{location_id}"
+        with self._cache_lock:
+            export = self._cache.get(key)
+            if export and export[0] == plan.version:
+                _ORDER_HITS.inc()
+                return export[1]
+        _ORDER_MISSES.inc()
+
+        rows = plan.for_location(location_id, only_to_order=True)
+        order = pd.DataFrame({
+            "code": rows["code"],
+            "name": rows["name"],
+            "category": rows["category"],
+            "supplier": rows["supplier"],
+            "cost": rows["cost"],
+            ORDER_QUANTITY_COLUMN: rows["suggested_qty"],
+        }, columns=PURCHASE_ORDER_COLUMNS)
+
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            order.to_excel(writer, sheet_name="Orden de compra", index=False)
+            rows.drop(columns=["location_id", "product_id"]).to_excel(writer, sheet_name="Detalle", index=False)
+        data = buffer.getvalue()
+
+        with self._cache_lock:
+            self._cache[key] = (plan.version, data)
+        return data
+
+    def _compute(self, version: Tuple[Any, ...], catalog: Dict[str, list], demand: Dict[str, list],
+                 location_stock: Dict[str, list], location_codes: Dict[int, str]) -> ReplenishmentPlan:
+        import numpy as np
+        import pandas as pd
+        products = pd.Index(catalog["id"])
+        demand_product = products.get_indexer(demand["product_id"])
+        demand_quantity = np.asarray(demand["quantity"], dtype=np.float64)
+        # Productos inactivos (-1) quedan fuera
+        known = demand_product >= 0
+
+        # Total de la empresa: products.stock contra toda la demanda, con o sin sucursal
+        total_sold = np.bincount(demand_product[known], weights=demand_quantity[known],
+                                 minlength=len(products))
+        total_rows = pd.DataFrame({
+            "location_id": np.full(len(products), np.nan),
+            "row": np.arange(len(products)),
+            "stock": np.asarray(catalog["stock"], dtype=np.float64),
+            "sold": total_sold,
+        })
+
+        # Por sucursal: filas de location_stock más las ventas de productos sin fila de stock
+        located = known & np.asarray([value is not None for value in demand["location_id"]], dtype=bool)
+        location_sold = pd.DataFrame({
+            "location_id": np.asarray(demand["location_id"], dtype=object)[located].astype(np.float64),
+            "row": demand_product[located],
+            "sold": demand_quantity[located],
+        })
+        stock_rows = products.get_indexer(location_stock["product_id"])
+        in_catalog = stock_rows >= 0
+        location_rows = pd.DataFrame({
+            "location_id": np.asarray(location_stock["location_id"], dtype=np.float64)[in_catalog],
+            "row": stock_rows[in_catalog],
+            "stock": np.asarray(location_stock["quantity"], dtype=np.float64)[in_catalog],
+        }).merge(location_sold, on=["location_id", "row"], how="outer")
+        # Sucursales desactivadas no tienen stock en la foto: tampoco se sugieren
+        location_rows = location_rows[location_rows["location_id"].isin(list(location_codes))]
+
+        frame = pd.concat([total_rows, location_rows], ignore_index=True)
+        row = frame["row"].to_numpy(dtype=np.int64)
+        stock = np.clip(frame["stock"].fillna(0).to_numpy(), 0, None)
+        sold = np.clip(frame["sold"].fillna(0).to_numpy(), 0, None)
+
+        parameters = self.parameters
+        daily = sold / parameters["lookback_days"]
+        selling = daily > 0
+        reorder_point = np.ceil(daily * (parameters["lead_days"] + parameters["safety_days"]))
+        target = np.ceil(daily * (parameters["lead_days"] + parameters["safety_days"] + parameters["cover_days"]))
+        suggested = np.where(selling & (stock <= reorder_point), np.clip(target - stock, 0, None), 0)
+        days_of_cover = np.divide(stock, daily, out=np.full(len(frame), np.nan), where=selling)
+        cost = np.asarray(catalog["cost"], dtype=np.float64)[row]
+
+        suggestions = pd.DataFrame({
+            "location_id": frame["location_id"].to_numpy(),
+            "location": frame["location_id"].map(location_codes).fillna("").to_numpy(),
+            "product_id": np.asarray(catalog["id"])[row],
+            "code": np.asarray(catalog["code"], dtype=object)[row],
+            "name": np.asarray(catalog["name"], dtype=object)[row],
+            "category": np.asarray(catalog["category"], dtype=object)[row],
+            "supplier": np.asarray(catalog["supplier"], dtype=object)[row],
+            "price": np.asarray(catalog["price"], dtype=np.float64)[row],
+            "cost": cost,
+            "stock": stock.astype(np.int64),
+            "sold": sold.astype(np.int64),
+            "avg_daily_demand": daily,
+            "days_of_cover": days_of_cover,
+            "reorder_point": reorder_point.astype(np.int64),
+            "suggested_qty": suggested.astype(np.int64),
+            "order_cost": suggested * cost,
+        })
+        return ReplenishmentPlan(version, suggestions, dict(parameters))
@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database.till_journal import TillJournal
+from src.database.write_coordinator import WriteCoordinator
+from src.entities.invoice import Invoice, InvoiceItem
+from src.entities.product import Product
+from src.repositories.sale_repository import SaleRepository
+from src.services.price_resolver import PriceResolver
+from src.utils.logger import Logger
+
+DEFAULT_TAX_RATE = 0.19
+
+
+class SalesService:
+    """
+    Registro de ventas finalizadas - SRP
+    En modo caja (con journal) las ventas se encolan localmente y se envían
+    a la base central con TillSyncService. Con location_id las ventas descuentan
+    el stock de esa sucursal; con price_resolver se cobran los precios de las
+    listas vigentes. Con write_coordinator las ventas y anulaciones de todas
+    las sesiones se confirman en grupo desde un solo hilo escritor.
+    """
+
+    def __init__(self, repository: SaleRepository, journal: Optional[TillJournal] = None,
+                 location_id: Optional[int] = None, price_resolver: Optional[PriceResolver] = None,
+                 write_coordinator: Optional[WriteCoordinator] = None, location_code: Optional[str] = None):
+        self.repository = repository
+        self.journal = journal
+        self.location_id = location_id
+        # Código de la sucursal location_id: con él se encolan las ventas del modo caja
+        self.location_code = location_code
+        self.price_resolver = price_resolver
+        self.write_coordinator = write_coordinator
+        self.logger = Logger(__name__).get_logger()
+
+    def build_item(self, product: Product, quantity: int, tax_rate: float = DEFAULT_TAX_RATE,
+                   customer_tier: Optional[str] = None) -> InvoiceItem:
+        """Línea de venta con el precio y costo vigentes del producto"""
+        unit_price = product.price
+        if self.price_resolver:
+            unit_price = self.price_resolver.resolve(product, self.location_id, customer_tier)
+        return InvoiceItem(
+            product_id=product.id,
+            product_name=product.name,
+            quantity=quantity,
+            unit_price=unit_price,
+            tax_rate=tax_rate,
+            unit_cost=product.cost,
+            category=product.category.value,
+            product_code=product.code,
+        )
+
+    def finalize_sale(self, invoice: Invoice) -> Invoice:
+        """Valida y registra la venta; actualiza stock y resúmenes en la misma transacción"""
+        try:
+            is_valid, message = invoice.validate()
+            if not is_valid:
+                raise ValueError(f"Venta inválida: {message}")
+
+            if not invoice.invoice_number:
+                invoice.invoice_number = self._new_invoice_number(invoice.created_at)
+            if invoice.location_id is None:
+                invoice.location_id = self.location_id
+
+            if self.journal:
+                if invoice.location_id not in (None, self.location_id):
+                    raise ValueError("En modo caja las ventas son de la sucursal de la caja (POS_LOCATION)")
+                self.journal.enqueue_sale(invoice, self.location_code if invoice.location_id else None)
+                return invoice
+
+            if self.write_coordinator:
+                return self.write_coordinator.submit_batched(self._create_sales, invoice).result()
+            return self.repository.create(invoice)
+
+        except Exception as e:
+            self.logger.error(f"Error finalizing sale: {str(e)}")
+            raise
+
+    def cancel_sale(self, invoice_id: int) -> bool:
+        if self.write_coordinator:
+            return self.write_coordinator.execute(
+                lambda session: self.repository.with_session(session).delete(invoice_id)
+            )
+        return self.repository.delete(invoice_id)
+
+    def get_sale(self, invoice_id: int) -> Optional[Invoice]:
+        return self.repository.get_by_id(invoice_id)
+
+    def get_all_sales(self) -> List[Invoice]:
+        return self.repository.get_all()
+
+    @staticmethod
+    def _create_sales(session: Session, invoices: List[Invoice]) -> List[Any]:
+        """Ventas de todas las cajas de un grupo del WriteCoordinator en un solo create_many"""
+        created = {id(invoice) for invoice in SaleRepository(session).create_many(invoices)}
+        return [
+            invoice if id(invoice) in created
+            else ValueError(f"La factura {invoice.invoice_number} ya fue registrada")
+            for invoice in invoices
+        ]
+
+    def _new_invoice_number(self, created_at: datetime) -> str:
+        return f"F-{created_at.strftime('%Y%m%d')}-{uuid.uuid4().hex[:8].upper()}"
@@ -0,0 +1,225 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.database.database import Database
+from src.database.till_journal import STOCK_COUNT, TillJournal
+from src.entities.invoice import Invoice
+from src.entities.product_change import ChangeOperation
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.utils.logger import Logger
+
+CENTRAL_SEQ_KEY = "central_change_seq"
+# upsert_many no copia el stock: los cambios solo de stock de la central no interesan
+_CATALOG_OPERATIONS = (ChangeOperation.CREATE, ChangeOperation.UPDATE, ChangeOperation.DELETE,
+                       ChangeOperation.REPRICE)
+
+
+class TillSyncService:
+    """
+    Sincroniza el diario de la caja con la base central - SRP
+
+    Envío: las ventas pendientes viajan en lotes a SaleRepository.create_many;
+    el número de factura es único, así que reenviar un lote no duplica ventas.
+    Conflictos: los productos se resuelven por código; si el código no existe en la
+    central la venta queda pendiente, si el precio difiere se conserva el precio
+    cobrado y se informa, y si el stock central queda negativo también se informa.
+    Sucursales: la caja guarda el código de la sucursal de cada venta y aquí se resuelve
+    al id de la central (los ids de sucursal de la caja y de la central pueden diferir);
+    si el código no existe en la central, la venta queda pendiente.
+    Stock: los conteos y transferencias se aplican en el orden en que se hicieron;
+    antes de cada uno se envían las ventas anteriores, así un conteo no descarta
+    ventas hechas después de contar. Cada uno lleva un id único que la central
+    registra al aplicarlo: si la marca en el diario se pierde, reenviarlo no lo repite. Productos y sucursales se resuelven por código;
+    si no existen en la central, o la transferencia no tiene stock, quedan pendientes.
+    Recepción: los productos cambiados en la central desde la última sincronización
+    (changes_since) se copian al catálogo local para que la caja cobre precios vigentes.
+    """
+
+    def __init__(self, journal: TillJournal, central_db: Database,
+                 local_product_repository: ProductRepository):
+        self.journal = journal
+        self.central_db = central_db
+        self.local_product_repository = local_product_repository
+        self.logger = Logger(__name__).get_logger()
+
+    def pending_count(self) -> int:
+        return self.journal.pending_count()
+
+    def pending_stock_count(self) -> int:
+        return self.journal.pending_stock_count()
+
+    def sync(self, batch_size: int = 1000) -> Dict[str, Any]:
+        report: Dict[str, Any] = {
+            "synced": 0,
+            "duplicates": 0,
+            "rejected": [],
+            "price_conflicts": [],
+            "stock_conflicts": [],
+            "stock_operations": 0,
+            "duplicate_operations": 0,
+            "rejected_operations": [],
+            "catalog_updates": 0,
+        }
+        session = self.central_db.get_session()
+        read_session = self.central_db.get_read_session()
+        try:
+            central_products = ProductRepository(session, read_session)
+            central_sales = SaleRepository(session, read_session)
+            central_locations = LocationRepository(session, read_session)
+
+            pusher = _SalePusher(self.journal, central_products, central_sales, central_locations, report)
+            for operation in self.journal.pending_stock_operations():
+                pusher.push(batch_size, before=operation["created_at"])
+                self._apply_stock_operation(operation, central_products, central_locations, report)
+            pusher.push(batch_size)
+
+            report["catalog_updates"] = self._pull_catalog(central_products)
+            self.logger.info(
+                f"Till sync: {report['synced']} synced, {report['duplicates']} duplicates, "
+                f"{len(report['rejected'])} rejected, {report['stock_operations']} stock operations, "
+                f"{report['catalog_updates']} catalog updates"
+            )
+            return report
+
+        except Exception as e:
+            self.logger.error(f"Error syncing till journal: {str(e)}")
+            raise
+        finally:
+            session.close()
+            read_session.close()
+
+    def _apply_stock_operation(self, operation: Dict[str, Any], central_products: ProductRepository,
+                               central_locations: LocationRepository, report: Dict[str, Any]) -> None:
+        try:
+            product_id = central_products.get_id_by_code(operation["product_code"])
+            if product_id is None:
+                raise ValueError(f"No existe un producto con el código: {operation['product_code']}")
+            operation_id = operation.get("operation_id")
+            if operation["operation"] == STOCK_COUNT:
+                location = self._central_location(central_locations, operation["location_code"])
+                applied = central_locations.set_stock(
+                    location.id, product_id, operation["quantity"], operation_id
+                ) is not None
+            else:
+                source = self._central_location(central_locations, operation["from_location_code"])
+                target = self._central_location(central_locations, operation["to_location_code"])
+                applied = central_locations.transfer_stock(
+                    source.id, target.id, product_id, operation["quantity"], operation_id
+                )
+        except ValueError as e:
+            report["rejected_operations"].append({
+                "operation": operation["operation"], "code": operation["product_code"], "error": str(e),
+            })
+            return
+        self.journal.mark_stock_operation_synced(operation["id"])
+        report["stock_operations" if applied else "duplicate_operations"] += 1
+
+    def _central_location(self, central_locations: LocationRepository, code: str):
+        location = central_locations.get_by_code(code)
+        if location is None:
+            raise ValueError(f"No existe la sucursal {code} en la base central")
+        return location
+
+    def _pull_catalog(self, central_products: ProductRepository, batch_size: int = 5000) -> int:
+        last_seq = int(self.journal.get_state(CENTRAL_SEQ_KEY, "0"))
+        # Leído antes: los cambios de stock hasta aquí no se vuelven a recorrer
+        latest_seq = central_products.get_latest_change_seq()
+        updated = 0
+        while True:
+            changes = central_products.changes_since(last_seq, batch_size, _CATALOG_OPERATIONS)
+            if not changes:
+                break
+            last_seq = changes[-1].seq
+            products = central_products.get_by_ids(change.product_id for change in changes)
+            if products:
+                result = self.local_product_repository.upsert_many(products)
+                updated += result.inserted_count + result.updated_count
+            self.journal.set_state(CENTRAL_SEQ_KEY, str(last_seq))
+        if latest_seq > last_seq:
+            self.journal.set_state(CENTRAL_SEQ_KEY, str(latest_seq))
+        return updated
+
+
+class _SalePusher:
+    """
+    Envío de las ventas del diario a la central durante una sincronización; recuerda
+    las sucursales ya resueltas y las ventas rechazadas ya informadas
+    """
+
+    def __init__(self, journal: TillJournal, central_products: ProductRepository,
+                 central_sales: SaleRepository, central_locations: LocationRepository,
+                 report: Dict[str, Any]):
+        self.journal = journal
+        self.central_products = central_products
+        self.central_sales = central_sales
+        self.central_locations = central_locations
+        self.report = report
+        self.location_ids: Dict[str, Optional[int]] = {}
+        # Una venta rechazada vuelve a leerse en cada pasada; se informa una sola vez
+        self.rejected: Set[str] = set()
+
+    def push(self, batch_size: int, before: Optional[datetime] = None) -> None:
+        """Envía las ventas pendientes (con before, solo las anteriores a ese momento)"""
+        after_id = 0
+        while True:
+            batch = self.journal.pending_sales(batch_size, after_id, before)
+            if not batch:
+                break
+            after_id = batch[-1][0]
+            self._push_batch([(invoice, location_code) for _, invoice, location_code in batch])
+
+    def _push_batch(self, sales: List[Tuple[Invoice, Optional[str]]]) -> None:
+        codes = {item.product_code for invoice, _ in sales for item in invoice.items}
+        products = {product.code: product for product in self.central_products.get_by_codes(codes)}
+
+        accepted = []
+        for invoice, location_code in sales:
+            missing = [item.product_code for item in invoice.items if item.product_code not in products]
+            if missing:
+                self._reject(invoice, {"missing_codes": missing})
+                continue
+            if location_code is not None:
+                invoice.location_id = self._location_id(location_code)
+                if invoice.location_id is None:
+                    self._reject(invoice, {"missing_location": location_code})
+                    continue
+
+            for item in invoice.items:
+                product = products[item.product_code]
+                if abs(product.price - item.unit_price) > 0.005:
+                    self.report["price_conflicts"].append({
+                        "invoice_number": invoice.invoice_number,
+                        "code": product.code,
+                        "till_price": item.unit_price,
+                        "central_price": product.price,
+                    })
+                item.product_id = product.id
+                item.category = product.category.value
+                item.unit_cost = product.cost
+            accepted.append(invoice)
+
+        created = self.central_sales.create_many(accepted)
+        self.report["synced"] += len(created)
+        self.report["duplicates"] += len(accepted) - len(created)
+        # Las duplicadas ya están en la central: también se marcan como enviadas
+        self.journal.mark_synced(invoice.invoice_number for invoice in accepted)
+
+        touched_ids = {item.product_id for invoice in created for item in invoice.items}
+        self.report["stock_conflicts"].extend(
+            {"code": product.code, "stock": product.stock}
+            for product in self.central_products.get_by_ids(touched_ids)
+            if product.stock < 0
+        )
+
+    def _location_id(self, code: str) -> Optional[int]:
+        if code not in self.location_ids:
+            location = self.central_locations.get_by_code(code)
+            self.location_ids[code] = location.id if location is not None else None
+        return self.location_ids[code]
+
+    def _reject(self, invoice: Invoice, reason: Dict[str, Any]) -> None:
+        if invoice.invoice_number not in self.rejected:
+            self.rejected.add(invoice.invoice_number)
+            self.report["rejected"].append({"invoice_number": invoice.invoice_number, **reason})
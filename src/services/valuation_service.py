@@ -0,0 +1,133 @@
+import io
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from src.repositories.product_repository import ProductRepository
+from src.utils.logger import Logger
+from src.utils.metrics import counter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_CACHE_REQUESTS = counter("pos_cache_requests_total", "Consultas a cachés en memoria", ["cache", "result"])
+_VALUATION_HITS = _CACHE_REQUESTS.labels("valuation", "hit")
+_VALUATION_MISSES = _CACHE_REQUESTS.labels("valuation", "miss")
+_EXPORT_HITS = _CACHE_REQUESTS.labels("valuation_xlsx", "hit")
+_EXPORT_MISSES = _CACHE_REQUESTS.labels("valuation_xlsx", "miss")
+
+
+class InventoryValuation:
+    """Resultado de la valorización: por producto, por categoría y totales"""
+
+    def __init__(self, version: int, products: "pd.DataFrame",
+                 categories: "pd.DataFrame", totals: Dict[str, float]):
+        self.version = version
+        self.products = products
+        self.categories = categories
+        self.totals = totals
+
+
+class ValuationService:
+    """
+    Márgenes y valorización de inventario - SRP
+    Calcula sobre columnas NumPy del catálogo completo y guarda el resultado
+    en caché hasta que cambie la versión del inventario (catálogo o stock).
+    """
+
+    # Caché compartida entre sesiones de Streamlit del mismo proceso
+    _cache: Dict[str, Any] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, repository: ProductRepository):
+        self.repository = repository
+        self.logger = Logger(__name__).get_logger()
+
+    def get_valuation(self) -> InventoryValuation:
+        version = self.repository.get_inventory_version()
+        with self._cache_lock:
+            cached: Optional[InventoryValuation] = self._cache.get("valuation")
+            if cached and cached.version == version:
+                _VALUATION_HITS.inc()
+                return cached
+        _VALUATION_MISSES.inc()
+
+        valuation = self._compute(version, self.repository.get_catalog_snapshot())
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache["valuation"] = valuation
+        self.logger.info(f"Inventory valuation computed for {len(valuation.products)} products")
+        return valuation
+
+    def export_xlsx(self) -> bytes:
+        """XLSX con hojas por categoría y por producto; se genera una vez por versión"""
+        import pandas as pd
+        valuation = self.get_valuation()
+        with self._cache_lock:
+            export = self._cache.get("xlsx")
+            if export and export[0] == valuation.version:
+                _EXPORT_HITS.inc()
+                return export[1]
+        _EXPORT_MISSES.inc()
+
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+            valuation.categories.to_excel(writer, sheet_name="Categorias", index=False)
+            valuation.products.to_excel(writer, sheet_name="Productos", index=False)
+        data = buffer.getvalue()
+
+        with self._cache_lock:
+            self._cache["xlsx"] = (valuation.version, data)
+        return data
+
+    def _compute(self, version: int, snapshot: Dict[str, list]) -> InventoryValuation:
+        import numpy as np
+        import pandas as pd
+        price = np.asarray(snapshot["price"], dtype=np.float64)
+        cost = np.asarray(snapshot["cost"], dtype=np.float64)
+        # Stock negativo (ventas sin existencias registradas) no suma valor
+        stock = np.clip(np.asarray(snapshot["stock"], dtype=np.float64), 0, None)
+
+        margin = price - cost
+        margin_pct = np.divide(margin, price, out=np.zeros_like(margin), where=price != 0) * 100
+        markup_pct = np.divide(margin, cost, out=np.zeros_like(margin), where=cost != 0) * 100
+
+        products = pd.DataFrame({
+            "code": snapshot["code"],
+            "name": snapshot["name"],
+            "category": snapshot["category"],
+            "supplier": snapshot["supplier"],
+            "price": price,
+            "cost": cost,
+            "stock": stock,
+            "margin": margin,
+            "margin_pct": margin_pct,
+            "markup_pct": markup_pct,
+            "value_at_cost": stock * cost,
+            "value_at_retail": stock * price,
+        })
+
+        categories = products.groupby("category", as_index=False).agg(
+            products=("code", "size"),
+            stock=("stock", "sum"),
+            value_at_cost=("value_at_cost", "sum"),
+            value_at_retail=("value_at_retail", "sum"),
+            avg_margin_pct=("margin_pct", "mean"),
+        )
+        categories["potential_margin"] = categories["value_at_retail"] - categories["value_at_cost"]
+        retail = categories["value_at_retail"].to_numpy()
+        categories["margin_pct"] = np.divide(
+            categories["potential_margin"].to_numpy(), retail,
+            out=np.zeros(len(categories)), where=retail != 0
+        ) * 100
+
+        value_at_cost = float(products["value_at_cost"].sum())
+        value_at_retail = float(products["value_at_retail"].sum())
+        totals = {
+            "products": len(products),
+            "stock": float(stock.sum()),
+            "value_at_cost": value_at_cost,
+            "value_at_retail": value_at_retail,
+            "potential_margin": value_at_retail - value_at_cost,
+            "margin_pct": (value_at_retail - value_at_cost) / value_at_retail * 100 if value_at_retail else 0.0,
+        }
+        return InventoryValuation(version, products, categories, totals)
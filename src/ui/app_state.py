@@ -1,12 +1,38 @@
+import os
+import weakref
 from typing import Optional
 
 import streamlit as st
 from abc import ABC, abstractmethod
 
 from src.database.database import Database
+from src.database.till_journal import TillJournal
+from src.entities.location import Location
+from src.repositories.duplicate_repository import DuplicateRepository
+from src.repositories.location_repository import LocationRepository
+from src.repositories.price_list_repository import PriceListRepository
 from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.repositories.stock_ledger_repository import StockLedgerRepository
+from src.services.analytics_service import AnalyticsService
+from src.services.duplicate_service import DuplicateService
+from src.services.inventory_history_service import InventoryHistoryService
+from src.services.location_service import LocationService
+from src.services.price_list_service import PriceListService
+from src.services.price_resolver import PriceResolver
+from src.services.pricing_service import PricingService
 from src.services.product_service import ProductService
+from src.services.replenishment_service import ReplenishmentService
+from src.services.sales_service import SalesService
+from src.services.till_sync_service import TillSyncService
+from src.services.valuation_service import ValuationService
 from src.utils.logger import Logger
+from src.utils.metrics import gauge
+from src.utils.profiler import profiling_enabled
+
+# Estados vivos de sesiones de Streamlit; se liberan al cerrarse la sesión
+_ACTIVE_SESSIONS = weakref.WeakSet()
+gauge("pos_ui_sessions_active", "Sesiones de Streamlit abiertas", function=lambda: len(_ACTIVE_SESSIONS))
 
 
 class IAppState(ABC):
@@ -16,6 +42,47 @@ class IAppState(ABC):
     def get_product_service(self) -> ProductService:
         pass
 
+    @abstractmethod
+    def get_pricing_service(self) -> PricingService:
+        pass
+
+    @abstractmethod
+    def get_sales_service(self) -> SalesService:
+        pass
+
+    @abstractmethod
+    def get_analytics_service(self) -> AnalyticsService:
+        pass
+
+    @abstractmethod
+    def get_valuation_service(self) -> ValuationService:
+        pass
+
+    @abstractmethod
+    def get_replenishment_service(self) -> ReplenishmentService:
+        pass
+
+    @abstractmethod
+    def get_inventory_history_service(self) -> InventoryHistoryService:
+        pass
+
+    @abstractmethod
+    def get_duplicate_service(self) -> DuplicateService:
+        pass
+
+    @abstractmethod
+    def get_location_service(self) -> LocationService:
+        pass
+
+    @abstractmethod
+    def get_price_list_service(self) -> PriceListService:
+        pass
+
+    @abstractmethod
+    def get_till_sync_service(self) -> Optional[TillSyncService]:
+        """Servicio de sincronización; None si la app no está en modo caja"""
+        pass
+
     @abstractmethod
     def get_selected_product_id(self) -> Optional[int]:
         pass
@@ -24,6 +91,10 @@ class IAppState(ABC):
     def set_selected_product_id(self, product_id: Optional[int]) -> None:
         pass
 
+    @abstractmethod
+    def is_profiling_enabled(self) -> bool:
+        pass
+
 
 class StreamlitAppState(IAppState):
     """Implementación concreta del estado para Streamlit - SRP"""
@@ -31,6 +102,7 @@ class StreamlitAppState(IAppState):
     def __init__(self):
         self.logger = Logger(__name__).get_logger()
         self._initialize_services()
+        _ACTIVE_SESSIONS.add(self)
     
     def _initialize_services(self):
         """Inicializa todos los servicios necesarios - SRP"""
@@ -38,27 +110,117 @@ class StreamlitAppState(IAppState):
             db = Database()
             db.create_tables()
             session = db.get_session()
+            read_session = db.get_read_session()
             
             # Repositories
-            product_repo = ProductRepository(session)
+            product_repo = ProductRepository(session, read_session)
+            sale_repo = SaleRepository(session, read_session)
+            location_repo = LocationRepository(session, read_session)
+            price_list_repo = PriceListRepository(session, read_session)
+            stock_ledger_repo = StockLedgerRepository(session, read_session)
+            duplicate_repo = DuplicateRepository(session, read_session)
 
             # Services
+            till_journal, till_sync_service = self._initialize_till_mode(product_repo)
             product_service = ProductService(product_repo)
+            pricing_service = PricingService(product_repo)
+            location_service = LocationService(location_repo, product_repo, till_journal)
+            price_resolver = PriceResolver(price_list_repo)
+            price_list_service = PriceListService(price_list_repo, product_repo, price_resolver, location_repo)
+            current_location = self._current_location(location_repo)
+            sales_service = SalesService(
+                sale_repo, till_journal, current_location.id if current_location else None, price_resolver,
+                db.get_write_coordinator(), current_location.code if current_location else None
+            )
+            analytics_service = AnalyticsService(sale_repo)
+            valuation_service = ValuationService(product_repo)
+            replenishment_service = ReplenishmentService(product_repo, sale_repo, location_repo)
+            inventory_history_service = InventoryHistoryService(stock_ledger_repo, product_repo)
+            duplicate_service = DuplicateService(duplicate_repo, product_repo)
             
             # Session state
             st.session_state.product_service = product_service
+            st.session_state.pricing_service = pricing_service
+            st.session_state.sales_service = sales_service
+            st.session_state.location_service = location_service
+            st.session_state.price_list_service = price_list_service
+            st.session_state.till_sync_service = till_sync_service
+            st.session_state.analytics_service = analytics_service
+            st.session_state.valuation_service = valuation_service
+            st.session_state.replenishment_service = replenishment_service
+            st.session_state.inventory_history_service = inventory_history_service
+            st.session_state.duplicate_service = duplicate_service
             st.session_state.db_session = session
+            st.session_state.db_read_session = read_session
             
             # Estados de UI
             st.session_state.selected_product_id = None
 
             self.logger.info("Application services initialized")
+
+    def _current_location(self, location_repo: LocationRepository) -> Optional[Location]:
+        """Sucursal de este punto de venta (POS_LOCATION = código de la sucursal)"""
+        code = os.getenv('POS_LOCATION')
+        if not code:
+            return None
+        location = location_repo.get_by_code(code.strip().upper())
+        if location is None:
+            raise ValueError(f"POS_LOCATION no corresponde a una sucursal: {code}")
+        return location
+
+    def _initialize_till_mode(self, product_repo: ProductRepository):
+        """Modo caja (POS_TILL_MODE=1): diario local y sincronización con POS_CENTRAL_DATABASE_URL"""
+        if os.getenv('POS_TILL_MODE', '').lower() not in ('1', 'true', 'offline'):
+            return None, None
+
+        central_url = os.getenv('POS_CENTRAL_DATABASE_URL')
+        if not central_url:
+            raise ValueError("El modo caja requiere POS_CENTRAL_DATABASE_URL")
+
+        journal = TillJournal()
+        sync_service = TillSyncService(journal, Database.connect(central_url), product_repo)
+        self.logger.info("Till mode enabled: sales and stock operations are queued in the local journal")
+        return journal, sync_service
     
     def get_product_service(self) -> ProductService:
         return st.session_state.product_service
 
+    def get_pricing_service(self) -> PricingService:
+        return st.session_state.pricing_service
+
+    def get_sales_service(self) -> SalesService:
+        return st.session_state.sales_service
+
+    def get_location_service(self) -> LocationService:
+        return st.session_state.location_service
+
+    def get_price_list_service(self) -> PriceListService:
+        return st.session_state.price_list_service
+
+    def get_till_sync_service(self) -> Optional[TillSyncService]:
+        return st.session_state.till_sync_service
+
+    def get_analytics_service(self) -> AnalyticsService:
+        return st.session_state.analytics_service
+
+    def get_valuation_service(self) -> ValuationService:
+        return st.session_state.valuation_service
+
+    def get_replenishment_service(self) -> ReplenishmentService:
+        return st.session_state.replenishment_service
+
+    def get_inventory_history_service(self) -> InventoryHistoryService:
+        return st.session_state.inventory_history_service
+
+    def get_duplicate_service(self) -> DuplicateService:
+        return st.session_state.duplicate_service
+
     def get_selected_product_id(self) -> Optional[int]:
         return st.session_state.selected_product_id
 
     def set_selected_product_id(self, product_id: Optional[int]) -> None:
-        st.session_state.selected_product_id = product_id
\ No newline at end of file
+        st.session_state.selected_product_id = product_id
+
+    def is_profiling_enabled(self) -> bool:
+        """Por variable de entorno o por el interruptor de la barra lateral"""
+        return profiling_enabled() or st.session_state.get("profiling_enabled", False)
\ No newline at end of file
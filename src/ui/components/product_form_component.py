@@ -1,8 +1,8 @@
-from typing import Optional, Dict, Callable
+from typing import Any, Optional, Dict, Callable
 
 import streamlit as st
 
-from src.entities.product import Product, ProductCategory
+from src.entities.product import Product, ProductCategory, ProductConflictError
 from src.utils.logger import Logger
 
 
@@ -11,6 +11,17 @@ class ProductFormComponent:
     Componente especializado en formularios de productos
     Responsabilidad Única: Renderizar y validar formularios de productos
     """
+
+    _FIELD_LABELS = {
+        "code": "Código",
+        "name": "Nombre",
+        "description": "Descripción",
+        "price": "Precio",
+        "cost": "Costo",
+        "category": "Categoría",
+        "supplier": "Proveedor",
+        "is_active": "Activo",
+    }
     
     def __init__(self):
         self.logger = Logger(__name__).get_logger()
@@ -45,6 +56,46 @@ class ProductFormComponent:
                 if st.form_submit_button("❌ Cancelar", type="secondary", use_container_width=True):
                     on_cancel()
     
+    def render_conflict(self,
+                        conflict: ProductConflictError,
+                        base: Optional[Product],
+                        on_overwrite: Callable[[], None],
+                        on_reload: Callable[[], None]) -> None:
+        """Diferencias campo a campo entre lo que se editó y lo que otro usuario guardó"""
+        import pandas as pd
+        st.warning(f"⚠️ {conflict}. Sus cambios no se guardaron.")
+        rows = conflict.field_diff(base)
+        if rows:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Campo": self._FIELD_LABELS.get(row["field"], row["field"]),
+                        "Al empezar a editar": self._format_value(row["base"]),
+                        "Sus cambios": self._format_value(row["mine"]),
+                        "Guardado por otro usuario": self._format_value(row["theirs"]),
+                    }
+                    for row in rows
+                ]),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("💾 Guardar mis cambios de todos modos", type="primary", use_container_width=True):
+                on_overwrite()
+        with col2:
+            if st.button("🔄 Descartar mis cambios y recargar", use_container_width=True):
+                on_reload()
+
+    @staticmethod
+    def _format_value(value: Any) -> str:
+        if isinstance(value, ProductCategory):
+            return value.value
+        if isinstance(value, bool):
+            return "Sí" if value else "No"
+        return "" if value is None else str(value)
+
     def _render_form_fields(self, product: Optional[Product]) -> Dict:
         """Renderiza los campos del formulario y retorna los datos"""
         col1, col2 = st.columns(2)
@@ -66,6 +117,12 @@ class ProductFormComponent:
         
         with col2:
             category = self._render_category_select(product)
+            supplier = st.text_input(
+                "🚚 Proveedor",
+                value=(product.supplier or "") if product else "",
+                placeholder="Ej: Distribuidora Central",
+                help="Proveedor del producto (opcional)"
+            )
             is_active = self._render_status_toggle(product)
         
         st.markdown("### 💰 Información de Precios")
@@ -104,6 +161,7 @@ class ProductFormComponent:
             "price": price,
             "cost": cost,
             "category": category,
+            "supplier": supplier,
             "is_active": is_active,
             "description": description
         }
@@ -149,10 +207,6 @@ class ProductFormComponent:
                 st.error("❌ El precio debe ser mayor a cero")
                 return
             
-            if form_data["stock"] < 0:
-                st.error("❌ El stock no puede ser negativo")
-                return
-            
             # Si pasa todas las validaciones, llamar al callback
             on_save(form_data)
             
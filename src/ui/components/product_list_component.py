@@ -1,11 +1,12 @@
 from typing import List, Callable, Optional
 
 import streamlit as st
-import pandas as pd
 
-from src.entities.product import Product
+from src.entities.product import Product, ProductCategory
+from src.entities.product_filter import ProductFilter
 from src.services.product_service import ProductService
 from src.utils.logger import Logger
+from src.utils.profiler import phase
 
 
 class ProductListComponent:
@@ -14,6 +15,11 @@ class ProductListComponent:
     Responsabilidad Única: Renderizar y manejar interacciones de lista
     """
     
+    # Filas que se dibujan por recarga; los filtros acotan el resto
+    _MAX_ROWS = 500
+
+    _STATUS_OPTIONS = {"Activos": True, "Inactivos": False, "Todos": None}
+
     def __init__(self, product_service: ProductService):
         self.product_service = product_service
         self.logger = Logger(__name__).get_logger()
@@ -27,25 +33,85 @@ class ProductListComponent:
                 self._confirm_delete()
                 return
 
-            products = self._load_products(search_term)
+            product_filter = self._render_filters(search_term)
+            with phase("load_products"):
+                products = self._load_products(product_filter)
             
             if not products:
                 self._render_empty_state()
                 return
             
+            truncated = len(products) > self._MAX_ROWS
+            products = products[:self._MAX_ROWS]
             self._render_search_header(len(products))
-            self._render_products_table(products)
+            if truncated:
+                st.caption(f"Mostrando los primeros {self._MAX_ROWS} productos; ajusta los filtros para ver el resto.")
+            with phase("table_build"):
+                self._render_products_table(products)
             self._render_actions_section(products, on_edit)
             
         except Exception as e:
             self.logger.error(f"Error rendering product list: {str(e)}")
             st.error("Error al cargar la lista de productos")
     
-    def _load_products(self, search_term: str) -> List[Product]:
-        """Carga productos según término de búsqueda"""
-        if search_term and len(search_term.strip()) > 0:
-            return self.product_service.search_products(search_term.strip())
-        return self.product_service.get_all_products_any_status()
+    def _render_filters(self, search_term: str) -> ProductFilter:
+        """Filtros por categoría, proveedor, estado y precio con la cantidad de productos de cada opción"""
+        with phase("facet_counts"):
+            facets = self.product_service.get_facet_counts()
+        by_category = facets["category"]
+        by_supplier = facets["supplier"]
+        by_status = facets["is_active"]
+        status_counts = {
+            "Activos": by_status[True],
+            "Inactivos": by_status[False],
+            "Todos": by_status[True] + by_status[False],
+        }
+
+        with st.expander("🔎 Filtros", expanded=False):
+            col1, col2 = st.columns(2)
+            with col1:
+                categories = st.multiselect(
+                    "Categorías",
+                    options=list(ProductCategory),
+                    format_func=lambda x: f"{x.value} ({by_category.get(x.value, 0)})",
+                    key="product_filter_categories",
+                )
+                status = st.selectbox(
+                    "Estado",
+                    options=list(self._STATUS_OPTIONS),
+                    format_func=lambda x: f"{x} ({status_counts[x]})",
+                    key="product_filter_status",
+                )
+            with col2:
+                suppliers = st.multiselect(
+                    "Proveedores",
+                    options=sorted(by_supplier, key=str.lower),
+                    format_func=lambda x: f"{x} ({by_supplier[x]})",
+                    key="product_filter_suppliers",
+                )
+                price_col1, price_col2 = st.columns(2)
+                min_price = price_col1.number_input("Precio mínimo", min_value=0.0, value=None,
+                                                    step=1.0, key="product_filter_min_price")
+                max_price = price_col2.number_input("Precio máximo", min_value=0.0, value=None,
+                                                    step=1.0, key="product_filter_max_price")
+            st.caption("Las cantidades de categorías y proveedores cuentan productos activos.")
+
+        return ProductFilter(
+            search=search_term,
+            categories=categories,
+            is_active=self._STATUS_OPTIONS[status],
+            suppliers=suppliers,
+            min_price=min_price,
+            max_price=max_price,
+        )
+
+    def _load_products(self, product_filter: ProductFilter) -> List[Product]:
+        """Carga los productos filtrados; uno de más indica que hay más para mostrar"""
+        is_valid, message = product_filter.validate()
+        if not is_valid:
+            st.warning(message)
+            return []
+        return self.product_service.filter_products(product_filter, limit=self._MAX_ROWS + 1)
     
     def _render_empty_state(self) -> None:
         """Renderiza estado cuando no hay productos"""
@@ -53,7 +119,7 @@ class ProductListComponent:
         st.markdown("""
         **Sugerencias:**
         - Verifica que los productos estén activos
-        - Ajusta los términos de búsqueda
+        - Ajusta los términos de búsqueda y los filtros
         - Agrega nuevos productos usando el formulario
         """)
     
@@ -67,6 +133,7 @@ class ProductListComponent:
     
     def _render_products_table(self, products: List[Product]) -> None:
         """Renderiza la tabla de productos optimizada"""
+        import pandas as pd
         # Preparar datos para DataFrame
         table_data = []
         for product in products:
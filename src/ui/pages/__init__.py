@@ -1,5 +1,13 @@
 from .base_page import BasePage
 from .product_management_page import ProductManagementPage
+from .pricing_page import PricingPage
+from .reports_page import ReportsPage
+from .valuation_page import ValuationPage
+from .replenishment_page import ReplenishmentPage
+from .locations_page import LocationsPage
+from .duplicates_page import DuplicatesPage
+from .price_lists_page import PriceListsPage
+from .profiling_page import ProfilingPage
 
 class PageRegistry:
     """Registry para gestionar páginas - OCP"""
@@ -11,6 +19,15 @@ class PageRegistry:
     def _register_default_pages(self, app_state) -> None:
         """Registra las páginas por defecto - OCP"""
         self.register(ProductManagementPage(app_state))
+        self.register(PricingPage(app_state))
+        self.register(PriceListsPage(app_state))
+        self.register(ReportsPage(app_state))
+        self.register(ValuationPage(app_state))
+        self.register(ReplenishmentPage(app_state))
+        self.register(LocationsPage(app_state))
+        self.register(DuplicatesPage(app_state))
+        if app_state.is_profiling_enabled():
+            self.register(ProfilingPage(app_state))
     
     def register(self, page: BasePage) -> None:
         """Registra una nueva página - OCP"""
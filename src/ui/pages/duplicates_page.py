@@ -0,0 +1,168 @@
+# src/ui/pages/duplicates_page.py
+from typing import List
+
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.entities.duplicate_candidate import DuplicateCandidate
+from src.entities.product import Product
+from src.services.duplicate_service import DuplicateService
+from src.utils.logger import Logger
+
+
+class DuplicatesPage(BasePage):
+    """
+    Página de productos duplicados
+    Responsabilidad Única: Lanzar búsquedas y revisar los pares propuestos (fusionar o descartar)
+    """
+
+    # Pares que se listan; al resolverlos aparecen los siguientes
+    _MAX_ROWS = 200
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Duplicados"
+        self._icon = "🧬"
+        self.logger = Logger(__name__).get_logger()
+
+        self.duplicate_service: DuplicateService = self.app_state.get_duplicate_service()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        try:
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            # Resultado de la acción anterior, que terminó en st.rerun()
+            message = st.session_state.pop("duplicate_message", None)
+            if message:
+                st.success(message)
+
+            self._render_scan()
+            st.markdown("---")
+
+            candidates = self.duplicate_service.get_pending(self._MAX_ROWS)
+            if not candidates:
+                st.info("✅ No hay pares pendientes de revisión.")
+                return
+            self._render_candidates(candidates)
+
+        except Exception as e:
+            self.logger.error(f"Error in duplicates page: {str(e)}")
+            st.error("❌ Error al cargar los duplicados")
+
+    def _render_scan(self) -> None:
+        last_scan = self.duplicate_service.get_last_scan()
+        if last_scan is None:
+            st.caption("Todavía no se buscaron duplicados.")
+        else:
+            mode = "completa" if last_scan["full"] else "incremental"
+            st.caption(
+                f"Última búsqueda {mode}: {last_scan['scanned_at']:%d/%m/%Y %H:%M} · "
+                f"{last_scan['products']:,} productos revisados · {last_scan['candidates']:,} pares nuevos · "
+                f"{last_scan['seconds']:.1f} s"
+            )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            pending_changes = self.duplicate_service.has_unscanned_changes()
+            if st.button("🔄 Revisar cambios", disabled=not pending_changes, use_container_width=True,
+                         help="Compara solo los productos creados o modificados desde la última búsqueda"):
+                self._run_scan(full=False)
+        with col2:
+            if st.button("🔍 Búsqueda completa", use_container_width=True,
+                         help="Recalcula todo el catálogo; con cientos de miles de productos tarda unos minutos"):
+                self._run_scan(full=True)
+
+    def _run_scan(self, full: bool) -> None:
+        with st.spinner("Buscando duplicados..."):
+            report = self.duplicate_service.scan(full=full)
+        st.session_state.duplicate_message = (
+            f"Búsqueda terminada: {report['products']:,} productos revisados, "
+            f"{report['candidates']:,} pares nuevos."
+        )
+        st.rerun()
+
+    def _render_candidates(self, candidates: List[DuplicateCandidate]) -> None:
+        import pandas as pd
+        st.subheader(f"Pares pendientes ({len(candidates)})")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Similitud": candidate.score,
+                    "Código A": candidate.product.code,
+                    "Nombre A": candidate.product.name,
+                    "Código B": candidate.duplicate.code,
+                    "Nombre B": candidate.duplicate.name,
+                }
+                for candidate in candidates
+            ]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        candidate = st.selectbox(
+            "Par a revisar",
+            options=candidates,
+            format_func=lambda x: f"{x.score:.0%} · {x.product.code} / {x.duplicate.code}",
+            key="duplicate_candidate",
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            self._render_product("A", candidate.product)
+        with col2:
+            self._render_product("B", candidate.duplicate)
+
+        st.caption(
+            "Al conservar uno, el otro se desactiva y su stock (también el de cada sucursal) pasa al "
+            "conservado; sus ventas y movimientos quedan en el historial."
+        )
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("✅ Conservar A", key="duplicate_keep_a", use_container_width=True):
+                self._handle_merge(candidate, candidate.product)
+        with col2:
+            if st.button("✅ Conservar B", key="duplicate_keep_b", use_container_width=True):
+                self._handle_merge(candidate, candidate.duplicate)
+        with col3:
+            if st.button("🚫 No son duplicados", key="duplicate_dismiss", use_container_width=True):
+                self._handle_dismiss(candidate)
+
+    def _render_product(self, label: str, product: Product) -> None:
+        st.markdown(f"**{label}: {product.name}**")
+        st.markdown(
+            f"Código: `{product.code}`  \n"
+            f"Categoría: {product.category.value}  \n"
+            f"Proveedor: {product.supplier or '-'}  \n"
+            f"Precio: ${product.price:,.2f} · Costo: ${product.cost:,.2f}  \n"
+            f"Stock: {product.stock}"
+        )
+        if product.description:
+            st.caption(product.description)
+
+    def _handle_merge(self, candidate: DuplicateCandidate, keep: Product) -> None:
+        try:
+            result = self.duplicate_service.merge(candidate.id, keep.id)
+            st.session_state.duplicate_message = (
+                f"✅ Fusionado en {keep.code}: {result['units_moved']} unidades movidas."
+            )
+            st.rerun()
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
+
+    def _handle_dismiss(self, candidate: DuplicateCandidate) -> None:
+        try:
+            self.duplicate_service.dismiss(candidate.id)
+            st.session_state.duplicate_message = "Par descartado; no se volverá a proponer."
+            st.rerun()
+        except ValueError as e:
+            st.error(f"❌ {str(e)}")
@@ -0,0 +1,161 @@
+# src/ui/pages/locations_page.py
+from typing import List
+
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.entities.location import Location
+from src.services.location_service import LocationService
+from src.utils.logger import Logger
+
+
+class LocationsPage(BasePage):
+    """
+    Página de sucursales
+    Responsabilidad Única: Inventario por sucursal, ajustes y transferencias
+    """
+
+    _PRICE_MODES = ["Sin cambios", "Precio general", "Precio propio"]
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Sucursales"
+        self._icon = "🏬"
+        self.logger = Logger(__name__).get_logger()
+
+        self.location_service: LocationService = self.app_state.get_location_service()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        try:
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            locations = self.location_service.get_all_locations()
+            if not locations:
+                st.info("📭 No hay sucursales registradas.")
+                self._render_location_form()
+                return
+
+            tab1, tab2, tab3, tab4 = st.tabs(["📦 Inventario", "✏️ Ajustar", "🔁 Transferir", "🏬 Sucursales"])
+            with tab1:
+                self._render_inventory(locations)
+            with tab2:
+                self._render_adjustment_form(locations)
+            with tab3:
+                self._render_transfer_form(locations)
+            with tab4:
+                self._render_locations(locations)
+                self._render_location_form()
+
+        except Exception as e:
+            self.logger.error(f"Error in locations page: {str(e)}")
+            st.error("❌ Error al cargar las sucursales")
+
+    def _select_location(self, locations: List[Location], label: str, key: str) -> Location:
+        return st.selectbox(label, options=locations, format_func=lambda x: f"{x.code} - {x.name}", key=key)
+
+    def _render_inventory(self, locations: List[Location]) -> None:
+        import pandas as pd
+        location = self._select_location(locations, "Sucursal", "location_inventory")
+        products = self.location_service.get_location_products(location.id)
+        if not products:
+            st.info("Sin productos asignados a esta sucursal.")
+            return
+
+        st.metric("Productos", len(products))
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Código": product.code,
+                    "Nombre": product.name,
+                    "Categoría": product.category.value,
+                    "Precio": product.price,
+                    "Stock": product.stock,
+                }
+                for product in products
+            ]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    def _render_adjustment_form(self, locations: List[Location]) -> None:
+        with st.form(key="location_adjustment_form"):
+            location = self._select_location(locations, "Sucursal", "location_adjustment")
+            code = st.text_input("Código del producto")
+            quantity = st.number_input("Stock contado", min_value=0, step=1, value=0)
+            price_mode = st.radio("Precio", options=self._PRICE_MODES, horizontal=True)
+            price = st.number_input("Precio propio de la sucursal", min_value=0.0, step=100.0)
+            submitted = st.form_submit_button("💾 Guardar", type="primary")
+
+        if submitted:
+            try:
+                delta = self.location_service.set_stock(location.id, code, int(quantity))
+                if price_mode == self._PRICE_MODES[1]:
+                    self.location_service.set_price(location.id, code, None)
+                elif price_mode == self._PRICE_MODES[2]:
+                    self.location_service.set_price(location.id, code, price)
+                if delta is None:
+                    st.success("✅ Conteo guardado; se aplicará en la central al sincronizar.")
+                else:
+                    st.success(f"✅ Stock actualizado ({delta:+d} unidades).")
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+
+    def _render_transfer_form(self, locations: List[Location]) -> None:
+        if len(locations) < 2:
+            st.info("Se necesitan al menos dos sucursales para transferir stock.")
+            return
+
+        with st.form(key="location_transfer_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                source = self._select_location(locations, "Desde", "transfer_from")
+            with col2:
+                target = self._select_location(locations, "Hacia", "transfer_to")
+            code = st.text_input("Código del producto")
+            quantity = st.number_input("Cantidad", min_value=1, step=1, value=1)
+            submitted = st.form_submit_button("🔁 Transferir", type="primary")
+
+        if submitted:
+            try:
+                self.location_service.transfer_stock(source.id, target.id, code, int(quantity))
+                if self.location_service.is_till_mode():
+                    st.success(f"✅ Transferencia de {int(quantity)} unidades guardada; "
+                               f"se aplicará en la central al sincronizar.")
+                else:
+                    st.success(f"✅ {int(quantity)} unidades transferidas de {source.name} a {target.name}.")
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+
+    def _render_locations(self, locations: List[Location]) -> None:
+        import pandas as pd
+        st.dataframe(
+            pd.DataFrame([{"Código": location.code, "Nombre": location.name} for location in locations]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    def _render_location_form(self) -> None:
+        st.subheader("➕ Nueva Sucursal")
+        with st.form(key="location_form", clear_on_submit=True):
+            code = st.text_input("Código", placeholder="Ej: CENTRO")
+            name = st.text_input("Nombre")
+            submitted = st.form_submit_button("💾 Crear sucursal", type="primary")
+
+        if submitted:
+            try:
+                location = self.location_service.create_location({"code": code, "name": name})
+                st.success(f"✅ Sucursal '{location.name}' creada.")
+                st.rerun()
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
@@ -0,0 +1,163 @@
+# src/ui/pages/price_lists_page.py
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional
+
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.entities.price_list import PriceList
+from src.services.location_service import LocationService
+from src.services.price_list_service import PriceListService
+from src.utils.logger import Logger
+
+
+class PriceListsPage(BasePage):
+    """
+    Página de listas de precios
+    Responsabilidad Única: Listas con vigencia por fecha y consulta de precio aplicable
+    """
+
+    _ALL = "Todas"
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Listas de Precios"
+        self._icon = "🏷️"
+        self.logger = Logger(__name__).get_logger()
+
+        self.price_list_service: PriceListService = self.app_state.get_price_list_service()
+        self.location_service: LocationService = self.app_state.get_location_service()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        try:
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            price_lists = self.price_list_service.get_price_lists()
+            tab1, tab2, tab3 = st.tabs(["📋 Listas", "➕ Nueva Lista", "🔎 Consultar Precio"])
+            with tab1:
+                self._render_price_lists(price_lists)
+            with tab2:
+                self._render_price_list_form()
+            with tab3:
+                self._render_price_lookup()
+
+        except Exception as e:
+            self.logger.error(f"Error in price lists page: {str(e)}")
+            st.error("❌ Error al cargar las listas de precios")
+
+    def _location_options(self) -> dict:
+        options = {self._ALL: None}
+        options.update({f"{location.code} - {location.name}": location.id
+                        for location in self.location_service.get_all_locations()})
+        return options
+
+    def _render_price_lists(self, price_lists: List[PriceList]) -> None:
+        import pandas as pd
+        if not price_lists:
+            st.info("📭 No hay listas de precios.")
+            return
+
+        price_list = st.selectbox(
+            "Lista", options=price_lists,
+            format_func=lambda x: f"{x.name} (prioridad {x.priority}"
+                                  f"{', ' + x.customer_tier if x.customer_tier else ''})"
+        )
+        self._render_item_form(price_list)
+
+        items = self.price_list_service.get_prices(price_list.id)
+        if items:
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "ID": item.id,
+                        "Código": item.product_code,
+                        "Precio": item.price,
+                        "Desde": item.starts_at,
+                        "Hasta": item.ends_at,
+                    }
+                    for item in items
+                ]),
+                use_container_width=True,
+                hide_index=True,
+            )
+        else:
+            st.info("La lista no tiene precios.")
+
+        if st.button("🗑️ Desactivar lista", key=f"deactivate_price_list_{price_list.id}"):
+            self.price_list_service.deactivate_price_list(price_list.id)
+            st.rerun()
+
+    def _render_item_form(self, price_list: PriceList) -> None:
+        with st.form(key="price_list_item_form", clear_on_submit=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                code = st.text_input("Código del producto")
+                price = st.number_input("Precio", min_value=0.0, step=100.0)
+            with col2:
+                start_day = st.date_input("Desde", value=date.today())
+                end_day = st.date_input("Hasta (inclusive)", value=None)
+            submitted = st.form_submit_button("💾 Agregar precio", type="primary")
+
+        if submitted:
+            try:
+                starts_at = datetime.combine(start_day, time.min)
+                ends_at = datetime.combine(end_day + timedelta(days=1), time.min) if end_day else None
+                self.price_list_service.add_price(price_list.id, code, price, starts_at, ends_at)
+                st.success("✅ Precio agregado.")
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+
+    def _render_price_list_form(self) -> None:
+        locations = self._location_options()
+        with st.form(key="price_list_form", clear_on_submit=True):
+            name = st.text_input("Nombre", placeholder="Ej: Promoción de temporada")
+            customer_tier = st.text_input("Tipo de cliente", placeholder="Vacío = todos (ej: MAYORISTA)")
+            location = st.selectbox("Sucursal", options=list(locations.keys()))
+            priority = st.number_input("Prioridad", value=0, step=1,
+                                       help="Entre listas vigentes gana la de mayor prioridad")
+            submitted = st.form_submit_button("💾 Crear lista", type="primary")
+
+        if submitted:
+            try:
+                self.price_list_service.create_price_list({
+                    "name": name,
+                    "customer_tier": customer_tier,
+                    "location_id": locations[location],
+                    "priority": priority,
+                })
+                st.success(f"✅ Lista '{name}' creada.")
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+
+    def _render_price_lookup(self) -> None:
+        locations = self._location_options()
+        with st.form(key="price_lookup_form"):
+            col1, col2 = st.columns(2)
+            with col1:
+                code = st.text_input("Código del producto")
+                customer_tier = st.text_input("Tipo de cliente")
+            with col2:
+                location = st.selectbox("Sucursal", options=list(locations.keys()), key="lookup_location")
+                day = st.date_input("Fecha", value=date.today())
+            submitted = st.form_submit_button("🔎 Consultar")
+
+        if submitted:
+            at: Optional[datetime] = None
+            if day != date.today():
+                at = datetime.combine(day, time(12, 0))
+            price = self.price_list_service.resolve_price(code, locations[location], customer_tier, at)
+            if price is None:
+                st.error("❌ Producto no encontrado")
+            else:
+                st.metric("Precio aplicable", f"${price:,.2f}")
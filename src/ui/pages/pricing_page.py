@@ -0,0 +1,170 @@
+# src/ui/pages/pricing_page.py
+from typing import List, Optional
+
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.entities.product import ProductCategory
+from src.entities.repricing_rule import RepricingMode, RepricingRule
+from src.services.pricing_service import PricingService
+from src.utils.logger import Logger
+
+
+class PricingPage(BasePage):
+    """
+    Página de actualización masiva de precios
+    Responsabilidad Única: Definir reglas, previsualizarlas y aplicarlas
+    """
+
+    _ALL_CATEGORIES = "Todas"
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Precios Masivos"
+        self._icon = "💲"
+        self.logger = Logger(__name__).get_logger()
+
+        self.pricing_service: PricingService = self.app_state.get_pricing_service()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        try:
+            if "repricing_rules" not in st.session_state:
+                st.session_state.repricing_rules = []
+
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            self._render_rule_form()
+            self._render_rules(st.session_state.repricing_rules)
+
+        except Exception as e:
+            self.logger.error(f"Error in pricing page: {str(e)}")
+            st.error("❌ Error al cargar la página de precios")
+
+    def _render_rule_form(self) -> None:
+        """Formulario para agregar una regla"""
+        st.subheader("➕ Nueva Regla")
+
+        with st.form(key="repricing_rule_form", clear_on_submit=True):
+            col1, col2 = st.columns(2)
+
+            with col1:
+                category = st.selectbox(
+                    "📂 Categoría",
+                    options=[self._ALL_CATEGORIES] + [category.value for category in ProductCategory]
+                )
+                supplier = st.text_input("🚚 Proveedor", placeholder="Vacío = todos los proveedores")
+
+            with col2:
+                mode = st.radio(
+                    "Cálculo",
+                    options=list(RepricingMode),
+                    format_func=lambda x: x.value
+                )
+                value = st.number_input(
+                    "Valor (factor o %)",
+                    value=1.0,
+                    step=0.05,
+                    help="Factor sobre el costo (ej: 1.35) o variación porcentual (ej: 5 o -10)"
+                )
+                round_to = st.number_input(
+                    "Redondear a",
+                    min_value=0.0,
+                    value=0.0,
+                    step=50.0,
+                    help="Múltiplo al que se redondea el nuevo precio (0 = sin redondeo)"
+                )
+
+            if st.form_submit_button("Agregar regla", type="primary"):
+                rule = RepricingRule(
+                    mode=mode,
+                    value=float(value),
+                    category=None if category == self._ALL_CATEGORIES else ProductCategory(category),
+                    supplier=supplier.strip() or None,
+                    round_to=float(round_to)
+                )
+                is_valid, message = rule.validate()
+                if is_valid:
+                    st.session_state.repricing_rules.append(rule)
+                    st.session_state.repricing_preview = None
+                else:
+                    st.error(f"❌ {message}")
+
+    def _render_rules(self, rules: List[RepricingRule]) -> None:
+        """Lista de reglas con vista previa y aplicación"""
+        st.markdown("---")
+        st.subheader("📋 Reglas a Aplicar")
+
+        if not rules:
+            st.info("No hay reglas definidas.")
+            return
+
+        for index, rule in enumerate(rules, start=1):
+            st.markdown(f"{index}. {rule.describe()}")
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            preview = st.button("👁️ Vista previa", use_container_width=True)
+        with col2:
+            apply = st.button("✅ Aplicar precios", type="primary", use_container_width=True)
+        with col3:
+            if st.button("🗑️ Limpiar reglas", use_container_width=True):
+                st.session_state.repricing_rules = []
+                st.session_state.repricing_preview = None
+                st.rerun()
+
+        try:
+            if preview:
+                changes = self.pricing_service.preview(rules)
+                st.session_state.repricing_preview = changes
+                self._render_preview(changes)
+            if apply:
+                self._apply(rules, st.session_state.get("repricing_preview"))
+        except ValueError as e:
+            st.error(f"❌ Error de validación: {e}")
+        except Exception as e:
+            self.logger.error(f"Error repricing: {str(e)}")
+            st.error(f"❌ Error al actualizar precios: {str(e)}")
+
+    def _apply(self, rules: List[RepricingRule], previewed: Optional[List[dict]]) -> None:
+        """Con vista previa solo se aplican los precios vistos; sin ella, las reglas sobre el catálogo vigente"""
+        if previewed is None:
+            changed_count = self.pricing_service.apply(rules)
+            conflicts = 0
+        else:
+            result = self.pricing_service.apply_preview(rules, previewed)
+            changed_count, conflicts = result["changed"], result["conflicts"]
+        st.session_state.repricing_rules = []
+        st.session_state.repricing_preview = None
+        st.success(f"✅ {changed_count} precios actualizados correctamente.")
+        if conflicts:
+            st.warning(
+                f"⚠️ {conflicts} productos cambiaron después de la vista previa y no se actualizaron. "
+                "Vuelva a definir las reglas y previsualice otra vez."
+            )
+
+    def _render_preview(self, changes: List[dict]) -> None:
+        import pandas as pd
+        if not changes:
+            st.info("Las reglas no modifican ningún precio.")
+            return
+
+        st.metric("Precios a cambiar", len(changes))
+        df = pd.DataFrame(changes).rename(columns={
+            "code": "Código",
+            "name": "Nombre",
+            "old_price": "Precio Actual",
+            "new_price": "Precio Nuevo",
+            "rule": "Regla",
+        }).drop(columns=["product_id", "version"])
+        st.dataframe(df, use_container_width=True, hide_index=True)
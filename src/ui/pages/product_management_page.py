@@ -1,16 +1,22 @@
 # src/ui/pages/product_management_page.py
+import time
 from typing import Optional
 
 import streamlit as st
-import pandas as pd
 
 from .base_page import BasePage
 from src.ui.app_state import IAppState
-from src.entities.product import Product
+from src.entities.product import Product, ProductConflictError
 from src.services.product_service import ProductService
 from src.ui.components.product_list_component import ProductListComponent
 from src.ui.components.product_form_component import ProductFormComponent
 from src.utils.logger import Logger
+from src.utils.metrics import counter, histogram
+
+_XLSX_ROWS = counter("pos_xlsx_rows_total", "Filas leídas de archivos XLSX", ["action"])
+_XLSX_SECONDS = histogram("pos_xlsx_import_seconds", "Duración del procesamiento de archivos XLSX",
+                          ["action"], buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+_XLSX_ERRORS = counter("pos_xlsx_errors_total", "Archivos XLSX con error", ["action"])
 
 
 class ProductManagementPage(BasePage):
@@ -170,6 +176,14 @@ class ProductManagementPage(BasePage):
             st.rerun()
             return
         
+        conflict = st.session_state.get("product_conflict")
+        if conflict:
+            self.form_component.render_conflict(
+                conflict["error"], product,
+                on_overwrite=self._handle_overwrite_conflict,
+                on_reload=self._handle_reload_conflict
+            )
+
         self.form_component.render(
             product=product,
             on_save=self._handle_save_product,
@@ -177,9 +191,16 @@ class ProductManagementPage(BasePage):
         )
 
     def _get_current_product(self) -> Optional[Product]:
-        """Obtiene el producto actualmente seleccionado"""
+        """
+        Producto tal como estaba al empezar a editarlo: el formulario no cambia bajo el
+        usuario y al guardar se compara su versión con la de la base
+        """
         if self._selected_product_id:
-            return self.product_service.get_product(self._selected_product_id)
+            base = st.session_state.get("product_edit_base")
+            if base is None or base.id != self._selected_product_id:
+                base = self.product_service.get_product(self._selected_product_id)
+                st.session_state.product_edit_base = base
+            return base
         return None
 
     def _get_product_display_name(self, product_id: int) -> str:
@@ -200,8 +221,12 @@ class ProductManagementPage(BasePage):
         """Maneja el guardado de productos - CORREGIDO"""
         try:
             if self._selected_product_id:
-                # Edición
-                self.product_service.update_product(self._selected_product_id, form_data)
+                # Edición: solo se guarda si nadie cambió el producto desde que se abrió
+                base = st.session_state.get("product_edit_base")
+                self.product_service.update_product(
+                    self._selected_product_id, form_data,
+                    expected_version=base.version if base else None
+                )
                 st.success("✅ Producto actualizado correctamente")
             else:
                 # Creación - envía todo el diccionario
@@ -212,43 +237,46 @@ class ProductManagementPage(BasePage):
             st.session_state.product_mgmt_view = "list"
             st.rerun()
         
+        except ProductConflictError as e:
+            # Las diferencias se muestran fuera del formulario, en la siguiente ejecución
+            st.session_state.product_conflict = {"error": e, "form_data": form_data}
+            st.rerun()
         except ValueError as e:
             st.error(f"❌ Error de validación: {e}")
         except Exception as e:
             self.logger.error(f"Error saving product: {str(e)}")
             st.error(f"❌ Error al guardar el producto: {str(e)}")
 
+    def _handle_overwrite_conflict(self) -> None:
+        """Guarda los cambios del usuario sobre la versión que guardó el otro usuario"""
+        conflict = st.session_state.product_conflict
+        st.session_state.product_edit_base = conflict["error"].current
+        del st.session_state.product_conflict
+        self._handle_save_product(conflict["form_data"])
+
+    def _handle_reload_conflict(self) -> None:
+        """Descarta los cambios del usuario y edita la versión vigente"""
+        st.session_state.product_edit_base = st.session_state.product_conflict["error"].current
+        del st.session_state.product_conflict
+        st.rerun()
+
     def _handle_xlsx_upload(self, uploaded_file) -> None:
         """Maneja la subida de un XLSX para eliminar productos."""
+        import pandas as pd
         if not uploaded_file:
             st.warning("Por favor, sube un archivo XLSX.")
             return
 
+        start = time.perf_counter()
         try:
             df = pd.read_excel(uploaded_file, engine='openpyxl')
+            _XLSX_ROWS.labels("delete").inc(len(df))
 
             if "code" not in df.columns:
                 st.error("El archivo XLSX debe contener la columna 'code'.")
                 return
 
-            deleted_count = 0
-            not_found_codes = []
-            processed_codes = set()
-
-            for code in df["code"]:
-                code_str = str(code)
-                if code_str in processed_codes:
-                    continue
-                
-                product = self.product_service.get_product_by_code(code_str)
-                
-                if product:
-                    self.product_service.delete_product(product.id)
-                    deleted_count += 1
-                else:
-                    not_found_codes.append(code_str)
-                
-                processed_codes.add(code_str)
+            deleted_count, not_found_codes = self.product_service.delete_products_by_code(df["code"].dropna())
 
             if deleted_count > 0:
                 st.success(f"{deleted_count} productos eliminados correctamente.")
@@ -259,8 +287,11 @@ class ProductManagementPage(BasePage):
             st.rerun()
 
         except Exception as e:
+            _XLSX_ERRORS.labels("delete").inc()
             self.logger.error(f"Error al procesar el archivo XLSX: {e}")
             st.error(f"Ocurrió un error al procesar el archivo: {e}")
+        finally:
+            _XLSX_SECONDS.labels("delete").observe(time.perf_counter() - start)
 
     def _handle_cancel_form(self) -> None:
         """Maneja la cancelación del formulario"""
@@ -273,12 +304,15 @@ class ProductManagementPage(BasePage):
         Maneja la subida de un XLSX para realizar un reconteo de inventario.
         Añade productos nuevos, actualiza existentes y elimina los que no están en el archivo.
         """
+        import pandas as pd
         if not uploaded_file:
             st.warning("Por favor, sube un archivo XLSX.")
             return
 
+        start = time.perf_counter()
         try:
             df = pd.read_excel(uploaded_file, engine='openpyxl')
+            _XLSX_ROWS.labels("recount").inc(len(df))
 
             required_columns = ["code", "name"]
             missing_columns = [col for col in required_columns if col not in df.columns]
@@ -286,64 +320,14 @@ class ProductManagementPage(BasePage):
                 st.error(f"El archivo XLSX debe contener las siguientes columnas: {', '.join(missing_columns)}")
                 return
 
-            added_count = 0
-            updated_count = 0
-            deleted_count = 0
-            processed_codes = set()
-
-            # Añadir y actualizar productos
-            for index, row in df.iterrows():
-                code = str(row["code"])
-                if code in processed_codes:
-                    continue
-                
-                processed_codes.add(code)
-                existing_product = self.product_service.get_product_by_code_any_status(code)
-
-                if existing_product:
-                    # Actualizar producto existente
-                    product_data = {}
-                    for col in df.columns:
-                        if col != "code" and pd.notna(row[col]):
-                            product_data[col] = row[col]
-                    
-                    if "is_active" not in product_data:
-                        product_data["is_active"] = True
-
-                    if product_data:
-                        self.product_service.update_product(existing_product.id, product_data)
-                        updated_count += 1
-                else:
-                    # Añadir nuevo producto
-                    name = row.get("name", "")
-                    description = row.get("description")
-                    price = row.get("price")
-                    cost = row.get("cost")
-                    category = row.get("category")
-
-                    product_data = {
-                        "code": code,
-                        "name": str(name) if pd.notna(name) else "null",
-                        "description": str(description) if pd.notna(description) else "null",
-                        "price": float(price) if pd.notna(price) else 0.0,
-                        "cost": float(cost) if pd.notna(cost) else 0.0,
-                        "category": str(category) if pd.notna(category) else "Otros",
-                        "is_active": True
-                    }
-                    self.product_service.create_product(product_data)
-                    added_count += 1
-
-            # Eliminar productos que no están en el XLSX
-            db_products = self.product_service.get_all_products_any_status()
-            db_codes = {p.code for p in db_products}
-            
-            codes_to_delete = db_codes - processed_codes
-
-            for code in codes_to_delete:
-                product_to_delete = self.product_service.get_product_by_code_any_status(code)
-                if product_to_delete:
-                    self.product_service.delete_product(product_to_delete.id)
-                    deleted_count += 1
+            records = [
+                {col: value for col, value in row.items() if pd.notna(value)}
+                for row in df.to_dict(orient="records")
+            ]
+            report = self.product_service.recount_inventory(records)
+            added_count = report["added"]
+            updated_count = report["updated"]
+            deleted_count = report["deleted"]
 
             if added_count > 0:
                 st.success(f"{added_count} nuevos productos añadidos correctamente.")
@@ -358,10 +342,15 @@ class ProductManagementPage(BasePage):
             st.rerun()
 
         except Exception as e:
+            _XLSX_ERRORS.labels("recount").inc()
             self.logger.error(f"Error al procesar el archivo XLSX para reconteo: {e}")
             st.error(f"Ocurrió un error al procesar el archivo: {e}")
+        finally:
+            _XLSX_SECONDS.labels("recount").observe(time.perf_counter() - start)
 
     def _clear_product_selection(self) -> None:
         """Limpia la selección de producto"""
         self._selected_product_id = None
         self.app_state.set_selected_product_id(None)
+        st.session_state.pop("product_edit_base", None)
+        st.session_state.pop("product_conflict", None)
@@ -0,0 +1,117 @@
+# src/ui/pages/profiling_page.py
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.utils.logger import Logger
+from src.utils.profiler import CPROFILE, ProfileStore
+
+
+class ProfilingPage(BasePage):
+    """
+    Página de diagnóstico del perfilado
+    Responsabilidad Única: Mostrar los perfiles guardados de las últimas reejecuciones
+    """
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Perfilado"
+        self._icon = "🐞"
+        self.logger = Logger(__name__).get_logger()
+        self.store = ProfileStore()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        import pandas as pd
+        try:
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            profiles = self.store.list()
+            if not profiles:
+                st.info("📭 Aún no hay perfiles. Navegue por la aplicación con el perfilado activo.")
+                return
+
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Fecha": profile["started_at"],
+                        "Página": profile["page"],
+                        "Modo": profile["mode"],
+                        "Estado": profile["status"],
+                        "Total (ms)": profile["total_ms"],
+                    }
+                    for profile in profiles
+                ]),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+            profile = st.selectbox(
+                "Perfil", options=profiles,
+                format_func=lambda x: f"{x['started_at']} - {x['page']} ({x['total_ms']:,.0f} ms)"
+            )
+            self._render_phases(profile)
+            self._render_top(profile)
+            self._render_export(profile)
+
+            if st.button("🗑️ Borrar perfiles"):
+                self.store.clear()
+                st.rerun()
+
+        except Exception as e:
+            self.logger.error(f"Error in profiling page: {str(e)}")
+            st.error("❌ Error al cargar los perfiles")
+
+    def _render_phases(self, profile: dict) -> None:
+        import pandas as pd
+        st.subheader("⏱️ Fases")
+        if not profile["phases"]:
+            st.info("La reejecución no registró fases.")
+            return
+
+        phases = pd.DataFrame([
+            {
+                "Fase": f"{'  ' * phase['depth']}{phase['name']}",
+                "Inicio (ms)": phase["start_ms"],
+                "Duración (ms)": phase["duration_ms"],
+            }
+            for phase in profile["phases"]
+        ])
+        st.bar_chart(phases, x="Fase", y="Duración (ms)", horizontal=True)
+        st.dataframe(phases, use_container_width=True, hide_index=True)
+
+    def _render_top(self, profile: dict) -> None:
+        import pandas as pd
+        if not profile["top"]:
+            return
+        if profile["mode"] == CPROFILE:
+            st.subheader("🔥 Funciones por tiempo acumulado")
+        else:
+            st.subheader("🔥 Funciones con más muestras")
+        st.dataframe(pd.DataFrame(profile["top"]), use_container_width=True, hide_index=True)
+
+    def _render_export(self, profile: dict) -> None:
+        artifact = self.store.artifact(profile["id"])
+        if not artifact:
+            return
+        file_name, data = artifact
+        if profile["mode"] == CPROFILE:
+            help_text = "Archivo pstats para snakeviz o flameprof"
+        else:
+            help_text = "Stacks \"folded\" para flamegraph.pl o speedscope.app"
+        st.download_button(
+            label="📥 Descargar perfil",
+            data=data,
+            file_name=file_name,
+            mime="application/octet-stream",
+            help=help_text,
+        )
@@ -0,0 +1,117 @@
+# src/ui/pages/replenishment_page.py
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.services.location_service import LocationService
+from src.services.replenishment_service import ReplenishmentService
+from src.utils.logger import Logger
+
+
+class ReplenishmentPage(BasePage):
+    """
+    Página de sugerencias de reposición
+    Responsabilidad Única: Presentar el plan calculado por el servicio y exportar la orden de compra
+    """
+
+    # Filas que se dibujan en pantalla; la orden de compra incluye todas
+    _MAX_ROWS = 1000
+
+    _COLUMN_LABELS = {
+        "location": "Sucursal",
+        "code": "Código",
+        "name": "Nombre",
+        "category": "Categoría",
+        "supplier": "Proveedor",
+        "cost": "Costo",
+        "stock": "Stock",
+        "sold": "Vendido",
+        "avg_daily_demand": "Demanda Diaria",
+        "days_of_cover": "Días de Cobertura",
+        "reorder_point": "Punto de Pedido",
+        "suggested_qty": "Cantidad Sugerida",
+        "order_cost": "Costo del Pedido",
+    }
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Reposición"
+        self._icon = "🚚"
+        self.logger = Logger(__name__).get_logger()
+
+        self.replenishment_service: ReplenishmentService = self.app_state.get_replenishment_service()
+        self.location_service: LocationService = self.app_state.get_location_service()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        try:
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            locations = self.location_service.get_all_locations()
+            location = st.selectbox(
+                "Sucursal",
+                options=[None] + locations,
+                format_func=lambda x: "Total de la empresa" if x is None else f"{x.code} - {x.name}",
+                key="replenishment_location",
+            )
+            location_id = location.id if location else None
+
+            plan = self.replenishment_service.get_plan()
+            parameters = plan.parameters
+            st.caption(
+                f"Demanda de los últimos {parameters['lookback_days']} días · plazo de entrega "
+                f"{parameters['lead_days']} días · seguridad {parameters['safety_days']} días · "
+                f"cobertura del pedido {parameters['cover_days']} días"
+            )
+
+            rows = plan.for_location(location_id)
+            to_order = rows[rows["suggested_qty"] > 0]
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Productos a Pedir", f"{len(to_order):,}")
+            col2.metric("Unidades", f"{int(to_order['suggested_qty'].sum()):,}")
+            col3.metric("Costo del Pedido", f"${to_order['order_cost'].sum():,.2f}")
+
+            only_to_order = st.checkbox("Solo productos a pedir", value=True, key="replenishment_only_to_order")
+            shown = to_order if only_to_order else rows
+            shown = shown.sort_values("days_of_cover", na_position="last").head(self._MAX_ROWS)
+            if len(shown) == self._MAX_ROWS:
+                st.caption(
+                    f"Mostrando los {self._MAX_ROWS} productos con menos días de cobertura; "
+                    "la orden de compra incluye todos."
+                )
+            st.dataframe(
+                shown.drop(columns=["location_id", "product_id", "price"]).rename(columns=self._COLUMN_LABELS),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+            self._render_export(location_id)
+
+        except Exception as e:
+            self.logger.error(f"Error in replenishment page: {str(e)}")
+            st.error("❌ Error al calcular la reposición")
+
+    def _render_export(self, location_id) -> None:
+        st.markdown("---")
+        if st.button("📥 Preparar orden de compra XLSX"):
+            st.session_state.purchase_order_xlsx = (
+                location_id, self.replenishment_service.export_purchase_order(location_id)
+            )
+
+        export = st.session_state.get("purchase_order_xlsx")
+        if export and export[0] == location_id:
+            st.download_button(
+                "⬇️ Descargar orden de compra",
+                data=export[1],
+                file_name="orden_de_compra.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
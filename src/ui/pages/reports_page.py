@@ -0,0 +1,107 @@
+# src/ui/pages/reports_page.py
+from datetime import date, timedelta
+from typing import List
+
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.services.analytics_service import AnalyticsService
+from src.utils.logger import Logger
+
+
+class ReportsPage(BasePage):
+    """
+    Página de reportes de ventas
+    Responsabilidad Única: Presentar los reportes del servicio de analítica
+    """
+
+    _COLUMN_LABELS = {
+        "day": "Día",
+        "category": "Categoría",
+        "code": "Código",
+        "name": "Nombre",
+        "stock": "Stock",
+        "quantity": "Unidades",
+        "revenue": "Ventas",
+        "cost": "Costo",
+        "margin": "Margen",
+        "margin_pct": "Margen %",
+        "invoice_count": "Facturas",
+    }
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Reportes de Ventas"
+        self._icon = "📈"
+        self.logger = Logger(__name__).get_logger()
+
+        self.analytics_service: AnalyticsService = self.app_state.get_analytics_service()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        try:
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            start, end = self._render_period_selector()
+            self._render_totals(start, end)
+            self._render_daily_sales(start, end)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("📂 Ventas por Categoría")
+                self._render_table(self.analytics_service.sales_by_category(start, end))
+            with col2:
+                st.subheader("🏆 Más Vendidos")
+                self._render_table(self.analytics_service.top_sellers(start, end))
+
+            st.subheader("🐢 Menor Rotación")
+            self._render_table(self.analytics_service.slow_movers(start, end))
+
+        except Exception as e:
+            self.logger.error(f"Error in reports page: {str(e)}")
+            st.error("❌ Error al cargar los reportes")
+
+    def _render_period_selector(self) -> tuple:
+        today = date.today()
+        col1, col2 = st.columns(2)
+        with col1:
+            start = st.date_input("Desde", value=today - timedelta(days=30), key="reports_start")
+        with col2:
+            end = st.date_input("Hasta", value=today, key="reports_end")
+        return start, end
+
+    def _render_totals(self, start: date, end: date) -> None:
+        totals = self.analytics_service.totals(start, end)
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Ventas", f"${totals['revenue']:,.2f}")
+        col2.metric("Costo", f"${totals['cost']:,.2f}")
+        col3.metric("Margen", f"${totals['margin']:,.2f}", f"{totals['margin_pct']:.1f}%")
+        col4.metric("Unidades", f"{totals['quantity']:,}")
+
+    def _render_daily_sales(self, start: date, end: date) -> None:
+        import pandas as pd
+        st.subheader("📅 Ventas por Día")
+        rows = self.analytics_service.sales_by_day(start, end)
+        if not rows:
+            st.info("📭 No hay ventas en el período seleccionado.")
+            return
+        df = pd.DataFrame(rows).set_index("day")
+        st.line_chart(df[["revenue", "margin"]].rename(columns=self._COLUMN_LABELS))
+
+    def _render_table(self, rows: List[dict]) -> None:
+        import pandas as pd
+        if not rows:
+            st.info("Sin datos para el período.")
+            return
+        df = pd.DataFrame(rows).drop(columns=["product_id"], errors="ignore")
+        st.dataframe(df.rename(columns=self._COLUMN_LABELS), use_container_width=True, hide_index=True)
@@ -0,0 +1,148 @@
+# src/ui/pages/valuation_page.py
+from datetime import date
+
+import streamlit as st
+
+from .base_page import BasePage
+from src.ui.app_state import IAppState
+from src.services.inventory_history_service import InventoryHistoryService, end_of_day
+from src.services.valuation_service import ValuationService
+from src.utils.logger import Logger
+
+
+class ValuationPage(BasePage):
+    """
+    Página de valorización de inventario y márgenes
+    Responsabilidad Única: Presentar la valorización calculada por el servicio
+    """
+
+    # Filas de producto que se dibujan en pantalla; la exportación incluye todas
+    _MAX_PRODUCT_ROWS = 1000
+
+    _COLUMN_LABELS = {
+        "code": "Código",
+        "name": "Nombre",
+        "category": "Categoría",
+        "supplier": "Proveedor",
+        "products": "Productos",
+        "price": "Precio",
+        "cost": "Costo",
+        "stock": "Stock",
+        "margin": "Margen",
+        "margin_pct": "Margen %",
+        "avg_margin_pct": "Margen % Promedio",
+        "markup_pct": "Markup %",
+        "value_at_cost": "Valor al Costo",
+        "value_at_retail": "Valor de Venta",
+        "potential_margin": "Margen Potencial",
+        "quantity": "Cantidad",
+    }
+
+    def __init__(self, app_state: IAppState):
+        super().__init__(app_state)
+        self._title = "Valorización de Inventario"
+        self._icon = "💰"
+        self.logger = Logger(__name__).get_logger()
+
+        self.valuation_service: ValuationService = self.app_state.get_valuation_service()
+        self.inventory_history_service: InventoryHistoryService = self.app_state.get_inventory_history_service()
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @property
+    def icon(self) -> str:
+        return self._icon
+
+    def render(self) -> None:
+        """Método principal de renderizado"""
+        try:
+            st.header(self.get_display_name())
+            st.markdown("---")
+
+            valuation = self.valuation_service.get_valuation()
+            totals = valuation.totals
+
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Productos", f"{totals['products']:,}")
+            col2.metric("Valor al Costo", f"${totals['value_at_cost']:,.2f}")
+            col3.metric("Valor de Venta", f"${totals['value_at_retail']:,.2f}")
+            col4.metric("Margen Potencial", f"${totals['potential_margin']:,.2f}", f"{totals['margin_pct']:.1f}%")
+
+            st.subheader("📂 Por Categoría")
+            st.dataframe(
+                valuation.categories.rename(columns=self._COLUMN_LABELS),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+            st.subheader("📋 Por Producto")
+            products = valuation.products.nlargest(self._MAX_PRODUCT_ROWS, "value_at_cost")
+            if len(valuation.products) > self._MAX_PRODUCT_ROWS:
+                st.caption(
+                    f"Mostrando los {self._MAX_PRODUCT_ROWS} productos con mayor valor al costo; "
+                    "la exportación incluye el catálogo completo."
+                )
+            st.dataframe(products.rename(columns=self._COLUMN_LABELS), use_container_width=True, hide_index=True)
+
+            self._render_export()
+            self._render_stock_as_of()
+
+        except Exception as e:
+            self.logger.error(f"Error in valuation page: {str(e)}")
+            st.error("❌ Error al cargar la valorización de inventario")
+
+    def _render_export(self) -> None:
+        st.markdown("---")
+        if st.button("📥 Preparar exportación XLSX"):
+            st.session_state.valuation_xlsx = self.valuation_service.export_xlsx()
+
+        if st.session_state.get("valuation_xlsx"):
+            st.download_button(
+                "⬇️ Descargar valorización",
+                data=st.session_state.valuation_xlsx,
+                file_name="valorizacion_inventario.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+
+    def _render_stock_as_of(self) -> None:
+        st.markdown("---")
+        st.subheader("📅 Stock a una Fecha")
+        col1, col2 = st.columns([2, 1])
+        day = col1.date_input("Al cierre del día", value=date.today(), max_value=date.today(),
+                              key="stock_as_of_day")
+        if col2.button("🔎 Consultar", key="stock_as_of_query"):
+            report = self.inventory_history_service.stock_as_of(end_of_day(day))
+            st.session_state.stock_as_of = (day, report, self.inventory_history_service.export_xlsx(report))
+
+        result = st.session_state.get("stock_as_of")
+        if not result or result[0] != day:
+            checkpoints = self.inventory_history_service.get_checkpoints()
+            st.caption(
+                f"Fotos de stock: {len(checkpoints)}"
+                + (f" (última: {checkpoints[0].taken_at:%Y-%m-%d %H:%M})" if checkpoints else "")
+            )
+            return
+
+        _, report, data = result
+        totals = report.totals
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Productos con Stock", f"{totals['products']:,}")
+        col2.metric("Unidades", f"{totals['units']:,}")
+        col3.metric("Valor al Costo Actual", f"${totals['value_at_cost']:,.2f}")
+        st.caption(
+            f"Desde la foto del {totals['checkpoint'] or '— (sin fotos: libro completo)'}, "
+            f"{totals['replayed_movements']:,} movimientos reproducidos en {totals['seconds']} s"
+        )
+        st.dataframe(
+            report.products.head(self._MAX_PRODUCT_ROWS).rename(columns=self._COLUMN_LABELS),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.download_button(
+            "⬇️ Descargar stock a la fecha",
+            data=data,
+            file_name=f"stock_{day:%Y%m%d}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
@@ -2,6 +2,8 @@ import streamlit as st
 
 from src.ui.app_state import IAppState
 from src.ui.pages import PageRegistry
+from src.services.till_sync_service import TillSyncService
+from src.utils.profiler import profiling_enabled
 
 
 def render_sidebar(app_state: IAppState, page_registry: PageRegistry) -> str:
@@ -16,5 +18,52 @@ def render_sidebar(app_state: IAppState, page_registry: PageRegistry) -> str:
             "Menú Principal", 
             page_registry.get_page_names()
         )
+
+        till_sync_service = app_state.get_till_sync_service()
+        if till_sync_service:
+            _render_till_sync(till_sync_service)
+
+        _render_diagnostics()
     
     return selected_page
+
+
+def _render_till_sync(till_sync_service: TillSyncService) -> None:
+    """Estado del modo caja y sincronización manual con la base central"""
+    st.markdown("---")
+    st.markdown("### 🧾 Modo Caja")
+    col1, col2 = st.columns(2)
+    col1.metric("Ventas pendientes", till_sync_service.pending_count())
+    col2.metric("Ajustes pendientes", till_sync_service.pending_stock_count())
+
+    if st.button("🔄 Sincronizar con central", use_container_width=True):
+        try:
+            report = till_sync_service.sync()
+            st.success(f"{report['synced']} ventas enviadas, {report['catalog_updates']} productos actualizados.")
+            if report["rejected"]:
+                st.warning(f"{len(report['rejected'])} ventas con códigos desconocidos quedan pendientes.")
+            if report["price_conflicts"]:
+                st.info(f"{len(report['price_conflicts'])} líneas cobradas con un precio distinto al central.")
+            if report["stock_operations"]:
+                st.success(f"{report['stock_operations']} conteos y transferencias aplicados.")
+            if report["rejected_operations"]:
+                st.warning(f"{len(report['rejected_operations'])} conteos o transferencias quedan pendientes: "
+                           f"{report['rejected_operations'][0]['error']}")
+            if report["stock_conflicts"]:
+                st.warning(f"{len(report['stock_conflicts'])} productos quedaron con stock negativo en la central.")
+        except Exception as e:
+            st.error(f"No se pudo sincronizar: {e}")
+
+
+def _render_diagnostics() -> None:
+    """Interruptor del perfilado de reejecuciones (POS_PROFILE lo fuerza para todos)"""
+    st.markdown("---")
+    with st.expander("🐞 Diagnóstico"):
+        forced = profiling_enabled()
+        st.toggle(
+            "Perfilar reejecuciones",
+            key="profiling_enabled",
+            value=forced,
+            disabled=forced,
+            help="Registra la duración de cada fase y un perfil por reejecución en la página Perfilado",
+        )
@@ -0,0 +1,601 @@
+"""
+Prueba de carga: cajeros y encargados concurrentes sobre una base SQLite temporal.
+
+Cada usuario simulado tiene sus propias sesiones, como una sesión de Streamlit,
+y repite las acciones de su rol hasta que termina la prueba:
+
+    scanner   escanea códigos (get_product_by_code) y a veces busca por nombre
+    checkout  arma una venta de 3 productos y la finaliza (SalesService)
+    manager   filtra la lista, consulta los conteos de filtros y cambia precios
+    recount   reconteo completo desde un XLSX (lectura en streaming + upsert)
+    export    exporta el catálogo activo a XLSX
+    ui        reejecuciones de la aplicación con AppTest (lista y búsqueda de productos)
+
+Los usuarios de un proceso corren en hilos y comparten la base, como los de un
+servidor de Streamlit; con --processes se reparten entre procesos. El catálogo y
+la secuencia de acciones de cada usuario salen de la semilla: dos ejecuciones con
+la misma configuración hacen el mismo trabajo y sus reportes JSON se comparan con
+--baseline (avisa si la configuración o el entorno difieren).
+
+Se informa por operación el rendimiento, los percentiles de latencia y los errores
+(los de bloqueo aparte). También se cuentan las sentencias que fallaron por bloqueo
+en la base: los repositorios absorben los errores de lectura y retornan vacío.
+
+Para probar un flujo nuevo, agregue una subclase de LoadUser y regístrela en ROLES.
+
+Uso:
+    python -m src.utils.load_test [--scenario cajas] [--duration 30] [--products 20000]
+    python -m src.utils.load_test --scenario scanner=20,checkout=10,ui=5 --processes 2 --report carga.json
+    python -m src.utils.load_test --scenario cajas --baseline carga.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, func, insert, select
+
+from src.database.database import Database
+from src.database.models import ProductModel
+from src.database.write_coordinator import WriteCoordinator, group_commit_enabled
+from src.entities.invoice import Invoice
+from src.entities.product import ProductCategory
+from src.entities.product_filter import ProductFilter
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.services.product_service import ProductService
+from src.services.sales_service import SalesService
+from src.utils.logger import Logger
+
+# Escenarios con nombre; también se acepta "rol=cantidad,rol=cantidad"
+SCENARIOS = {
+    "cajas": "scanner=30,recount=1",
+    "tienda": "scanner=10,checkout=10,manager=2,export=1,ui=3",
+    "interfaz": "ui=10",
+}
+
+_FAMILIES = ["Filtro aceite", "Filtro aire", "Pastilla freno", "Bujía", "Amortiguador", "Correa", "Lámpara"]
+_BRANDS = ["Bosch", "Valeo", "Denso", "NGK", "Mahle", "Gates"]
+_SUPPLIERS = 40
+_LOCK_MESSAGES = ("database is locked", "database table is locked", "database is busy")
+_MAIN_SCRIPT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "main.py"))
+# La primera ejecución de AppTest importa toda la aplicación
+_UI_TIMEOUT = 120
+
+
+def _code(number: int) -> str:
+    return f"LT{number:06d}"
+
+
+def _catalog_record(number: int) -> Dict[str, Any]:
+    """Producto number del catálogo de prueba; depende solo del número"""
+    categories = list(ProductCategory)
+    price = 1000.0 + number % 5000
+    return {
+        "code": _code(number),
+        "name": f"{_FAMILIES[number % len(_FAMILIES)]} {_BRANDS[number % len(_BRANDS)]} {number:06d}",
+        "description": "",
+        "price": price,
+        "cost": round(price * 0.6, 2),
+        "category": categories[number % len(categories)].value,
+        "supplier": f"Proveedor {number % _SUPPLIERS + 1}",
+        "stock": 1000,
+        "is_active": True,
+    }
+
+
+def _is_lock_error(error: BaseException) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in _LOCK_MESSAGES)
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class OperationStats:
+    """Latencias y errores de una operación; se combinan entre usuarios y procesos"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.lock_errors = 0
+        self.error_sample: List[str] = []
+
+    def fail(self, error: Exception) -> None:
+        self.errors += 1
+        if _is_lock_error(error):
+            self.lock_errors += 1
+        message = type(error).__name__ + ": " + (str(error).splitlines() or [""])[0]
+        if message not in self.error_sample and len(self.error_sample) < 3:
+            self.error_sample.append(message)
+
+    def merge(self, other: "OperationStats") -> None:
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        self.lock_errors += other.lock_errors
+        for message in other.error_sample:
+            if message not in self.error_sample and len(self.error_sample) < 3:
+                self.error_sample.append(message)
+
+    def summary(self, seconds: float) -> Dict[str, Any]:
+        latencies = self.latencies
+        return {
+            "count": len(latencies),
+            "errors": self.errors,
+            "lock_errors": self.lock_errors,
+            "per_second": round(len(latencies) / seconds, 1) if seconds else 0.0,
+            "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2) if latencies else None,
+            "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2) if latencies else None,
+            "max_ms": round(max(latencies) * 1000, 2) if latencies else None,
+            "error_sample": self.error_sample,
+        }
+
+
+class LoadContext:
+    """
+    Lo compartido por los usuarios de un proceso: base, escritor único (con
+    POS_GROUP_COMMIT), catálogo, carpeta temporal y fin de la prueba
+    """
+
+    def __init__(self, database: Database, settings: Dict[str, Any]):
+        self.database = database
+        self.write_coordinator = WriteCoordinator(database) if group_commit_enabled() else None
+        self.products: int = settings["products"]
+        self.seed: int = settings["seed"]
+        self.directory: str = settings["directory"]
+        self.deadline = 0.0
+
+
+class LoadUser:
+    """
+    Usuario simulado: setup prepara sus servicios (no se mide), step ejecuta una
+    acción y mide sus operaciones con timed. El generador aleatorio depende de la
+    semilla, el rol y el número del usuario.
+    """
+
+    role = ""
+
+    def __init__(self, context: LoadContext, number: int):
+        self.context = context
+        self.number = number
+        self.rng = random.Random(f"{context.seed}-{self.role}-{number}")
+        self.stats: Dict[str, OperationStats] = {}
+
+    def setup(self) -> None:
+        pass
+
+    def step(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def timed(self, operation: str, function: Callable[..., Any], *args, **kwargs) -> Any:
+        stats = self.stats.get(operation)
+        if stats is None:
+            stats = self.stats.setdefault(operation, OperationStats())
+        started = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        except Exception as e:
+            stats.fail(e)
+            return None
+        stats.latencies.append(time.perf_counter() - started)
+        return result
+
+    def random_code(self) -> str:
+        return _code(self.rng.randrange(1, self.context.products + 1))
+
+
+class _ServiceUser(LoadUser):
+    """Usuario con sus propias sesiones y ProductService, como una sesión de la aplicación"""
+
+    def setup(self) -> None:
+        database = self.context.database
+        self.session = database.get_session()
+        self.read_session = database.get_read_session()
+        self.repository = ProductRepository(self.session, self.read_session, actor=f"load-{self.role}-{self.number}")
+        self.product_service = ProductService(self.repository)
+
+    def close(self) -> None:
+        self.session.close()
+        self.read_session.close()
+
+
+class ScannerUser(_ServiceUser):
+    role = "scanner"
+
+    def step(self) -> None:
+        # Uno de cada 20: el código no se lee y se busca por nombre
+        if self.rng.random() < 0.05:
+            self.timed("search", self.product_service.search_products, self.rng.choice(_BRANDS))
+        else:
+            self.timed("scan", self.product_service.get_product_by_code, self.random_code())
+
+
+class CheckoutUser(_ServiceUser):
+    role = "checkout"
+    items = 3
+
+    def setup(self) -> None:
+        super().setup()
+        sales = SaleRepository(self.session, self.read_session, actor=f"load-{self.role}-{self.number}")
+        self.sales_service = SalesService(sales, write_coordinator=self.context.write_coordinator)
+
+    def step(self) -> None:
+        self.timed("checkout", self._checkout)
+
+    def _checkout(self) -> Invoice:
+        invoice = Invoice()
+        for _ in range(self.items):
+            code = self.random_code()
+            product = self.product_service.get_product_by_code(code)
+            if product is None:
+                raise ValueError(f"Producto no encontrado: {code}")
+            invoice.add_item(self.sales_service.build_item(product, 1))
+        return self.sales_service.finalize_sale(invoice)
+
+
+class ManagerUser(_ServiceUser):
+    role = "manager"
+
+    def step(self) -> None:
+        action = self.rng.random()
+        if action < 0.5:
+            category = self.rng.choice(list(ProductCategory))
+            self.timed("filter", self.product_service.filter_products, ProductFilter(categories=[category]))
+        elif action < 0.8:
+            self.timed("facets", self.product_service.get_facet_counts)
+        else:
+            self.timed("update_price", self._update_price)
+
+    def _update_price(self) -> None:
+        product = self.product_service.get_product_by_code(self.random_code())
+        if product is None:
+            raise ValueError("Producto no encontrado")
+        self.product_service.update_product(product.id, {"price": round(product.price * 1.01, 2)},
+                                            expected_version=product.version)
+
+
+class RecountUser(_ServiceUser):
+    """Reconteo del catálogo completo desde un XLSX, por el mismo camino que liz-pos import-recount"""
+
+    role = "recount"
+
+    def setup(self) -> None:
+        from src.cli import write_records
+        super().setup()
+        self.path = os.path.join(self.context.directory, f"recount-{self.number}.xlsx")
+        write_records(self.path, (
+            {**_catalog_record(number), "stock": self.rng.randrange(0, 100)}
+            for number in range(1, self.context.products + 1)
+        ))
+
+    def step(self) -> None:
+        from src.cli import read_records
+        self.timed("recount_xlsx", lambda: self.product_service.recount_inventory(
+            read_records(self.path), batch_size=5000
+        ))
+
+
+class ExportUser(_ServiceUser):
+    role = "export"
+
+    def setup(self) -> None:
+        super().setup()
+        self.path = os.path.join(self.context.directory, f"export-{self.number}.xlsx")
+
+    def step(self) -> None:
+        from src.cli import write_records
+        self.timed("export_xlsx", lambda: write_records(self.path, (
+            {**record, "category": getattr(record["category"], "value", record["category"])}
+            for record in self.product_service.iter_catalog(True, 5000)
+        )))
+
+
+class UIUser(LoadUser):
+    """Sesión de la aplicación con AppTest: mide cada reejecución completa del script"""
+
+    role = "ui"
+
+    def setup(self) -> None:
+        from streamlit.testing.v1 import AppTest
+        self.app = AppTest.from_file(_MAIN_SCRIPT, default_timeout=_UI_TIMEOUT)
+        self._run()
+
+    def step(self) -> None:
+        # Mitad búsquedas (cambia el texto y la lista), mitad reejecuciones sin cambios
+        if self.rng.random() < 0.5:
+            term = self.rng.choice(_BRANDS + [self.random_code(), ""])
+            self.app.text_input(key="product_search_main").input(term)
+            self.timed("search", self._run)
+        else:
+            self.timed("rerun", self._run)
+
+    def _run(self) -> None:
+        self.app.run()
+        if self.app.exception:
+            raise RuntimeError(f"Excepción en la aplicación: {self.app.exception[0].message}")
+        if self.app.error:
+            raise RuntimeError(f"Error en la aplicación: {self.app.error[0].value}")
+
+
+ROLES = {user.role: user for user in (ScannerUser, CheckoutUser, ManagerUser, RecountUser, ExportUser, UIUser)}
+
+
+class _LockWatcher:
+    """Cuenta las sentencias que fallaron por bloqueo en los motores observados"""
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def attach(self, *engines) -> None:
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if _is_lock_error(context.original_exception):
+            with self._lock:
+                self.count += 1
+
+
+def parse_scenario(spec: str) -> Dict[str, int]:
+    """Nombre de escenario o "rol=cantidad,..." a cantidad de usuarios por rol, en el orden de ROLES"""
+    users: Dict[str, int] = {}
+    for part in SCENARIOS.get(spec, spec).split(","):
+        role, _, count = part.strip().partition("=")
+        if role not in ROLES:
+            raise ValueError(f"Rol desconocido: {role} (disponibles: {', '.join(ROLES)})")
+        try:
+            users[role] = users.get(role, 0) + int(count or 1)
+        except ValueError:
+            raise ValueError(f"Cantidad inválida para {role}: {count}")
+    if not users or any(count < 1 for count in users.values()):
+        raise ValueError("El escenario debe tener al menos un usuario por rol")
+    return {role: users[role] for role in ROLES if role in users}
+
+
+def _seed(database: Database, products: int) -> None:
+    database.create_tables()
+    database.run_migrations()
+    with database.get_session() as session:
+        if session.execute(select(func.count()).select_from(ProductModel)).scalar():
+            raise ValueError("La base de la prueba de carga debe estar vacía")
+        numbers = list(range(1, products + 1))
+        for batch in database.backend.batched(numbers, params_per_row=9):
+            session.execute(insert(ProductModel), [_catalog_record(number) for number in batch])
+        session.commit()
+
+
+def _run_users(settings: Dict[str, Any], users: List[Tuple[str, int]], process_barrier=None) -> Dict[str, Any]:
+    """Corre los usuarios de este proceso en hilos; arrancan juntos cuando todos terminaron su setup"""
+    database = Database.connect(settings["url"])
+    context = LoadContext(database, settings)
+    watcher = _LockWatcher()
+    watcher.attach(database.engine, database.read_engine)
+    if any(role == UIUser.role for role, _ in users):
+        # AppTest usa el singleton, creado desde DATABASE_URL
+        watcher.attach(Database().engine, Database().read_engine)
+
+    load_users = [ROLES[role](context, number) for role, number in users]
+    ready = threading.Barrier(len(load_users) + 1)
+    go = threading.Event()
+    setup_errors: List[str] = []
+
+    def run(user: LoadUser) -> None:
+        try:
+            user.setup()
+        except Exception as e:
+            setup_errors.append(f"{user.role} {user.number}: {type(e).__name__}: {e}")
+            ready.wait()
+            return
+        ready.wait()
+        go.wait()
+        try:
+            while time.monotonic() < context.deadline:
+                user.step()
+                if settings["think_ms"]:
+                    time.sleep(settings["think_ms"] / 1000 * user.rng.uniform(0.5, 1.5))
+        finally:
+            user.close()
+
+    threads = [threading.Thread(target=run, args=(user,), daemon=True) for user in load_users]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    if process_barrier is not None:
+        process_barrier.wait(timeout=600)
+    context.deadline = time.monotonic() + settings["duration"]
+    started = time.perf_counter()
+    go.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    operations: Dict[str, OperationStats] = {}
+    for user in load_users:
+        for operation, stats in user.stats.items():
+            operations.setdefault(f"{user.role}.{operation}", OperationStats()).merge(stats)
+    if context.write_coordinator:
+        context.write_coordinator.close()
+    database.engine.dispose()
+    database.read_engine.dispose()
+    return {"seconds": elapsed, "operations": operations, "db_lock_errors": watcher.count,
+            "setup_errors": setup_errors}
+
+
+def _process_main(settings: Dict[str, Any], users: List[Tuple[str, int]], barrier, queue) -> None:
+    Logger.set_console_stream(sys.stderr)
+    try:
+        queue.put(_run_users(settings, users, barrier))
+    except Exception as e:
+        barrier.abort()
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def run_scenario(users: Dict[str, int], duration: float = 30.0, products: int = 20000, seed: int = 1,
+                 processes: int = 1, think_ms: float = 0.0, database_url: Optional[str] = None) -> Dict[str, Any]:
+    """Siembra el catálogo, corre los usuarios repartidos en processes procesos y arma el reporte"""
+    if duration <= 0 or products < 1 or processes < 1 or think_ms < 0:
+        raise ValueError("Duración, productos y procesos deben ser positivos")
+    plan = [(role, number) for role, count in users.items() for number in range(count)]
+    processes = min(processes, len(plan))
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = database_url or f"sqlite:///{os.path.join(directory, 'load.db')}"
+        database = Database.connect(url)
+        _seed(database, products)
+        database.engine.dispose()
+        database.read_engine.dispose()
+        # Las sesiones de AppTest (y los procesos hijos) abren la base con el singleton
+        os.environ["DATABASE_URL"] = url
+
+        settings = {"url": url, "directory": directory, "products": products, "seed": seed,
+                    "duration": duration, "think_ms": think_ms}
+        if processes == 1:
+            results = [_run_users(settings, plan)]
+        else:
+            import multiprocessing
+            # spawn: un fork con hilos y conexiones abiertas no es seguro
+            mp = multiprocessing.get_context("spawn")
+            barrier = mp.Barrier(processes)
+            queue = mp.Queue()
+            workers = [
+                mp.Process(target=_process_main, args=(settings, plan[index::processes], barrier, queue))
+                for index in range(processes)
+            ]
+            for worker in workers:
+                worker.start()
+            results = [queue.get() for _ in workers]
+            for worker in workers:
+                worker.join()
+            failed = [result["error"] for result in results if "error" in result]
+            if failed:
+                raise RuntimeError(f"Falló un proceso de la prueba: {failed[0]}")
+
+    seconds = max(result["seconds"] for result in results)
+    operations: Dict[str, OperationStats] = {}
+    for result in results:
+        for name, stats in result["operations"].items():
+            operations.setdefault(name, OperationStats()).merge(stats)
+    return {
+        "scenario": ",".join(f"{role}={count}" for role, count in users.items()),
+        "config": {
+            "users": users, "duration": duration, "products": products, "seed": seed,
+            "processes": processes, "think_ms": think_ms, "group_commit": group_commit_enabled(),
+        },
+        "environment": {
+            "python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+        },
+        "seconds": round(seconds, 3),
+        "db_lock_errors": sum(result["db_lock_errors"] for result in results),
+        "setup_errors": [error for result in results for error in result["setup_errors"]],
+        "operations": {name: operations[name].summary(seconds) for name in sorted(operations)},
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    config = report["config"]
+    lines = [
+        f"Escenario {report['scenario']} · {report['seconds']:,.1f} s · {config['products']:,} productos · "
+        f"semilla {config['seed']} · {config['processes']} proceso(s)",
+        "",
+        f"{'operación':<22} {'ops':>7} {'errores':>7} {'bloqueo':>7} {'ops/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'máx ms':>8}",
+    ]
+    for name, operation in report["operations"].items():
+        lines.append(
+            f"{name:<22} {operation['count']:>7} {operation['errors']:>7} {operation['lock_errors']:>7} "
+            f"{operation['per_second']:>8,.1f} {operation['p50_ms'] or 0:>8,.1f} {operation['p95_ms'] or 0:>8,.1f} "
+            f"{operation['p99_ms'] or 0:>8,.1f} {operation['max_ms'] or 0:>8,.1f}"
+        )
+        for sample in operation["error_sample"]:
+            lines.append(f"{'':<22} ❌ {sample}")
+    lines.append("")
+    lines.append(f"Sentencias fallidas por bloqueo en la base: {report['db_lock_errors']}")
+    for error in report["setup_errors"]:
+        lines.append(f"❌ Preparación: {error}")
+    return "\n".join(lines)
+
+
+def compare_reports(report: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    """Rendimiento y p95 de cada operación contra un reporte anterior"""
+    def change(current: Optional[float], previous: Optional[float]) -> str:
+        if not current or not previous:
+            return ""
+        return f"({(current - previous) / previous:+.1%})"
+
+    lines = ["Comparación con la ejecución anterior:"]
+    if report["config"] != baseline["config"]:
+        lines.append(f"⚠️ Configuración distinta: {json.dumps(baseline['config'])}")
+    if report["environment"] != baseline["environment"]:
+        lines.append(f"⚠️ Entorno distinto: {json.dumps(baseline['environment'])}")
+    for name, operation in report["operations"].items():
+        previous = baseline["operations"].get(name)
+        if previous is None:
+            lines.append(f"{name:<22} nueva")
+            continue
+        lines.append(
+            f"{name:<22} ops/s {previous['per_second']:>8,.1f} → {operation['per_second']:>8,.1f} "
+            f"{change(operation['per_second'], previous['per_second']):>9}   "
+            f"p95 {previous['p95_ms'] or 0:>8,.1f} → {operation['p95_ms'] or 0:>8,.1f} ms "
+            f"{change(operation['p95_ms'], previous['p95_ms']):>9}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga con usuarios concurrentes")
+    parser.add_argument("--scenario", default="cajas",
+                        help=f"Escenario ({', '.join(SCENARIOS)}) o roles, p. ej. scanner=30,recount=1 "
+                             f"(roles: {', '.join(ROLES)})")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de carga")
+    parser.add_argument("--products", type=int, default=20000, help="Productos del catálogo de prueba")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla del catálogo y de las acciones")
+    parser.add_argument("--processes", type=int, default=1, help="Procesos entre los que se reparten los usuarios")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pausa media entre acciones de cada usuario")
+    parser.add_argument("--database-url", help="Base vacía a usar (por defecto SQLite temporal)")
+    parser.add_argument("--report", help="Guarda el reporte JSON en este archivo")
+    parser.add_argument("--baseline", help="Reporte JSON anterior con el que comparar")
+    parser.add_argument("--max-p95-ms", type=float, help="Falla si el p95 de alguna operación lo supera")
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte como JSON")
+    args = parser.parse_args(argv)
+    try:
+        users = parse_scenario(args.scenario)
+    except ValueError as e:
+        parser.error(str(e))
+    Logger.set_console_stream(sys.stderr)
+
+    report = run_scenario(users, args.duration, args.products, args.seed, args.processes, args.think_ms,
+                          args.database_url)
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output if args.json else format_report(report))
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            print("\n" + compare_reports(report, json.load(file)))
+
+    over_budget = args.max_p95_ms is not None and any(
+        (operation["p95_ms"] or 0) > args.max_p95_ms for operation in report["operations"].values()
+    )
+    failed = report["setup_errors"] or any(operation["errors"] for operation in report["operations"].values())
+    return 1 if failed or over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,47 @@
 import logging
 import sys
+import threading
 from datetime import datetime
 
 
 class Logger:
+    # Un solo par de handlers para todos los loggers del sistema; el archivo
+    # se abre recién con el primer mensaje (delay), no al importar cada módulo
+    _handlers = None
+    _handlers_lock = threading.Lock()
+
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(logging.INFO)
         
         if not self.logger.handlers:
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            
-            # Handler para consola
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setFormatter(formatter)
-            self.logger.addHandler(console_handler)
-            
-            # Handler para archivo
-            file_handler = logging.FileHandler(f'pos_system_{datetime.now().strftime("%Y%m%d")}.log')
-            file_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
+            for handler in self._shared_handlers():
+                self.logger.addHandler(handler)
+
+    @classmethod
+    def set_console_stream(cls, stream) -> None:
+        """Redirige la consola (p. ej. a stderr cuando stdout lleva un reporte JSON)"""
+        cls._shared_handlers()[0].setStream(stream)
+
+    @classmethod
+    def _shared_handlers(cls) -> list:
+        with cls._handlers_lock:
+            if cls._handlers is None:
+                formatter = logging.Formatter(
+                    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+                )
+
+                # Handler para consola
+                console_handler = logging.StreamHandler(sys.stdout)
+                console_handler.setFormatter(formatter)
+
+                # Handler para archivo
+                file_handler = logging.FileHandler(
+                    f'pos_system_{datetime.now().strftime("%Y%m%d")}.log', delay=True
+                )
+                file_handler.setFormatter(formatter)
+                cls._handlers = [console_handler, file_handler]
+        return cls._handlers
     
     def get_logger(self):
-        return self.logger
\ No newline at end of file
+        return self.logger
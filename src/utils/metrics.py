@@ -0,0 +1,364 @@
+"""
+Métricas del proceso en formato de texto de Prometheus.
+
+Contadores, medidores e histogramas registrados en un registro del proceso.
+Registrar un evento solo toma un lock y suma un número: las etiquetas se
+resuelven una vez con labels() y el hijo resultante se reutiliza.
+
+Exposición, según variables de entorno:
+    POS_METRICS_PORT=9464            servidor HTTP en un hilo aparte (/metrics)
+    POS_METRICS_FILE=metrics.prom    archivo reescrito cada POS_METRICS_INTERVAL segundos
+"""
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de operaciones en memoria a importaciones grandes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        # Conteos por intervalo; se acumulan al exponer
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> "_Timer":
+        """Context manager que observa la duración del bloque"""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild):
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+
+class Metric:
+    """Métrica con nombre y etiquetas; cada combinación de valores es un hijo"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._unlabeled = self.labels()
+
+    def labels(self, *values: str):
+        """Hijo para los valores de etiqueta dados; conviene guardarlo y reutilizarlo"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"La métrica {self.name} espera las etiquetas {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Valor que solo aumenta (eventos, filas, errores)"""
+
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabeled.inc(amount)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self._children.items())]
+
+
+class Gauge(Counter):
+    """Valor que sube y baja; con function se calcula al exponer"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], Optional[float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabeled.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._unlabeled.set(value)
+
+    def samples(self) -> List[str]:
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception as e:
+                logger.error(f"Error evaluating gauge {self.name}: {str(e)}")
+                value = None
+            return [] if value is None else [f"{self.name} {_format_value(float(value))}"]
+        return super().samples()
+
+
+class Histogram(Metric):
+    """Distribución de valores (duraciones, tamaños) en intervalos acumulados"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(float(bucket) for bucket in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value: float) -> None:
+        self._unlabeled.observe(value)
+
+    def time(self) -> _Timer:
+        return self._unlabeled.time()
+
+    def timed(self, *values: str):
+        """Decorador que observa la duración de cada llamada con las etiquetas dadas"""
+        child = self.labels(*values)
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with _Timer(child):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.bounds + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Métricas del proceso; registrar dos veces el mismo nombre devuelve la existente"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"La métrica {metric.name} ya existe con otra definición")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus"""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = (),
+          function: Optional[Callable[[], Optional[float]]] = None) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames, function))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+class MetricsExporter:
+    """Expone un registro por HTTP (hilo aparte) o en un archivo reescrito periódicamente"""
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+
+    def start_http_server(self, port: int, address: str = "0.0.0.0") -> ThreadingHTTPServer:
+        registry = self.registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((address, port), MetricsHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{address}:{self.server.server_port}/metrics")
+        return self.server
+
+    def write_file(self, path: str) -> None:
+        """Escritura atómica, apta para el textfile collector de node_exporter"""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(self.registry.render())
+        os.replace(temporary, path)
+
+    def start_file_writer(self, path: str, interval: float = 15.0) -> threading.Thread:
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.write_file(path)
+                except OSError as e:
+                    logger.error(f"Error writing metrics file {path}: {str(e)}")
+
+        self.write_file(path)
+        thread = threading.Thread(target=loop, name="metrics-file", daemon=True)
+        thread.start()
+        logger.info(f"Metrics written to {path} every {interval:g}s")
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+_exporter: Optional[MetricsExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def start_exporters() -> Optional[MetricsExporter]:
+    """Inicia los exportadores configurados una sola vez por proceso"""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is not None:
+            return _exporter
+
+        port = os.getenv("POS_METRICS_PORT")
+        path = os.getenv("POS_METRICS_FILE")
+        if not port and not path:
+            return None
+
+        _exporter = MetricsExporter()
+        try:
+            if port:
+                _exporter.start_http_server(int(port), os.getenv("POS_METRICS_ADDRESS", "0.0.0.0"))
+            if path:
+                _exporter.start_file_writer(path, float(os.getenv("POS_METRICS_INTERVAL", "15")))
+        except (OSError, ValueError) as e:
+            # Las métricas nunca impiden que la caja funcione
+            logger.error(f"Error starting metrics exporter: {str(e)}")
+        return _exporter
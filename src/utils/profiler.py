@@ -0,0 +1,267 @@
+"""
+Perfilado de las reejecuciones de Streamlit.
+
+Con el perfilado activo cada reejecución registra la duración de sus fases
+(inicialización de base y estado, barra lateral, página, tablas) y un perfil de
+funciones, que se guardan en disco conservando solo los últimos N.
+
+Modos (POS_PROFILE_MODE):
+    sample    muestreo de la pila cada POS_PROFILE_INTERVAL_MS; exporta stacks
+              "folded" para flamegraph.pl o speedscope (por defecto)
+    cprofile  cProfile determinista; exporta el .prof para snakeviz o flameprof
+
+Variables de entorno:
+    POS_PROFILE=1               perfila todas las sesiones
+    POS_PROFILE_DIR=profiles    carpeta de los perfiles
+    POS_PROFILE_KEEP=20         perfiles que se conservan
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.utils.logger import Logger
+
+logger = Logger(__name__).get_logger()
+
+SAMPLE = "sample"
+CPROFILE = "cprofile"
+
+_current: ContextVar[Optional["RerunProfile"]] = ContextVar("current_profile", default=None)
+_NO_PHASE = nullcontext()
+
+
+def profiling_enabled() -> bool:
+    """Perfilado forzado para todo el proceso por variable de entorno"""
+    return os.getenv("POS_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+class RerunProfile:
+    """Una reejecución perfilada: fases medidas y artefactos del perfilador"""
+
+    def __init__(self, mode: str):
+        self.id = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.started_at = datetime.now()
+        self.mode = mode
+        self.page = ""
+        self.status = "ok"
+        self.total_ms = 0.0
+        self.phases: List[Dict[str, Any]] = []
+        self.top: List[Dict[str, Any]] = []
+        self.folded: Dict[str, int] = {}
+        self.stats: Optional[cProfile.Profile] = None
+        self._origin = time.perf_counter()
+        self._depth = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        entry = {"name": name, "depth": self._depth, "start_ms": self._elapsed_ms(), "duration_ms": 0.0}
+        self.phases.append(entry)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            entry["duration_ms"] = self._elapsed_ms() - entry["start_ms"]
+
+    def finish(self) -> None:
+        self.total_ms = self._elapsed_ms()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "mode": self.mode,
+            "page": self.page,
+            "status": self.status,
+            "total_ms": round(self.total_ms, 2),
+            "phases": [{**entry, "start_ms": round(entry["start_ms"], 2),
+                        "duration_ms": round(entry["duration_ms"], 2)} for entry in self.phases],
+            "top": self.top,
+        }
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+
+
+def phase(name: str):
+    """Mide una fase de la reejecución perfilada en curso; sin perfilado no hace nada"""
+    profile = _current.get()
+    return profile.phase(name) if profile is not None else _NO_PHASE
+
+
+class StackSampler:
+    """Muestrea la pila de un hilo a intervalos fijos y acumula stacks "folded" """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: int, root_frame) -> None:
+        self._thread = threading.Thread(
+            target=self._run, args=(thread_id, root_frame), name="profile-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self, thread_id: int, root_frame) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            # Solo los marcos bajo la reejecución, no los del ScriptRunner de Streamlit
+            while frame is not None and frame is not root_frame:
+                code = frame.f_code
+                stack.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_name}")
+                frame = frame.f_back
+            # Una muestra tomada tras stop() es la propia espera del hilo perfilado
+            if stack and not self._stop.is_set():
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """Perfiles en disco: un .json por reejecución más su .folded o .prof"""
+
+    def __init__(self, directory: Optional[str] = None, keep: Optional[int] = None):
+        self.directory = directory or os.getenv("POS_PROFILE_DIR", "profiles")
+        self.keep = keep or int(os.getenv("POS_PROFILE_KEEP", "20"))
+
+    def save(self, profile: RerunProfile) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, profile.id)
+        if profile.folded:
+            with open(f"{base}.folded", "w", encoding="utf-8") as file:
+                file.writelines(f"{stack} {count}\n" for stack, count in profile.folded.items())
+        if profile.stats is not None:
+            profile.stats.dump_stats(f"{base}.prof")
+        with open(f"{base}.json", "w", encoding="utf-8") as file:
+            json.dump(profile.summary(), file, ensure_ascii=False)
+        self._rotate()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Resúmenes del más reciente al más antiguo"""
+        summaries = []
+        for profile_id in reversed(self._ids()):
+            summary = self.load(profile_id)
+            if summary:
+                summaries.append(summary)
+        return summaries
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.directory, f"{profile_id}.json"), encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def artifact(self, profile_id: str) -> Optional[tuple]:
+        """(nombre de archivo, contenido) del export del perfil, o None"""
+        for extension in (".folded", ".prof"):
+            path = os.path.join(self.directory, f"{profile_id}{extension}")
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    return os.path.basename(path), file.read()
+        return None
+
+    def clear(self) -> int:
+        ids = self._ids()
+        for profile_id in ids:
+            self._delete(profile_id)
+        return len(ids)
+
+    def _ids(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def _rotate(self) -> None:
+        ids = self._ids()
+        for profile_id in ids[:max(len(ids) - self.keep, 0)]:
+            self._delete(profile_id)
+
+    def _delete(self, profile_id: str) -> None:
+        for extension in (".json", ".folded", ".prof"):
+            path = os.path.join(self.directory, f"{profile_id}{extension}")
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _top_functions(profiler: cProfile.Profile, limit: int = 25) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({function})",
+            "calls": calls,
+            "total_ms": round(total * 1000, 2),
+            "cumulative_ms": round(cumulative * 1000, 2),
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def _top_stacks(samples: Counter, interval: float, limit: int = 25) -> List[Dict[str, Any]]:
+    """Funciones con más muestras propias (hoja del stack)"""
+    leaves: Counter = Counter()
+    for stack, count in samples.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    return [{"function": function, "samples": count, "approx_ms": round(count * interval * 1000, 1)}
+            for function, count in leaves.most_common(limit)]
+
+
+@contextmanager
+def profile_rerun(enabled: bool, store: Optional[ProfileStore] = None,
+                  mode: Optional[str] = None) -> Iterator[Optional[RerunProfile]]:
+    """Perfila el bloque (una reejecución) y lo guarda al salir, aun si Streamlit la interrumpe"""
+    if not enabled:
+        yield None
+        return
+
+    mode = mode or os.getenv("POS_PROFILE_MODE", SAMPLE)
+    profile = RerunProfile(mode)
+    token = _current.set(profile)
+    sampler = None
+    if mode == CPROFILE:
+        profile.stats = cProfile.Profile()
+        profile.stats.enable()
+    else:
+        sampler = StackSampler(float(os.getenv("POS_PROFILE_INTERVAL_MS", "5")) / 1000)
+        sampler.start(threading.get_ident(), sys._getframe(2).f_back)
+
+    try:
+        yield profile
+    except Exception:
+        profile.status = "error"
+        raise
+    except BaseException:
+        # st.rerun() y st.stop() interrumpen la reejecución con excepciones de control
+        profile.status = "interrupted"
+        raise
+    finally:
+        _current.reset(token)
+        profile.finish()
+        if profile.stats is not None:
+            profile.stats.disable()
+            profile.top = _top_functions(profile.stats)
+        if sampler is not None:
+            sampler.stop()
+            profile.folded = dict(sampler.samples)
+            profile.top = _top_stacks(sampler.samples, sampler.interval)
+        try:
+            (store or ProfileStore()).save(profile)
+        except OSError as e:
+            logger.error(f"Error saving profile {profile.id}: {str(e)}")
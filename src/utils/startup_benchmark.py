@@ -0,0 +1,114 @@
+"""
+Benchmark del arranque en frío de la aplicación.
+
+Importa src.main en intérpretes nuevos con -X importtime y mide el tiempo
+acumulado de la importación. Falla (código 1) si la mediana supera el
+presupuesto o si al arrancar se cargan módulos pesados que deben importarse
+recién al usar la función que los necesita (pandas, numpy, openpyxl).
+
+Uso:
+    python -m src.utils.startup_benchmark [--runs 5] [--budget-ms 800] [--top 15]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# Solo se importan al usar tablas, importaciones XLSX o la valorización
+DEFERRED_MODULES = ("pandas", "numpy", "openpyxl", "pyarrow")
+
+DEFAULT_BUDGET_MS = 800.0
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+class StartupRun:
+    """Una importación en frío: tiempo total, paquetes importados y módulos diferidos cargados"""
+
+    def __init__(self, total_ms: float, modules: List[Tuple[str, float]], deferred_loaded: List[str]):
+        self.total_ms = total_ms
+        self.modules = modules
+        self.deferred_loaded = deferred_loaded
+
+
+def measure_startup(module: str = "src.main") -> StartupRun:
+    code = (
+        f"import {module}, sys, json; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+
+    total_us = 0
+    modules: Dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, _, name = match.groups()
+        # Paquetes raíz (streamlit, sqlalchemy...): su tiempo acumulado incluye sus submódulos
+        if "." not in name and name != module.split(".")[0]:
+            modules[name] = max(modules.get(name, 0.0), int(cumulative) / 1000)
+        if name == module:
+            total_us = int(cumulative)
+
+    deferred_loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    ranked = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    return StartupRun(total_us / 1000, ranked, deferred_loaded)
+
+
+def run_benchmark(runs: int = 5, module: str = "src.main") -> List[StartupRun]:
+    return [measure_startup(module) for _ in range(runs)]
+
+
+def format_report(results: List[StartupRun], budget_ms: float, top: int = 15) -> str:
+    totals = [result.total_ms for result in results]
+    median = statistics.median(totals)
+    lines = [
+        f"Arranque en frío ({len(results)} ejecuciones): mediana {median:,.0f} ms, "
+        f"mín {min(totals):,.0f} ms, máx {max(totals):,.0f} ms, presupuesto {budget_ms:,.0f} ms",
+        "",
+        "Paquetes más costosos (última ejecución):",
+    ]
+    for name, cumulative_ms in results[-1].modules[:top]:
+        lines.append(f"  {cumulative_ms:>9,.1f} ms  {name}")
+
+    deferred_loaded = sorted({name for result in results for name in result.deferred_loaded})
+    if deferred_loaded:
+        lines.append("")
+        lines.append(f"❌ Módulos que deberían importarse en diferido: {', '.join(deferred_loaded)}")
+    if median > budget_ms:
+        lines.append("")
+        lines.append(f"❌ El arranque supera el presupuesto por {median - budget_ms:,.0f} ms")
+    return "\n".join(lines)
+
+
+def within_budget(results: List[StartupRun], budget_ms: float) -> bool:
+    median = statistics.median(result.total_ms for result in results)
+    return median <= budget_ms and not any(result.deferred_loaded for result in results)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark del arranque en frío de la aplicación")
+    parser.add_argument("--runs", type=int, default=5, help="Intérpretes nuevos a medir")
+    parser.add_argument("--budget-ms", type=float,
+                        default=float(os.getenv("POS_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)),
+                        help="Mediana máxima aceptada del tiempo de importación")
+    parser.add_argument("--top", type=int, default=15, help="Importaciones más costosas a listar")
+    parser.add_argument("--module", default="src.main", help="Módulo de entrada a importar")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.runs, args.module)
+    print(format_report(results, args.budget_ms, args.top))
+    return 0 if within_budget(results, args.budget_ms) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from src.database import models  # noqa: F401  registra las tablas en Base.metadata
+from src.database.database import Base, Database
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Base SQLite nueva en un archivo temporal (WAL con motor de escritura y de solo lectura)"""
+    database = Database.connect(f"sqlite:///{tmp_path / 'pos_test.db'}")
+    database.create_tables()
+    database.run_migrations()
+    yield database
+    database.engine.dispose()
+    database.read_engine.dispose()
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def any_database(request, tmp_path):
+    """
+    La misma prueba sobre cada motor soportado.
+    PostgreSQL necesita POS_TEST_PG_URL (una base desechable: se borran sus tablas); sin ella se omite.
+    """
+    if request.param == "sqlite":
+        database = Database.connect(f"sqlite:///{tmp_path / 'pos_test.db'}")
+    else:
+        url = os.getenv("POS_TEST_PG_URL")
+        if not url:
+            pytest.skip("POS_TEST_PG_URL no definido; se omiten las pruebas sobre PostgreSQL")
+        database = Database.connect(url)
+        Base.metadata.drop_all(database.engine)
+    database.create_tables()
+    database.run_migrations()
+    yield database
+    database.engine.dispose()
+    database.read_engine.dispose()
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+
+from src.database.backup import BackupManager
+from src.database.models import ProductModel
+from src.entities.product import Product
+from src.repositories.product_repository import ProductRepository
+
+
+def _products(codes, price=100.0):
+    return [Product(code=code, name=f"Producto {code}", price=price, cost=60.0) for code in codes]
+
+
+def _repository(database) -> ProductRepository:
+    return ProductRepository(database.get_session(), database.get_read_session())
+
+
+def _count(session) -> int:
+    return session.execute(select(func.count()).select_from(ProductModel)).scalar_one()
+
+
+def test_upsert_inserts_new_codes_and_updates_existing_ones(any_database):
+    assert any_database.backend.supports_upsert()
+    first = _repository(any_database).upsert_many(_products(["A1", "A2", "A3"]))
+    assert (len(first.inserted_ids), len(first.updated_ids)) == (3, 0)
+
+    second = _repository(any_database).upsert_many(_products(["A2", "A3", "A4"], price=150.0),
+                                                   update_fields={"price"})
+    assert (len(second.inserted_ids), len(second.updated_ids)) == (1, 2)
+
+    products = {product.code: product for product in _repository(any_database).get_all()}
+    assert set(products) == {"A1", "A2", "A3", "A4"}
+    assert products["A1"].price == 100.0
+    assert products["A2"].price == 150.0
+    assert products["A4"].price == 150.0
+
+
+def test_read_engine_rejects_writes(any_database):
+    _repository(any_database).upsert_many(_products(["R1"]))
+    session = any_database.get_read_session()
+    try:
+        with pytest.raises(DBAPIError):
+            session.execute(text("UPDATE products SET price = 1"))
+    finally:
+        session.rollback()
+        session.close()
+
+
+def test_read_session_keeps_its_snapshot_until_it_ends(any_database):
+    _repository(any_database).upsert_many(_products(["S1", "S2"]))
+    session = any_database.get_read_session()
+    try:
+        assert _count(session) == 2
+        _repository(any_database).upsert_many(_products(["S3"]))
+        # Misma transacción de lectura: no ve el commit posterior
+        assert _count(session) == 2
+    finally:
+        session.close()
+
+    session = any_database.get_read_session()
+    try:
+        assert _count(session) == 3
+    finally:
+        session.close()
+
+
+def test_batches_stay_under_the_bind_parameter_limit(any_database):
+    backend = any_database.backend
+    params_per_row = 9
+    rows = list(range(backend.max_bind_params))
+    batches = list(backend.batched(rows, params_per_row))
+    assert len(batches) > 1
+    assert all(len(batch) * params_per_row <= backend.max_bind_params for batch in batches)
+    assert [row for batch in batches for row in batch] == rows
+
+
+def test_backup_restore(any_database, tmp_path):
+    if any_database.backend.dialect_name != "sqlite":
+        with pytest.raises(ValueError):
+            any_database.backend.restore_backup(str(tmp_path / "respaldo.db"))
+        with pytest.raises(ValueError):
+            any_database.backend.open_backup_source()
+        return
+
+    _repository(any_database).upsert_many(_products(["B1", "B2"]))
+    manager = BackupManager(any_database, directory=str(tmp_path / "backups"), keep=5)
+    backup = manager.create(label="test")
+    assert manager.verify(backup["file"])["ok"]
+
+    _repository(any_database).upsert_many(_products(["B3"]))
+    manager.restore(backup["file"])
+
+    codes = {product.code for product in _repository(any_database).get_all()}
+    assert codes == {"B1", "B2"}
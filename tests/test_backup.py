@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from src.database.backup import BackupManager
+from src.entities.product import Product
+from src.repositories.product_repository import ProductRepository
+
+
+def _repository(database) -> ProductRepository:
+    return ProductRepository(database.get_session(), database.get_read_session())
+
+
+def test_restoring_the_oldest_backup_with_full_retention_keeps_it(database, tmp_path):
+    manager = BackupManager(database, directory=str(tmp_path / "backups"), keep=2)
+    _repository(database).upsert_many([Product(code="B1", name="Producto 1", price=100.0, cost=60.0)])
+    oldest = manager.create(label="uno")
+    _repository(database).upsert_many([Product(code="B2", name="Producto 2", price=100.0, cost=60.0)])
+    manager.create(label="dos")
+    _repository(database).upsert_many([Product(code="B3", name="Producto 3", price=100.0, cost=60.0)])
+
+    result = manager.restore(oldest["file"])
+
+    assert result["restored"] == oldest["file"]
+    assert {product.code for product in _repository(database).get_all()} == {"B1"}
+    # El respaldo restaurado y el de seguridad siguen en disco
+    names = {path.name for path in manager.list_backups()}
+    assert Path(oldest["file"]).name in names
+    assert Path(result["previous"]).name in names
@@ -0,0 +1,70 @@
+from src.entities.location import Location
+from src.entities.product import Product
+from src.repositories.duplicate_repository import DuplicateRepository
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.services.duplicate_service import DuplicateService
+
+_OTHERS = ["Bujía iridio NGK", "Pastillas de freno delanteras", "Amortiguador trasero", "Correa de distribución",
+           "Batería 12V 60Ah", "Lámpara H4 halógena", "Limpiaparabrisas 22 pulgadas", "Radiador de aluminio",
+           "Termostato motor", "Bomba de agua"]
+
+
+def _service(database):
+    products = ProductRepository(database.get_session(), database.get_read_session())
+    duplicates = DuplicateRepository(database.get_session(), database.get_read_session())
+    for number, name in enumerate(_OTHERS):
+        products.create(Product(code=f"O{number}", name=name, price=10.0, cost=5.0))
+    return DuplicateService(duplicates, products), products
+
+
+def _pairs(service):
+    return {frozenset((candidate.product.name, candidate.duplicate.name)) for candidate in service.get_pending()}
+
+
+def test_finds_the_same_filter_written_differently_but_not_other_models(database):
+    service, products = _service(database)
+    products.create(Product(code="F1", name="Filtro aceite X-200", price=10.0, cost=5.0))
+    products.create(Product(code="F2", name="FILTRO DE ACEITE X200", price=11.0, cost=5.0))
+    products.create(Product(code="F3", name="Filtro aceite X-300", price=10.0, cost=5.0))
+
+    assert service.scan()["full"] is True
+    assert _pairs(service) == {frozenset(("Filtro aceite X-200", "FILTRO DE ACEITE X200"))}
+
+
+def test_incremental_scan_picks_up_an_imported_near_duplicate(database):
+    service, products = _service(database)
+    products.create(Product(code="F1", name="Filtro aceite X-200", price=10.0, cost=5.0))
+    service.scan()
+    assert _pairs(service) == set()
+
+    # Los cambios de stock no cambian nombres: no hay nada nuevo que buscar
+    products.update_stock(products.get_id_by_code("F1"), 5)
+    assert not service.has_unscanned_changes()
+
+    products.upsert_many([Product(code="F2", name="FILTRO DE ACEITE X200", price=11.0, cost=5.0)])
+    assert service.has_unscanned_changes()
+    result = service.scan()
+    assert (result["full"], result["products"], result["candidates"]) == (False, 1, 1)
+    assert _pairs(service) == {frozenset(("Filtro aceite X-200", "FILTRO DE ACEITE X200"))}
+    assert not service.has_unscanned_changes()
+
+
+def test_merge_moves_the_stock_to_the_kept_product(database):
+    service, products = _service(database)
+    kept = products.create(Product(code="F1", name="Filtro aceite X-200", price=10.0, cost=5.0))
+    merged = products.create(Product(code="F2", name="FILTRO DE ACEITE X200", price=11.0, cost=5.0))
+    locations = LocationRepository(database.get_session(), database.get_read_session())
+    location = locations.create(Location(code="S1", name="Sucursal 1"))
+    products.update_stock(kept.id, 4)
+    locations.set_stock(location.id, merged.id, 6)
+    service.scan()
+    candidate = service.get_pending()[0]
+
+    assert service.merge(candidate.id, kept.id) == {"kept": kept.id, "merged": merged.id, "units_moved": 6}
+    assert products.get_by_id(kept.id).stock == 10
+    assert products.get_by_id(merged.id).stock == 0
+    assert products.get_by_id(merged.id).is_active is False
+    assert locations.get_stock(location.id, kept.id) == 6
+    assert locations.get_stock(location.id, merged.id) == 0
+    assert service.get_pending() == []
@@ -0,0 +1,44 @@
+import threading
+
+from src.entities.location import Location
+from src.entities.product import Product
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+
+_COUNTERS = 8
+_COUNTS = 25
+
+
+def _locations(database) -> LocationRepository:
+    return LocationRepository(database.get_session(), database.get_read_session())
+
+
+def test_concurrent_counts_keep_the_company_total_in_step(database):
+    products = ProductRepository(database.get_session(), database.get_read_session())
+    product = products.create(Product(code="C1", name="Producto contado", price=100.0, cost=60.0))
+    products.update_stock(product.id, 40)
+    location = _locations(database).create(Location(code="S1", name="Sucursal 1"))
+
+    errors = []
+    barrier = threading.Barrier(_COUNTERS)
+
+    def counter(number: int) -> None:
+        repository = _locations(database)
+        barrier.wait()
+        for count in range(_COUNTS):
+            try:
+                repository.set_stock(location.id, product.id, number * 10 + count % 7)
+            except Exception as e:
+                errors.append(e)
+        repository.session.close()
+
+    threads = [threading.Thread(target=counter, args=(number,)) for number in range(_COUNTERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    # Stock fuera de sucursales (40) más el último conteo de la sucursal
+    final_count = _locations(database).get_stock(location.id, product.id)
+    assert products.get_by_id(product.id).stock == 40 + final_count
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from src.entities.price_list import PriceList, PriceListItem
+from src.entities.product import Product
+from src.repositories.price_list_repository import PriceListRepository
+from src.repositories.product_repository import ProductRepository
+from src.services.price_resolver import PriceResolver
+
+
+def _seed(database):
+    products = ProductRepository(database.get_session(), database.get_read_session())
+    product = products.create(Product(code="R1", name="Producto", price=100.0, cost=60.0))
+    return PriceListRepository(database.get_session(), database.get_read_session()), product
+
+
+def _price_list(repository, product, price, starts_at, ends_at=None, **price_list):
+    created = repository.create(PriceList(name=f"Lista {price}", **price_list))
+    repository.add_items([PriceListItem(created.id, product.id, price, starts_at, ends_at)])
+    return created
+
+
+def test_priority_then_specificity_then_lowest_price(database):
+    repository, product = _seed(database)
+    since = datetime.now() - timedelta(days=1)
+    _price_list(repository, product, 90.0, since)
+    _price_list(repository, product, 80.0, since, location_id=1)
+    _price_list(repository, product, 85.0, since, customer_tier="mayorista")
+    _price_list(repository, product, 70.0, since, location_id=1, customer_tier="mayorista")
+    _price_list(repository, product, 60.0, since, location_id=2)
+    resolver = PriceResolver(repository)
+
+    # A igual prioridad, la más específica; con la misma especificidad, el menor precio
+    assert resolver.resolve(product, location_id=1, customer_tier="mayorista") == 70.0
+    assert resolver.resolve(product, location_id=1) == 80.0
+    assert resolver.resolve(product, location_id=2, customer_tier="mayorista") == 60.0
+    assert resolver.resolve(product, location_id=3, customer_tier="mayorista") == 85.0
+    assert resolver.resolve(product) == 90.0
+
+    # La prioridad gana a la especificidad
+    _price_list(repository, product, 95.0, since, priority=1)
+    resolver.invalidate()
+    assert resolver.resolve(product, location_id=1, customer_tier="mayorista") == 95.0
+    # Otro instante va a la base por producto y elige igual
+    assert resolver.resolve(product, location_id=1, at=datetime.now() + timedelta(days=2)) == 95.0
+
+
+def test_cache_expires_when_a_price_window_opens_and_closes(database):
+    repository, product = _seed(database)
+    at = datetime.now()
+    opens, closes = at + timedelta(seconds=10), at + timedelta(seconds=20)
+    _price_list(repository, product, 75.0, opens, closes)
+    resolver = PriceResolver(repository)
+    resolver.version_check_seconds = 3600
+
+    assert repository.get_next_boundary(at) == opens
+    assert repository.get_next_boundary(opens) == closes
+    assert repository.get_next_boundary(closes) is None
+
+    assert resolver.resolve(product, at=at) == 100.0
+    assert resolver._valid_until == opens
+    assert resolver.resolve(product, at=opens - timedelta(microseconds=1)) == 100.0
+    assert resolver.resolve(product, at=opens) == 75.0
+    assert resolver._valid_until == closes
+    assert resolver.resolve(product, at=closes) == 100.0
+    assert resolver._valid_until is None
+
+
+def test_cache_reloads_when_another_process_changes_the_lists(database):
+    repository, product = _seed(database)
+    resolver = PriceResolver(repository)
+    resolver.version_check_seconds = 3600
+    assert resolver.resolve(product) == 100.0
+
+    # Otro proceso (otro repositorio, sin pasar por este resolvedor) agrega un precio
+    other = PriceListRepository(database.get_session(), database.get_read_session())
+    _price_list(other, product, 65.0, datetime.now() - timedelta(hours=1))
+    assert resolver.resolve(product) == 100.0
+
+    resolver.version_check_seconds = 0
+    assert resolver.resolve(product) == 65.0
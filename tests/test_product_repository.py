@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.entities.invoice import Invoice, InvoiceItem
+from src.entities.location import Location
+from src.entities.product import Product, ProductConflictError
+from src.entities.product_change import ChangeOperation
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+
+
+def _repository(database) -> ProductRepository:
+    return ProductRepository(database.get_session(), database.get_read_session())
+
+
+def test_create_returns_the_version_used_by_compare_and_swap(database):
+    repository = _repository(database)
+    product = repository.create(Product(code="V1", name="Producto", price=100.0, cost=60.0))
+    assert product.version == 1
+
+    product.price = 120.0
+    assert repository.update(product).version == 2
+
+    stale = repository.get_by_id(product.id)
+    stale.version = 1
+    stale.price = 90.0
+    with pytest.raises(ProductConflictError):
+        repository.update(stale)
+    assert repository.get_by_id(product.id).price == 120.0
+
+
+def test_update_of_a_missing_product_raises(database):
+    repository = _repository(database)
+    with pytest.raises(ValueError, match="No existe"):
+        repository.update(Product(id=999, code="X", name="Inexistente", price=1.0, cost=1.0))
+    with pytest.raises(ValueError, match="No existe"):
+        repository.update(Product(id=999, code="X", name="Inexistente", price=1.0, cost=1.0, version=3))
+    assert repository.changes_since(0) == []
+
+
+def test_stock_changes_and_archiving_are_recorded_in_the_change_log(database):
+    session, read_session = database.get_session(), database.get_read_session()
+    repository = ProductRepository(session, read_session)
+    locations = LocationRepository(session, read_session)
+    kept = repository.create(Product(code="K1", name="Conservado", price=100.0, cost=60.0))
+    duplicate = repository.create(Product(code="K2", name="Duplicado", price=100.0, cost=60.0))
+    retired = repository.create(Product(code="K3", name="Retirado", price=100.0, cost=60.0))
+    first, second = (locations.create(Location(code=code, name=code)) for code in ("S1", "S2"))
+    repository.delete(retired.id)
+
+    def recorded(step):
+        seq = repository.get_inventory_version()
+        step()
+        return [(change.product_id, change.operation) for change in repository.changes_since(seq)]
+
+    stock = ChangeOperation.STOCK
+    assert recorded(lambda: repository.update_stock(kept.id, 10)) == [(kept.id, stock)]
+    assert recorded(lambda: locations.set_stock(first.id, kept.id, 4)) == [(kept.id, stock)]
+    assert recorded(lambda: locations.transfer_stock(first.id, second.id, kept.id, 1)) == [(kept.id, stock)]
+    invoice = Invoice(invoice_number="F-1", location_id=first.id)
+    invoice.add_item(InvoiceItem(kept.id, "Conservado", 2, 100.0, 0.19, unit_cost=60.0, product_code="K1"))
+    assert recorded(lambda: SaleRepository(session, read_session).create(invoice)) == [(kept.id, stock)]
+    repository.update_stock(duplicate.id, 5)
+    assert recorded(lambda: repository.merge_into(duplicate.id, kept.id)) == [
+        (kept.id, stock), (duplicate.id, ChangeOperation.DELETE),
+    ]
+    assert repository.get_by_id(kept.id).stock == 17
+
+    # Los cambios de stock no invalidan los conteos del catálogo; la fusión (DELETE) sí
+    assert repository.get_facet_version() == repository.changes_since(0)[-1].seq
+    facet_version = repository.get_facet_version()
+    assert recorded(lambda: repository.update_stock(kept.id, 12)) == [(kept.id, stock)]
+    assert repository.get_facet_version() == facet_version
+
+    archived, _ = repository.archive_inactive(datetime.now() + timedelta(days=1))
+    assert archived == 1
+    assert [(change.product_id, change.operation) for change in repository.changes_since(facet_version)] == [
+        (kept.id, stock), (retired.id, ChangeOperation.ARCHIVE),
+    ]
+    assert repository.get_facet_version() > facet_version
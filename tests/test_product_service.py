@@ -0,0 +1,19 @@
+from src.repositories.product_repository import ProductRepository
+from src.services.product_service import ProductService
+
+
+def _service(database) -> ProductService:
+    return ProductService(ProductRepository(database.get_session(), database.get_read_session()))
+
+
+def test_numeric_codes_read_as_float_match_the_same_product(database):
+    service = _service(database)
+    # pandas lee 1234 como 1234.0 si la columna tiene celdas vacías; openpyxl y CSV lo traen como int o str
+    assert service.recount_inventory([{"code": 1234.0, "name": "Producto"}])["added"] == 1
+    assert service.get_product_by_code("1234") is not None
+
+    report = service.recount_inventory([{"code": 1234, "name": "Producto"}, {"code": "5678", "name": "Otro"}])
+    assert (report["added"], report["updated"], report["deleted"]) == (1, 1, 0)
+
+    deleted, not_found = service.delete_products_by_code([1234.0, 5678.0])
+    assert (deleted, not_found) == (2, [])
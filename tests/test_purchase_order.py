@@ -0,0 +1,37 @@
+import pytest
+
+from src.cli import read_records
+from src.entities.invoice import Invoice, InvoiceItem
+from src.entities.product import Product
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.services.product_service import ORDER_QUANTITY_COLUMN, ProductService
+from src.services.replenishment_service import PURCHASE_ORDER_COLUMNS, ReplenishmentService
+
+
+def test_purchase_order_cannot_be_imported_as_a_recount(database, tmp_path):
+    session, read_session = database.get_session(), database.get_read_session()
+    products = ProductRepository(session, read_session)
+    for number in range(1, 4):
+        product = products.create(Product(code=f"R{number}", name=f"Producto {number}", price=100.0, cost=60.0))
+        products.update_stock(product.id, 2)
+
+    # Solo R1 se vende: es el único que entra en la orden
+    invoice = Invoice(invoice_number="F-1")
+    invoice.add_item(InvoiceItem(1, "Producto 1", 2, 100.0, 0.19, unit_cost=60.0, product_code="R1"))
+    SaleRepository(session, read_session).create(invoice)
+
+    service = ReplenishmentService(products, SaleRepository(session, read_session),
+                                   LocationRepository(session, read_session))
+    path = tmp_path / "pedido.xlsx"
+    path.write_bytes(service.export_purchase_order())
+
+    records = list(read_records(str(path)))
+    assert [record["code"] for record in records] == ["R1"]
+    assert set(records[0]) <= set(PURCHASE_ORDER_COLUMNS)
+    assert records[0][ORDER_QUANTITY_COLUMN] > 0
+
+    with pytest.raises(ValueError, match="orden de compra"):
+        ProductService(products).recount_inventory(records)
+    assert {product.code for product in products.get_all()} == {"R1", "R2", "R3"}
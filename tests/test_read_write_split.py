@@ -0,0 +1,69 @@
+import threading
+import time
+
+from sqlalchemy import event
+
+from src.entities.product import Product
+from src.entities.product_filter import ProductFilter
+from src.repositories.product_repository import ProductRepository
+
+_SEEDED = 2000
+_IMPORTED = 60000
+
+
+def _products(start: int, count: int):
+    return [Product(code=f"P{number:07d}", name=f"Producto {number}", price=100.0 + number % 50, cost=60.0)
+            for number in range(start, start + count)]
+
+
+def _repository(database) -> ProductRepository:
+    return ProductRepository(database.get_session(), database.get_read_session())
+
+
+def test_reads_continue_with_a_consistent_snapshot_during_a_large_import(database):
+    _repository(database).upsert_many(_products(0, _SEEDED))
+    reader = _repository(database)
+    started = time.perf_counter()
+    assert len(reader.get_all()) == _SEEDED
+    baseline = time.perf_counter() - started
+
+    # Se marca con el primer INSERT: desde ahí la transacción de escritura está abierta
+    importing = threading.Event()
+    errors = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO products"):
+            importing.set()
+
+    event.listen(database.engine, "before_cursor_execute", on_execute)
+
+    def run_import():
+        try:
+            _repository(database).upsert_many(_products(_SEEDED, _IMPORTED))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            importing.set()
+
+    writer = threading.Thread(target=run_import)
+    writer.start()
+    importing.wait()
+
+    # Lecturas completas mientras la importación tiene abierta su transacción de escritura
+    counts, durations = [], []
+    while writer.is_alive():
+        started = time.perf_counter()
+        count = len(reader.get_all())
+        reader.filter(ProductFilter(search="Producto 1"))
+        durations.append(time.perf_counter() - started)
+        if writer.is_alive():
+            counts.append(count)
+    writer.join()
+
+    assert not errors
+    assert counts, "la importación terminó antes de la primera lectura"
+    # Cada lectura ve el catálogo anterior completo: nunca una importación a medias
+    assert set(counts) == {_SEEDED}
+    # Las lecturas no esperan al escritor (con un margen amplio para máquinas cargadas)
+    assert max(durations) < baseline * 20 + 1.0
+    assert len(reader.get_all()) == _SEEDED + _IMPORTED
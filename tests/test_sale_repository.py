@@ -0,0 +1,39 @@
+import threading
+
+from src.entities.invoice import Invoice, InvoiceItem
+from src.entities.product import Product
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+
+_CANCELLERS = 4
+
+
+def test_concurrent_cancellations_reverse_the_sale_once(database):
+    session, read_session = database.get_session(), database.get_read_session()
+    products = ProductRepository(session, read_session)
+    product = products.create(Product(code="L2", name="Producto", price=100.0, cost=60.0))
+    products.update_stock(product.id, 10)
+    invoice = Invoice(invoice_number="F-2")
+    invoice.add_item(InvoiceItem(product.id, "Producto", 3, 100.0, 0.19, unit_cost=60.0, product_code="L2"))
+    SaleRepository(session, read_session).create(invoice)
+
+    results = []
+    barrier = threading.Barrier(_CANCELLERS)
+
+    def cancel() -> None:
+        repository = SaleRepository(database.get_session(), database.get_read_session())
+        barrier.wait()
+        results.append(repository.delete(invoice.id))
+        repository.session.close()
+
+    threads = [threading.Thread(target=cancel) for _ in range(_CANCELLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [False] * (_CANCELLERS - 1) + [True]
+    assert products.get_by_id(product.id).stock == 10
+    sales = SaleRepository(session, read_session)
+    assert sales.get_by_id(invoice.id).status.value == "CANCELLED"
+    assert sales.delete(invoice.id) is False
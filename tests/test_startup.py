@@ -0,0 +1,15 @@
+import os
+
+import pytest
+
+from src.utils.startup_benchmark import DEFAULT_BUDGET_MS, format_report, run_benchmark, within_budget
+
+# Máquinas de CI lentas pueden subir el presupuesto sin tocar el código
+_BUDGET_MS = float(os.getenv("POS_STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS))
+
+
+@pytest.mark.slow
+def test_startup_stays_within_budget_and_defers_heavy_imports():
+    results = run_benchmark(runs=3)
+    assert not any(result.deferred_loaded for result in results), format_report(results, _BUDGET_MS)
+    assert within_budget(results, _BUDGET_MS), format_report(results, _BUDGET_MS)
@@ -0,0 +1,39 @@
+import time
+from datetime import datetime
+
+from src.entities.invoice import Invoice, InvoiceItem
+from src.entities.product import Product
+from src.entities.stock_checkpoint import StockCheckpoint
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.repositories.stock_ledger_repository import StockLedgerRepository
+
+
+def _pause() -> datetime:
+    """Momento claramente separado de lo anterior y de lo siguiente"""
+    time.sleep(0.01)
+    moment = datetime.now()
+    time.sleep(0.01)
+    return moment
+
+
+def test_cancellation_after_a_checkpoint_counts_from_the_cancel_time(database):
+    session, read_session = database.get_session(), database.get_read_session()
+    products = ProductRepository(session, read_session)
+    sales = SaleRepository(session, read_session)
+    ledger = StockLedgerRepository(session, read_session)
+
+    product = products.create(Product(code="L1", name="Producto", price=100.0, cost=60.0))
+    products.update_stock(product.id, 10)
+    invoice = Invoice(invoice_number="F-1")
+    invoice.add_item(InvoiceItem(product.id, "Producto", 1, 100.0, 0.19, unit_cost=60.0, product_code="L1"))
+    sales.create(invoice)
+
+    ledger.create(StockCheckpoint())
+    before_cancel = _pause()
+    assert sales.delete(invoice.id)
+    after_cancel = _pause()
+
+    assert ledger.stock_as_of(before_cancel)[0] == {product.id: 9}
+    assert ledger.stock_as_of(after_cancel)[0] == {product.id: 10}
+    assert products.get_by_id(product.id).stock == 10
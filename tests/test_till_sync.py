@@ -0,0 +1,141 @@
+from src.database.database import Database
+from src.database.till_journal import TillJournal
+from src.entities.invoice import Invoice
+from src.entities.location import Location
+from src.entities.product import Product
+from src.repositories.location_repository import LocationRepository
+from src.repositories.product_repository import ProductRepository
+from src.repositories.sale_repository import SaleRepository
+from src.services.location_service import LocationService
+from src.services.sales_service import SalesService
+from src.services.till_sync_service import TillSyncService
+
+
+def _seed(database, others: int = 0):
+    """
+    Mismo producto y sucursales en ambas bases; others crea antes otros productos y
+    sucursales, así los ids de la caja y de la central no coinciden
+    """
+    products = ProductRepository(database.get_session(), database.get_read_session())
+    locations = LocationRepository(database.get_session(), database.get_read_session())
+    for number in range(others):
+        products.create(Product(code=f"OTRO{number}", name=f"Otro {number}", price=10.0, cost=5.0))
+        locations.create(Location(code=f"OTRA{number}", name=f"Otra {number}"))
+    product = products.create(Product(code="P1", name="Producto 1", price=100.0, cost=60.0))
+    first = locations.create(Location(code="S1", name="Sucursal 1"))
+    second = locations.create(Location(code="S2", name="Sucursal 2"))
+    return products, locations, product, first, second
+
+
+def _sell(sales: SalesService, product: Product, quantity: int) -> None:
+    invoice = Invoice()
+    invoice.add_item(sales.build_item(product, quantity))
+    sales.finalize_sale(invoice)
+
+
+def test_offline_counts_and_transfers_replay_in_order_with_sales(database, tmp_path):
+    central = Database.connect(f"sqlite:///{tmp_path / 'central.db'}")
+    central.create_tables()
+    central.run_migrations()
+    central_products, central_locations, central_product, first, second = _seed(central, others=3)
+    central_locations.set_stock(first.id, central_product.id, 10)
+
+    local_products, local_locations, product, local_first, local_second = _seed(database)
+    assert local_first.id != first.id
+    journal = TillJournal(str(tmp_path / "journal.db"))
+    sales = SalesService(SaleRepository(database.get_session(), database.get_read_session()),
+                         journal, location_id=local_first.id, location_code=local_first.code)
+    locations = LocationService(local_locations, local_products, journal)
+
+    _sell(sales, product, 1)  # ya descontada cuando se cuenta
+    assert locations.set_stock(local_first.id, "P1", 7) is None
+    _sell(sales, product, 1)
+    locations.transfer_stock(local_first.id, local_second.id, "P1", 2)
+    assert journal.pending_stock_count() == 2
+
+    sync = TillSyncService(journal, central, local_products)
+    report = sync.sync()
+    assert report["synced"] == 2
+    assert report["stock_operations"] == 2
+    assert report["rejected_operations"] == []
+
+    assert central_locations.get_stock(first.id, central_product.id) == 7 - 1 - 2
+    assert central_locations.get_stock(second.id, central_product.id) == 2
+    assert central_products.get_by_id(central_product.id).stock == 7 - 1
+    # Ninguna venta cayó en la sucursal de la central con el id local
+    assert central_locations.get_stock(local_first.id, central_product.id) == 0
+
+    again = sync.sync()
+    assert (again["synced"], again["stock_operations"]) == (0, 0)
+    assert central_locations.get_stock(first.id, central_product.id) == 4
+    central.engine.dispose()
+    central.read_engine.dispose()
+
+
+def test_transfer_without_central_stock_stays_pending(database, tmp_path):
+    central = Database.connect(f"sqlite:///{tmp_path / 'central.db'}")
+    central.create_tables()
+    central.run_migrations()
+    _seed(central)
+
+    local_products, local_locations, _, first, second = _seed(database)
+    journal = TillJournal(str(tmp_path / "journal.db"))
+    LocationService(local_locations, local_products, journal).transfer_stock(first.id, second.id, "P1", 3)
+
+    report = TillSyncService(journal, central, local_products).sync()
+    assert report["stock_operations"] == 0
+    assert len(report["rejected_operations"]) == 1
+    assert journal.pending_stock_count() == 1
+    central.engine.dispose()
+    central.read_engine.dispose()
+
+
+def test_sale_from_a_location_unknown_to_the_central_stays_pending(database, tmp_path):
+    central = Database.connect(f"sqlite:///{tmp_path / 'central.db'}")
+    central.create_tables()
+    central.run_migrations()
+    _seed(central)
+
+    local_products, local_locations, product, _, _ = _seed(database)
+    only_local = local_locations.create(Location(code="S9", name="Solo en la caja"))
+    journal = TillJournal(str(tmp_path / "journal.db"))
+    sales = SalesService(SaleRepository(database.get_session(), database.get_read_session()),
+                         journal, location_id=only_local.id, location_code=only_local.code)
+    _sell(sales, product, 1)
+
+    report = TillSyncService(journal, central, local_products).sync()
+    assert report["synced"] == 0
+    assert report["rejected"] == [{"invoice_number": report["rejected"][0]["invoice_number"],
+                                   "missing_location": "S9"}]
+    assert journal.pending_count() == 1
+    central.engine.dispose()
+    central.read_engine.dispose()
+
+
+def test_transfer_is_not_applied_twice_when_the_journal_mark_is_lost(database, tmp_path, monkeypatch):
+    central = Database.connect(f"sqlite:///{tmp_path / 'central.db'}")
+    central.create_tables()
+    central.run_migrations()
+    central_products, central_locations, central_product, first, second = _seed(central)
+    central_locations.set_stock(first.id, central_product.id, 10)
+
+    local_products, local_locations, _, local_first, local_second = _seed(database)
+    journal = TillJournal(str(tmp_path / "journal.db"))
+    LocationService(local_locations, local_products, journal).transfer_stock(
+        local_first.id, local_second.id, "P1", 3
+    )
+
+    sync = TillSyncService(journal, central, local_products)
+    # La central confirma la transferencia pero la caja se cae antes de marcarla
+    with monkeypatch.context() as patch:
+        patch.setattr(journal, "mark_stock_operation_synced", lambda operation_id: None)
+        assert sync.sync()["stock_operations"] == 1
+    assert journal.pending_stock_count() == 1
+
+    report = sync.sync()
+    assert (report["stock_operations"], report["duplicate_operations"]) == (0, 1)
+    assert journal.pending_stock_count() == 0
+    assert central_locations.get_stock(first.id, central_product.id) == 7
+    assert central_locations.get_stock(second.id, central_product.id) == 3
+    central.engine.dispose()
+    central.read_engine.dispose()
@@ -0,0 +1,33 @@
+from src.database.write_coordinator import WriteCoordinator
+
+
+def test_group_keeps_arrival_order_across_batches_and_single_operations(database):
+    coordinator = WriteCoordinator(database, max_group_size=16, window_seconds=0.5)
+    executed, handler_calls = [], []
+
+    def handler(session, items):
+        handler_calls.append(list(items))
+        executed.extend(items)
+        return items
+
+    def operation(name):
+        def run(session):
+            executed.append(name)
+            return name
+        return run
+
+    try:
+        futures = [
+            coordinator.submit_batched(handler, "venta-1"),
+            coordinator.submit_batched(handler, "venta-2"),
+            coordinator.submit(operation("anulación")),
+            coordinator.submit_batched(handler, "venta-3"),
+        ]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        coordinator.close()
+
+    assert results == ["venta-1", "venta-2", "anulación", "venta-3"]
+    assert executed == ["venta-1", "venta-2", "anulación", "venta-3"]
+    # Solo las consecutivas del mismo handler van juntas
+    assert handler_calls == [["venta-1", "venta-2"], ["venta-3"]]